@@ -30,7 +30,8 @@ if sys.platform == 'win32':
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+from treelisty_cassette import build_service, replay_service
 
 # Google Calendar API scope (read-only)
 SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
@@ -64,6 +65,11 @@ def authenticate(force_reauth=False):
     Returns:
         Calendar API service object
     """
+    # Offline replay (TREELISTY_CASSETTE): no credentials needed
+    service = replay_service('calendar', 'v3')
+    if service is not None:
+        return service
+
     creds = None
 
     # Delete token if forcing re-auth
@@ -103,7 +109,7 @@ def authenticate(force_reauth=False):
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
 
-    return build('calendar', 'v3', credentials=creds)
+    return build_service('calendar', 'v3', creds)
 
 
 def get_event_icon(event):
@@ -15,6 +15,47 @@ Setup:
 3. Create credentials: https://console.cloud.google.com/apis/credentials (Desktop app OAuth 2.0)
 4. Download credentials.json to this folder
 5. Run: python export_gdrive_content_to_treelisty.py [folder_id] [--max-depth N] [--chunk-size N]
+                                                       [--chunking {greedy,content}]
+                                                       [--incremental [PREVIOUS]] [--manifest [PATH]]
+                                                       [--search-index [PATH]]
+                                                       [--dedupe {mark,collapse}] [--dedupe-threshold T]
+                                                       [--sheets {rows,summary}] [--sheet-rows N] [--sheet-chars N]
+                                                       [--downloaders N] [--extract-jobs N]
+                                                       [--spill-mb N] [--max-file-mb N] [--max-resident-mb N]
+
+Files are downloaded 8 at a time (--downloaders) while the folder walk goes
+on, and PDF/Word/Excel files are parsed in worker processes (--extract-jobs);
+the tree is written in folder order as results come in. Downloads over
+--spill-mb go to a temporary file that the parsers open directly, files over
+--max-file-mb are skipped, and downloads in flight hold at most
+--max-resident-mb in memory.
+
+--incremental takes the newest previous export (or PREVIOUS) as a baseline,
+and --manifest a SQLite sidecar that every run updates: a listed file whose
+md5Checksum (or, for Google Docs/Sheets/Slides, which have none,
+modifiedTime) is unchanged keeps its previous node and chunks instead of
+being downloaded and extracted again. The summary reports the bytes and
+download/parse time that saved.
+
+--chunking content cuts content-defined chunks (averaging --chunk-size,
+see treelisty_chunking) instead of greedy ones, so an edit only changes
+the chunks around it rather than every chunk after it.
+
+--search-index keeps a BM25 index of the chunks (treelisty_search_index)
+next to the export, updated every run for the files whose chunks changed;
+query it with python treelisty_search_index.py PATH "query".
+
+Excel workbooks and Google Sheets are read a row at a time within budgets
+(treelisty_spreadsheet): --sheets rows keeps each sheet's first
+--sheet-rows rows, --sheets summary describes its columns (types, distinct
+counts, ranges) with a few sample rows; either way at most --sheet-chars
+characters per sheet, however large the workbook.
+
+--dedupe finds chunks that repeat an earlier chunk of the export, word for
+word or nearly ("final" and "final v2", a Doc and its exported PDF; see
+treelisty_dedupe): `mark` notes the first copy's node id on them, and
+`collapse` also leaves out their text. The stats report the dedupe rate
+and the export's size.
 
 First run opens browser for authentication. Token saved for future runs.
 """
@@ -22,11 +63,18 @@ First run opens browser for authentication. Token saved for future runs.
 import os
 import sys
 import json
-import re
 import io
 import argparse
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, NamedTuple, Union
 
 # Fix Windows console encoding for emojis
 if sys.platform == 'win32':
@@ -35,24 +83,27 @@ if sys.platform == 'win32':
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 
-# Optional imports for text extraction
-try:
-    import fitz  # PyMuPDF
-    HAS_PYMUPDF = True
-except ImportError:
-    HAS_PYMUPDF = False
+import treelisty_chunking
+from treelisty_chunking import CHUNKING_MODES, CONTENT_DEFINED, GREEDY
+from treelisty_cassette import build_service, replay_service
+from treelisty_dedupe import DEFAULT_THRESHOLD, ChunkDeduper
+from treelisty_documents import DOCX_BACKEND, DOCX_VERSION, PDF_BACKEND, PDF_VERSION, docx_text, pdf_text
+from treelisty_drive_sync import find_previous_export, load_previous_export
+from treelisty_extract_cache import DEFAULT_CACHE_FILE, DEFAULT_CACHE_MB, ExtractionCache
+from treelisty_google_batch import list_folders_batched
+from treelisty_json_writer import StreamingTreeWriter
+from treelisty_search_index import SearchIndexWriter, file_chunks
+from treelisty_spreadsheet import FORMAT_VERSION, SHEET_MODES, SheetOptions, csv_text, workbook_text
+
+# PDF and Word text comes from treelisty_documents, shared with the local exporter
+if PDF_BACKEND is None:
     print("⚠️  PyMuPDF not installed. PDF extraction disabled. Install: pip install PyMuPDF")
-
-try:
-    from docx import Document as DocxDocument
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
+if DOCX_BACKEND is None:
     print("⚠️  python-docx not installed. Word extraction disabled. Install: pip install python-docx")
 
+# Optional imports for text extraction
 try:
     import openpyxl
     HAS_OPENPYXL = True
@@ -64,11 +115,50 @@ except ImportError:
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 TOKEN_FILE = 'token-drive.json'  # Separate from Gmail token
 
+# Shared extraction cache (--extract-cache), set in export_gdrive_content()
+extraction_cache: Optional[ExtractionCache] = None
+
+# How spreadsheets become text (--sheets), set in export_gdrive_content()
+sheet_options = SheetOptions()
+
 # Default chunk size in characters (roughly 250-500 tokens)
 DEFAULT_CHUNK_SIZE = 1500
 MAX_CHUNK_SIZE = 4000
 MIN_CHUNK_SIZE = 200
 
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+LIST_FIELDS = "id, name, mimeType, size, md5Checksum, modifiedTime, webViewLink"
+LIST_PAGE_SIZE = 100  # Smaller batches for content extraction
+
+# Download/extract pipeline: files downloaded at once (0 = one at a time, inline)
+# and worker processes parsing PDF/Word/Excel (0 = parse on the main thread)
+DEFAULT_DOWNLOADERS = 8
+DEFAULT_EXTRACT_JOBS = min(8, os.cpu_count() or 1)
+PROGRESS_INTERVAL = 2.0  # seconds between progress lines
+
+# Download memory: files over DEFAULT_SPILL_MB are written to a temp file
+# instead of memory, files over DEFAULT_MAX_FILE_MB are skipped, and
+# concurrent downloads hold at most DEFAULT_MAX_RESIDENT_MB in memory
+DEFAULT_SPILL_MB = 16
+DEFAULT_MAX_FILE_MB = 1024
+DEFAULT_MAX_RESIDENT_MB = 256
+DOWNLOAD_CHUNK_BYTES = 4 * 1024 * 1024  # Per request while downloading (googleapiclient defaults to 100MB)
+
+EXPORT_GLOB = 'gdrive-content-*.json'
+LATEST_EXPORT = 'latest'  # --incremental without a file name
+DEFAULT_MANIFEST_FILE = 'gdrive-content.manifest.db'
+DEFAULT_SEARCH_INDEX_FILE = 'gdrive-content.search.db'
+
+# Spreadsheets, read within sheet_options' budgets (Google Sheets are exported as CSV)
+GOOGLE_SHEET = 'application/vnd.google-apps.spreadsheet'
+EXCEL = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+SPREADSHEET_TYPES = {GOOGLE_SHEET, EXCEL}
+
+# --dedupe: mark duplicate chunks with their canonical chunk, or also drop their text
+DEDUPE_MARK = 'mark'
+DEDUPE_COLLAPSE = 'collapse'
+DEDUPE_MODES = (DEDUPE_MARK, DEDUPE_COLLAPSE)
+
 # File types we can extract text from
 EXTRACTABLE_TYPES = {
     # Google Workspace (export as text)
@@ -88,6 +178,11 @@ EXTRACTABLE_TYPES = {
 
 def authenticate():
     """Authenticate with Google Drive API"""
+    # Offline replay (TREELISTY_CASSETTE): no credentials needed
+    service = replay_service('drive', 'v3')
+    if service is not None:
+        return service
+
     creds = None
 
     if os.path.exists(TOKEN_FILE):
@@ -114,219 +209,567 @@ def authenticate():
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
 
-    return build('drive', 'v3', credentials=creds)
+    return build_service('drive', 'v3', creds)
 
 
-def generate_node_id() -> str:
-    """Generate a unique node ID"""
-    import uuid
-    return f"n_{uuid.uuid4().hex[:8]}"
-
+class NodeIds:
+    """
+    Node ids for one export, derived from what the nodes hold rather than
+    drawn at random: a folder's or file's from its Drive id, a chunk's from
+    its file's Drive id and a hash of its text. Unchanged content gets the
+    same ids on every run, so re-exports can be diffed and merged by id.
+
+    Ids are 'n_' and 12 hex digits of a SHA-1. Identical chunks within a
+    file are told apart by how many came before; if an id was already
+    issued in this export anyway (a hash collision, or a Drive item listed
+    in two folders), the next one derived from the same parts and a counter
+    is used. Issued ids are kept as integers.
+    """
 
-def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    def __init__(self):
+        self.issued = set()
+
+    def issue(self, *parts: str) -> str:
+        """The id for these parts, or the next free one after it"""
+        key = '\x1f'.join(parts)
+        attempt = 0
+        while True:
+            salted = key if attempt == 0 else f'{key}\x1f{attempt}'
+            value = int.from_bytes(hashlib.sha1(salted.encode('utf-8')).digest()[:6], 'big')
+            if value not in self.issued:
+                self.issued.add(value)
+                return f'n_{value:012x}'
+            attempt += 1
+
+    def folder(self, folder_id: str) -> str:
+        return self.issue('folder', folder_id)
+
+    def file(self, file_id: str) -> str:
+        return self.issue('file', file_id)
+
+    def chunks(self, file_id: str, texts: List[str]) -> List[str]:
+        """Ids for a file's chunks, in order"""
+        seen = {}
+        ids = []
+        for text in texts:
+            digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+            seen[digest] = seen.get(digest, 0) + 1
+            ids.append(self.issue('chunk', file_id, digest, str(seen[digest])))
+        return ids
+
+    def assign(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """A file node from a baseline with the ids this export gives it (it may predate them)"""
+        file_id = node['external']['id']
+        node = dict(node, id=self.file(file_id))
+        if 'items' in node:
+            chunk_ids = self.chunks(file_id, [chunk['description'] for chunk in node['items']])
+            node['items'] = [dict(chunk, id=chunk_id) for chunk, chunk_id in zip(node['items'], chunk_ids)]
+        return node
+
+
+def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, chunking: str = GREEDY) -> List[Dict[str, Any]]:
     """
     Split text into chunks for RAG.
-    Tries to split on paragraph boundaries.
+    Tries to split on paragraph boundaries, then sentences (see treelisty_chunking);
+    chunking=CONTENT_DEFINED cuts content-defined chunks averaging chunk_size.
 
     Returns list of chunks with metadata.
     """
-    if not text or not text.strip():
-        return []
-
-    # Normalize whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text.strip())
-
-    # If text is small enough, return as single chunk
-    if len(text) <= chunk_size:
-        return [{
-            'text': text,
-            'charCount': len(text),
-            'isLeaf': True
-        }]
-
-    chunks = []
-    paragraphs = text.split('\n\n')
-    current_chunk = ""
-
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-
-        # If adding this paragraph would exceed chunk size
-        if len(current_chunk) + len(para) + 2 > chunk_size:
-            # Save current chunk if not empty
-            if current_chunk:
-                chunks.append({
-                    'text': current_chunk.strip(),
-                    'charCount': len(current_chunk.strip()),
-                    'isLeaf': True
-                })
-                current_chunk = ""
-
-            # If paragraph itself is too large, split it
-            if len(para) > chunk_size:
-                # Split on sentence boundaries
-                sentences = re.split(r'(?<=[.!?])\s+', para)
-                for sentence in sentences:
-                    if len(current_chunk) + len(sentence) + 1 > chunk_size:
-                        if current_chunk:
-                            chunks.append({
-                                'text': current_chunk.strip(),
-                                'charCount': len(current_chunk.strip()),
-                                'isLeaf': True
-                            })
-                            current_chunk = ""
-                        # If single sentence is still too large, force split
-                        if len(sentence) > chunk_size:
-                            for i in range(0, len(sentence), chunk_size):
-                                chunk_text = sentence[i:i+chunk_size].strip()
-                                if chunk_text:
-                                    chunks.append({
-                                        'text': chunk_text,
-                                        'charCount': len(chunk_text),
-                                        'isLeaf': True
-                                    })
-                        else:
-                            current_chunk = sentence
-                    else:
-                        current_chunk += " " + sentence if current_chunk else sentence
-            else:
-                current_chunk = para
-        else:
-            current_chunk += "\n\n" + para if current_chunk else para
+    return treelisty_chunking.chunk_text(text, chunk_size, chunking)
 
-    # Don't forget the last chunk
-    if current_chunk.strip():
-        chunks.append({
-            'text': current_chunk.strip(),
-            'charCount': len(current_chunk.strip()),
-            'isLeaf': True
-        })
 
-    return chunks
+def _document_source(source: Union[bytes, str]):
+    """What a parser opens: a spilled download's path as is, bytes as a file object"""
+    return source if isinstance(source, str) else io.BytesIO(source)
 
 
-def extract_text_from_pdf(content: bytes) -> str:
-    """Extract text from PDF content"""
-    if not HAS_PYMUPDF:
+def extract_text_from_pdf(source: Union[bytes, str]) -> str:
+    """Extract text from PDF content (bytes, or the path of a spilled download)"""
+    if PDF_BACKEND is None:
         return "[PDF extraction requires PyMuPDF: pip install PyMuPDF]"
 
-    try:
-        doc = fitz.open(stream=content, filetype="pdf")
-        text_parts = []
-        for page in doc:
-            text_parts.append(page.get_text())
-        doc.close()
-        return "\n\n".join(text_parts)
-    except Exception as e:
-        return f"[PDF extraction error: {e}]"
+    text, error = pdf_text(source)
+    return f"[PDF extraction error: {error}]" if error else text
 
 
-def extract_text_from_docx(content: bytes) -> str:
-    """Extract text from Word document"""
-    if not HAS_DOCX:
+def extract_text_from_docx(source: Union[bytes, str]) -> str:
+    """Extract text from Word document (bytes or path)"""
+    if DOCX_BACKEND is None:
         return "[Word extraction requires python-docx: pip install python-docx]"
 
-    try:
-        doc = DocxDocument(io.BytesIO(content))
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-        return "\n\n".join(paragraphs)
-    except Exception as e:
-        return f"[Word extraction error: {e}]"
+    text, error = docx_text(source)
+    return f"[Word extraction error: {error}]" if error else text
 
 
-def extract_text_from_xlsx(content: bytes) -> str:
-    """Extract text from Excel spreadsheet"""
+def extract_text_from_xlsx(source: Union[bytes, str], sheets: SheetOptions = SheetOptions()) -> str:
+    """
+    Extract text from Excel spreadsheet (bytes or path): each sheet's first
+    rows or a column summary, within the budgets of `sheets`. Rows are
+    streamed from the workbook and reading stops at the budgets, so huge
+    workbooks cost no more than small ones.
+    """
     if not HAS_OPENPYXL:
         return "[Excel extraction requires openpyxl: pip install openpyxl]"
 
     try:
-        wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
-        text_parts = []
+        wb = openpyxl.load_workbook(_document_source(source), read_only=True, data_only=True)
+        try:
+            # max_row comes from the sheet's recorded dimensions; sheets saved without them (as
+            # some generated files are) report None, so no total row count is given for them
+            return workbook_text(((name, wb[name].iter_rows(values_only=True), wb[name].max_row)
+                                  for name in wb.sheetnames), sheets, len(wb.sheetnames))
+        finally:
+            wb.close()
+    except Exception as e:
+        return f"[Excel extraction error: {e}]"
+
+
+def extract_text_from_csv(source: Union[bytes, str], sheets: SheetOptions = SheetOptions()) -> str:
+    """Extract a Google Sheet exported as CSV (bytes or path) like an Excel sheet"""
+    try:
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8', errors='replace', newline='') as f:
+                return csv_text(f, sheets)
+        return csv_text(io.StringIO(source.decode('utf-8', errors='replace'), newline=''), sheets)
+    except Exception as e:
+        return f"[CSV extraction error: {e}]"
+
+
+# Parsers whose output goes through the shared cache: mime type -> (fn, backend, version).
+# PDF and Word backends are treelisty_documents', so the local exporter's entries are hits here
+CACHED_EXTRACTORS = {
+    'application/pdf': (extract_text_from_pdf, PDF_BACKEND, PDF_VERSION),
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': (
+        extract_text_from_docx, DOCX_BACKEND, DOCX_VERSION),
+    'application/msword': (extract_text_from_docx, DOCX_BACKEND, DOCX_VERSION),
+    EXCEL: (extract_text_from_xlsx, 'openpyxl', getattr(openpyxl, '__version__', '?') if HAS_OPENPYXL else None),
+    GOOGLE_SHEET: (extract_text_from_csv, 'csv', FORMAT_VERSION),
+}
 
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            text_parts.append(f"## Sheet: {sheet_name}\n")
 
-            rows = []
-            for row in sheet.iter_rows(values_only=True):
-                cell_values = [str(cell) if cell is not None else "" for cell in row]
-                if any(cell_values):
-                    rows.append(" | ".join(cell_values))
+def configure_extraction_cache(db_path: Optional[str], max_mb: int = DEFAULT_CACHE_MB, evict_on_put: bool = True):
+    """Set (or clear, with db_path=None) the shared extraction cache; also a pool initializer"""
+    global extraction_cache
+    extraction_cache = ExtractionCache(db_path, max_mb, evict_on_put) if db_path else None
 
-            text_parts.append("\n".join(rows))
 
-        wb.close()
-        return "\n\n".join(text_parts)
-    except Exception as e:
-        return f"[Excel extraction error: {e}]"
+def extract_document(source: Union[bytes, str], mime_type: str, digest: Optional[str] = None,
+                     sheets: Optional[SheetOptions] = None):
+    """
+    Parse a downloaded document (its bytes, or the path it was spilled to)
+    with the extractor for mime_type, consulting the shared extraction cache
+    first. Extractor error messages are not cached. Spreadsheets are read
+    as `sheets` says (default: sheet_options), which is part of their key.
+
+    This is the unit of work run in extraction worker processes, whose cache
+    statistics are lost; the caller records the lookup.
+
+    Args:
+        digest: SHA-256 hex digest of the bytes, if already known (required
+            with a path to use the cache)
+
+    Returns:
+        tuple: (text, cache_hit), cache_hit None when the cache wasn't consulted
+    """
+    extractor, backend, version = CACHED_EXTRACTORS[mime_type]
+    options = {}
+    if mime_type in SPREADSHEET_TYPES:
+        options['sheets'] = sheets or sheet_options
+        backend += '+' + options['sheets'].key()
+    if extraction_cache is None or version is None or (digest is None and isinstance(source, str)):
+        return extractor(source, **options), None
+
+    if digest is None:
+        key = extraction_cache.key(source, backend, version)
+    else:
+        key = extraction_cache.digest_key(digest, backend, version)
+    text = extraction_cache.get(key)
+    if text is not None:
+        return text, True
+
+    text = extractor(source, **options)
+    if not (text.startswith('[') and 'extraction error:' in text[:60]):
+        extraction_cache.put(key, text)
+    return text, False
+
+
+def extract_document_cached(source: Union[bytes, str], mime_type: str, digest: Optional[str] = None) -> str:
+    """Parse a downloaded document in this process (see extract_document)"""
+    return extract_document(source, mime_type, digest)[0]
+
+
+# =============================================================================
+# Downloads
+# =============================================================================
+
+class DownloadLimits(NamedTuple):
+    """Memory limits for content downloads, in bytes (0 = no limit)"""
+    spill_bytes: int = DEFAULT_SPILL_MB * 1024 * 1024           # Larger downloads go to a temp file
+    max_file_bytes: int = DEFAULT_MAX_FILE_MB * 1024 * 1024     # Larger files are skipped
+    max_resident_bytes: int = DEFAULT_MAX_RESIDENT_MB * 1024 * 1024  # In memory across downloads
+    spill_dir: Optional[str] = None                              # Temp dir (default: system temp)
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+class Extracted(NamedTuple):
+    """A file's text from ContentPipeline.result(), with what getting it cost"""
+    text: Optional[str]
+    size: int = 0         # Bytes downloaded
+    seconds: float = 0.0  # Downloading and parsing
+
+
+class DownloadBuffer:
+    """
+    Write target for MediaIoBaseDownload that keeps up to `spill_bytes` in
+    memory and moves anything larger to a temporary file, hashing as it
+    goes (for the extraction cache). Parsers get source(): the bytes, or the
+    temp file's path, so a large document is never held in memory whole,
+    let alone twice. close() removes the temp file.
+    """
+
+    def __init__(self, limits: DownloadLimits = DownloadLimits()):
+        self.limits = limits
+        self.memory = io.BytesIO()
+        self.file = None
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.started = time.monotonic()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.limits.max_file_bytes and self.size > self.limits.max_file_bytes:
+            raise FileTooLarge(f"over {self.limits.max_file_bytes // (1024 * 1024)}MB")
+        self.sha256.update(data)
+        if self.file is None and self.limits.spill_bytes and self.size > self.limits.spill_bytes:
+            self.file = tempfile.NamedTemporaryFile(prefix='treelisty-', suffix='.download',
+                                                    dir=self.limits.spill_dir, delete=False)
+            self.file.write(self.memory.getbuffer())
+            self.memory = None
+        (self.file or self.memory).write(data)
+        return len(data)
+
+    @property
+    def spilled(self) -> bool:
+        return self.file is not None
+
+    @property
+    def digest(self) -> str:
+        return self.sha256.hexdigest()
+
+    def source(self) -> Union[bytes, str]:
+        """The downloaded bytes, or the path of the file they were spilled to"""
+        if self.file is not None:
+            self.file.close()
+            return self.file.name
+        return self.memory.getvalue()
+
+    def text(self) -> str:
+        """The download decoded as UTF-8 (plain text and exported Google files)"""
+        if self.file is not None:
+            self.file.close()
+            with open(self.file.name, 'rb') as f:
+                return f.read().decode('utf-8', errors='replace')
+        return self.memory.getvalue().decode('utf-8', errors='replace')
+
+    def close(self):
+        self.memory = None
+        if self.file is not None:
+            self.file.close()
+            try:
+                os.remove(self.file.name)
+            except OSError:
+                pass
+
+
+class ByteBudget:
+    """
+    Bytes that concurrent downloads may hold in memory. acquire() blocks
+    until the amount fits; a single download bigger than the whole budget
+    still runs, alone. Amounts are granted in the order of the turns taken
+    with take_turn(), so a later file can't take the share that the oldest
+    one (the one the caller is waiting on) needs.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.turns = 0
+        self.next_turn = 0
+        self.condition = threading.Condition()
+
+    def take_turn(self) -> int:
+        with self.condition:
+            self.turns += 1
+            return self.turns - 1
+
+    def acquire(self, amount: int, turn: int):
+        with self.condition:
+            while turn != self.next_turn or (self.limit and self.used and self.used + amount > self.limit):
+                self.condition.wait()
+            self.used += amount
+            self.next_turn += 1
+            self.condition.notify_all()
+
+    def release(self, amount: int):
+        with self.condition:
+            self.used -= amount
+            self.condition.notify_all()
+
 
+def file_too_large(item: Dict[str, Any], limits: DownloadLimits) -> bool:
+    """Whether a listed file is over the size limit (exported Google files have no size)"""
+    return bool(limits.max_file_bytes) and int(item.get('size', 0)) > limits.max_file_bytes
 
-def download_and_extract(service, file_id: str, mime_type: str, file_name: str) -> Optional[str]:
+
+def download_content(service, file_id: str, mime_type: str,
+                     limits: DownloadLimits = DownloadLimits()) -> DownloadBuffer:
+    """
+    Download a file's bytes into a DownloadBuffer (the caller closes it).
+
+    For Google Workspace files: Use export API (as EXTRACTABLE_TYPES says)
+    For binary files: Download as stored
+    """
+    type_info = EXTRACTABLE_TYPES[mime_type]
+    if 'export' in type_info:
+        request = service.files().export_media(fileId=file_id, mimeType=type_info['export'])
+    else:
+        request = service.files().get_media(fileId=file_id)
+    content = DownloadBuffer(limits)
+    try:
+        downloader = MediaIoBaseDownload(content, request, chunksize=DOWNLOAD_CHUNK_BYTES)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+    except Exception:
+        content.close()
+        raise
+    return content
+
+
+def download_and_extract(service, file_id: str, mime_type: str, file_name: str,
+                         limits: DownloadLimits = DownloadLimits()) -> Optional[str]:
     """
     Download file content and extract text.
 
     For Google Workspace files: Use export API
     For binary files: Download and parse
     """
-    type_info = EXTRACTABLE_TYPES.get(mime_type)
-    if not type_info:
+    if mime_type not in EXTRACTABLE_TYPES:
         return None
 
     try:
-        # Google Workspace files - export as text
-        if 'export' in type_info:
-            export_mime = type_info['export']
-            request = service.files().export_media(fileId=file_id, mimeType=export_mime)
-            content = io.BytesIO()
-            downloader = MediaIoBaseDownload(content, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-            return content.getvalue().decode('utf-8', errors='replace')
-
-        # Binary files - download and parse
-        elif 'download' in type_info:
-            request = service.files().get_media(fileId=file_id)
-            content = io.BytesIO()
-            downloader = MediaIoBaseDownload(content, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-
-            raw_content = content.getvalue()
-
-            # PDF
-            if mime_type == 'application/pdf':
-                return extract_text_from_pdf(raw_content)
-
-            # Word
-            elif mime_type in ['application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                              'application/msword']:
-                return extract_text_from_docx(raw_content)
-
-            # Excel
-            elif mime_type == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
-                return extract_text_from_xlsx(raw_content)
-
-            # Plain text files
-            else:
-                return raw_content.decode('utf-8', errors='replace')
+        content = download_content(service, file_id, mime_type, limits)
+        try:
+            # PDF, Word, Excel (through the shared extraction cache)
+            if mime_type in CACHED_EXTRACTORS:
+                return extract_document_cached(content.source(), mime_type, content.digest)
+
+            # Exported Google Workspace files and plain text
+            return content.text()
+        finally:
+            content.close()
 
     except Exception as e:
         print(f"    ⚠️  Extraction failed for {file_name}: {e}")
         return None
 
-    return None
+
+# =============================================================================
+# Download/Extract Pipeline
+# =============================================================================
+
+class ContentPipeline:
+    """
+    Overlaps the folder walk, downloads and parsing for scan_and_extract.
+
+    Submitted files are downloaded by `downloaders` threads, each with its
+    own API client from service_factory, and PDF/Word/Excel documents then
+    go to a pool of `extract_jobs` worker processes (started on the first
+    such file), which open spilled downloads straight from disk. The caller
+    takes each file's text back with result(), in the order it submitted
+    them, and does the chunking, so the tree comes out exactly as a serial
+    run writes it. `window` is how many files the walk may run ahead of the
+    oldest unfinished one.
+
+    Downloads stay within `limits`: files over max_file_bytes are skipped,
+    and a download only starts once its in-memory share (up to spill_bytes)
+    fits in max_resident_bytes alongside the others being downloaded,
+    waiting to be parsed or parsed.
+
+    With downloaders=0 (or no service_factory) each file is downloaded and
+    parsed inline with `service` when submitted; with extract_jobs=0
+    documents are parsed on the calling thread in result().
+    """
+
+    def __init__(self, service, service_factory=None, downloaders: int = DEFAULT_DOWNLOADERS,
+                 extract_jobs: int = DEFAULT_EXTRACT_JOBS, limits: DownloadLimits = DownloadLimits()):
+        self.service = service
+        self.service_factory = service_factory
+        self.downloaders = downloaders if service_factory is not None else 0
+        self.extract_jobs = max(0, extract_jobs)
+        self.limits = limits
+        self.budget = ByteBudget(limits.max_resident_bytes)
+        self.window = max(1, self.downloaders * 4 + self.extract_jobs)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.download_pool = (ThreadPoolExecutor(max_workers=self.downloaders, thread_name_prefix='drive-download')
+                              if self.downloaders else None)
+        self.extract_pool = None
+        self.counts = {'queued': 0, 'downloaded': 0, 'bytes': 0, 'spilled': 0, 'parsed': 0, 'failed': 0,
+                       'skipped': 0, 'done': 0, 'reused': 0}
+        self.started = self.last_report = time.monotonic()
+
+    def submit(self, item: Dict[str, Any]) -> Future:
+        """Start downloading (and parsing) a listed file"""
+        self._count(queued=1)
+        future = Future()
+        if file_too_large(item, self.limits):
+            self._skipped(item, f"{int(item['size']) // (1024 * 1024)}MB", future)
+        elif self.download_pool is None:
+            self._download(item, future, self.budget.take_turn(), self.service)
+        else:
+            self.download_pool.submit(self._download, item, future, self.budget.take_turn())
+        return future
+
+    def result(self, item: Dict[str, Any], future: Future) -> Extracted:
+        """Wait for a submitted file's text; None if it couldn't be downloaded or parsed"""
+        kind, value = future.result()
+        if kind == 'download':
+            # extract_jobs=0: parse here, where the extraction cache's connection lives
+            content, reserved = value
+            try:
+                text = extract_document_cached(content.source(), item['mimeType'], content.digest)
+            finally:
+                content.close()
+                self.budget.release(reserved)
+            value = Extracted(text, content.size, time.monotonic() - content.started)
+            self._count(parsed=1)
+        self._count(done=1)
+        return value
+
+    def reused(self):
+        """Count a file taken from the previous export instead"""
+        self._count(reused=1)
+
+    def report(self, force: bool = False):
+        """Print a progress line, at most every PROGRESS_INTERVAL seconds unless forced"""
+        now = time.monotonic()
+        if not force and now - self.last_report < PROGRESS_INTERVAL:
+            return
+        self.last_report = now
+        with self.lock:
+            c = dict(self.counts)
+        print(f"   ⏳ {c['done'] + c['reused']:,}/{c['queued'] + c['reused']:,} files · "
+              f"{c['downloaded']:,} downloaded ({c['bytes'] / (1024 * 1024):,.1f}MB, {c['spilled']:,} to disk) · "
+              f"{c['parsed']:,} parsed · {c['reused']:,} reused · {c['skipped']:,} too large · "
+              f"{c['failed']:,} failed · {now - self.started:,.0f}s")
+
+    def close(self):
+        if self.download_pool is not None:
+            self.download_pool.shutdown(wait=True)
+        if self.extract_pool is not None:
+            self.extract_pool.shutdown(wait=True)
+
+    def _count(self, **amounts):
+        with self.lock:
+            for key, amount in amounts.items():
+                self.counts[key] += amount
+
+    def _client(self):
+        # googleapiclient services aren't thread-safe: one per download thread
+        if not hasattr(self.local, 'service'):
+            self.local.service = self.service_factory()
+        return self.local.service
+
+    def _download(self, item, future, turn, service=None):
+        # Memory this download may hold: its size, up to the spill threshold
+        size = int(item.get('size', 0)) or self.limits.spill_bytes
+        reserved = min(size, self.limits.spill_bytes) if self.limits.spill_bytes else size
+        self.budget.acquire(reserved, turn)
+        try:
+            content = download_content(service or self._client(), item['id'], item['mimeType'], self.limits)
+        except FileTooLarge as e:
+            self.budget.release(reserved)
+            self._skipped(item, str(e), future)
+            return
+        except Exception as e:
+            self.budget.release(reserved)
+            self._failed(item, e, future)
+            return
+        self._count(downloaded=1, bytes=content.size, spilled=int(content.spilled))
+
+        if item['mimeType'] not in CACHED_EXTRACTORS:
+            try:
+                future.set_result(('text', Extracted(content.text(), content.size,
+                                                     time.monotonic() - content.started)))
+            finally:
+                content.close()
+                self.budget.release(reserved)
+        elif self.extract_jobs == 0 or self.download_pool is None:
+            # Still counted against the budget until result() has parsed and closed it
+            future.set_result(('download', (content, reserved)))
+        else:
+            self._parse(item, content, reserved, future)
+
+    def _parse(self, item, content, reserved, future):
+        """Hand a download to the extraction processes; the text resolves `future`"""
+        # Workers don't share this process's sheet_options: they are passed along
+        args = (extract_document, content.source(), item['mimeType'], content.digest, sheet_options)
+        try:
+            parsed = self._extract_pool().submit(*args)
+        except BrokenProcessPool:
+            # A worker died (e.g. a parser crash); start a fresh pool for the rest
+            with self.lock:
+                self.extract_pool = None
+            parsed = self._extract_pool().submit(*args)
+
+        def parsed_done(parsed):
+            content.close()
+            self.budget.release(reserved)
+            try:
+                text, cache_hit = parsed.result()
+            except Exception as e:
+                self._failed(item, e, future)
+                return
+            if extraction_cache is not None:
+                extraction_cache.record(cache_hit, len(text) if cache_hit else 0)
+            self._count(parsed=1)
+            future.set_result(('text', Extracted(text, content.size, time.monotonic() - content.started)))
+        parsed.add_done_callback(parsed_done)
+
+    def _extract_pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.extract_pool is None:
+                # Workers open their own handle on the shared cache and leave eviction to us
+                if extraction_cache is None:
+                    self.extract_pool = ProcessPoolExecutor(max_workers=self.extract_jobs)
+                else:
+                    self.extract_pool = ProcessPoolExecutor(
+                        max_workers=self.extract_jobs, initializer=configure_extraction_cache,
+                        initargs=(extraction_cache.db_path, extraction_cache.max_mb, False))
+            return self.extract_pool
+
+    def _failed(self, item, error, future):
+        print(f"    ⚠️  Extraction failed for {item['name']}: {error}")
+        self._count(failed=1)
+        future.set_result(('text', Extracted(None)))
+
+    def _skipped(self, item, size, future):
+        print(f"    ⊘ Skipped {item['name']}: too large ({size})")
+        self._count(skipped=1)
+        future.set_result(('text', Extracted(None)))
 
 
-def create_chunk_nodes(chunks: List[Dict], parent_name: str, file_id: str) -> List[Dict]:
+def create_chunk_nodes(chunks: List[Dict], parent_name: str, file_id: str, ids: NodeIds) -> List[Dict]:
     """Create child nodes for each chunk"""
     nodes = []
+    chunk_ids = ids.chunks(file_id, [chunk['text'] for chunk in chunks])
     for i, chunk in enumerate(chunks):
         node = {
-            'id': generate_node_id(),
+            'id': chunk_ids[i],
             'name': f"Chunk {i + 1}" if len(chunks) > 1 else parent_name,
             'description': chunk['text'],
             'type': 'item',
@@ -347,136 +790,466 @@ def create_chunk_nodes(chunks: List[Dict], parent_name: str, file_id: str) -> Li
     return nodes
 
 
-def scan_and_extract(service, folder_id: str = 'root', folder_name: str = 'My Drive',
-                     depth: int = 0, max_depth: int = 5, chunk_size: int = DEFAULT_CHUNK_SIZE,
-                     stats: Dict = None) -> List[Dict]:
+def build_file_node(item: Dict[str, Any], text: Optional[str], chunk_size: int, stats: Dict,
+                    size: int = 0, seconds: float = 0.0, chunking: str = GREEDY,
+                    ids: Optional[NodeIds] = None) -> Optional[Dict]:
     """
-    Recursively scan folder and extract content from files.
+    Chunk a file's extracted text into its knowledge-base node (None for
+    near-empty files). The download size and download/parse time are kept
+    in its source metadata, as what reusing the node later saves.
+    """
+    if not text or len(text.strip()) <= 50:  # Skip near-empty files
+        return None
 
-    Returns list of nodes in knowledge-base pattern format.
+    if ids is None:
+        ids = NodeIds()
+    stats['files_extracted'] += 1
+    chunks = chunk_text(text, chunk_size, chunking)
+    stats['total_chunks'] += len(chunks)
+
+    # Create file node with chunks as children
+    file_node = {
+        'id': ids.file(item['id']),
+        'name': item['name'],
+        'type': 'item',
+        'icon': EXTRACTABLE_TYPES[item['mimeType']]['icon'],
+        'external': {
+            'type': 'gdrive:file',
+            'id': item['id']
+        },
+        '_rag': {
+            'source': {
+                'type': 'google-drive',
+                'fileId': item['id'],
+                'fileName': item['name'],
+                'mimeType': item['mimeType'],
+                'modifiedTime': item.get('modifiedTime', ''),
+                'size': size,
+                'extractSeconds': round(seconds, 3),
+                'extractedAt': datetime.now().isoformat()
+            }
+        },
+        'fileUrl': item.get('webViewLink', '')
+    }
+    if item.get('md5Checksum'):
+        file_node['_rag']['source']['md5Checksum'] = item['md5Checksum']
+    if item['mimeType'] in SPREADSHEET_TYPES:
+        file_node['_rag']['source']['sheets'] = sheet_options.key()
+
+    # Add chunks as children if multiple
+    if len(chunks) > 1:
+        file_node['items'] = create_chunk_nodes(chunks, item['name'], item['id'], ids)
+    elif len(chunks) == 1:
+        # Single chunk - embed in description
+        file_node['description'] = chunks[0]['text']
+        file_node['_rag']['chunk'] = chunks[0]
+    return file_node
+
+
+def dedupe_file_node(node: Dict[str, Any], deduper: Optional[ChunkDeduper], collapse: bool = False) -> Dict:
     """
-    if stats is None:
-        stats = {'files_processed': 0, 'files_extracted': 0, 'total_chunks': 0, 'errors': 0}
+    A file node with each chunk that repeats an earlier chunk of the export
+    marked with that chunk's node id and their estimated similarity
+    (_rag.chunk duplicateOf and similarity) and, collapsing, without its
+    text. Marks a baseline node brought from an earlier run are dropped
+    first, so without a deduper the node comes back unmarked.
+    """
+    if 'items' in node:
+        return dict(node, items=[_dedupe_chunk(chunk, deduper, collapse) for chunk in node['items']])
+    if 'chunk' in node.get('_rag', {}):
+        return _dedupe_chunk(node, deduper, collapse)
+    return node
+
+
+def _dedupe_chunk(node: Dict[str, Any], deduper: Optional[ChunkDeduper], collapse: bool) -> Dict:
+    """One chunk node (or single-chunk file node) checked against the export's earlier chunks"""
+    chunk = {key: value for key, value in node['_rag']['chunk'].items() if key not in ('duplicateOf', 'similarity')}
+    duplicate = deduper.check(node['id'], node['description']) if deduper is not None else None
+    if duplicate is not None:
+        chunk['duplicateOf'] = duplicate.node_id
+        chunk['similarity'] = duplicate.similarity
+        if collapse:
+            node = {key: value for key, value in node.items() if key != 'description'}
+            chunk.pop('text', None)
+    return dict(node, _rag=dict(node['_rag'], chunk=chunk))
+
+
+class NodeCollector:
+    """
+    Collects nodes in memory through the StreamingTreeWriter calls
+    scan_and_extract makes, for callers without a writer (empty folders are
+    dropped, as lazy writer objects are).
+    """
+
+    def __init__(self):
+        self.lists = [[]]
+        self.folders = []
+
+    @property
+    def nodes(self) -> List[Dict]:
+        return self.lists[0]
+
+    def begin_object(self, fields: Dict[str, Any], lazy: bool = False):
+        self.folders.append(dict(fields))
+
+    def begin_array(self, key: str, lazy: bool = False):
+        self.lists.append([])
+
+    def end_array(self):
+        self.folders[-1]['children'] = self.lists.pop()
+
+    def end_object(self):
+        folder = self.folders.pop()
+        if folder['children']:
+            self.lists[-1].append(folder)
 
+    def write_item(self, node: Dict[str, Any]):
+        self.lists[-1].append(node)
+
+
+def walk_folder(service, folder_id: str, folder_name: str, depth: int, max_depth: int,
+                stats: Dict, listing: Any = None) -> Iterator[tuple]:
+    """
+    Walk a folder depth-first, in listing order.
+
+    Subfolder listings are fetched together, in batched round trips, when
+    their parent is listed, and handed down as `listing` (their items, or
+    the error that stopped the listing).
+
+    Yields:
+        tuple: ('folder', item) and later ('end', item) around a subfolder's
+        contents, and ('file', item) for each extractable file
+    """
     if depth > max_depth:
         print(f"{'  ' * depth}⚠️  Max depth {max_depth} reached")
-        return []
+        return
 
     indent = '  ' * depth
     print(f"{indent}📂 {folder_name}")
 
     try:
-        # Query files in this folder
-        query = f"'{folder_id}' in parents and trashed=false"
-        results = service.files().list(
-            q=query,
-            pageSize=100,  # Smaller batches for content extraction
-            fields="files(id, name, mimeType, size, modifiedTime, webViewLink)"
-        ).execute()
-
-        items = results.get('files', [])
-        children = []
-
-        for item in items:
-            is_folder = item['mimeType'] == 'application/vnd.google-apps.folder'
-            type_info = EXTRACTABLE_TYPES.get(item['mimeType'], {})
-            icon = type_info.get('icon', '📄' if not is_folder else '📁')
-
-            if is_folder:
-                # Recursively scan subfolders
-                subchildren = scan_and_extract(
-                    service, item['id'], item['name'],
-                    depth + 1, max_depth, chunk_size, stats
-                )
-
-                if subchildren:  # Only add folders with extractable content
-                    folder_node = {
-                        'id': generate_node_id(),
-                        'name': item['name'],
-                        'type': 'phase',
-                        'icon': '📁',
-                        'external': {
-                            'type': 'gdrive:folder',
-                            'id': item['id']
-                        },
-                        'children': subchildren
-                    }
-                    children.append(folder_node)
-
-            elif item['mimeType'] in EXTRACTABLE_TYPES:
-                # Extract content from file
-                stats['files_processed'] += 1
-                print(f"{indent}  📄 {item['name'][:40]}...", end=" ")
-
-                text = download_and_extract(service, item['id'], item['mimeType'], item['name'])
-
-                if text and len(text.strip()) > 50:  # Skip near-empty files
-                    stats['files_extracted'] += 1
-                    chunks = chunk_text(text, chunk_size)
-                    stats['total_chunks'] += len(chunks)
-
-                    print(f"✓ {len(chunks)} chunks")
-
-                    # Create file node with chunks as children
-                    file_node = {
-                        'id': generate_node_id(),
-                        'name': item['name'],
-                        'type': 'item',
-                        'icon': icon,
-                        'external': {
-                            'type': 'gdrive:file',
-                            'id': item['id']
-                        },
-                        '_rag': {
-                            'source': {
-                                'type': 'google-drive',
-                                'fileId': item['id'],
-                                'fileName': item['name'],
-                                'mimeType': item['mimeType'],
-                                'modifiedTime': item.get('modifiedTime', ''),
-                                'extractedAt': datetime.now().isoformat()
-                            }
-                        },
-                        'fileUrl': item.get('webViewLink', '')
-                    }
-
-                    # Add chunks as children if multiple
-                    if len(chunks) > 1:
-                        file_node['items'] = create_chunk_nodes(chunks, item['name'], item['id'])
-                    elif len(chunks) == 1:
-                        # Single chunk - embed in description
-                        file_node['description'] = chunks[0]['text']
-                        file_node['_rag']['chunk'] = chunks[0]
-
-                    children.append(file_node)
-                else:
-                    print(f"⊘ (empty/small)")
-            else:
-                # Skip non-extractable files silently
-                pass
-
-        return children
-
+        if isinstance(listing, Exception):
+            raise listing
+        items = listing
+        if items is None:
+            # Query files in this folder, following nextPageToken
+            query = f"'{folder_id}' in parents and trashed=false"
+            items = []
+            page_token = None
+            while True:
+                results = service.files().list(
+                    q=query,
+                    pageSize=LIST_PAGE_SIZE,
+                    fields=f"nextPageToken, files({LIST_FIELDS})",
+                    pageToken=page_token
+                ).execute()
+                items.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+
+        # List all subfolders now, up to 100 per batch request, rather than one by one
+        subfolder_listings = {}
+        if depth + 1 <= max_depth:
+            subfolder_ids = [item['id'] for item in items if item['mimeType'] == FOLDER_MIME_TYPE]
+            if subfolder_ids:
+                subfolder_listings = list_folders_batched(service, subfolder_ids, LIST_FIELDS, LIST_PAGE_SIZE)
     except Exception as e:
         print(f"{indent}❌ Error: {e}")
         stats['errors'] += 1
-        return []
+        return
+
+    for item in items:
+        if item['mimeType'] == FOLDER_MIME_TYPE:
+            yield 'folder', item
+            yield from walk_folder(service, item['id'], item['name'], depth + 1, max_depth, stats,
+                                   subfolder_listings.get(item['id']))
+            yield 'end', item
+        elif item['mimeType'] in EXTRACTABLE_TYPES:
+            yield 'file', item
+        # Non-extractable files are skipped silently
+
+
+# =============================================================================
+# Unchanged Files
+# =============================================================================
+
+def reusable_node(item: Dict[str, Any], node: Dict[str, Any]) -> Optional[Dict]:
+    """
+    A baseline node for a listed file whose content hasn't changed since it
+    was extracted - same md5Checksum or, for Google files that have none
+    (or nodes exported before checksums were recorded), same modifiedTime -
+    with its name, link and source brought up to date; None otherwise, or
+    for spreadsheets read with other sheet_options.
+    """
+    source = node.get('_rag', {}).get('source', {})
+    if source.get('mimeType') != item['mimeType']:
+        return None
+    if item.get('md5Checksum') and source.get('md5Checksum'):
+        unchanged = item['md5Checksum'] == source['md5Checksum']
+    else:
+        unchanged = bool(item.get('modifiedTime')) and item['modifiedTime'] == source.get('modifiedTime')
+    if not unchanged:
+        return None
+    # Spreadsheets read with other --sheets options (or before there were any) are read again
+    if item['mimeType'] in SPREADSHEET_TYPES and source.get('sheets') != sheet_options.key():
+        return None
+    # Chunks collapsed into references (--dedupe collapse) have no text left to reuse
+    if any('description' not in chunk for chunk in node.get('items', [])) or \
+            ('chunk' in node.get('_rag', {}) and 'description' not in node):
+        return None
+
+    # Renamed or moved files keep their chunks (chunk nodes aren't named after the file)
+    current = {'fileName': item['name'], 'modifiedTime': item.get('modifiedTime', '')}
+    if item.get('md5Checksum'):
+        current['md5Checksum'] = item['md5Checksum']
+    if node['name'] != item['name'] or any(source.get(k) != v for k, v in current.items()):
+        node = dict(node, name=item['name'], fileUrl=item.get('webViewLink', ''))
+        node['_rag'] = dict(node['_rag'], source=dict(source, **current))
+    return node
+
+
+class ContentManifest:
+    """
+    SQLite sidecar of extracted file nodes, the --manifest baseline for
+    skipping unchanged files.
+
+    Every file node a run writes is stored by Drive file id, and the next
+    run reuses it (see reusable_node) rather than downloading the file
+    again. Unlike a previous export it needn't be of the same folder or
+    depth, and it is looked up one file at a time instead of loaded whole.
+    Stored nodes were cut at one chunk size and chunking mode, so changing
+    either starts the manifest afresh.
+
+    Nodes are looked up and stored on the thread that writes the tree; save()
+    commits them and drops files the scan no longer reached.
+    """
+
+    VERSION = '1'
+
+    def __init__(self, db_path: str, chunk_size: int, chunking: str = GREEDY):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (file_id TEXT PRIMARY KEY, node TEXT);
+        """)
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if (meta.get('version') != self.VERSION or meta.get('chunk_size') != str(chunk_size)
+                or meta.get('chunking', GREEDY) != chunking):
+            self.conn.execute("DELETE FROM files")
+        self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                              [('version', self.VERSION), ('chunk_size', str(chunk_size)), ('chunking', chunking)])
+        self.seen = set()
+
+    def get(self, file_id: str) -> Optional[Dict]:
+        """The stored node for a file, or None"""
+        row = self.conn.execute("SELECT node FROM files WHERE file_id = ?", (file_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def store(self, node: Dict[str, Any]):
+        """Remember a written file node for the next run"""
+        file_id = node['external']['id']
+        self.seen.add(file_id)
+        self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?)",
+                          (file_id, json.dumps(node, ensure_ascii=False)))
+
+    def save(self):
+        """Commit this run's nodes and drop files it didn't write"""
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_files (file_id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM seen_files")
+            self.conn.executemany("INSERT OR IGNORE INTO seen_files VALUES (?)",
+                                  ((file_id,) for file_id in self.seen))
+            self.conn.execute("DELETE FROM files WHERE file_id NOT IN (SELECT file_id FROM seen_files)")
+
+    def close(self):
+        self.conn.close()
+
+
+def scan_and_extract(service, folder_id: str = 'root', folder_name: str = 'My Drive',
+                     depth: int = 0, max_depth: int = 5, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     stats: Dict = None, writer: Optional[StreamingTreeWriter] = None,
+                     reuse: Optional[Dict[str, Dict]] = None, listing: Any = None,
+                     pipeline: Optional[ContentPipeline] = None,
+                     manifest: Optional[ContentManifest] = None, chunking: str = GREEDY,
+                     ids: Optional[NodeIds] = None,
+                     search_index: Optional[SearchIndexWriter] = None,
+                     deduper: Optional[ChunkDeduper] = None, collapse: bool = False) -> List[Dict]:
+    """
+    Recursively scan folder and extract content from files.
+
+    With a writer, each node is written to it as soon as it is built (folders
+    are opened lazily so empty ones still disappear) and an empty list is
+    returned; the writer must have an array open.
+
+    reuse maps file ids to their nodes in a previous export, and manifest
+    holds the nodes of earlier runs (and is given every file node written).
+    A file whose node there is still current (see reusable_node) keeps it
+    instead of being downloaded again; stats count the bytes and
+    download/parse seconds that saved.
+
+    Files are downloaded and parsed by `pipeline` while the walk (see
+    walk_folder) carries on, up to its window of files ahead; nodes are
+    chunked and written in walk order as their text arrives. Without a
+    pipeline, each file is downloaded and parsed inline.
+
+    Node ids come from `ids` (see NodeIds; one per export), so the same
+    content is written with the same ids every time. Every file node
+    written is also added to search_index, if given.
+
+    With a deduper, chunks repeating an earlier chunk are marked as its
+    duplicates, or collapsed into references to it (see dedupe_file_node);
+    the manifest still stores them whole.
+
+    Returns list of nodes in knowledge-base pattern format.
+    """
+    if stats is None:
+        stats = {'files_processed': 0, 'files_extracted': 0, 'total_chunks': 0, 'errors': 0, 'files_reused': 0,
+                 'bytes_saved': 0, 'seconds_saved': 0.0}
+    sink = writer if writer is not None else NodeCollector()
+    if pipeline is None:
+        pipeline = ContentPipeline(service, downloaders=0)
+    if ids is None:
+        ids = NodeIds()
+
+    # Walk events waiting to be written, oldest first, and how many are files in flight
+    waiting = deque()
+    in_flight = 0
+
+    def write_file(file_node):
+        if manifest is not None:
+            manifest.store(file_node)
+        file_node = dedupe_file_node(file_node, deduper, collapse)
+        sink.write_item(file_node)
+        if search_index is not None:
+            search_index.add_file(file_node['id'], file_chunks(file_node))
+
+    def write_next():
+        nonlocal in_flight
+        kind, item, future = waiting.popleft()
+        if kind == 'folder':
+            # Stream subfolder; it is dropped if nothing inside gets written
+            sink.begin_object({
+                'id': ids.folder(item['id']),
+                'name': item['name'],
+                'type': 'phase',
+                'icon': '📁',
+                'external': {
+                    'type': 'gdrive:folder',
+                    'id': item['id']
+                }
+            }, lazy=True)
+            sink.begin_array('children', lazy=True)
+        elif kind == 'end':
+            sink.end_array()
+            sink.end_object()
+        elif kind == 'reused':
+            write_file(ids.assign(item))
+        else:
+            in_flight -= 1
+            extracted = pipeline.result(item, future)
+            file_node = build_file_node(item, extracted.text, chunk_size, stats, extracted.size, extracted.seconds,
+                                        chunking, ids)
+            if file_node is not None:
+                write_file(file_node)
+        pipeline.report()
+
+    for kind, item in walk_folder(service, folder_id, folder_name, depth, max_depth, stats, listing):
+        future = None
+        if kind == 'file':
+            stats['files_processed'] += 1
+            node = reuse.get(item['id']) if reuse else None
+            if node is None and manifest is not None:
+                node = manifest.get(item['id'])
+            node = reusable_node(item, node) if node is not None else None
+            if node is not None:
+                # Unchanged since it was extracted: keep its node and chunks
+                kind, item = 'reused', node
+                source = node['_rag']['source']
+                stats['files_extracted'] += 1
+                stats['files_reused'] += 1
+                stats['total_chunks'] += len(node.get('items', [])) or 1
+                stats['bytes_saved'] += source.get('size', 0)
+                stats['seconds_saved'] += source.get('extractSeconds', 0)
+                pipeline.reused()
+            else:
+                future = pipeline.submit(item)
+                in_flight += 1
+        waiting.append((kind, item, future))
+
+        # Write whatever is finished; wait on the oldest file once the window is full
+        while waiting and (waiting[0][2] is None or waiting[0][2].done() or in_flight > pipeline.window):
+            write_next()
+
+    while waiting:
+        write_next()
+    return sink.nodes if writer is None else []
+
+
+def index_file_nodes(nodes: List[Dict], index: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """File nodes of a previous export by Drive file id"""
+    if index is None:
+        index = {}
+    for node in nodes:
+        external = node.get('external', {})
+        if external.get('type') == 'gdrive:file':
+            index[external['id']] = node
+        elif 'children' in node:
+            index_file_nodes(node['children'], index)
+    return index
 
 
 def export_gdrive_content(folder_id: str = 'root', max_depth: int = 5,
-                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
-    """Main export function"""
+                          chunk_size: int = DEFAULT_CHUNK_SIZE, cache_path: Optional[str] = None,
+                          cache_mb: int = DEFAULT_CACHE_MB, incremental: Optional[str] = None,
+                          downloaders: int = DEFAULT_DOWNLOADERS, extract_jobs: int = DEFAULT_EXTRACT_JOBS,
+                          limits: DownloadLimits = DownloadLimits(), manifest_path: Optional[str] = None,
+                          chunking: str = GREEDY, search_index_path: Optional[str] = None,
+                          dedupe: Optional[str] = None, dedupe_threshold: float = DEFAULT_THRESHOLD,
+                          sheets: SheetOptions = SheetOptions()) -> str:
+    """
+    Main export function
+
+    Files are downloaded by `downloaders` threads and parsed by
+    `extract_jobs` processes (ContentPipeline) while the walk continues,
+    within the memory limits of `limits`.
+
+    With cache_path, parsed PDF/Word/Excel text is looked up in the shared
+    content-addressed extraction cache before parsing. With incremental (an
+    export file, or LATEST_EXPORT for the newest one) and/or manifest_path (a
+    ContentManifest, updated by the run), files whose content is unchanged
+    since then are copied from there instead of downloaded and extracted.
+    With search_index_path, the chunks are added to a BM25 search index
+    (treelisty_search_index), saved once the export is written.
+    With dedupe (DEDUPE_MARK or DEDUPE_COLLAPSE), chunks at least
+    dedupe_threshold similar to an earlier one are marked or collapsed (see
+    treelisty_dedupe), and the stats report how many and the export's size.
+    Excel workbooks and Google Sheets become text as `sheets` says
+    (treelisty_spreadsheet).
+    """
+    global extraction_cache, sheet_options
+    sheet_options = sheets
     print("\n🧠 TreeListy Google Drive Content Extractor")
     print("=" * 60)
     print(f"Folder: {folder_id}")
     print(f"Max depth: {max_depth} levels")
-    print(f"Chunk size: {chunk_size} characters\n")
+    print(f"Chunk size: {chunk_size} characters" + (" (content-defined)" if chunking == CONTENT_DEFINED else ""))
+    print(f"Downloads: {downloaders} at a time, parsing: {extract_jobs} processes")
+    print(f"Download memory: spill over {limits.spill_bytes // (1024 * 1024)}MB, "
+          f"skip over {limits.max_file_bytes // (1024 * 1024)}MB, "
+          f"{limits.max_resident_bytes // (1024 * 1024)}MB in flight")
+    print(f"Spreadsheets: {sheets.mode}, {sheets.max_rows} rows / {sheets.max_chars:,} chars per sheet, "
+          f"up to {sheets.max_sheets} sheets\n")
 
     # Check extraction libraries
     print("📚 Extraction Libraries:")
-    print(f"   PyMuPDF (PDF): {'✅' if HAS_PYMUPDF else '❌'}")
-    print(f"   python-docx (Word): {'✅' if HAS_DOCX else '❌'}")
+    print(f"   {PDF_BACKEND or 'PyMuPDF'} (PDF): {'✅' if PDF_BACKEND else '❌'}")
+    print(f"   python-docx (Word): {'✅' if DOCX_BACKEND else '❌'}")
     print(f"   openpyxl (Excel): {'✅' if HAS_OPENPYXL else '❌'}")
+    if cache_path:
+        print(f"   Extraction cache: {cache_path} (max {cache_mb}MB)")
+        extraction_cache = ExtractionCache(cache_path, cache_mb)
     print()
 
     # Authenticate
@@ -493,46 +1266,116 @@ def export_gdrive_content(folder_id: str = 'root', max_depth: int = 5,
         except:
             pass
 
-    # Scan and extract
+    # Baselines for skipping unchanged files: the previous export's file nodes
+    # (any folder or depth, as long as the chunks were cut the same way) and
+    # the manifest's.
+    reuse = None
+    if incremental:
+        previous_file = find_previous_export(EXPORT_GLOB) if incremental == LATEST_EXPORT else incremental
+        previous = load_previous_export(previous_file, require_token=False, chunkSize=chunk_size)
+        if previous is not None and previous['source'].get('chunking', GREEDY) != chunking:
+            print(f"ℹ️  {previous_file} was chunked {previous['source'].get('chunking', GREEDY)} "
+                  f"(now {chunking}) - running a full export")
+            previous = None
+        if previous is not None:
+            reuse = index_file_nodes(previous['children'])
+            print(f"   ✓ {len(reuse)} extracted files as of {previous['source']['lastSync']}\n")
+            del previous
+    manifest = None
+    if manifest_path:
+        print(f"Content manifest: {manifest_path}\n")
+        manifest = ContentManifest(manifest_path, chunk_size, chunking)
+    search_index = None
+    if search_index_path:
+        print(f"Search index: {search_index_path}\n")
+        search_index = SearchIndexWriter(search_index_path)
+    deduper = None
+    if dedupe:
+        print(f"Dedupe: {dedupe} chunks at least {dedupe_threshold:.0%} similar to an earlier one\n")
+        deduper = ChunkDeduper(dedupe_threshold)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = f'gdrive-content-{timestamp}.json'
+    partial_file = output_file + '.partial'
+
+    # Scan and extract, streaming nodes straight into the file (knowledge-base pattern)
     print("📥 Scanning and extracting content...\n")
-    stats = {'files_processed': 0, 'files_extracted': 0, 'total_chunks': 0, 'errors': 0}
-    children = scan_and_extract(service, folder_id, folder_name, 0, max_depth, chunk_size, stats)
-
-    # Create TreeListy structure (knowledge-base pattern)
-    tree = {
-        'id': 'kb-gdrive',
-        'name': f'📚 {folder_name} Knowledge Base',
-        'type': 'root',
-        'icon': '📚',
-        'expanded': True,
-        'pattern': {
-            'key': 'knowledge-base'
-        },
-        'source': {
-            'type': 'google-drive',
-            'folderId': folder_id,
-            'folderName': folder_name,
-            'lastSync': datetime.now().isoformat(),
-            'syncDepth': max_depth,
-            'chunkSize': chunk_size
-        },
-        '_rag': {
-            'stats': {
+    stats = {'files_processed': 0, 'files_extracted': 0, 'total_chunks': 0, 'errors': 0, 'files_reused': 0,
+             'bytes_saved': 0, 'seconds_saved': 0.0}
+    # Each download thread authenticates its own client
+    pipeline = ContentPipeline(service, authenticate, downloaders, extract_jobs, limits)
+    try:
+        with open(partial_file, 'w', encoding='utf-8') as f:
+            writer = StreamingTreeWriter(f)
+            writer.begin_object({
+                'id': 'kb-gdrive',
+                'name': f'📚 {folder_name} Knowledge Base',
+                'type': 'root',
+                'icon': '📚',
+                'expanded': True,
+                'pattern': {
+                    'key': 'knowledge-base'
+                },
+                'source': {
+                    'type': 'google-drive',
+                    'folderId': folder_id,
+                    'folderName': folder_name,
+                    'lastSync': datetime.now().isoformat(),
+                    'syncDepth': max_depth,
+                    'chunkSize': chunk_size,
+                    'chunking': chunking
+                }
+            })
+            writer.begin_array('children')
+            scan_and_extract(service, folder_id, folder_name, 0, max_depth, chunk_size, stats, writer, reuse,
+                             pipeline=pipeline, manifest=manifest, chunking=chunking, search_index=search_index,
+                             deduper=deduper, collapse=dedupe == DEDUPE_COLLAPSE)
+            writer.end_array()
+            pipeline.report(force=True)
+
+            # Stats are only known once the scan is done, so they follow the children
+            rag_stats = {
                 'filesProcessed': stats['files_processed'],
                 'filesExtracted': stats['files_extracted'],
                 'totalChunks': stats['total_chunks'],
                 'errors': stats['errors']
             }
-        },
-        'children': children
-    }
-
-    # Save to file
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_file = f'gdrive-content-{timestamp}.json'
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(tree, f, indent=2, ensure_ascii=False)
+            if reuse is not None or manifest is not None:
+                rag_stats['filesReused'] = stats['files_reused']
+                rag_stats['bytesSaved'] = stats['bytes_saved']
+                rag_stats['secondsSaved'] = round(stats['seconds_saved'], 1)
+            if deduper is not None:
+                duplicates = deduper.stats['exact'] + deduper.stats['near']
+                rag_stats['dedupe'] = {
+                    'mode': dedupe,
+                    'threshold': dedupe_threshold,
+                    'chunksChecked': deduper.stats['chunks'],
+                    'duplicateChunks': duplicates,
+                    'exactDuplicates': deduper.stats['exact'],
+                    'dedupeRate': round(duplicates / deduper.stats['chunks'], 4) if deduper.stats['chunks'] else 0.0,
+                    'duplicateChars': deduper.stats['duplicate_chars']
+                }
+                # Everything written before the stats
+                rag_stats['outputBytes'] = f.tell()
+            writer.end_object({
+                '_rag': {
+                    'stats': rag_stats
+                }
+            })
+            writer.close()
+        os.replace(partial_file, output_file)
+        if manifest is not None:
+            manifest.save()
+        if search_index is not None:
+            search_index.save(output_file)
+    finally:
+        pipeline.close()
+        if manifest is not None:
+            manifest.close()
+        if search_index is not None:
+            search_index.close()
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
 
     # Summary
     print("\n" + "=" * 60)
@@ -542,6 +1385,28 @@ def export_gdrive_content(folder_id: str = 'root', max_depth: int = 5,
     print(f"   Files extracted: {stats['files_extracted']}")
     print(f"   Total chunks: {stats['total_chunks']}")
     print(f"   Errors: {stats['errors']}")
+    if reuse is not None or manifest is not None:
+        print(f"   Reused unchanged: {stats['files_reused']} "
+              f"({stats['bytes_saved'] / (1024 * 1024):,.1f}MB and ~{stats['seconds_saved']:,.0f}s "
+              f"of downloading/parsing saved)")
+    if search_index is not None:
+        print(f"\n🔎 Search Index: {search_index_path}")
+        print(f"   Files indexed: {search_index.stats['files_added']} "
+              f"({search_index.stats['chunks_added']} chunks), unchanged: {search_index.stats['files_unchanged']}, "
+              f"removed: {search_index.stats['files_deleted']}")
+    if deduper is not None:
+        duplicates = deduper.stats['exact'] + deduper.stats['near']
+        print(f"\n🧬 Duplicate chunks ({dedupe}): {duplicates} of {deduper.stats['chunks']} "
+              f"({duplicates / max(deduper.stats['chunks'], 1):.1%}; {deduper.stats['exact']} exact), "
+              f"{deduper.stats['duplicate_chars'] / max(deduper.stats['chars'], 1):.1%} of the text"
+              + (" left out" if dedupe == DEDUPE_COLLAPSE else ""))
+        print(f"   Export size: {os.path.getsize(output_file) / (1024 * 1024):,.1f}MB")
+    if extraction_cache is not None:
+        print(f"\n🗃️  Extraction Cache:")
+        for line in extraction_cache.summary_lines():
+            print(line)
+        extraction_cache.close()
+        extraction_cache = None
     print(f"\n📋 Next Steps:")
     print(f"   1. Open TreeListy in browser")
     print(f"   2. Click '📂 Import' → Select '{output_file}'")
@@ -574,6 +1439,126 @@ if __name__ == '__main__':
         default=DEFAULT_CHUNK_SIZE,
         help=f'Target chunk size in characters (default: {DEFAULT_CHUNK_SIZE})'
     )
+    parser.add_argument(
+        '--chunking',
+        choices=CHUNKING_MODES,
+        default=GREEDY,
+        help='greedy: pack paragraphs up to the chunk size; content: content-defined chunks averaging '
+             'the chunk size, which stay the same across edits elsewhere in the document (default: greedy)'
+    )
+
+    parser.add_argument(
+        '--extract-cache',
+        type=str,
+        nargs='?',
+        const=DEFAULT_CACHE_FILE,
+        default=None,
+        metavar='PATH',
+        help=f'Reuse parsed PDF/Word/Excel text from a content-addressed cache shared with the '
+             f'local folder exporter (default path: {DEFAULT_CACHE_FILE})'
+    )
+    parser.add_argument(
+        '--extract-cache-mb',
+        type=int,
+        default=DEFAULT_CACHE_MB,
+        help=f'Extraction cache size cap in MB, least recently used evicted first (default: {DEFAULT_CACHE_MB})'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        nargs='?',
+        const=LATEST_EXPORT,
+        default=None,
+        metavar='PREVIOUS',
+        help='Reuse the nodes of files whose md5Checksum/modifiedTime is unchanged since the newest '
+             'gdrive-content-*.json (or PREVIOUS) instead of downloading them again'
+    )
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        nargs='?',
+        const=DEFAULT_MANIFEST_FILE,
+        default=None,
+        metavar='PATH',
+        help=f'Keep extracted file nodes in a SQLite manifest, updated every run, and reuse them for '
+             f'unchanged files (default path: {DEFAULT_MANIFEST_FILE})'
+    )
+
+    parser.add_argument(
+        '--search-index',
+        type=str,
+        nargs='?',
+        const=DEFAULT_SEARCH_INDEX_FILE,
+        default=None,
+        metavar='PATH',
+        help=f'Keep a BM25 search index of the chunks, updated every run for the files that changed '
+             f'(default path: {DEFAULT_SEARCH_INDEX_FILE}; query with treelisty_search_index.py)'
+    )
+
+    parser.add_argument(
+        '--sheets',
+        choices=SHEET_MODES,
+        default=SheetOptions().mode,
+        help='Excel/Google Sheets as each sheet\'s first rows (rows) or as a summary of each column - types, '
+             'distinct counts, range - with sample rows (summary) (default: rows)'
+    )
+    parser.add_argument(
+        '--sheet-rows',
+        type=int,
+        default=SheetOptions().max_rows,
+        help=f'Rows per sheet in rows mode (default: {SheetOptions().max_rows})'
+    )
+    parser.add_argument(
+        '--sheet-chars',
+        type=int,
+        default=SheetOptions().max_chars,
+        help=f'Characters per sheet (default: {SheetOptions().max_chars})'
+    )
+
+    parser.add_argument(
+        '--dedupe',
+        choices=DEDUPE_MODES,
+        default=None,
+        help='Find chunks repeating an earlier chunk word for word or nearly (MinHash/LSH): mark them with '
+             'the first copy\'s node id, or collapse them into references to it, leaving out their text'
+    )
+    parser.add_argument(
+        '--dedupe-threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f'Estimated share of shared word 4-grams that makes a chunk a duplicate (default: {DEFAULT_THRESHOLD})'
+    )
+
+    parser.add_argument(
+        '--downloaders',
+        type=int,
+        default=DEFAULT_DOWNLOADERS,
+        help=f'Files downloaded concurrently (default: {DEFAULT_DOWNLOADERS}, 0 = one at a time)'
+    )
+    parser.add_argument(
+        '--extract-jobs', '-j',
+        type=int,
+        default=DEFAULT_EXTRACT_JOBS,
+        help=f'PDF/Word/Excel parsing worker processes (default: {DEFAULT_EXTRACT_JOBS}, 0 = main thread)'
+    )
+    parser.add_argument(
+        '--spill-mb',
+        type=int,
+        default=DEFAULT_SPILL_MB,
+        help=f'Download files larger than this to a temporary file instead of memory (default: {DEFAULT_SPILL_MB})'
+    )
+    parser.add_argument(
+        '--max-file-mb',
+        type=int,
+        default=DEFAULT_MAX_FILE_MB,
+        help=f'Skip files larger than this (default: {DEFAULT_MAX_FILE_MB}, 0 = no limit)'
+    )
+    parser.add_argument(
+        '--max-resident-mb',
+        type=int,
+        default=DEFAULT_MAX_RESIDENT_MB,
+        help=f'Memory all downloads in flight may hold (default: {DEFAULT_MAX_RESIDENT_MB}, 0 = no limit)'
+    )
 
     args = parser.parse_args()
 
@@ -582,4 +1567,10 @@ if __name__ == '__main__':
     if chunk_size != args.chunk_size:
         print(f"⚠️  Chunk size adjusted to {chunk_size} (range: {MIN_CHUNK_SIZE}-{MAX_CHUNK_SIZE})")
 
-    export_gdrive_content(args.folder_id, args.max_depth, chunk_size)
+    export_gdrive_content(args.folder_id, args.max_depth, chunk_size,
+                          args.extract_cache, args.extract_cache_mb, args.incremental,
+                          args.downloaders, args.extract_jobs,
+                          DownloadLimits(args.spill_mb * 1024 * 1024, args.max_file_mb * 1024 * 1024,
+                                         args.max_resident_mb * 1024 * 1024),
+                          args.manifest, args.chunking, args.search_index, args.dedupe, args.dedupe_threshold,
+                          SheetOptions(args.sheets, args.sheet_rows, args.sheet_chars))
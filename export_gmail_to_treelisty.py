@@ -30,6 +30,7 @@ from email.utils import parsedate_to_datetime
 MAX_BODY_LENGTH = 5000       # Main email body
 MAX_PREVIEW_LENGTH = 300     # Preview in tree view
 MAX_FULL_BODY_LENGTH = 10000 # Full body storage per message
+THREAD_BATCH_SIZE = 50       # threads.get calls per batch round trip (Gmail's recommended max)
 
 # Fix Windows console encoding for emojis
 if sys.platform == 'win32':
@@ -38,7 +39,9 @@ if sys.platform == 'win32':
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+from treelisty_cassette import build_service, replay_service
+from treelisty_google_batch import iter_batched
 
 # Gmail API scopes
 # - readonly: Fetch and read emails (required)
@@ -76,6 +79,11 @@ def authenticate(force_reauth=False):
     Returns:
         Gmail API service object
     """
+    # Offline replay (TREELISTY_CASSETTE): no credentials needed
+    service = replay_service('gmail', 'v1')
+    if service is not None:
+        return service
+
     creds = None
     token_path = 'token.json'
 
@@ -145,7 +153,7 @@ def authenticate(force_reauth=False):
         with open(token_path, 'w') as token:
             token.write(creds.to_json())
 
-    return build('gmail', 'v1', credentials=creds)
+    return build_service('gmail', 'v1', creds)
 
 def get_thread_icon(labels):
     """Get emoji icon based on Gmail labels"""
@@ -259,19 +267,18 @@ def get_header(headers, name):
             return header['value']
     return ""
 
-def fetch_thread_details(service, thread_id):
-    """Fetch full thread with all messages"""
-    try:
-        thread = service.users().threads().get(
-            userId='me',
-            id=thread_id,
-            format='full'
-        ).execute()
+def fetch_thread_details_batched(service, thread_ids, batch_size=THREAD_BATCH_SIZE):
+    """Fetch full threads, batch_size per round trip (retrying rate-limited ones)
 
-        return thread
-    except Exception as e:
-        print(f"  Error fetching thread {thread_id}: {e}")
-        return None
+    Yields:
+        (thread_id, thread) in the order given; thread is None if it failed
+    """
+    requests = ((thread_id, service.users().threads().get(userId='me', id=thread_id, format='full'))
+                for thread_id in thread_ids)
+    for thread_id, thread, error in iter_batched(service, requests, batch_size):
+        if error is not None:
+            print(f"  Error fetching thread {thread_id}: {error}")
+        yield thread_id, thread
 
 def parse_thread(thread):
     """Convert Gmail thread to TreeListy node structure"""
@@ -437,12 +444,11 @@ def export_gmail(max_threads=100, days_back=30, force_reauth=False):
     # Track statistics
     total_attachments = 0
 
-    # Process each thread
-    for idx, thread_info in enumerate(thread_list, 1):
+    # Process each thread (full details fetched in batches)
+    thread_ids = [thread_info['id'] for thread_info in thread_list]
+    for idx, (thread_id, thread) in enumerate(fetch_thread_details_batched(service, thread_ids), 1):
         print(f"Processing thread {idx}/{len(thread_list)}...", end='\r')
 
-        # Fetch full thread details
-        thread = fetch_thread_details(service, thread_info['id'])
         if not thread:
             continue
 
@@ -7,7 +7,21 @@ Setup:
 2. Enable API: https://console.cloud.google.com/apis/library/drive.googleapis.com
 3. Create credentials: https://console.cloud.google.com/apis/credentials (Desktop app OAuth 2.0)
 4. Download credentials.json to this folder
-5. Run: python export_google_drive_to_treelisty.py
+5. Run: python export_google_drive_to_treelisty.py [max_depth] [--flat | --batch] [--workers N] [--rate R]
+                                                   [--incremental [PREVIOUS]] [--folder FOLDER_ID]
+
+Folders are listed 8 at a time (--workers), at most 20 requests/s (--rate).
+--flat lists the whole drive with a few bulk API calls (1 per 1000 items)
+instead of one call per folder; much faster on drives with many folders.
+--batch lists folders level by level, up to 100 folders per batch request,
+and only down to max_depth.
+--incremental starts from the newest previous export (or PREVIOUS) and only
+applies what the Drive Changes API reports since it was made: adds, moves,
+renames and deletes, by file id. Falls back to a full scan when there is no
+usable previous export.
+--folder rescans only one folder's subtree and splices it, by file id, into
+the newest previous export (keeping its changes token, so the rest of the
+tree is brought up to date by the next --incremental run).
 
 First run opens browser for authentication. Token saved for future runs.
 """
@@ -15,6 +29,10 @@ First run opens browser for authentication. Token saved for future runs.
 import os
 import sys
 import json
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Fix Windows console encoding for emojis
@@ -23,14 +41,38 @@ if sys.platform == 'win32':
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+from treelisty_cassette import build_service, replay_service
+from treelisty_drive_sync import (change_is_removal, find_previous_export, find_subtree, get_start_page_token,
+                                  list_changes, load_previous_export)
+from treelisty_google_batch import list_folders_batched
+from treelisty_json_writer import StreamingTreeWriter
+from treelisty_nodes import DriveFileNode, count_nodes, write_nodes
 
 # Google Drive API scope (read-only)
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 TOKEN_FILE = 'token-drive.json'  # Separate from Gmail token
 
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+FILE_FIELDS = "id, name, mimeType, size, createdTime, modifiedTime, webViewLink, owners"
+
+# Folder listing concurrency: folders listed at once, and files.list requests
+# per second across all of them (Drive allows roughly 200/s per user)
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 20
+# Retries for 429 / 5xx / rate-limit 403 responses (googleapiclient backs off exponentially)
+NUM_RETRIES = 5
+
+EXPORT_GLOB = 'google-drive-*.json'
+LATEST_EXPORT = 'latest'  # --incremental without a file name
+
 def authenticate():
     """Authenticate with Google Drive API"""
+    # Offline replay (TREELISTY_CASSETTE): no credentials needed
+    service = replay_service('drive', 'v3')
+    if service is not None:
+        return service
+
     creds = None
 
     if os.path.exists(TOKEN_FILE):
@@ -57,12 +99,12 @@ def authenticate():
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
 
-    return build('drive', 'v3', credentials=creds)
+    return build_service('drive', 'v3', creds)
 
 def get_file_icon(mime_type, name):
     """Get emoji icon based on file type"""
     # Folders
-    if mime_type == 'application/vnd.google-apps.folder':
+    if mime_type == FOLDER_MIME_TYPE:
         name_lower = name.lower()
         if 'download' in name_lower:
             return '📥'
@@ -102,13 +144,91 @@ def get_file_icon(mime_type, name):
     }
     return ext_icons.get(ext, '📄')
 
-def scan_folder(service, folder_id='root', folder_name='My Drive', depth=0, max_depth=10):
+class RateLimiter:
+    """Spaces out API requests, across all threads, to at most `rate` per second"""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class FolderLister:
+    """
+    Lists a folder's items, following nextPageToken, with shared rate limiting.
+
+    googleapiclient services aren't thread-safe, so with a service_factory
+    each thread builds its own; otherwise `service` is used directly.
+    """
+
+    def __init__(self, service, service_factory=None, rate=DEFAULT_RATE):
+        self.service = service
+        self.service_factory = service_factory
+        self.limiter = RateLimiter(rate)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def client(self):
+        if self.service_factory is None:
+            return self.service
+        if not hasattr(self.local, 'service'):
+            self.local.service = self.service_factory()
+        return self.local.service
+
+    def list_folder(self, folder_id):
+        """All non-trashed items in a folder, in listing order"""
+        query = f"'{folder_id}' in parents and trashed=false"
+        items = []
+        page_token = None
+        while True:
+            self.limiter.wait()
+            results = self.client().files().list(
+                q=query,
+                pageSize=1000,
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+                pageToken=page_token
+            ).execute(num_retries=NUM_RETRIES)
+            with self.lock:
+                self.calls += 1
+            items.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return items
+
+def scan_folder(service, folder_id='root', folder_name='My Drive', depth=0, max_depth=10,
+                workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, service_factory=None, lister=None):
     """
     Recursively scan Google Drive folder
 
+    Folder listings (every page) run on a pool of `workers` threads, each with
+    its own client from service_factory: as soon as a folder is listed, all of
+    its subfolders are queued, so up to `workers` folders are in flight while
+    nodes are still assembled depth-first on the calling thread. Output and
+    ordering are the same as a serial walk. Without service_factory (or with
+    workers <= 1) folders are listed one at a time with `service`. Pass a
+    FolderLister to read its API call count afterwards.
+
     Returns:
-        list: Children nodes in TreeListy filesystem format
+        list: Children as DriveFileNode objects (written as TreeListy filesystem nodes)
     """
+    lister = lister or FolderLister(service, service_factory, rate)
+    if workers <= 1 or lister.service_factory is None:
+        return _scan_folder(lister, None, folder_id, folder_name, depth, max_depth, None)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='drive-list') as pool:
+        return _scan_folder(lister, pool, folder_id, folder_name, depth, max_depth, None)
+
+def _scan_folder(lister, pool, folder_id, folder_name, depth, max_depth, listing):
+    """Build one folder's children; listing is its queued listing future, if any"""
     if depth > max_depth:
         print(f"⚠️  Max depth {max_depth} reached at: {folder_name}")
         return []
@@ -118,42 +238,27 @@ def scan_folder(service, folder_id='root', folder_name='My Drive', depth=0, max_
 
     try:
         # Query all files in this folder
-        query = f"'{folder_id}' in parents and trashed=false"
-        results = service.files().list(
-            q=query,
-            pageSize=1000,
-            fields="files(id, name, mimeType, size, createdTime, modifiedTime, webViewLink, owners)"
-        ).execute()
+        items = listing.result() if listing is not None else lister.list_folder(folder_id)
+
+        # Queue listings for subfolders so they are ready when the walk reaches them
+        prefetched = {}
+        if pool is not None and depth + 1 <= max_depth:
+            for item in items:
+                if item['mimeType'] == FOLDER_MIME_TYPE and item['id'] not in prefetched:
+                    prefetched[item['id']] = pool.submit(lister.list_folder, item['id'])
 
-        items = results.get('files', [])
         children = []
 
         for item in items:
-            is_folder = item['mimeType'] == 'application/vnd.google-apps.folder'
-            icon = get_file_icon(item['mimeType'], item['name'])
-
-            # Build node
-            node = {
-                'id': item['id'],
-                'name': item['name'],
-                'type': 'item',
-                'icon': icon,
-                'isFolder': is_folder,
-                'fileExtension': os.path.splitext(item['name'])[1] if not is_folder else '',
-                'fileSize': int(item.get('size', 0)) if 'size' in item else 0,
-                'dateModified': item.get('modifiedTime', ''),
-                'dateCreated': item.get('createdTime', ''),
-                'fileUrl': item.get('webViewLink', ''),
-                'fileOwner': item.get('owners', [{}])[0].get('displayName', ''),
-                'mimeType': item['mimeType']
-            }
+            node = build_node(item)
 
             # Recursively scan subfolders
-            if is_folder:
-                subchildren = scan_folder(service, item['id'], item['name'], depth + 1, max_depth)
+            if node.is_folder:
+                subchildren = _scan_folder(lister, pool, item['id'], item['name'], depth + 1, max_depth,
+                                           prefetched.pop(item['id'], None))
                 if subchildren:
-                    node['children'] = subchildren
-                node['expanded'] = False  # Collapsed by default
+                    node.children = subchildren
+                node.expanded = False  # Collapsed by default
 
             children.append(node)
 
@@ -164,65 +269,483 @@ def scan_folder(service, folder_id='root', folder_name='My Drive', depth=0, max_
         print(f"{indent}  ❌ Error: {e}")
         return []
 
-def export_google_drive(max_depth=10):
-    """Main export function"""
+def build_node(item):
+    """Build the filesystem-pattern node for one files.list item"""
+    is_folder = item['mimeType'] == FOLDER_MIME_TYPE
+    icon = get_file_icon(item['mimeType'], item['name'])
+
+    return DriveFileNode(
+        item['id'], item['name'], icon, is_folder,
+        file_extension=os.path.splitext(item['name'])[1] if not is_folder else '',
+        file_size=int(item.get('size', 0)) if 'size' in item else 0,
+        date_modified=item.get('modifiedTime', ''),
+        date_created=item.get('createdTime', ''),
+        file_url=item.get('webViewLink', ''),
+        file_owner=item.get('owners', [{}])[0].get('displayName', ''),
+        mime_type=item['mimeType']
+    )
+
+# =============================================================================
+# Flat Listing (--flat)
+# =============================================================================
+
+def scan_drive_flat(service, max_depth=10, rate=DEFAULT_RATE):
+    """
+    Scan My Drive with one paged, corpus-wide files.list instead of one query
+    per folder, then rebuild the folder hierarchy in memory.
+
+    API calls scale with item count / 1000 rather than folder count. Items
+    are grouped by parent in listing order, and depth is limited during the
+    rebuild, as scan_folder() would. Items not reachable from My Drive (files
+    only shared with you) are left out, as they are by the recursive scan.
+
+    Returns:
+        list: Children as DriveFileNode objects, like scan_folder()
+    """
+    root_id = service.files().get(fileId='root', fields='id').execute()['id']
+    children_by_parent, calls = list_all_files(service, rate)
+    print(f"   ✓ {calls} API calls\n")
+    return build_from_index(children_by_parent, root_id, 'My Drive', 0, max_depth)
+
+def list_all_files(service, rate=DEFAULT_RATE):
+    """
+    Page through every non-trashed item visible to the user.
+
+    Returns:
+        tuple: (dict of parent id -> items in listing order, files.list calls made)
+    """
+    children_by_parent = {}
+    limiter = RateLimiter(rate)
+    page_token = None
+    calls = 0
+    total = 0
+
+    while True:
+        limiter.wait()
+        results = service.files().list(
+            q="trashed=false",
+            pageSize=1000,
+            fields=f"nextPageToken, files({FILE_FIELDS}, parents)",
+            pageToken=page_token
+        ).execute(num_retries=NUM_RETRIES)
+        calls += 1
+
+        for item in results.get('files', []):
+            total += 1
+            # Items with several parents appear in each folder, as with per-folder queries
+            for parent_id in item.get('parents', []):
+                children_by_parent.setdefault(parent_id, []).append(item)
+        print(f"   Page {calls}: {total:,} items listed")
+
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return children_by_parent, calls
+
+def scan_drive_batched(service, max_depth=10):
+    """
+    Scan My Drive one folder level at a time, sending each level's listings
+    as batch requests (up to 100 folders per round trip) instead of one
+    request per folder, then rebuild the hierarchy like scan_drive_flat().
+
+    Unlike --flat, only folders within max_depth are listed.
+
+    Returns:
+        list: Children as DriveFileNode objects, like scan_folder()
+    """
+    children_by_parent = {}
+    level = ['root']
+    depth = 0
+    while level and depth <= max_depth:
+        listings = list_folders_batched(service, level, FILE_FIELDS)
+        next_level = []
+        for folder_id, items in listings.items():
+            if isinstance(items, Exception):
+                print(f"   ❌ Error listing folder {folder_id}: {items}")
+                continue
+            children_by_parent[folder_id] = items
+            next_level.extend(item['id'] for item in items
+                              if item['mimeType'] == FOLDER_MIME_TYPE and item['id'] not in children_by_parent)
+        print(f"   Level {depth}: {len(level):,} folders listed")
+        level = list(dict.fromkeys(next_level))
+        depth += 1
+    print()
+    return build_from_index(children_by_parent, 'root', 'My Drive', 0, max_depth)
+
+def build_from_index(children_by_parent, folder_id, folder_name, depth=0, max_depth=10):
+    """Rebuild one folder's subtree from the parent -> children index"""
+    if depth > max_depth:
+        print(f"⚠️  Max depth {max_depth} reached at: {folder_name}")
+        return []
+
+    indent = '  ' * depth
+    print(f"{indent}📂 {folder_name}")
+
+    children = []
+    for item in children_by_parent.get(folder_id, []):
+        node = build_node(item)
+
+        if node.is_folder:
+            subchildren = build_from_index(children_by_parent, item['id'], item['name'], depth + 1, max_depth)
+            if subchildren:
+                node.children = subchildren
+            node.expanded = False  # Collapsed by default
+
+        children.append(node)
+
+    print(f"{indent}  ✓ {len(children)} items")
+    return children
+
+# =============================================================================
+# Incremental Sync (--incremental)
+# =============================================================================
+
+class DriveTreeIndex:
+    """
+    A previous export's nodes by Drive file id, for applying changes in place.
+
+    Only folders whose listing the export contains (scan depth <= max_depth)
+    are containers; changes whose new parents aren't containers place the
+    item nowhere, as a full scan wouldn't reach it either.
+    """
+
+    def __init__(self, phase, root_id, max_depth, scan_subfolder):
+        self.max_depth = max_depth
+        self.scan_subfolder = scan_subfolder   # (folder id, name, depth) -> DriveFileNode list
+        self.containers = {}   # folder id -> [(node whose 'children' is its listing, scan depth)]
+        self.placements = {}   # file id -> [(parent node, node, parent's scan depth)]
+        self.stats = {'added': 0, 'updated': 0, 'moved': 0, 'removed': 0}
+        self._add_container(root_id, phase, 0)
+
+    def _add_container(self, folder_id, node, depth):
+        self.containers.setdefault(folder_id, []).append((node, depth))
+        for child in node.get('children', []):
+            self._index(node, child, depth)
+
+    def _index(self, parent, node, depth):
+        self.placements.setdefault(node['id'], []).append((parent, node, depth))
+        if node['isFolder'] and depth + 1 <= self.max_depth:
+            self._add_container(node['id'], node, depth + 1)
+
+    def _unindex_subtree(self, node, depth):
+        """Forget a detached node's own listing and everything below it"""
+        if not (node['isFolder'] and depth + 1 <= self.max_depth):
+            return
+        self._discard(self.containers, node['id'], lambda entry: entry[0] is node)
+        for child in node.get('children', []):
+            self._discard(self.placements, child['id'], lambda entry: entry[1] is child)
+            self._unindex_subtree(child, depth + 1)
+
+    @staticmethod
+    def _discard(index, key, matches):
+        remaining = [entry for entry in index.get(key, []) if not matches(entry)]
+        if remaining:
+            index[key] = remaining
+        else:
+            index.pop(key, None)
+
+    def count(self):
+        return sum(len(entries) for entries in self.placements.values())
+
+    def apply(self, change):
+        """Apply one changes.list entry (the item's latest state) to the tree"""
+        file_id = change['fileId']
+        old = self.placements.pop(file_id, [])
+        item = None if change_is_removal(change) else change.get('file')
+
+        targets = []
+        if item is not None:
+            for parent_id in item.get('parents', []):
+                targets.extend(self.containers.get(parent_id, []))
+        is_folder = item is not None and item['mimeType'] == FOLDER_MIME_TYPE
+
+        # Nodes still under the same parent are updated where they are
+        # (renames keep their position); the rest are detached
+        detached = {}
+        for parent, node, depth in old:
+            target = next((t for t in targets if t[0] is parent), None)
+            if target is not None and node['isFolder'] == is_folder:
+                targets.remove(target)
+                self._update_fields(node, item)
+                self.placements.setdefault(file_id, []).append((parent, node, depth))
+                self.stats['updated'] += 1
+                continue
+            self._detach(parent, node)
+            self._unindex_subtree(node, depth)
+            if item is None:
+                self.stats['removed'] += 1
+            elif node['isFolder'] == is_folder:
+                detached.setdefault(depth, node)
+
+        # New placements: a moved subtree is reused when it stays at the same
+        # depth (its contents are then still exactly what a scan would list),
+        # otherwise the item is built and, for folders, scanned afresh
+        for parent, depth in targets:
+            node = detached.pop(depth, None)
+            if node is not None:
+                self._update_fields(node, item)
+                self.stats['moved'] += 1
+            else:
+                node = self._build(item, depth)
+                self.stats['added'] += 1
+            self._attach(parent, node)
+            self._index(parent, node, depth)
+
+        # Moved somewhere deeper or shallower, or out of the scanned tree
+        self.stats['removed'] += len(detached)
+
+    def _build(self, item, depth):
+        node = build_node(item)
+        if node.is_folder:
+            node.children = self.scan_subfolder(item['id'], item['name'], depth + 1) or None
+            node.expanded = False  # Collapsed by default
+        return node.to_dict()
+
+    @staticmethod
+    def _update_fields(node, item):
+        """Replace a node's own fields with the item's latest metadata, keeping its subtree"""
+        children = node.pop('children', None)
+        expanded = node.pop('expanded', None)
+        node.clear()
+        node.update(build_node(item).fields())
+        if children:
+            node['children'] = children
+        if expanded is not None:
+            node['expanded'] = expanded
+
+    @staticmethod
+    def _attach(parent, node):
+        if 'children' not in parent:
+            # Keep 'children' ahead of 'expanded', as a scan writes them
+            expanded = parent.pop('expanded', None)
+            parent['children'] = []
+            if expanded is not None:
+                parent['expanded'] = expanded
+        parent['children'].append(node)
+
+    @staticmethod
+    def _detach(parent, node):
+        parent['children'] = [child for child in parent['children'] if child is not node]
+        if not parent['children'] and parent.get('type') != 'phase':
+            del parent['children']  # Scans omit empty folders' children
+
+def update_export(service, tree, max_depth=10, rate=DEFAULT_RATE):
+    """
+    Bring a previous export up to date from the Drive Changes API.
+
+    Each change carries the item's latest state, so applying them in feed
+    order leaves the tree as a full scan would see it, except that added
+    and moved items are appended to their folder rather than placed in
+    listing order.
+
+    Returns:
+        tuple: (index with change counts, token to store for the next run)
+    """
+    phase = next(child for child in tree['children'] if child['id'] == 'gdrive-main')
+    root_id = service.files().get(fileId='root', fields='id').execute(num_retries=NUM_RETRIES)['id']
+    # The whole tree is brought up to date, not one folder (the previous export may have been a folder refresh)
+    tree['source'].pop('refreshedFolderId', None)
+
+    changes, next_token = list_changes(service, tree['source']['changesPageToken'], FILE_FIELDS)
+    print(f"   ✓ {len(changes)} changes since {tree['source']['lastSync']}\n")
+
+    # New folders are listed serially: incremental runs touch few of them
+    lister = FolderLister(service, None, rate)
+    index = DriveTreeIndex(
+        phase, root_id, max_depth,
+        lambda folder_id, name, depth: scan_folder(service, folder_id, name, depth, max_depth,
+                                                   workers=1, lister=lister))
+    for change in changes:
+        index.apply(change)
+    return index, next_token
+
+def count_tree(nodes):
+    """Count exported node dicts recursively"""
+    return len(nodes) + sum(count_tree(node.get('children', [])) for node in nodes)
+
+def refresh_folder(service, tree, folder_id, max_depth, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE):
+    """
+    Rescan one folder of a previous export and splice the result into it.
+
+    Every placement of the folder (an item with several parents appears
+    under each) gets the folder's current metadata and a freshly scanned
+    subtree, to the depth a full scan would reach there. The rest of the
+    tree, and its changes token, are left as they were; the folder's id is
+    recorded as the source's 'refreshedFolderId'.
+
+    Returns:
+        int: items in the refreshed subtree, or None if the folder isn't in
+        the tree or can't be read (the caller should fall back to a full
+        export)
+    """
+    placements = find_subtree(tree, folder_id)
+    if not placements:
+        print(f"ℹ️  Folder {folder_id} isn't in the previous export - running a full export")
+        return None
+    try:
+        item = service.files().get(fileId=folder_id, fields=FILE_FIELDS).execute(num_retries=NUM_RETRIES)
+    except Exception as e:
+        print(f"ℹ️  Couldn't read folder {folder_id} ({e}) - running a full export")
+        return None
+    if item['mimeType'] != FOLDER_MIME_TYPE:
+        print(f"ℹ️  {item['name']} is not a folder - running a full export")
+        return None
+
+    # Each listing thread authenticates its own client
+    lister = FolderLister(service, authenticate if workers > 1 else None, rate)
+    # A folder at path [root, phase, ...] is listed at depth len(path) - 1, as in scan_folder()
+    scanned = {}
+    for node, path in placements:
+        depth = len(path) - 1
+        if depth not in scanned:
+            scanned[depth] = scan_folder(service, folder_id, item['name'], depth, max_depth, workers,
+                                         lister=lister)
+        folder = build_node(item)
+        folder.children = scanned[depth]
+        folder.expanded = node.get('expanded', False)
+        node.clear()
+        node.update(folder.to_dict())
+    tree['source']['refreshedFolderId'] = folder_id
+    print(f"\n   ✓ {lister.calls} API calls")
+    return count_nodes(scanned[len(placements[0][1]) - 1])
+
+def export_google_drive(max_depth=10, flat=False, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+                        incremental=None, batch=False, folder=None):
+    """
+    Main export function
+
+    With flat, the drive is listed in bulk (scan_drive_flat) instead of
+    folder by folder; with batch, folder listings are sent in batch requests
+    (scan_drive_batched); otherwise `workers` folders are listed concurrently.
+    With incremental (an export file, or LATEST_EXPORT for the newest one),
+    that export is updated from the Changes API instead (update_export).
+    With folder (a Drive folder id), only that folder is rescanned and
+    spliced into the newest previous export (refresh_folder); without one
+    to splice into, the export runs as it would without folder.
+    """
     print("\n🌳 TreeListy Google Drive Exporter")
     print("=" * 60)
-    print(f"Max scan depth: {max_depth} levels\n")
+    print(f"Max scan depth: {max_depth} levels")
+    if flat:
+        print("Listing: flat (bulk files.list)")
+    elif batch:
+        print("Listing: per folder, batched")
+    else:
+        print(f"Listing: per folder, {workers} at a time")
+    if folder:
+        print(f"Mode: refresh folder {folder}")
+    elif incremental:
+        print("Mode: incremental (Drive Changes API)")
+    print(f"Rate limit: {rate} requests/s\n")
 
     # Authenticate
     print("🔐 Authenticating...")
     service = authenticate()
     print("✅ Authenticated\n")
 
-    # Scan drive
-    print("📥 Scanning Google Drive...\n")
-    children = scan_folder(service, 'root', 'My Drive', 0, max_depth)
-
-    # Create TreeListy structure (filesystem pattern) with source metadata
-    tree = {
-        'id': 'root-gdrive',
-        'name': '💻 My Computer',
-        'type': 'root',
-        'icon': '💻',
-        'expanded': True,
-        'source': {
-            'type': 'google-drive',
-            'folderId': 'root',
-            'folderName': 'My Drive',
-            'lastSync': datetime.now().isoformat(),
-            'syncDepth': max_depth
-        },
-        'children': [
-            {
-                'id': 'gdrive-main',
-                'name': '☁️ Google Drive',
-                'type': 'phase',
-                'icon': '☁️',
-                'expanded': True,
-                'children': children
-            }
-        ],
-        'pattern': {
-            'key': 'filesystem',
-            'labels': None
-        }
-    }
+    cached = None
+    refreshed = None
+    if folder and folder != 'root':
+        cached = load_previous_export(find_previous_export(EXPORT_GLOB), syncDepth=max_depth)
+        if cached is not None:
+            print("📥 Rescanning folder...\n")
+            refreshed = refresh_folder(service, cached, folder, max_depth, workers, rate)
+
+    previous = None
+    if refreshed is None and incremental:
+        previous_file = find_previous_export(EXPORT_GLOB) if incremental == LATEST_EXPORT else incremental
+        previous = load_previous_export(previous_file, syncDepth=max_depth)
 
-    # Save to file
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     output_file = f'google-drive-{timestamp}.json'
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(tree, f, indent=2, ensure_ascii=False)
+    if refreshed is not None:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(cached, f, indent=2, ensure_ascii=False)
+
+        phase = next(child for child in cached['children'] if child['id'] == 'gdrive-main')
+        total_items = count_tree(phase['children'])
+        top_level = len(phase['children'])
+    elif previous is not None:
+        print("📥 Applying Drive changes...\n")
+        index, page_token = update_export(service, previous, max_depth, rate)
+        previous['source']['lastSync'] = datetime.now().isoformat()
+        previous['source']['changesPageToken'] = page_token
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(previous, f, indent=2, ensure_ascii=False)
+
+        phase = next(child for child in previous['children'] if child['id'] == 'gdrive-main')
+        total_items = index.count()
+        top_level = len(phase['children'])
+    else:
+        # Taken before scanning, so changes made during the scan are seen next time
+        page_token = get_start_page_token(service)
+
+        # Scan drive
+        print("📥 Scanning Google Drive...\n")
+        if flat:
+            children = scan_drive_flat(service, max_depth, rate)
+        elif batch:
+            children = scan_drive_batched(service, max_depth)
+        else:
+            # Each listing thread authenticates its own client
+            lister = FolderLister(service, authenticate if workers > 1 else None, rate)
+            children = scan_folder(service, 'root', 'My Drive', 0, max_depth, workers, lister=lister)
+            print(f"\n   ✓ {lister.calls} API calls")
+
+        # Save to file (filesystem pattern) with source metadata; nodes become
+        # dicts one at a time as they are written
+        with open(output_file, 'w', encoding='utf-8') as f:
+            writer = StreamingTreeWriter(f)
+            writer.begin_object({
+                'id': 'root-gdrive',
+                'name': '💻 My Computer',
+                'type': 'root',
+                'icon': '💻',
+                'expanded': True,
+                'source': {
+                    'type': 'google-drive',
+                    'folderId': 'root',
+                    'folderName': 'My Drive',
+                    'lastSync': datetime.now().isoformat(),
+                    'syncDepth': max_depth,
+                    'changesPageToken': page_token
+                }
+            })
+            writer.begin_array('children')
+            writer.begin_object({
+                'id': 'gdrive-main',
+                'name': '☁️ Google Drive',
+                'type': 'phase',
+                'icon': '☁️',
+                'expanded': True
+            })
+            writer.begin_array('children')
+            write_nodes(writer, children)
+            writer.end_array()
+            writer.end_object()
+            writer.end_array()
+            writer.end_object({
+                'pattern': {
+                    'key': 'filesystem',
+                    'labels': None
+                }
+            })
+            writer.close()
+
+        total_items = count_nodes(children)
+        top_level = len(children)
 
     # Summary
-    total_items = count_items(children)
     print("\n" + "=" * 60)
     print(f"✅ SUCCESS! Exported to: {output_file}")
     print(f"\n📊 Statistics:")
     print(f"   Total items: {total_items}")
-    print(f"   Top-level items: {len(children)}")
+    print(f"   Top-level items: {top_level}")
+    if refreshed is not None:
+        print(f"   Folder refreshed: {folder} ({refreshed} items)")
+    if previous is not None:
+        print(f"   Changes applied: {index.stats['added']} added, {index.stats['updated']} updated, "
+              f"{index.stats['moved']} moved, {index.stats['removed']} removed")
     print(f"\n📋 Next Steps:")
     print(f"   1. Open TreeListy in browser")
     print(f"   2. Click '📂 Import' → Select '{output_file}'")
@@ -230,24 +753,34 @@ def export_google_drive(max_depth=10):
     print(f"   4. Your Google Drive appears as a tree!")
     print("=" * 60)
 
-def count_items(children):
-    """Count total items recursively"""
-    if not children:
-        return 0
-    count = len(children)
-    for child in children:
-        if 'children' in child:
-            count += count_items(child['children'])
-    return count
+    return output_file
 
 if __name__ == '__main__':
     print("🚀 Starting...")
 
+    parser = argparse.ArgumentParser(description='Export Google Drive to TreeListy format')
+    parser.add_argument('max_depth', nargs='?', default=None, help='Maximum folder depth (default: 10)')
+    listing = parser.add_mutually_exclusive_group()
+    listing.add_argument('--flat', action='store_true',
+                         help='List the whole drive in bulk (1 API call per 1000 items) instead of per folder')
+    listing.add_argument('--batch', action='store_true',
+                         help='Send folder listings as batch requests, up to 100 folders per round trip')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Folders listed concurrently (default: {DEFAULT_WORKERS}, 1 = serial)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Max API requests per second (default: {DEFAULT_RATE}, 0 = unlimited)')
+    parser.add_argument('--incremental', nargs='?', const=LATEST_EXPORT, default=None, metavar='PREVIOUS',
+                        help='Update the newest google-drive-*.json (or PREVIOUS) from the Drive Changes API '
+                             'instead of rescanning; falls back to a full scan if there is none')
+    parser.add_argument('--folder', default=None, metavar='FOLDER_ID',
+                        help='Rescan only this folder and splice it into the newest google-drive-*.json')
+    args = parser.parse_args()
+
     # Get max depth from command line or use default
     max_depth = 10
-    if len(sys.argv) > 1:
+    if args.max_depth is not None:
         try:
-            max_depth = int(sys.argv[1])
+            max_depth = int(args.max_depth)
             print(f"Using max depth from command line: {max_depth}")
         except ValueError:
             print(f"Invalid depth argument, using default: {max_depth}")
@@ -259,4 +792,4 @@ if __name__ == '__main__':
         except (EOFError, ValueError):
             print(f"Using default max depth: {max_depth}")
 
-    export_google_drive(max_depth)
+    export_google_drive(max_depth, args.flat, args.workers, args.rate, args.incremental, args.batch, args.folder)
@@ -13,34 +13,65 @@ Options:
   --extract-content    Extract text from documents (PDFs, Docs, etc.)
   --max-depth N        Maximum folder depth (default: 10)
   --max-content-size N Max content size per file in KB (default: 100)
-
-Install extraction libraries:
-  pip install PyPDF2 python-docx
+  --pdf-sample F,L     Only extract the outline and first F / last L pages of each PDF
+  --sheets MODE        CSV files as their first rows (rows) or a column summary (summary)
+  --sheet-rows N       Rows per CSV file in rows mode (default: 200)
+  --sheet-chars N      Characters per CSV file (default: 20000)
+  --scan-threads N     Threads listing folders concurrently (default: 8)
+  --jobs N             Content extraction worker processes (default: CPU count, max 8; 0 = inline)
+  --extract-timeout N  Seconds before one file's extraction is abandoned (default: 120)
+  --extract-cache [P]  Content-addressed PDF/DOCX text cache shared with the Drive exporter
+  --extract-cache-mb N Extraction cache size cap in MB (default: 1024)
+  --incremental        Reuse unchanged folder listings and extracted text from the last run
+  --manifest PATH      Scan manifest file (implies --incremental)
+  --search-index [P]   Keep a BM25 search index of the extracted content (treelisty_search_index)
+  --compact-paths      Smaller output with parent-relative paths (TreeListy can't import it as is:
+                       expand it first with treelisty_paths.py)
+  --watch              Keep running and write JSON Patch files as the folder changes
+
+Install extraction libraries (PyPDF2 also works for PDFs):
+  pip install PyMuPDF python-docx
+
+Install for --watch:
+  pip install watchdog
 """
 
 import os
 import sys
+import codecs
+import copy
 import json
+import sqlite3
 import argparse
+import threading
+import time
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from treelisty_documents import (DOCX_BACKEND, DOCX_VERSION, PDF_BACKEND, PDF_VERSION, PdfSample,
+                                 docx_text, pdf_text)
+from treelisty_extract_cache import DEFAULT_CACHE_FILE, DEFAULT_CACHE_MB, ExtractionCache
+from treelisty_json_writer import StreamingTreeWriter
+from treelisty_nodes import LocalFileNode, iso_date
+from treelisty_paths import PATH_ENCODING, compact_fields, expanded_file_name, load_tree
+from treelisty_search_index import SearchIndexWriter
+from treelisty_spreadsheet import SHEET_MODES, SheetOptions, csv_text
 
 # Fix Windows console encoding for emojis
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-# Optional imports for content extraction
+# Optional import for --watch (inotify on Linux, native APIs on Windows/macOS)
 try:
-    import PyPDF2
-    HAS_PYPDF2 = True
+    from watchdog.observers import Observer
+    HAS_WATCHDOG = True
 except ImportError:
-    HAS_PYPDF2 = False
-
-try:
-    import docx
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
+    HAS_WATCHDOG = False
 
 # =============================================================================
 # Configuration
@@ -56,20 +87,63 @@ EXTRACTABLE_EXTENSIONS = {
     '.json': 'JSON',
 }
 
+# Plain-text types truncated at a line boundary (JSON log records)
+LINE_ORIENTED_EXTENSIONS = {'.json'}
+
 # Stats tracking
 extraction_stats = {
     'attempted': 0,
     'succeeded': 0,
     'failed': 0,
     'skipped': 0,
+    'timed_out': 0,
+    'reused': 0,
     'total_chars': 0
 }
 
+# Shared extraction cache (--extract-cache); see configure_extraction_cache()
+extraction_cache = None
+
+
+EXT_ICONS = {
+    '.pdf': '📕',
+    '.doc': '📘', '.docx': '📘',
+    '.xls': '📗', '.xlsx': '📗', '.csv': '📊',
+    '.ppt': '📙', '.pptx': '📙',
+    '.txt': '📝', '.md': '📝',
+    '.jpg': '🖼️', '.jpeg': '🖼️', '.png': '🖼️', '.gif': '🎨',
+    '.mp4': '🎬', '.avi': '🎬', '.mov': '🎬',
+    '.mp3': '🎵', '.wav': '🎵', '.flac': '🎵',
+    '.zip': '🗜️', '.rar': '📦', '.7z': '📦',
+    '.html': '🌐', '.css': '🎨', '.js': '⚡', '.py': '🐍',
+}
+
+# Directory listings run on a thread pool; 1 disables it
+DEFAULT_SCAN_THREADS = 8
+
+# Content extraction runs in worker processes; 0 extracts inline during the walk
+DEFAULT_EXTRACT_JOBS = min(8, os.cpu_count() or 1)
+DEFAULT_EXTRACT_TIMEOUT = 120  # seconds per file
+
+# Scanned nodes held back while waiting on extraction before the walk pauses
+DEFAULT_STREAM_BUFFER = 10000
+
+# --watch: seconds without events before a batch of changes is rescanned
+DEFAULT_WATCH_DEBOUNCE = 2.0
+WATCH_POLL_SECONDS = 0.5
 
-def get_file_icon(path: Path):
+
+def get_file_icon(path: Path, is_folder=None):
     """Get emoji icon based on file type"""
-    if path.is_dir():
-        name_lower = path.name.lower()
+    if is_folder is None:
+        is_folder = path.is_dir()
+    return get_icon_for_name(path.name, is_folder)
+
+
+def get_icon_for_name(name: str, is_folder: bool):
+    """Get emoji icon from an entry name (no filesystem access)"""
+    if is_folder:
+        name_lower = name.lower()
         if 'download' in name_lower:
             return '📥'
         elif 'document' in name_lower or 'docs' in name_lower:
@@ -82,329 +156,1039 @@ def get_file_icon(path: Path):
             return '🎵'
         return '📁'
 
-    ext = path.suffix.lower()
-    ext_icons = {
-        '.pdf': '📕',
-        '.doc': '📘', '.docx': '📘',
-        '.xls': '📗', '.xlsx': '📗', '.csv': '📊',
-        '.ppt': '📙', '.pptx': '📙',
-        '.txt': '📝', '.md': '📝',
-        '.jpg': '🖼️', '.jpeg': '🖼️', '.png': '🖼️', '.gif': '🎨',
-        '.mp4': '🎬', '.avi': '🎬', '.mov': '🎬',
-        '.mp3': '🎵', '.wav': '🎵', '.flac': '🎵',
-        '.zip': '🗜️', '.rar': '📦', '.7z': '📦',
-        '.html': '🌐', '.css': '🎨', '.js': '⚡', '.py': '🐍',
-    }
-    return ext_icons.get(ext, '📄')
+    return EXT_ICONS.get(name_suffix(name).lower(), '📄')
+
+
+def name_suffix(name: str):
+    """Same result as Path(name).suffix, without building a Path"""
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ''
 
 
 # =============================================================================
 # Content Extraction
 # =============================================================================
 
-def extract_text_from_pdf(file_path: Path):
-    """Extract text from PDF file"""
-    if not HAS_PYPDF2:
-        return None, "PyPDF2 not installed"
-
+def parse_pdf_sample(value: str) -> PdfSample:
+    """argparse type for --pdf-sample FIRST,LAST"""
     try:
-        reader = PyPDF2.PdfReader(str(file_path))
-        text_parts = []
+        first, last = (int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected FIRST,LAST page counts (e.g. 20,5), got {value!r}")
+    if first < 0 or last < 0:
+        raise argparse.ArgumentTypeError("page counts can't be negative")
+    return PdfSample(first, last)
 
-        for page_num, page in enumerate(reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(f"[Page {page_num + 1}]\n{page_text}")
-            except Exception as e:
-                text_parts.append(f"[Page {page_num + 1}] (extraction error: {e})")
 
-        return '\n\n'.join(text_parts), None
+def extract_text_from_plain(file_path: Path, max_chars=None, whole_lines=False):
+    """
+    Extract text from plain text files, decoding at most max_chars characters.
+
+    Only the bytes that can hold max_chars + 1 characters are read (4 per
+    character in UTF-8), however large the file, and decoded with an
+    incremental decoder so a sequence cut at the end of the read is left
+    out rather than reported as an error. UTF-8 is tried first; the text is
+    re-read as latin-1 only if a bad byte falls inside the characters kept,
+    not somewhere past the budget. With whole_lines, a truncated read is cut
+    back to the last complete line so a CSV row or JSON log record is never
+    split.
+
+    Returns:
+        tuple: (text, error, truncated)
+    """
+    try:
+        text = read_text_prefix(file_path, max_chars)
     except Exception as e:
-        return None, str(e)
+        return None, str(e), False
 
+    if max_chars is None or len(text) <= max_chars:
+        return text, None, False
+    text = text[:max_chars]
+    if whole_lines:
+        last_newline = text.rfind('\n')
+        if last_newline > 0:
+            text = text[:last_newline]
+    return text, None, True
 
-def extract_text_from_docx(file_path: Path):
-    """Extract text from DOCX file"""
-    if not HAS_DOCX:
-        return None, "python-docx not installed"
 
-    try:
-        doc = docx.Document(str(file_path))
-        text_parts = []
+def read_text_prefix(file_path: Path, max_chars=None):
+    """
+    Read the whole file, or max_chars + 1 characters (enough to tell it was cut),
+    as UTF-8 or else latin-1
+    """
+    with open(file_path, 'rb') as f:
+        if max_chars is None:
+            data = f.read()
+        else:
+            limit = max_chars * 4 + 4
+            data = f.read(limit)
+    if max_chars is None:
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            return data.decode('latin-1')
 
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text)
+    decoder = codecs.getincrementaldecoder('utf-8')('strict')
+    try:
+        return decoder.decode(data, final=len(data) < limit)[:max_chars + 1]
+    except UnicodeDecodeError as e:
+        valid = data[:e.start].decode('utf-8')
+        if len(valid) > max_chars:
+            # The bad byte is past the characters kept
+            return valid[:max_chars + 1]
+        return data[:max_chars + 1].decode('latin-1')
 
-        # Also extract from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = ' | '.join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                if row_text:
-                    text_parts.append(row_text)
 
-        return '\n\n'.join(text_parts), None
-    except Exception as e:
-        return None, str(e)
+def extract_text_from_csv(file_path: Path, max_chars=None, sheets: Optional[SheetOptions] = None):
+    """
+    Extract a CSV file as its first rows or a column summary
+    (treelisty_spreadsheet), within the sheet budgets and max_chars.
 
+    Rows are read one at a time and reading stops at the budget, so this
+    costs the same for a 2GB export as for a small table. UTF-8 is tried
+    first, then latin-1.
 
-def extract_text_from_plain(file_path: Path):
-    """Extract text from plain text files"""
+    Returns:
+        tuple: (text, error)
+    """
+    sheets = sheets or SheetOptions()
+    if max_chars is not None:
+        sheets = sheets._replace(max_chars=min(sheets.max_chars, max_chars))
     try:
-        # Try UTF-8 first, then fall back to latin-1
         try:
-            return file_path.read_text(encoding='utf-8'), None
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                return csv_text(f, sheets), None
         except UnicodeDecodeError:
-            return file_path.read_text(encoding='latin-1'), None
+            with open(file_path, 'r', encoding='latin-1', newline='') as f:
+                return csv_text(f, sheets), None
     except Exception as e:
         return None, str(e)
 
 
-def extract_content(file_path: Path, max_size_kb=100):
+# Extractors whose output goes through the shared cache (treelisty_documents, as in the
+# Drive exporter): ext -> (fn, backend, version)
+CACHED_EXTRACTORS = {
+    '.pdf': (pdf_text, PDF_BACKEND, PDF_VERSION),
+    '.docx': (docx_text, DOCX_BACKEND, DOCX_VERSION),
+}
+
+
+def extract_content(file_path: Path, max_size_kb=100, pdf_sample: Optional[PdfSample] = None,
+                    sheets: Optional[SheetOptions] = None):
     """
     Extract text content from a file.
 
     Args:
         file_path: Path to the file
         max_size_kb: Maximum content size in KB
+        pdf_sample: Only extract the outline and first/last pages of PDFs
+        sheets: How CSV files are extracted (default: SheetOptions())
 
     Returns:
         tuple: (extracted_text, error_message)
     """
-    global extraction_stats
-    extraction_stats['attempted'] += 1
+    text, error, outcome, _ = extract_content_uncounted(file_path, max_size_kb, pdf_sample, sheets)
+    record_extraction(outcome, text)
+    return text, error
+
+
+def extract_content_uncounted(file_path: Path, max_size_kb=100, pdf_sample: Optional[PdfSample] = None,
+                              sheets: Optional[SheetOptions] = None):
+    """
+    Extract text content without touching extraction_stats.
 
+    This is the unit of work run in extraction worker processes, where updates
+    to the module globals would be lost; the caller records the outcome.
+    PDF and DOCX text goes through extraction_cache when one is configured.
+
+    Returns:
+        tuple: (extracted_text, error_message, outcome, cache_hit) where outcome
+               is 'succeeded', 'failed' or 'skipped' and cache_hit is None when
+               the cache wasn't consulted
+    """
     ext = file_path.suffix.lower()
     if ext not in EXTRACTABLE_EXTENSIONS:
-        extraction_stats['skipped'] += 1
-        return None, "Unsupported type"
-
-    # Check file size
-    try:
-        file_size = file_path.stat().st_size
-        if file_size > max_size_kb * 1024 * 10:  # 10x limit for raw files
-            extraction_stats['skipped'] += 1
-            return None, f"File too large ({file_size // 1024}KB)"
-    except Exception:
-        pass
+        return None, "Unsupported type", 'skipped', None
 
+    # Check file size (DOCX only: PDFs and plain text stop at the budget, whatever their size)
+    if ext == '.docx':
+        try:
+            file_size = file_path.stat().st_size
+            if file_size > max_size_kb * 1024 * 10:  # 10x limit for raw files
+                return None, f"File too large ({file_size // 1024}KB)", 'skipped', None
+        except Exception:
+            pass
+
+    cache_hit = None
+    max_chars = max_size_kb * 1024
     try:
         # Extract based on type
-        if ext == '.pdf':
-            text, error = extract_text_from_pdf(file_path)
-        elif ext == '.docx':
-            text, error = extract_text_from_docx(file_path)
+        truncated = False
+        if ext in CACHED_EXTRACTORS:
+            text, error, cache_hit = extract_document_cached(file_path, ext, max_chars, pdf_sample)
+        elif ext == '.csv':
+            text, error = extract_text_from_csv(file_path, max_chars, sheets)
         else:
-            # Plain text, markdown, CSV, JSON
-            text, error = extract_text_from_plain(file_path)
+            # Plain text, markdown, JSON
+            text, error, truncated = extract_text_from_plain(
+                file_path, max_chars, whole_lines=ext in LINE_ORIENTED_EXTENSIONS)
 
         if error:
-            extraction_stats['failed'] += 1
-            return None, error
+            return None, error, 'failed', cache_hit
 
         # Truncate if too large
-        max_chars = max_size_kb * 1024
-        if text and len(text) > max_chars:
+        if truncated or (text and len(text) > max_chars):
             text = text[:max_chars] + f"\n\n[Truncated at {max_size_kb}KB]"
 
-        extraction_stats['succeeded'] += 1
-        extraction_stats['total_chars'] += len(text) if text else 0
-        return text, None
+        return text, None, 'succeeded', cache_hit
 
     except Exception as e:
-        extraction_stats['failed'] += 1
-        return None, str(e)
+        return None, str(e), 'failed', cache_hit
+
+
+def extract_document_cached(file_path: Path, ext: str, max_chars=None,
+                            pdf_sample: Optional[PdfSample] = None):
+    """
+    Run the PDF/DOCX extractor for ext, consulting extraction_cache first.
+
+    The cache is keyed by the file's bytes, so text is shared across runs and
+    with the Drive exporter. PDFs stop at the character budget: text that
+    covers the whole document is stored under the plain key and serves any
+    budget, while a budget-limited prefix is stored under a key for that budget.
+
+    Returns:
+        tuple: (text, error, cache_hit)
+    """
+    extractor, backend, version = CACHED_EXTRACTORS[ext]
+    limits = {'max_chars': max_chars, 'sample': pdf_sample} if ext == '.pdf' else {}
+    if extraction_cache is None or version is None:
+        text, error = extractor(file_path, **limits)
+        return text, error, None
+
+    if pdf_sample is not None and ext == '.pdf':
+        backend += f"+sample{pdf_sample.first},{pdf_sample.last}"
+    # Hashed in blocks and parsed from the path: a huge PDF is never read into memory whole
+    digest = extraction_cache.file_digest(file_path)
+    full_key = extraction_cache.digest_key(digest, backend, version)
+    prefix_key = extraction_cache.digest_key(digest, f"{backend}+first{max_chars}", version)
+    text = extraction_cache.get(full_key, prefix_key) if limits else extraction_cache.get(full_key)
+    if text is not None:
+        return text, None, True
+
+    text, error = extractor(file_path, **limits)
+    if not error and text is not None:
+        complete = not limits or max_chars is None or len(text) <= max_chars
+        extraction_cache.put(full_key if complete else prefix_key, text)
+    return text, error, False
+
+
+def configure_extraction_cache(db_path: Optional[str], max_mb=DEFAULT_CACHE_MB, evict_on_put=True):
+    """Set (or clear, with db_path=None) the shared extraction cache; also a pool initializer"""
+    global extraction_cache
+    extraction_cache = ExtractionCache(db_path, max_mb, evict_on_put) if db_path else None
+
+
+def record_extraction(outcome: str, text: Optional[str]):
+    """Count one extraction attempt in extraction_stats"""
+    extraction_stats['attempted'] += 1
+    extraction_stats[outcome] += 1
+    if outcome == 'succeeded':
+        extraction_stats['total_chars'] += len(text) if text else 0
+
+
+# =============================================================================
+# Extraction Pipeline
+# =============================================================================
+
+class ExtractionPipeline:
+    """
+    Runs content extraction on a process pool as a separate stage from the walk.
+
+    The walker submits (path, node) pairs; they wait on a bounded queue, at most
+    `jobs` run at once, and finished text is stitched back into its node by
+    path. A file that runs past `timeout` seconds is recorded as failed and the
+    pool is recycled, so one pathological document can't stall the export.
+    """
+
+    def __init__(self, jobs: int, max_content_kb=100, timeout=DEFAULT_EXTRACT_TIMEOUT,
+                 queue_size=None, manifest=None, pdf_sample: Optional[PdfSample] = None,
+                 sheets: Optional[SheetOptions] = None):
+        self.jobs = max(1, jobs)
+        self.max_content_kb = max_content_kb
+        self.pdf_sample = pdf_sample
+        self.sheets = sheets
+        self.timeout = timeout
+        self.queue_size = queue_size or self.jobs * 4
+        self.queue = deque()       # (path, retries) waiting for a worker
+        self.pending = {}          # path -> (node, indent, stat), until stitched
+        self.in_flight = {}        # future -> (path, retries, started)
+        self.manifest = manifest
+        self.pool = self._new_pool()
+
+    def submit(self, path: str, node: LocalFileNode, indent='', stat=None):
+        """Queue a file for extraction, blocking while the queue is full"""
+        self.pending[path] = (node, indent, stat)
+        self.queue.append((path, 0))
+        self._start_queued()
+        while len(self.queue) >= self.queue_size:
+            self._collect(block=True)
+            self._start_queued()
+        self._collect(block=False)
+
+    def is_pending(self, path: str):
+        """True until the file's result has been stitched into its node"""
+        return path in self.pending
+
+    def wait(self):
+        """Block until at least one running extraction finishes or times out"""
+        self._start_queued()
+        self._collect(block=True)
+
+    def drain(self):
+        """Wait for every queued file and stitch its result into its node"""
+        while self.queue or self.in_flight:
+            self._start_queued()
+            self._collect(block=True)
+
+    def close(self):
+        """Stop the workers, killing any still stuck on a file"""
+        self._shutdown_pool()
+
+    def _start_queued(self):
+        while self.queue and len(self.in_flight) < self.jobs:
+            path, retries = self.queue.popleft()
+            future = self.pool.submit(extract_content_uncounted, Path(path), self.max_content_kb,
+                                      self.pdf_sample, self.sheets)
+            self.in_flight[future] = (path, retries, time.monotonic())
+
+    def _collect(self, block: bool):
+        if not self.in_flight:
+            return
+
+        wait_for = 0
+        if block:
+            oldest = min(started for _, _, started in self.in_flight.values())
+            wait_for = max(0.0, oldest + self.timeout - time.monotonic())
+        done, _ = wait(list(self.in_flight), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        broken = []
+        for future in done:
+            path, retries, _ = self.in_flight.pop(future)
+            try:
+                text, error, outcome, cache_hit = future.result()
+            except BrokenProcessPool:
+                broken.append((path, retries))
+                continue
+            except Exception as e:
+                text, error, outcome, cache_hit = None, str(e), 'failed', None
+            if extraction_cache is not None:
+                extraction_cache.record(cache_hit, len(text) if cache_hit else 0)
+            self._stitch(path, text, error, outcome)
+
+        now = time.monotonic()
+        expired = [f for f, (_, _, started) in self.in_flight.items() if now - started >= self.timeout]
+        for future in expired:
+            path, _, _ = self.in_flight.pop(future)
+            extraction_stats['timed_out'] += 1
+            self._stitch(path, None, f"Timed out after {self.timeout}s", 'failed')
+
+        if broken or expired:
+            self._recycle_pool(broken)
+
+    def _recycle_pool(self, broken):
+        """Replace the pool; work it was running goes back on the queue"""
+        requeue = [(path, retries) for path, retries, _ in self.in_flight.values()]
+        self.in_flight.clear()
+        self._shutdown_pool()
+        self.pool = self._new_pool()
+
+        # A worker crash breaks every running task, so each gets one retry
+        for path, retries in broken:
+            if retries >= 1:
+                self._stitch(path, None, "Extraction worker crashed", 'failed')
+            else:
+                requeue.append((path, retries + 1))
+        self.queue.extendleft(reversed(requeue))
+
+    def _new_pool(self):
+        # Workers open their own handle on the shared cache and leave eviction to us
+        if extraction_cache is None:
+            return ProcessPoolExecutor(max_workers=self.jobs)
+        return ProcessPoolExecutor(max_workers=self.jobs, initializer=configure_extraction_cache,
+                                   initargs=(extraction_cache.db_path, extraction_cache.max_mb, False))
+
+    def _shutdown_pool(self):
+        processes = list((getattr(self.pool, '_processes', None) or {}).values())
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _stitch(self, path: str, text, error, outcome):
+        node, indent, stat = self.pending.pop(path)
+        record_extraction(outcome, text)
+        if text:
+            add_extracted_content(node, text)
+            if self.manifest is not None:
+                self.manifest.store_text(path, stat, text)
+            print(f"{indent}    ✓ {node.name}: {len(text):,} chars")
+        elif error:
+            print(f"{indent}    ⚠️ {node.name}: {error}")
+
+
+def add_extracted_content(node: LocalFileNode, content: str):
+    """Attach extracted text and RAG metadata to a file node"""
+    # Store content in description for RAG
+    node.description = content
+
+    # Add RAG metadata
+    node.rag = {
+        'source': node.name,
+        'sourceType': 'local-file',
+        'sourceId': node.file_path,
+        'sourcePath': node.file_path,
+        'imported': datetime.now().isoformat(),
+        'charCount': len(content)
+    }
+
+
+# =============================================================================
+# Scan Manifest (incremental re-export)
+# =============================================================================
+
+class CachedStat(NamedTuple):
+    """The stat fields the exporter uses, as stored in the scan manifest"""
+    st_size: int
+    st_mtime: float
+    st_ctime: float
+    st_mtime_ns: int
+    st_ino: int
+
+
+class ScanManifest:
+    """
+    SQLite sidecar that lets a re-export skip work that hasn't changed.
+
+    Folders are keyed by path with their mtime_ns and inode: when both still
+    match, the stored listing is reused instead of calling scandir again, so
+    only changed folders are listed. Folders and extractable files in a reused
+    listing are still stat()ed individually, so edited documents are noticed;
+    other files keep their stored size/dates until their folder changes.
+
+    Extracted text is keyed by path with size, mtime_ns and inode and reused
+    while all three match (and max_content_kb, the PDF sampling and the CSV
+    sheet options are unchanged).
+
+    Listings may be looked up and stored from scan threads, so the folder table
+    is held in memory and only written back by save(); extracted text is read
+    and written on the calling thread.
+    """
+
+    VERSION = '1'
+
+    def __init__(self, db_path: str, max_content_kb=100, restat_suffixes=(),
+                 pdf_sample: Optional[PdfSample] = None, sheets: Optional[SheetOptions] = None):
+        self.db_path = db_path
+        self.restat_suffixes = set(restat_suffixes)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, ino INTEGER, entries TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, ino INTEGER, text TEXT);
+        """)
+
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get('version') != self.VERSION:
+            self.conn.execute("DELETE FROM dirs")
+            self.conn.execute("DELETE FROM files")
+        elif (meta.get('max_content_kb') != str(max_content_kb)
+              or meta.get('pdf_sample', 'None') != str(pdf_sample)
+              or meta.get('sheets') != (sheets or SheetOptions()).key()):
+            # Stored text was truncated to a different budget or sampled differently
+            self.conn.execute("DELETE FROM files")
+        self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                              [('version', self.VERSION), ('max_content_kb', str(max_content_kb)),
+                               ('pdf_sample', str(pdf_sample)), ('sheets', (sheets or SheetOptions()).key())])
+
+        self.dirs = {path: (mtime_ns, ino, entries)
+                     for path, mtime_ns, ino, entries in self.conn.execute("SELECT * FROM dirs")}
+        self.seen_dirs = {}
+        self.reused_dirs = set()
+        self.seen_files = set()
+        self.stats = {'files_reused': 0, 'chars_reused': 0}
+
+    def list_directory(self, dir_path: str):
+        """Drop-in for list_directory() that reuses the stored listing when the folder is unchanged"""
+        st = os.stat(dir_path)
+        stored = self.dirs.get(dir_path)
+        if stored is not None and stored[0] == st.st_mtime_ns and stored[1] == st.st_ino:
+            entries = [self._restat(self._decode_entry(dir_path, row)) for row in json.loads(stored[2])]
+            self.seen_dirs[dir_path] = stored
+            self.reused_dirs.add(dir_path)
+            return entries
+
+        entries = list_directory(dir_path)
+        self.seen_dirs[dir_path] = (st.st_mtime_ns, st.st_ino,
+                                    json.dumps([self._encode_entry(e) for e in entries]))
+        return entries
+
+    def cached_text(self, path: str, stat):
+        """Return stored extracted text if the file is unchanged, else None"""
+        self.seen_files.add(path)
+        if stat is None:
+            return None
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, ino, text FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None or row[:3] != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            return None
+        self.stats['files_reused'] += 1
+        self.stats['chars_reused'] += len(row[3])
+        return row[3]
+
+    def store_text(self, path: str, stat, text: str):
+        """Remember extracted text for an unchanged re-run"""
+        self.seen_files.add(path)
+        if stat is None:
+            return
+        self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                          (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, text))
+
+    def save(self):
+        """Write this run's listings and drop anything the scan no longer reached"""
+        with self.conn:
+            self.conn.execute("DELETE FROM dirs")
+            self.conn.executemany("INSERT INTO dirs VALUES (?, ?, ?, ?)",
+                                  ((path, *row) for path, row in self.seen_dirs.items()))
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_files (path TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM seen_files")
+            self.conn.executemany("INSERT OR IGNORE INTO seen_files VALUES (?)",
+                                  ((path,) for path in self.seen_files))
+            self.conn.execute("DELETE FROM files WHERE path NOT IN (SELECT path FROM seen_files)")
+
+    def close(self):
+        self.conn.close()
+
+    def _restat(self, entry):
+        """Refresh stat data for entries whose changes a folder mtime doesn't reveal"""
+        if entry.is_dir or name_suffix(entry.name).lower() in self.restat_suffixes:
+            try:
+                stats = os.stat(entry.path)
+            except OSError:
+                stats = None
+            return entry._replace(stat=stats)
+        return entry
+
+    @staticmethod
+    def _encode_entry(entry):
+        st = entry.stat
+        stat_row = None
+        if st is not None:
+            stat_row = [st.st_size, st.st_mtime, st.st_ctime, st.st_mtime_ns, st.st_ino]
+        return [entry.name, entry.is_dir, entry.is_symlink, stat_row]
+
+    @staticmethod
+    def _decode_entry(dir_path, row):
+        name, is_dir, is_symlink, stat_row = row
+        stats = CachedStat(*stat_row) if stat_row is not None else None
+        return ScanEntry(name, os.path.join(dir_path, name), is_dir, is_symlink, stats)
 
 
 # =============================================================================
 # Folder Scanning
 # =============================================================================
 
-def scan_folder(folder_path: Path, depth=0, max_depth=10, extract=False, max_content_kb=100):
+class ScanEntry(NamedTuple):
+    """One directory entry with its scandir type and stat data cached"""
+    name: str
+    path: str
+    is_dir: bool
+    is_symlink: bool
+    stat: Optional[Union[os.stat_result, CachedStat]]
+
+
+def list_directory(dir_path: str):
+    """
+    List a directory with os.scandir, in the order scan_folder emits nodes.
+
+    Type and stat data come from the DirEntry cache, so each entry costs at
+    most one stat() call. Runs on worker threads, so it must not print.
+
+    Returns:
+        list: ScanEntry items, folders first, then case-insensitive by name
+    """
+    entries = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            name = entry.name
+            # Skip hidden files and system files
+            if name.startswith('.') or name.startswith('~'):
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            try:
+                is_symlink = entry.is_symlink()
+            except OSError:
+                is_symlink = False
+            try:
+                stats = entry.stat()
+            except OSError:
+                stats = None
+            entries.append(ScanEntry(name, entry.path, is_dir, is_symlink, stats))
+
+    entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+    return entries
+
+
+class NodeListSink:
+    """Collects scanned nodes into nested 'children' lists in memory"""
+
+    def __init__(self):
+        self.children = []
+        self.stack = [self.children]
+        self.total_items = 0
+
+    def begin_folder(self, node: LocalFileNode):
+        self.stack[-1].append(node)
+        self.stack.append([])
+        self.total_items += 1
+
+    def end_folder(self):
+        children = self.stack.pop()
+        if children:
+            self.stack[-1][-1].children = children
+
+    def add_file(self, node: LocalFileNode, path: str):
+        self.stack[-1].append(node)
+        self.total_items += 1
+
+    def finish(self):
+        pass
+
+    @property
+    def top_level_items(self):
+        return len(self.children)
+
+
+class NodeStreamSink:
+    """
+    Writes scanned nodes through a StreamingTreeWriter as soon as they are final.
+
+    Nodes go out in walk order. A file node still waiting on the extraction
+    pipeline holds back everything after it, so at most `max_buffered` nodes
+    are kept in memory; past that the walk waits for extraction to catch up.
+
+    With root_path, nodes are written with compact paths (see treelisty_paths):
+    paths implied by the parent folder's path and the node's name are left out.
+    With search_index, each file node's extracted content is added to it as
+    the node is written.
+    """
+
+    def __init__(self, writer: StreamingTreeWriter, pipeline=None, max_buffered=DEFAULT_STREAM_BUFFER,
+                 root_path: Optional[str] = None, search_index: Optional[SearchIndexWriter] = None):
+        self.writer = writer
+        self.search_index = search_index
+        self.pipeline = pipeline
+        self.max_buffered = max_buffered
+        self.parent_paths = [root_path] if root_path is not None else None
+        self.events = deque()      # ('begin', node) / ('end', node) / ('file', node, path)
+        self.folders = []          # nodes of the folders opened so far
+        self.depth = 0
+        self.total_items = 0
+        self.top_level_items = 0
+
+    def begin_folder(self, node: LocalFileNode):
+        self.events.append(('begin', node))
+        self.folders.append(node)
+        self._flush()
+
+    def end_folder(self):
+        self.events.append(('end', self.folders.pop()))
+        self._flush()
+
+    def add_file(self, node: LocalFileNode, path: str):
+        self.events.append(('file', node, path))
+        self._flush()
+
+    def finish(self):
+        self._flush()
+        if self.events:
+            raise RuntimeError(f"{len(self.events)} scanned nodes were never written")
+
+    def _flush(self):
+        while True:
+            self._write_ready()
+            if len(self.events) <= self.max_buffered or self.pipeline is None:
+                return
+            self.pipeline.wait()
+
+    def _write_ready(self):
+        while self.events:
+            event = self.events[0]
+            if event[0] == 'file' and self.pipeline is not None and self.pipeline.is_pending(event[2]):
+                return
+            self.events.popleft()
+
+            # Nodes become dicts only here, as they are written
+            if event[0] == 'end':
+                self.writer.end_array()
+                self.writer.end_object({'expanded': event[1].expanded})
+                self.depth -= 1
+                if self.parent_paths is not None:
+                    self.parent_paths.pop()
+                continue
+
+            self.total_items += 1
+            if self.depth == 0:
+                self.top_level_items += 1
+            node = event[1]
+            if event[0] == 'begin':
+                self.writer.begin_object(self._encode(node.fields()))
+                self.writer.begin_array('children', lazy=True)
+                self.depth += 1
+                if self.parent_paths is not None:
+                    self.parent_paths.append(node.file_path)
+            else:
+                self.writer.write_item(self._encode(node.to_dict()))
+                if self.search_index is not None and node.description is not None:
+                    self.search_index.add_file(node.id, [(node.id, node.description)])
+
+    def _encode(self, fields: Dict[str, Any]):
+        if self.parent_paths is None:
+            return fields
+        return compact_fields(fields, self.parent_paths[-1])
+
+
+def scan_folder(folder_path: Path, depth=0, max_depth=10, extract=False, max_content_kb=100,
+                threads=DEFAULT_SCAN_THREADS, jobs=DEFAULT_EXTRACT_JOBS,
+                extract_timeout=DEFAULT_EXTRACT_TIMEOUT, manifest=None, pdf_sample=None, sheets=None):
     """
     Recursively scan local folder
 
+    Directory listings are prefetched on a bounded thread pool (sibling folders
+    are listed concurrently) while nodes are still assembled depth-first on the
+    calling thread, so output and ordering match a plain recursive walk.
+    With jobs > 0, extraction runs in an ExtractionPipeline and every node has
+    its content stitched in before this returns.
+
     Args:
         folder_path: Path to folder to scan
         depth: Current recursion depth
         max_depth: Maximum depth to scan
         extract: Whether to extract content from documents
         max_content_kb: Maximum content size per file in KB
+        threads: Directory listing threads (1 = list on the calling thread)
+        jobs: Extraction worker processes (0 = extract inline during the walk)
+        extract_timeout: Seconds before an extraction worker's file is abandoned
+        manifest: Optional ScanManifest for reusing unchanged listings and text
+        pdf_sample: Optional PdfSample limiting which PDF pages are extracted
+        sheets: Optional SheetOptions for CSV files (default: first rows within budget)
 
     Returns:
-        list: Children nodes in TreeListy filesystem format
+        list: Children as LocalFileNode objects (node.to_dict() gives the TreeListy JSON)
     """
-    if depth > max_depth:
-        print(f"⚠️  Max depth {max_depth} reached at: {folder_path.name}")
-        return []
+    sink = NodeListSink()
+    walk_folder(folder_path, sink, depth, max_depth, extract, max_content_kb,
+                threads, jobs, extract_timeout, manifest, pdf_sample, sheets)
+    return sink.children
 
-    indent = '  ' * depth
-    print(f"{indent}📂 {folder_path.name}")
+
+def walk_folder(folder_path: Path, sink, depth=0, max_depth=10, extract=False, max_content_kb=100,
+                threads=DEFAULT_SCAN_THREADS, jobs=DEFAULT_EXTRACT_JOBS,
+                extract_timeout=DEFAULT_EXTRACT_TIMEOUT, manifest=None, pdf_sample=None, sheets=None):
+    """
+    Walk a local folder, handing each node to `sink` (NodeListSink or
+    NodeStreamSink) in output order. Arguments are as for scan_folder().
+    """
+    folder_path = Path(folder_path)
+    options = {'max_depth': max_depth, 'extract': extract, 'max_content_kb': max_content_kb,
+               'pdf_sample': pdf_sample, 'sheets': sheets, 'sink': sink}
+    resolved = str(folder_path.resolve())
+
+    if manifest is not None:
+        options['manifest'] = manifest
+        options['lister'] = manifest.list_directory
+    if extract and jobs > 0:
+        options['pipeline'] = ExtractionPipeline(jobs, max_content_kb, extract_timeout,
+                                                 manifest=manifest, pdf_sample=pdf_sample, sheets=sheets)
+        if isinstance(sink, NodeStreamSink):
+            sink.pipeline = options['pipeline']
 
     try:
-        children = []
-        items = sorted(folder_path.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
+        if threads <= 1:
+            _scan_directory(str(folder_path), resolved, folder_path.name, depth, options, None)
+        else:
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='scan') as pool:
+                options['pool'] = pool
+                _scan_directory(str(folder_path), resolved, folder_path.name, depth, options, None)
+
+        if 'pipeline' in options:
+            print("\n⏳ Waiting for content extraction to finish...")
+            options['pipeline'].drain()
+        sink.finish()
+    finally:
+        if 'pipeline' in options:
+            options['pipeline'].close()
+
+
+def _scan_directory(dir_path: str, resolved_dir: str, dir_name: str, depth: int,
+                    options: Dict[str, Any], listing: Optional[Future]):
+    """Emit the children of one directory; listing is its prefetched future, if any"""
+    max_depth = options['max_depth']
+    if depth > max_depth:
+        print(f"⚠️  Max depth {max_depth} reached at: {dir_name}")
+        return
 
-        for item in items:
-            # Skip hidden files and system files
-            if item.name.startswith('.') or item.name.startswith('~'):
-                continue
+    indent = '  ' * depth
+    print(f"{indent}📂 {dir_name}")
 
-            is_folder = item.is_dir()
-            icon = get_file_icon(item)
+    try:
+        lister = options.get('lister', list_directory)
+        entries = listing.result() if listing is not None else lister(dir_path)
 
-            # Get file stats
-            try:
-                stats = item.stat()
-                file_size = stats.st_size if not is_folder else 0
-                modified_time = datetime.fromtimestamp(stats.st_mtime).isoformat()
-                created_time = datetime.fromtimestamp(stats.st_ctime).isoformat()
-            except Exception:
-                file_size = 0
-                modified_time = ''
-                created_time = ''
-
-            # Build node
-            node = {
-                'id': str(item.resolve()),  # Use full path as ID
-                'name': item.name,
-                'type': 'item',
-                'icon': icon,
-                'isFolder': is_folder,
-                'fileExtension': item.suffix if not is_folder else '',
-                'fileSize': file_size,
-                'dateModified': modified_time,
-                'dateCreated': created_time,
-                'filePath': str(item.resolve())
-            }
-
-            # Extract content if enabled and file type is supported
-            if extract and not is_folder and item.suffix.lower() in EXTRACTABLE_EXTENSIONS:
-                type_label = EXTRACTABLE_EXTENSIONS[item.suffix.lower()]
-                print(f"{indent}  📄 Extracting: {item.name} ({type_label})")
-
-                content, error = extract_content(item, max_content_kb)
+        # Queue listings for subfolders so they are ready when the walk reaches them
+        pool = options.get('pool')
+        prefetched = {}
+        if pool is not None and depth + 1 <= max_depth:
+            for entry in entries:
+                if entry.is_dir:
+                    prefetched[entry.path] = pool.submit(lister, entry.path)
 
-                if content:
-                    # Store content in description for RAG
-                    node['description'] = content
-
-                    # Add RAG metadata
-                    node['_rag'] = {
-                        'source': item.name,
-                        'sourceType': 'local-file',
-                        'sourceId': str(item.resolve()),
-                        'sourcePath': str(item.resolve()),
-                        'imported': datetime.now().isoformat(),
-                        'charCount': len(content)
-                    }
-                    print(f"{indent}    ✓ {len(content):,} chars")
-                elif error:
-                    print(f"{indent}    ⚠️ {error}")
+        sink = options['sink']
+        for entry in entries:
+            node = build_node(entry, resolved_dir, indent, options)
 
             # Recursively scan subfolders
-            if is_folder:
-                subchildren = scan_folder(
-                    item, depth + 1, max_depth, extract, max_content_kb
+            if entry.is_dir:
+                node.expanded = False  # Collapsed by default
+                sink.begin_folder(node)
+                _scan_directory(
+                    entry.path, node.file_path, entry.name, depth + 1,
+                    options, prefetched.pop(entry.path, None)
                 )
-                if subchildren:
-                    node['children'] = subchildren
-                node['expanded'] = False  # Collapsed by default
+                sink.end_folder()
+            else:
+                sink.add_file(node, entry.path)
 
-            children.append(node)
-
-        print(f"{indent}  ✓ {len(children)} items")
-        return children
+        print(f"{indent}  ✓ {len(entries)} items")
 
     except PermissionError:
         print(f"{indent}  ❌ Permission denied")
-        return []
     except Exception as e:
         print(f"{indent}  ❌ Error: {e}")
-        return []
 
 
-def count_items(children):
-    """Count total items recursively"""
-    if not children:
-        return 0
-    count = len(children)
-    for child in children:
-        if 'children' in child:
-            count += count_items(child['children'])
-    return count
+def build_node(entry: ScanEntry, resolved_dir: str, indent: str, options: Dict[str, Any]):
+    """Build the filesystem-pattern node for one scanned entry"""
+    name = entry.name
+    is_folder = entry.is_dir
+    suffix = name_suffix(name)
+
+    # Only symlinks need resolving; anything else sits directly under its resolved parent
+    if entry.is_symlink:
+        resolved_path = str(Path(entry.path).resolve())
+    else:
+        resolved_path = os.path.join(resolved_dir, name)
+
+    # Get file stats (dates are formatted when the node is written)
+    stats = entry.stat
+    if stats is not None:
+        file_size = stats.st_size if not is_folder else 0
+        modified_time = stats.st_mtime
+        created_time = stats.st_ctime
+    else:
+        file_size = 0
+        modified_time = None
+        created_time = None
+
+    # Build node (the full path is both its ID and its filePath)
+    node = LocalFileNode(
+        resolved_path, name, get_icon_for_name(name, is_folder), is_folder,
+        suffix if not is_folder else '', file_size, modified_time, created_time
+    )
+
+    # Extract content if enabled and file type is supported
+    if options['extract'] and not is_folder and suffix.lower() in EXTRACTABLE_EXTENSIONS:
+        type_label = EXTRACTABLE_EXTENSIONS[suffix.lower()]
+        print(f"{indent}  📄 Extracting: {name} ({type_label})")
+
+        manifest = options.get('manifest')
+        if manifest is not None:
+            content = manifest.cached_text(entry.path, entry.stat)
+            if content is not None:
+                extraction_stats['reused'] += 1
+                extraction_stats['total_chars'] += len(content)
+                add_extracted_content(node, content)
+                print(f"{indent}    ♻️ {len(content):,} chars (unchanged)")
+                return node
+
+        pipeline = options.get('pipeline')
+        if pipeline is not None:
+            pipeline.submit(entry.path, node, indent, entry.stat)
+            return node
+
+        content, error = extract_content(Path(entry.path), options['max_content_kb'], options['pdf_sample'],
+                                         options['sheets'])
+
+        if content:
+            add_extracted_content(node, content)
+            if manifest is not None:
+                manifest.store_text(entry.path, entry.stat, content)
+            print(f"{indent}    ✓ {len(content):,} chars")
+        elif error:
+            print(f"{indent}    ⚠️ {error}")
+
+    return node
+
+
+def safe_folder_name(folder_path: Path):
+    """Folder name usable in output file names"""
+    return folder_path.name.replace('/', '-').replace('\\', '-').replace(' ', '-')
 
 
 # =============================================================================
 # Main Export
 # =============================================================================
 
-def export_folder(folder_path: Path, max_depth=10, extract=False, max_content_kb=100):
-    """Main export function"""
+def export_folder(folder_path: Path, max_depth=10, extract=False, max_content_kb=100,
+                  threads=DEFAULT_SCAN_THREADS, jobs=DEFAULT_EXTRACT_JOBS,
+                  extract_timeout=DEFAULT_EXTRACT_TIMEOUT, manifest_path=None,
+                  cache_path=None, cache_mb=DEFAULT_CACHE_MB, pdf_sample=None,
+                  compact_paths=False, search_index_path=None, sheets=None):
+    """
+    Main export function
+
+    Nodes are written to the output file as the scan produces them, so memory
+    stays bounded by folder depth (plus the extraction window), not tree size.
+    With manifest_path, a SQLite scan manifest is read before the scan and
+    rewritten after it, so the next run only re-lists changed folders and
+    re-extracts changed files. With cache_path, PDF/DOCX text is looked up in
+    the shared content-addressed extraction cache before parsing. With
+    pdf_sample, PDFs contribute only their outline and first/last pages.
+    CSV files contribute their first rows or a column summary, as sheets
+    (a SheetOptions) says.
+    With compact_paths, the file is written in the compact path encoding
+    (treelisty_paths), which must be expanded before import. With
+    search_index_path, extracted content is added to a BM25 search index
+    (treelisty_search_index), saved once the export is written.
+    """
     print("\n🌳 TreeListy Local Folder Exporter")
     print("=" * 60)
     print(f"Target folder: {folder_path}")
     print(f"Max scan depth: {max_depth} levels")
+    print(f"Scan threads: {threads}")
     print(f"Content extraction: {'✅ Enabled' if extract else '❌ Disabled'}")
     if extract:
         print(f"Max content size: {max_content_kb}KB per file")
-        if not HAS_PYPDF2:
-            print("⚠️  PyPDF2 not installed - PDF extraction disabled")
-        if not HAS_DOCX:
+        if pdf_sample is not None:
+            print(f"PDF sampling: outline + first {pdf_sample.first} / last {pdf_sample.last} pages")
+        if sheets is not None:
+            print(f"CSV files: {sheets.mode} ({sheets.max_rows} rows / {sheets.max_chars:,} chars)")
+        if jobs > 0:
+            print(f"Extraction workers: {jobs} (timeout {extract_timeout}s per file)")
+        else:
+            print("Extraction workers: inline")
+        if PDF_BACKEND is None:
+            print("⚠️  PyMuPDF/PyPDF2 not installed - PDF extraction disabled")
+        if DOCX_BACKEND is None:
             print("⚠️  python-docx not installed - DOCX extraction disabled")
+        if cache_path:
+            print(f"Extraction cache: {cache_path} (max {cache_mb}MB)")
+            configure_extraction_cache(cache_path, cache_mb)
+    manifest = None
+    if manifest_path:
+        print(f"Scan manifest: {manifest_path}")
+        manifest = ScanManifest(manifest_path, max_content_kb, EXTRACTABLE_EXTENSIONS if extract else (),
+                                pdf_sample, sheets)
+    search_index = None
+    if search_index_path:
+        print(f"Search index: {search_index_path}")
+        search_index = SearchIndexWriter(search_index_path)
     print()
 
-    # Scan folder
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    suffix = '.compact.json' if compact_paths else '.json'
+    output_file = f'local-folder-{safe_folder_name(folder_path)}-{timestamp}{suffix}'
+    partial_file = output_file + '.partial'
+
+    source = {
+        'type': 'local-folder',
+        'folderPath': str(folder_path.resolve()),
+        'folderName': folder_path.name,
+        'lastSync': datetime.now().isoformat(),
+        'syncDepth': max_depth,
+        'contentExtracted': extract
+    }
+    if compact_paths:
+        source['pathEncoding'] = PATH_ENCODING
+        source['pathSeparator'] = os.sep
+
+    # Scan folder, streaming nodes straight into the file (filesystem pattern)
     print("📥 Scanning folder...\n")
-    children = scan_folder(folder_path, 0, max_depth, extract, max_content_kb)
-
-    # Create TreeListy structure (filesystem pattern) with source metadata
-    tree = {
-        'id': 'root-local',
-        'name': '💻 My Computer',
-        'type': 'root',
-        'icon': '💻',
-        'expanded': True,
-        'source': {
-            'type': 'local-folder',
-            'folderPath': str(folder_path.resolve()),
-            'folderName': folder_path.name,
-            'lastSync': datetime.now().isoformat(),
-            'syncDepth': max_depth,
-            'contentExtracted': extract
-        },
-        'children': [
-            {
+    try:
+        with open(partial_file, 'w', encoding='utf-8') as f:
+            writer = StreamingTreeWriter(f)
+            writer.begin_object({
+                'id': 'root-local',
+                'name': '💻 My Computer',
+                'type': 'root',
+                'icon': '💻',
+                'expanded': True,
+                'source': source
+            })
+            writer.begin_array('children')
+            writer.begin_object({
                 'id': str(folder_path.resolve()),
                 'name': f'📁 {folder_path.name}',
                 'type': 'phase',
                 'icon': '📁',
-                'expanded': True,
-                'children': children
-            }
-        ],
-        'pattern': {
-            'key': 'filesystem',
-            'labels': None
-        }
-    }
-
-    # Save to file
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    safe_name = folder_path.name.replace('/', '-').replace('\\', '-').replace(' ', '-')
-    output_file = f'local-folder-{safe_name}-{timestamp}.json'
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(tree, f, indent=2, ensure_ascii=False)
+                'expanded': True
+            })
+            writer.begin_array('children')
+
+            sink = NodeStreamSink(writer, root_path=str(folder_path.resolve()) if compact_paths else None,
+                                  search_index=search_index)
+            walk_folder(folder_path, sink, 0, max_depth, extract, max_content_kb, threads,
+                        jobs, extract_timeout, manifest, pdf_sample, sheets)
+
+            writer.end_array()
+            writer.end_object()
+            writer.end_array()
+            writer.end_object({
+                'pattern': {
+                    'key': 'filesystem',
+                    'labels': None
+                }
+            })
+            writer.close()
+        os.replace(partial_file, output_file)
+
+        if manifest is not None:
+            manifest.save()
+        if search_index is not None:
+            search_index.save(output_file)
+        if extraction_cache is not None:
+            extraction_cache.evict()
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if search_index is not None:
+            search_index.close()
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
 
     # Summary
-    total_items = count_items(children)
+    total_items = sink.total_items
     print("\n" + "=" * 60)
     print(f"✅ SUCCESS! Exported to: {output_file}")
     print(f"\n📊 Statistics:")
     print(f"   Total items: {total_items}")
-    print(f"   Top-level items: {len(children)}")
+    print(f"   Top-level items: {sink.top_level_items}")
 
     if extract:
         print(f"\n📝 Content Extraction:")
@@ -412,17 +1196,293 @@ def export_folder(folder_path: Path, max_depth=10, extract=False, max_content_kb
         print(f"   Succeeded: {extraction_stats['succeeded']}")
         print(f"   Failed: {extraction_stats['failed']}")
         print(f"   Skipped: {extraction_stats['skipped']}")
+        print(f"   Timed out: {extraction_stats['timed_out']}")
+        if manifest is not None:
+            print(f"   Reused (unchanged): {extraction_stats['reused']}")
         print(f"   Total characters: {extraction_stats['total_chars']:,}")
 
+    if extraction_cache is not None:
+        print(f"\n🗃️  Extraction Cache:")
+        for line in extraction_cache.summary_lines():
+            print(line)
+        extraction_cache.close()
+        configure_extraction_cache(None)
+
+    if manifest is not None:
+        print(f"\n♻️  Incremental:")
+        print(f"   Folders unchanged: {len(manifest.reused_dirs)} of {len(manifest.seen_dirs)}")
+        if extract:
+            print(f"   Files reused: {manifest.stats['files_reused']} "
+                  f"({manifest.stats['chars_reused']:,} chars not re-extracted)")
+
+    if search_index is not None:
+        print(f"\n🔎 Search Index: {search_index_path}")
+        print(f"   Files indexed: {search_index.stats['files_added']}, "
+              f"unchanged: {search_index.stats['files_unchanged']}, removed: {search_index.stats['files_deleted']}")
+
     print(f"\n📋 Next Steps:")
+    import_file = output_file
+    if compact_paths:
+        # The app only imports the expanded form
+        import_file = expanded_file_name(output_file)
+        print(f"   0. Expand paths for import: python treelisty_paths.py {output_file}")
     print(f"   1. Open TreeListy in browser")
-    print(f"   2. Click '📂 Import' → Select '{output_file}'")
+    print(f"   2. Click '📂 Import' → Select '{import_file}'")
     print(f"   3. Use retrieve_context via MCP to search content!")
+    if search_index is not None:
+        print(f"   4. Or search from Python: python treelisty_search_index.py {search_index_path} \"query\"")
     print("=" * 60)
 
     return output_file
 
 
+# =============================================================================
+# Watch Mode
+# =============================================================================
+
+class ChangeCollector:
+    """
+    watchdog event handler that records which folders need rescanning.
+
+    Every event marks the folder *containing* the changed path (both ends of a
+    move), since that folder's listing is what changed. Hidden paths and
+    folders past max_depth are ignored, as the scan ignores them.
+    """
+
+    def __init__(self, root: Path, max_depth: int):
+        self.root = str(root)
+        self.max_depth = max_depth
+        self.lock = threading.Lock()
+        self.dirty = set()
+        self.last_event = 0.0
+
+    def dispatch(self, event):
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        for path in paths:
+            if not path:
+                continue
+            parent = os.path.dirname(os.fsdecode(path))
+            parts = relative_parts(self.root, parent)
+            if parts is None or len(parts) > self.max_depth:
+                continue
+            name = os.path.basename(os.fsdecode(path))
+            if any(p.startswith(('.', '~')) for p in parts + [name]):
+                continue
+            with self.lock:
+                self.dirty.add(parent)
+                self.last_event = time.monotonic()
+
+    def take_if_quiet(self, debounce: float):
+        """Return (and clear) the dirty folders once no event arrived for `debounce` seconds"""
+        with self.lock:
+            if not self.dirty or time.monotonic() - self.last_event < debounce:
+                return set()
+            dirty, self.dirty = self.dirty, set()
+            return dirty
+
+
+def relative_parts(root: str, path: str):
+    """Path components of path below root, or None if it isn't inside root"""
+    try:
+        rel = os.path.relpath(path, root)
+    except ValueError:
+        return None  # Different drive on Windows
+    if rel == '.':
+        return []
+    if rel == '..' or rel.startswith('..' + os.sep):
+        return None
+    return rel.split(os.sep)
+
+
+def watch_folder(folder_path: Path, base_file: str, max_depth=10, extract=False, max_content_kb=100,
+                 debounce=DEFAULT_WATCH_DEBOUNCE, pdf_sample=None, sheets=None):
+    """
+    Watch a folder after a full export and write JSON Patch (RFC 6902) files.
+
+    Each batch of filesystem events (once quiet for `debounce` seconds)
+    rescans only the folders whose listings changed and writes
+    <base>.patch-NNNN.json with the operations that take the previous state
+    of the export to the new one. Patches apply in order, starting from
+    base_file. Changed nodes are patched field by field, so a patch grows
+    with the change, not with the subtrees around it. Unchanged documents
+    keep their extracted text; new or modified ones are extracted inline.
+    Runs until interrupted.
+    """
+    if not HAS_WATCHDOG:
+        print("❌ --watch needs the watchdog package: pip install watchdog")
+        sys.exit(1)
+
+    # Patches apply to the expanded tree, even for a --compact-paths export
+    tree = load_tree(base_file)
+
+    root = folder_path.resolve()
+    options = {'max_depth': max_depth, 'extract': extract, 'max_content_kb': max_content_kb,
+               'pdf_sample': pdf_sample, 'sheets': sheets}
+    collector = ChangeCollector(root, max_depth)
+    observer = Observer()
+    observer.schedule(collector, str(root), recursive=True)
+    observer.start()
+
+    base_stem = base_file[:-len('.json')] if base_file.endswith('.json') else base_file
+    patch_count = 0
+    print(f"\n👀 Watching {root} for changes (Ctrl+C to stop)...")
+
+    try:
+        while True:
+            time.sleep(WATCH_POLL_SECONDS)
+            dirty = collector.take_if_quiet(debounce)
+            if not dirty:
+                continue
+
+            ops = []
+            # Parents first, so a new folder is in the tree before its own events are handled
+            for dir_path in sorted(dirty, key=lambda d: len(relative_parts(str(root), d))):
+                ops.extend(rescan_directory(tree, root, dir_path, options))
+            if not ops:
+                continue
+
+            patch_count += 1
+            patch_file = f"{base_stem}.patch-{patch_count:04d}.json"
+            with open(patch_file, 'w', encoding='utf-8') as f:
+                json.dump(ops, f, indent=2, ensure_ascii=False)
+            stamp = datetime.now().strftime('%H:%M:%S')
+            print(f"🔄 [{stamp}] {len(dirty)} folder(s) rescanned, {len(ops)} change(s) → {patch_file}")
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopped watching. Wrote {patch_count} patch file(s) against {base_file}")
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def rescan_directory(tree: Dict[str, Any], root: Path, dir_path: str, options: Dict[str, Any]):
+    """
+    Re-list one folder, update its node in `tree` in place and return the
+    JSON Patch operations describing the change.
+
+    Existing subfolders keep their subtrees; new subfolders are scanned fully.
+    """
+    parts = relative_parts(str(root), dir_path)
+    pointer = '/children/0'
+    folder = tree['children'][0]
+    for part in parts:
+        for index, child in enumerate(folder.get('children', [])):
+            if child['name'] == part and child.get('isFolder'):
+                pointer += f'/children/{index}'
+                folder = child
+                break
+        else:
+            return []  # Not in the export (yet): its parent's rescan adds it
+
+    try:
+        entries = list_directory(dir_path)
+    except OSError:
+        return []  # Folder is gone; its parent's rescan removes it
+
+    old_children = folder.get('children', [])
+    old_by_id = {child['id']: child for child in old_children}
+    resolved_dir = folder.get('filePath', folder['id'])
+    indent = '  ' * (len(parts) + 1)
+    metadata_only = dict(options, extract=False)
+
+    new_children = []
+    for entry in entries:
+        node = build_node(entry, resolved_dir, indent, metadata_only)
+        old = old_by_id.get(node.id)
+
+        if entry.is_dir:
+            if old is not None and old.get('isFolder'):
+                subchildren = old.get('children')
+            else:
+                print(f"{indent}📂 New folder: {entry.name}")
+                subchildren = [child.to_dict() for child in scan_folder(
+                    Path(entry.path), len(parts) + 1, options['max_depth'], options['extract'],
+                    options['max_content_kb'], jobs=0, pdf_sample=options['pdf_sample'],
+                    sheets=options['sheets'])]
+            # The loaded tree is plain dicts, so old subtrees are spliced in as they are
+            node_dict = node.fields()
+            if subchildren:
+                node_dict['children'] = subchildren
+            node_dict['expanded'] = old.get('expanded', False) if old is not None else False
+            new_children.append(node_dict)
+            continue
+
+        if options['extract'] and name_suffix(entry.name).lower() in EXTRACTABLE_EXTENSIONS:
+            unchanged = (old is not None and 'description' in old
+                         and old.get('fileSize') == node.file_size
+                         and old.get('dateModified') == iso_date(node.date_modified))
+            if unchanged:
+                node.description = old['description']
+                node.rag = old['_rag']
+            else:
+                print(f"{indent}📄 Extracting: {entry.name}")
+                content, error = extract_content(Path(entry.path), options['max_content_kb'],
+                                                 options['pdf_sample'], options['sheets'])
+                if content:
+                    add_extracted_content(node, content)
+                elif error:
+                    print(f"{indent}  ⚠️ {error}")
+
+        new_children.append(node.to_dict())
+
+    # The top folder always has a children array; other folders only when non-empty
+    keep_key = not parts
+    ops = diff_children(pointer, old_children, new_children, keep_key)
+    if new_children or keep_key:
+        folder['children'] = new_children
+    else:
+        folder.pop('children', None)
+    return ops
+
+
+def diff_children(pointer: str, old: List[Dict[str, Any]], new: List[Dict[str, Any]], keep_key=False):
+    """JSON Patch operations turning folder `pointer`'s children from old into new (matched by id)"""
+    if not old and not new:
+        return []
+    if not old:
+        return [{'op': 'add', 'path': f'{pointer}/children', 'value': copy.deepcopy(new)}]
+    if not new and not keep_key:
+        return [{'op': 'remove', 'path': f'{pointer}/children'}]
+
+    ops = []
+    # A path that switched between file and folder sorts differently, so it's removed and re-added
+    new_kinds = {node['id']: node['isFolder'] for node in new}
+    kept = []
+    # Removals from the end so earlier indices stay valid
+    for index in range(len(old) - 1, -1, -1):
+        if new_kinds.get(old[index]['id']) != old[index]['isFolder']:
+            ops.append({'op': 'remove', 'path': f'{pointer}/children/{index}'})
+        else:
+            kept.append(old[index])
+    kept.reverse()
+
+    # Values are copied: later rescans in the same batch update these nodes in place.
+    # Both lists are in scan order, so the surviving nodes line up with new
+    # as soon as additions are inserted in ascending position
+    kept_by_id = {node['id']: node for node in kept}
+    for index, node in enumerate(new):
+        previous = kept_by_id.get(node['id'])
+        if previous is None:
+            ops.append({'op': 'add', 'path': f'{pointer}/children/{index}', 'value': copy.deepcopy(node)})
+        elif previous != node:
+            ops.extend(diff_node(f'{pointer}/children/{index}', previous, node))
+    return ops
+
+
+def diff_node(pointer: str, old: Dict[str, Any], new: Dict[str, Any]):
+    """JSON Patch operations for the fields of one node that changed, recursing into its children"""
+    ops = [{'op': 'remove', 'path': f'{pointer}/{key}'} for key in old if key not in new and key != 'children']
+    for key, value in new.items():
+        if key == 'children':
+            continue
+        if key not in old:
+            ops.append({'op': 'add', 'path': f'{pointer}/{key}', 'value': copy.deepcopy(value)})
+        elif old[key] != value:
+            ops.append({'op': 'replace', 'path': f'{pointer}/{key}', 'value': copy.deepcopy(value)})
+    if old.get('children') != new.get('children'):
+        ops.extend(diff_children(pointer, old.get('children', []), new.get('children', [])))
+    return ops
+
+
 # =============================================================================
 # CLI
 # =============================================================================
@@ -444,6 +1504,12 @@ Examples:
 
   python export_local_folder_to_treelisty.py . --extract-content
       Export current directory with content
+
+  python export_local_folder_to_treelisty.py B:/ai_boneyard --extract-content --incremental
+      Nightly re-export: only changed folders and files are re-read
+
+  python export_local_folder_to_treelisty.py B:/ai_boneyard --extract-content --watch
+      Export once, then write a .patch-NNNN.json file for every batch of changes
         """
     )
 
@@ -455,6 +1521,42 @@ Examples:
                         help='Maximum folder depth (default: 10)')
     parser.add_argument('--max-content-size', type=int, default=100,
                         help='Maximum content size per file in KB (default: 100)')
+    parser.add_argument('--pdf-sample', type=parse_pdf_sample, default=None, metavar='FIRST,LAST',
+                        help='Only extract the outline and the first/last pages of PDFs (e.g. 20,5)')
+    parser.add_argument('--sheets', choices=SHEET_MODES, default=SheetOptions().mode,
+                        help='CSV files as their first rows (rows) or as a summary of each column - types, '
+                             'distinct counts, range - and sample rows (summary) (default: rows)')
+    parser.add_argument('--sheet-rows', type=int, default=SheetOptions().max_rows,
+                        help=f'Rows per CSV file in rows mode (default: {SheetOptions().max_rows})')
+    parser.add_argument('--sheet-chars', type=int, default=SheetOptions().max_chars,
+                        help=f'Characters per CSV file (default: {SheetOptions().max_chars})')
+    parser.add_argument('--scan-threads', type=int, default=DEFAULT_SCAN_THREADS,
+                        help=f'Threads listing folders concurrently (default: {DEFAULT_SCAN_THREADS}, 1 = serial)')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_EXTRACT_JOBS,
+                        help=f'Content extraction worker processes (default: {DEFAULT_EXTRACT_JOBS}, 0 = inline)')
+    parser.add_argument('--extract-timeout', type=int, default=DEFAULT_EXTRACT_TIMEOUT,
+                        help=f'Seconds before a file\'s extraction is abandoned (default: {DEFAULT_EXTRACT_TIMEOUT})')
+    parser.add_argument('--extract-cache', type=str, nargs='?', const=DEFAULT_CACHE_FILE, default=None,
+                        metavar='PATH',
+                        help=f'Reuse PDF/DOCX text from a content-addressed cache shared with the Drive '
+                             f'content exporter (default path: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--extract-cache-mb', type=int, default=DEFAULT_CACHE_MB,
+                        help=f'Extraction cache size cap in MB, least recently used evicted first '
+                             f'(default: {DEFAULT_CACHE_MB})')
+    parser.add_argument('--compact-paths', action='store_true',
+                        help='Write paths relative to their parent folder (.compact.json). TreeListy imports only '
+                             'the expanded form: run treelisty_paths.py on it before importing')
+    parser.add_argument('--watch', action='store_true',
+                        help='After the export, watch the folder and write JSON Patch files for each change')
+    parser.add_argument('--watch-debounce', type=float, default=DEFAULT_WATCH_DEBOUNCE,
+                        help=f'Seconds of quiet before a batch of changes is rescanned (default: {DEFAULT_WATCH_DEBOUNCE})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Keep a scan manifest and only re-list/re-extract what changed since the last run')
+    parser.add_argument('--manifest', type=str, default=None,
+                        help='Scan manifest path (implies --incremental; default: local-folder-<name>.manifest.db)')
+    parser.add_argument('--search-index', type=str, nargs='?', const='', default=None, metavar='PATH',
+                        help='With --extract-content, keep a BM25 search index of the extracted content, updated '
+                             'every run for the files that changed (default path: local-folder-<name>.search.db)')
 
     args = parser.parse_args()
 
@@ -468,14 +1570,45 @@ Examples:
         print(f"❌ Not a directory: {folder_path}")
         sys.exit(1)
 
+    manifest_path = args.manifest
+    if args.incremental and not manifest_path:
+        manifest_path = f'local-folder-{safe_folder_name(folder_path)}.manifest.db'
+
+    search_index_path = args.search_index
+    if search_index_path == '':
+        search_index_path = f'local-folder-{safe_folder_name(folder_path)}.search.db'
+    if search_index_path and not args.extract_content:
+        print("⚠️  --search-index needs --extract-content - no index written")
+        search_index_path = None
+
+    sheets = SheetOptions(args.sheets, args.sheet_rows, args.sheet_chars)
+
+    if args.watch and not HAS_WATCHDOG:
+        print("❌ --watch needs the watchdog package: pip install watchdog")
+        sys.exit(1)
+
     # Run export
-    export_folder(
+    output_file = export_folder(
         folder_path=folder_path,
         max_depth=args.max_depth,
         extract=args.extract_content,
-        max_content_kb=args.max_content_size
+        max_content_kb=args.max_content_size,
+        threads=args.scan_threads,
+        jobs=args.jobs,
+        extract_timeout=args.extract_timeout,
+        manifest_path=manifest_path,
+        cache_path=args.extract_cache if args.extract_content else None,
+        cache_mb=args.extract_cache_mb,
+        pdf_sample=args.pdf_sample,
+        compact_paths=args.compact_paths,
+        search_index_path=search_index_path,
+        sheets=sheets
     )
 
+    if args.watch:
+        watch_folder(folder_path, output_file, args.max_depth, args.extract_content,
+                     args.max_content_size, args.watch_debounce, args.pdf_sample, sheets)
+
 
 if __name__ == '__main__':
     main()
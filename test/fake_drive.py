@@ -0,0 +1,330 @@
+"""
+Fake Google Drive service for offline exporter tests.
+
+Stands in for googleapiclient's build('drive', 'v3', ...) in
+export_google_drive_to_treelisty.py and export_gdrive_content_to_treelisty.py:
+files().list / get / export_media / get_media, changes().getStartPageToken
+/ list and new_batch_http_request(), with paging, trashing and a changes
+feed, on an in-memory drive that the test mutates between exports. Only the
+query shapes the exporters send are understood. Media requests work with the
+real MediaIoBaseDownload. Queue HTTP statuses in `fail_next` to make the
+next API calls fail.
+
+Usage:
+    drive = FakeDrive()
+    docs = drive.add_folder('Docs')
+    drive.add_file('notes.txt', docs, b'Some text')
+    exporter.authenticate = lambda: drive
+    ...
+    drive.rename(docs, 'Documents')
+    drive.trash(file_id)
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def select_fields(spec: str, name: str) -> Optional[List[str]]:
+    """Field names inside `name(...)` of a fields spec, or None if it isn't there"""
+    match = re.search(r'\b' + re.escape(name) + r'\(', spec)
+    if match is None:
+        return None
+    depth, start = 1, match.end()
+    for i in range(start, len(spec)):
+        depth += {'(': 1, ')': -1}.get(spec[i], 0)
+        if depth == 0:
+            inner = spec[start:i]
+            break
+    # Drop nested selections, e.g. owners(displayName) -> owners
+    inner = re.sub(r'\([^()]*\)', '', inner)
+    return [field.strip() for field in inner.split(',') if field.strip()]
+
+
+def project(item: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return dict(item)
+    return {key: item[key] for key in fields if key in item}
+
+
+def http_error(status: int, reason: str, uri: str = 'https://fake-drive.test/') -> HttpError:
+    content = json.dumps({'error': {'code': status, 'errors': [{'reason': reason}]}}).encode()
+    return HttpError(FakeResponse(status, {}), content, uri=uri)
+
+
+class FakeRequest:
+    """What service.<resource>().<method>(...) returns: execute() runs it"""
+
+    def __init__(self, drive, method, run):
+        self.drive = drive
+        self.method = method
+        self.run = run
+
+    def execute(self, num_retries=0, http=None):
+        self.drive.count(self.method)
+        if self.drive.fail_next:
+            status = self.drive.fail_next.pop(0)
+            raise http_error(status, 'rateLimitExceeded' if status in (403, 429) else 'backendError')
+        return self.run()
+
+
+class FakeBatch:
+    """service.new_batch_http_request(): requests run in order, errors go to callbacks"""
+
+    def __init__(self, drive, callback=None):
+        self.drive = drive
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if len(self.requests) >= 1000:
+            raise ValueError("Exceeded the maximum calls in a single batch request")
+        self.requests.append((request_id or str(len(self.requests) + 1), request, callback))
+
+    def execute(self, http=None):
+        self.drive.count('batch')
+        for request_id, request, callback in self.requests:
+            response, exception = None, None
+            try:
+                response = request.execute()
+            except HttpError as e:
+                exception = e
+            for cb in (callback, self.callback):
+                if cb is not None:
+                    cb(request_id, response, exception)
+
+
+class FakeResponse(dict):
+    """httplib2-style response: headers as dict items, plus .status"""
+
+    def __init__(self, status, headers):
+        super().__init__(headers)
+        self.status = status
+        self.reason = 'OK' if status < 300 else 'Error'
+
+
+class FakeMediaHttp:
+    def __init__(self, drive, content):
+        self.drive = drive
+        self.content = content
+
+    def request(self, uri, method='GET', **kwargs):
+        self.drive.count('media')
+        return FakeResponse(200, {'content-length': str(len(self.content))}), self.content
+
+
+class FakeMediaRequest:
+    """Enough of googleapiclient.http.HttpRequest for MediaIoBaseDownload"""
+
+    def __init__(self, drive, file_id, content):
+        self.uri = f'https://fake-drive.test/files/{file_id}?alt=media'
+        self.headers = {}
+        self.http = FakeMediaHttp(drive, content)
+
+
+class FakeFiles:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def list(self, q='', pageSize=100, fields='', pageToken=None, **kwargs):
+        drive = self.drive
+        match = re.fullmatch(r"'([^']+)' in parents and trashed=false", q)
+        if match:
+            folder_id = drive.resolve(match.group(1))
+            items = [f for f in drive.items.values() if folder_id in f['parents'] and not f['trashed']]
+        elif q == 'trashed=false':
+            items = [f for f in drive.items.values() if not f['trashed']]
+        else:
+            raise ValueError(f"FakeDrive doesn't understand q={q!r}")
+
+        def run():
+            start = int(pageToken or 0)
+            size = min(pageSize, drive.page_size)
+            response = {'files': [project(f, select_fields(fields, 'files')) for f in items[start:start + size]]}
+            if start + size < len(items):
+                response['nextPageToken'] = str(start + size)
+            return response
+        return FakeRequest(drive, 'files.list', run)
+
+    def get(self, fileId, fields=None, **kwargs):
+        drive = self.drive
+
+        def run():
+            item = drive.items.get(drive.resolve(fileId))
+            if item is None:
+                raise http_error(404, 'notFound')
+            return project(item, [f.strip() for f in fields.split(',')] if fields else None)
+        return FakeRequest(drive, 'files.get', run)
+
+    def export_media(self, fileId, mimeType):
+        return FakeMediaRequest(self.drive, fileId, self.drive.content[fileId])
+
+    def get_media(self, fileId, **kwargs):
+        return FakeMediaRequest(self.drive, fileId, self.drive.content[fileId])
+
+
+class FakeChanges:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def getStartPageToken(self, **kwargs):
+        return FakeRequest(self.drive, 'changes.getStartPageToken',
+                           lambda: {'startPageToken': str(len(self.drive.log))})
+
+    def list(self, pageToken, pageSize=100, fields='', includeRemoved=True, **kwargs):
+        drive = self.drive
+
+        def run():
+            # Page tokens are '<log position>' to start, '<log position>:<offset>' to continue
+            start, _, offset = pageToken.partition(':')
+            offset = int(offset or 0)
+            # Like Drive, only each file's latest change is reported, in order of that change
+            latest = {}
+            for file_id in drive.log[int(start):]:
+                latest.pop(file_id, None)
+                latest[file_id] = True
+            file_fields = select_fields(fields, 'file')
+
+            changes = []
+            for file_id in list(latest)[offset:offset + min(pageSize, drive.page_size)]:
+                if file_id in drive.items:
+                    changes.append({'fileId': file_id, 'removed': False,
+                                    'file': project(drive.items[file_id], file_fields)})
+                elif includeRemoved:
+                    changes.append({'fileId': file_id, 'removed': True})
+            response = {'changes': changes}
+            if offset + drive.page_size < len(latest):
+                response['nextPageToken'] = f"{start}:{offset + drive.page_size}"
+            else:
+                response['newStartPageToken'] = str(len(drive.log))
+            return response
+        return FakeRequest(drive, 'changes.list', run)
+
+
+class FakeDrive:
+    """In-memory My Drive (see module docstring)"""
+
+    def __init__(self, page_size: int = 1000, root_id: str = 'fake-root'):
+        self.page_size = page_size      # Server-side page size cap, to exercise paging
+        self.root_id = root_id
+        self._next_id = 0
+        self._clock = datetime(2025, 1, 1)
+        # File id -> metadata, in creation order
+        self.items = {root_id: self._metadata(root_id, 'My Drive', FOLDER_MIME_TYPE, None, None)}
+        self.content = {}
+        self.log = []                   # File ids in change order (the changes feed)
+        self.calls = Counter()          # API calls by method ('batch' = batch round trips)
+        self.lock = threading.Lock()    # Media downloads come from several threads
+        self.fail_next = []             # HTTP statuses the next API calls fail with
+
+    # -- googleapiclient surface -------------------------------------------
+
+    def files(self):
+        return FakeFiles(self)
+
+    def changes(self):
+        return FakeChanges(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    def count(self, method: str):
+        with self.lock:
+            self.calls[method] += 1
+
+    # -- building and mutating the drive ---------------------------------------
+
+    def resolve(self, file_id: str) -> str:
+        return self.root_id if file_id == 'root' else file_id
+
+    def add_folder(self, name: str, parent: str = 'root') -> str:
+        return self._add(name, FOLDER_MIME_TYPE, parent, None)
+
+    def add_file(self, name: str, parent: str = 'root', content: bytes = b'',
+                 mime_type: str = 'text/plain') -> str:
+        return self._add(name, mime_type, parent, content)
+
+    def rename(self, file_id: str, name: str):
+        self.items[file_id]['name'] = name
+        self._touch(file_id)
+
+    def move(self, file_id: str, new_parent: str):
+        self.items[file_id]['parents'] = [self.resolve(new_parent)]
+        self._touch(file_id)
+
+    def update_content(self, file_id: str, content: bytes):
+        self.content[file_id] = content
+        self.items[file_id]['size'] = str(len(content))
+        self._checksum(file_id)
+        self._touch(file_id)
+
+    def trash(self, file_id: str):
+        """Trash an item; a folder's contents are trashed with it"""
+        for item_id in self._subtree(file_id):
+            self.items[item_id]['trashed'] = True
+            self._touch(item_id)
+
+    def delete(self, file_id: str):
+        """Delete an item for good (reported as removed); a folder's contents go with it"""
+        for item_id in self._subtree(file_id):
+            del self.items[item_id]
+            self.content.pop(item_id, None)
+            self.log.append(item_id)
+
+    # -- internals -----------------------------------------------------------
+
+    def _add(self, name, mime_type, parent, content):
+        self._next_id += 1
+        file_id = f'f{self._next_id:06d}'
+        size = None if content is None else len(content)
+        self.items[file_id] = self._metadata(file_id, name, mime_type, self.resolve(parent), size)
+        if content is not None:
+            self.content[file_id] = content
+            self._checksum(file_id)
+        self.log.append(file_id)
+        return file_id
+
+    def _metadata(self, file_id, name, mime_type, parent, size):
+        now = self._tick()
+        item = {
+            'id': file_id,
+            'name': name,
+            'mimeType': mime_type,
+            'createdTime': now,
+            'modifiedTime': now,
+            'webViewLink': f'https://drive.google.com/file/d/{file_id}/view',
+            'owners': [{'displayName': 'Test User'}],
+            'parents': [parent] if parent else [],
+            'trashed': False,
+        }
+        if size is not None:
+            item['size'] = str(size)
+        return item
+
+    def _checksum(self, file_id):
+        # Drive only has checksums for uploaded files, not Google Docs/Sheets/Slides
+        if not self.items[file_id]['mimeType'].startswith('application/vnd.google-apps.'):
+            self.items[file_id]['md5Checksum'] = hashlib.md5(self.content[file_id]).hexdigest()
+
+    def _touch(self, file_id):
+        self.items[file_id]['modifiedTime'] = self._tick()
+        self.log.append(file_id)
+
+    def _tick(self) -> str:
+        self._clock += timedelta(seconds=1)
+        return self._clock.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def _subtree(self, file_id):
+        ids = [file_id]
+        for item_id, item in list(self.items.items()):
+            if file_id in item['parents']:
+                ids.extend(self._subtree(item_id))
+        return ids
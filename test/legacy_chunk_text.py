@@ -0,0 +1,93 @@
+"""
+The original export_gdrive_content_to_treelisty.chunk_text, before it was
+rebuilt on treelisty_chunking.chunk_spans: the reference its output is
+checked against (test/test-chunking.py) and benchmarked against
+(test/performance/bench-chunk-text.py).
+"""
+
+import re
+from typing import Any, Dict, List
+
+
+def legacy_chunk_text(text: str, chunk_size: int = 1500) -> List[Dict[str, Any]]:
+    """
+    Split text into chunks for RAG.
+    Tries to split on paragraph boundaries.
+
+    Returns list of chunks with metadata.
+    """
+    if not text or not text.strip():
+        return []
+
+    # Normalize whitespace
+    text = re.sub(r'\n{3,}', '\n\n', text.strip())
+
+    # If text is small enough, return as single chunk
+    if len(text) <= chunk_size:
+        return [{
+            'text': text,
+            'charCount': len(text),
+            'isLeaf': True
+        }]
+
+    chunks = []
+    paragraphs = text.split('\n\n')
+    current_chunk = ""
+
+    for para in paragraphs:
+        para = para.strip()
+        if not para:
+            continue
+
+        # If adding this paragraph would exceed chunk size
+        if len(current_chunk) + len(para) + 2 > chunk_size:
+            # Save current chunk if not empty
+            if current_chunk:
+                chunks.append({
+                    'text': current_chunk.strip(),
+                    'charCount': len(current_chunk.strip()),
+                    'isLeaf': True
+                })
+                current_chunk = ""
+
+            # If paragraph itself is too large, split it
+            if len(para) > chunk_size:
+                # Split on sentence boundaries
+                sentences = re.split(r'(?<=[.!?])\s+', para)
+                for sentence in sentences:
+                    if len(current_chunk) + len(sentence) + 1 > chunk_size:
+                        if current_chunk:
+                            chunks.append({
+                                'text': current_chunk.strip(),
+                                'charCount': len(current_chunk.strip()),
+                                'isLeaf': True
+                            })
+                            current_chunk = ""
+                        # If single sentence is still too large, force split
+                        if len(sentence) > chunk_size:
+                            for i in range(0, len(sentence), chunk_size):
+                                chunk_text = sentence[i:i+chunk_size].strip()
+                                if chunk_text:
+                                    chunks.append({
+                                        'text': chunk_text,
+                                        'charCount': len(chunk_text),
+                                        'isLeaf': True
+                                    })
+                        else:
+                            current_chunk = sentence
+                    else:
+                        current_chunk += " " + sentence if current_chunk else sentence
+            else:
+                current_chunk = para
+        else:
+            current_chunk += "\n\n" + para if current_chunk else para
+
+    # Don't forget the last chunk
+    if current_chunk.strip():
+        chunks.append({
+            'text': current_chunk.strip(),
+            'charCount': len(current_chunk.strip()),
+            'isLeaf': True
+        })
+
+    return chunks
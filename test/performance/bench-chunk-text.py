@@ -0,0 +1,80 @@
+"""
+Benchmark: span-based chunking (treelisty_chunking) vs. the original
+export_gdrive_content_to_treelisty.chunk_text.
+
+Generates document-like text of each size - mostly normal paragraphs,
+some long unbroken ones that get packed by sentence, the odd run-on line -
+then chunks it with both, checks the chunks are identical, and reports
+wall time and MB/s for the original, for chunk_spans alone (offsets only)
+and for chunk_text (offsets plus chunk dicts).
+
+Usage:
+  python test/performance/bench-chunk-text.py
+  python test/performance/bench-chunk-text.py --sizes 1,10 --chunk-size 4000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import treelisty_chunking as chunking  # noqa: E402
+from legacy_chunk_text import legacy_chunk_text  # noqa: E402
+
+WORDS = ('the quick brown fox jumps over lazy dog report quarterly revenue grew percent team '
+         'meeting agreed action items follow up next week budget draft review').split()
+
+
+def make_document(size_mb: float, seed: int = 1) -> str:
+    """About size_mb of paragraphs; one in ten is a wall of text several chunks long"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    # A pool of sentences keeps generation fast; their order is still random
+    sentences = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))).capitalize() + rng.choice('..!?')
+                 for _ in range(500)]
+    paragraphs = []
+    total = 0
+    while total < target:
+        count = rng.randint(20, 60) if rng.random() < 0.1 else rng.randint(1, 6)
+        separator = '\n' if rng.random() < 0.05 else ' '
+        paragraph = separator.join(rng.choice(sentences) for _ in range(count))
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark span-based chunking against the original chunk_text')
+    parser.add_argument('--sizes', default='1,10,100', help='Comma-separated document sizes in MB (default: 1,10,100)')
+    parser.add_argument('--chunk-size', type=int, default=1500, help='Chunk size in characters (default: 1500)')
+    args = parser.parse_args()
+
+    print(f"chunk_text at chunk size {args.chunk_size} (Python {sys.version.split()[0]}):")
+    print(f"  {'size':>7} {'chunks':>9} {'original':>10} {'spans':>10} {'chunk_text':>11} {'speedup':>8} {'same':>5}")
+    for size in args.sizes.split(','):
+        size_mb = float(size)
+        text = make_document(size_mb)
+        expected, legacy_time = timed(legacy_chunk_text, text, args.chunk_size)
+        (_, spans), spans_time = timed(chunking.chunk_spans, text, args.chunk_size)
+        actual, chunk_time = timed(chunking.chunk_text, text, args.chunk_size)
+        same = actual == expected
+        del expected, actual
+        print(f"  {size_mb:>5g}MB {len(spans):>9,} {legacy_time:>9.2f}s {spans_time:>9.2f}s {chunk_time:>10.2f}s "
+              f"{legacy_time / chunk_time:>7.1f}x {'yes' if same else 'NO':>5}", flush=True)
+        print(f"  {'':>7} {'':>9} {size_mb / legacy_time:>7.0f}MB/s {size_mb / spans_time:>7.0f}MB/s "
+              f"{size_mb / chunk_time:>8.0f}MB/s", flush=True)
+
+
+if __name__ == '__main__':
+    main()
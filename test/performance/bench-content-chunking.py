@@ -0,0 +1,144 @@
+"""
+Benchmark: how many chunks survive typical document edits, greedy
+chunking vs. content-defined chunking (treelisty_chunking).
+
+Generates three kinds of document - prose (short paragraphs, like a
+Google or Word doc), pages (paragraphs a few chunks long, like extracted
+PDF pages) and lines (no blank lines at all, like many text files) -
+applies one edit at a time - a paragraph inserted
+near the top, one deleted from the middle, a sentence reworded, a typo
+fixed, text appended, two paragraphs swapped - and reports, per mode, the
+share of the edited document's chunks whose text was already a chunk of
+the original (what a cache, index or diff keyed by chunk content gets to
+keep), plus chunk size spread and chunking speed.
+
+Usage:
+  python test/performance/bench-content-chunking.py
+  python test/performance/bench-content-chunking.py --size-kb 2000 --chunk-size 1000 --docs 10
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import treelisty_chunking as chunking  # noqa: E402
+
+WORDS = ('the quick brown fox jumps over lazy dog report quarterly revenue grew percent team '
+         'meeting agreed action items follow up next week budget draft review customer launch').split()
+
+
+def sentence(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))).capitalize() + rng.choice('...!?')
+
+
+# Kind of document: sentences per paragraph, and what paragraphs are separated by
+KINDS = {
+    'prose': ((1, 7), '\n\n'),
+    'pages': ((25, 50), '\n\n'),
+    'lines': ((1, 7), '\n'),
+}
+
+
+def paragraph(rng: random.Random, kind: str = 'prose') -> str:
+    count = rng.randint(*KINDS[kind][0])
+    return ' '.join(sentence(rng) for _ in range(count))
+
+
+def make_paragraphs(size_kb: int, kind: str, rng: random.Random):
+    paragraphs = []
+    total = 0
+    while total < size_kb * 1024:
+        paragraphs.append(paragraph(rng, kind))
+        total += len(paragraphs[-1]) + 2
+    return paragraphs
+
+
+def insert_near_top(paragraphs, rng):
+    return paragraphs[:1] + [paragraph(rng)] + paragraphs[1:]
+
+
+def delete_middle(paragraphs, rng):
+    middle = len(paragraphs) // 2
+    return paragraphs[:middle] + paragraphs[middle + 1:]
+
+
+def reword_sentence(paragraphs, rng):
+    i = rng.randrange(len(paragraphs))
+    sentences = paragraphs[i].split('. ')
+    sentences[rng.randrange(len(sentences))] = sentence(rng).rstrip('.!?')
+    return paragraphs[:i] + ['. '.join(sentences)] + paragraphs[i + 1:]
+
+
+def fix_typo(paragraphs, rng):
+    i = rng.randrange(len(paragraphs))
+    position = rng.randrange(len(paragraphs[i]))
+    return paragraphs[:i] + [paragraphs[i][:position] + 'x' + paragraphs[i][position + 1:]] + paragraphs[i + 1:]
+
+
+def append_text(paragraphs, rng):
+    return paragraphs + [paragraph(rng) for _ in range(3)]
+
+
+def swap_paragraphs(paragraphs, rng):
+    i = rng.randrange(len(paragraphs) - 1)
+    return paragraphs[:i] + [paragraphs[i + 1], paragraphs[i]] + paragraphs[i + 2:]
+
+
+EDITS = [insert_near_top, delete_middle, reword_sentence, fix_typo, append_text, swap_paragraphs]
+
+
+def chunk_set(text: str, chunk_size: int, mode: str):
+    return [chunk['text'] for chunk in chunking.chunk_text(text, chunk_size, mode)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chunk reuse across document edits, greedy vs. content-defined')
+    parser.add_argument('--size-kb', type=int, default=500, help='Document size in KB (default: 500)')
+    parser.add_argument('--chunk-size', type=int, default=1500, help='Chunk size in characters (default: 1500)')
+    parser.add_argument('--docs', type=int, default=5, help='Documents per edit, averaged (default: 5)')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    columns = [(kind, mode) for kind in KINDS for mode in chunking.CHUNKING_MODES]
+    reuse = {(edit.__name__, kind, mode): [] for edit in EDITS for kind, mode in columns}
+    sizes = {mode: [] for mode in chunking.CHUNKING_MODES}
+    timing = {mode: [0.0, 0] for mode in chunking.CHUNKING_MODES}
+    for kind in KINDS:
+        separator = KINDS[kind][1]
+        for _ in range(args.docs):
+            paragraphs = make_paragraphs(args.size_kb, kind, rng)
+            original_text = separator.join(paragraphs)
+            for mode in chunking.CHUNKING_MODES:
+                start = time.perf_counter()
+                original = chunk_set(original_text, args.chunk_size, mode)
+                timing[mode][0] += time.perf_counter() - start
+                timing[mode][1] += len(original_text)
+                sizes[mode] += [len(chunk) for chunk in original]
+                known = set(original)
+                for edit in EDITS:
+                    edited = chunk_set(separator.join(edit(paragraphs, random.Random(len(paragraphs)))),
+                                       args.chunk_size, mode)
+                    reuse[edit.__name__, kind, mode].append(sum(chunk in known for chunk in edited) / len(edited))
+
+    print(f"Chunks kept after one edit, {args.size_kb}KB documents, chunk size {args.chunk_size} "
+          f"(mean of {args.docs}):")
+    print(f"  {'':<18} " + ' '.join(f"{kind:>21}" for kind in KINDS))
+    print(f"  {'edit':<18} " + ' '.join(f"{mode:>10}" for _, mode in columns))
+    for edit in EDITS:
+        print(f"  {edit.__name__:<18} " + ' '.join(
+            f"{statistics.mean(reuse[edit.__name__, kind, mode]):>9.1%} " for kind, mode in columns))
+    print("\nChunk sizes (chars) and speed:")
+    for mode in chunking.CHUNKING_MODES:
+        seconds, chars = timing[mode]
+        print(f"  {mode:<10} mean {statistics.mean(sizes[mode]):>6.0f}  median {statistics.median(sizes[mode]):>6.0f}  "
+              f"min {min(sizes[mode]):>5}  max {max(sizes[mode]):>5}  {chars / seconds / (1024 * 1024):>5.0f}MB/s")
+
+
+if __name__ == '__main__':
+    main()
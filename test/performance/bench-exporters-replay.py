@@ -0,0 +1,110 @@
+"""
+Benchmark: the Google exporters replayed offline from synthetic API
+cassettes (treelisty_cassette).
+
+Generates Drive, Gmail and Calendar cassettes of each size (kept in
+--cassettes and reused between runs), then runs each exporter in-process
+against them with a simulated round-trip latency and reports wall time,
+items/s and round trips. No credentials or network are used.
+
+The Drive metadata exporter runs in its three listing modes (per-folder
+with --workers, --batch, --flat); its request rate limit is switched off,
+since the point is what the exporter and the latency cost, not the quota.
+
+Usage:
+  python test/performance/bench-exporters-replay.py
+  python test/performance/bench-exporters-replay.py --sizes 10k,100k,1m --latency 40
+  python test/performance/bench-exporters-replay.py --exporters drive-batch,gmail --latency 0
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import treelisty_cassette as cassette  # noqa: E402
+
+EXPORTERS = ['drive', 'drive-batch', 'drive-flat', 'content', 'gmail', 'calendar']
+CASSETTE_API = {'drive': 'drive', 'drive-batch': 'drive', 'drive-flat': 'drive', 'content': 'drive',
+                'gmail': 'gmail', 'calendar': 'calendar'}
+
+
+def run_exporter(name: str, items: int):
+    """Run one exporter against the current cassette; returns the output file"""
+    if name.startswith('drive'):
+        import export_google_drive_to_treelisty as exporter
+        return exporter.export_google_drive(100, flat=name == 'drive-flat', batch=name == 'drive-batch', rate=0)
+    if name == 'content':
+        import export_gdrive_content_to_treelisty as exporter
+        return exporter.export_gdrive_content('root', 100)
+    if name == 'gmail':
+        import export_gmail_to_treelisty as exporter
+        return exporter.export_gmail(items, 30)
+    import export_gcalendar_to_treelisty as exporter
+    return exporter.export_calendar(7, 30)
+
+
+class CountingHttp(cassette.ReplayHttp):
+    """ReplayHttp that counts round trips"""
+    round_trips = 0
+
+    def request(self, *args, **kwargs):
+        CountingHttp.round_trips += 1
+        return super().request(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Google exporters against replayed API cassettes')
+    parser.add_argument('--sizes', default='10k,100k', help='Comma-separated item counts (default: 10k,100k)')
+    parser.add_argument('--exporters', default=','.join(EXPORTERS),
+                        help=f"Comma-separated subset of {', '.join(EXPORTERS)}")
+    parser.add_argument('--latency', type=float, default=20, help='Simulated round-trip latency in ms (default: 20)')
+    parser.add_argument('--cassettes', default=str(Path(tempfile.gettempdir()) / 'treelisty-cassettes'),
+                        help='Directory for generated cassettes (reused between runs)')
+    args = parser.parse_args()
+
+    exporters = [name.strip() for name in args.exporters.split(',') if name.strip()]
+    unknown = set(exporters) - set(EXPORTERS)
+    if unknown:
+        parser.error(f"unknown exporter(s): {', '.join(sorted(unknown))}")
+    cassette_dir = Path(args.cassettes)
+    cassette_dir.mkdir(parents=True, exist_ok=True)
+    cassette.ReplayHttp = CountingHttp
+    os.environ[cassette.ENV_MODE] = 'replay'
+    os.environ[cassette.ENV_LATENCY] = str(args.latency)
+
+    print(f"Exporters replayed at {args.latency:g}ms per round trip (Python {sys.version.split()[0]}):")
+    print(f"  {'exporter':<12} {'items':>10} {'time':>9} {'items/s':>10} {'round trips':>12} {'output':>10}")
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        for size in args.sizes.split(','):
+            items = cassette.parse_count(size)
+            for name in exporters:
+                api = CASSETTE_API[name]
+                path = cassette_dir / f"{api}-{size.strip().lower()}.cassette"
+                if not path.exists():
+                    print(f"  (generating {path.name}...)", flush=True)
+                    cassette.SYNTHESIZERS[api](str(path), items)
+                os.environ[cassette.ENV_CASSETTE] = str(path)
+
+                CountingHttp.round_trips = 0
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    output = run_exporter(name, items)
+                elapsed = time.perf_counter() - start
+                size_mb = os.path.getsize(output) / (1024 * 1024)
+                os.remove(output)
+                print(f"  {name:<12} {items:>10,} {elapsed:>8.2f}s {items / elapsed:>10,.0f} "
+                      f"{CountingHttp.round_trips:>12,} {size_mb:>8.1f}MB", flush=True)
+        os.chdir(ROOT)
+
+
+if __name__ == '__main__':
+    main()
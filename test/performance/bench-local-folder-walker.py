@@ -0,0 +1,174 @@
+"""
+Benchmark: scandir walker vs. the original Path.iterdir() walker
+for export_local_folder_to_treelisty.scan_folder (metadata only).
+
+Builds a synthetic tree (default 100k files), runs both walkers, checks the
+node dicts and ordering are identical, and reports wall time for each.
+
+Usage:
+  python test/performance/bench-local-folder-walker.py
+  python test/performance/bench-local-folder-walker.py --files 20000 --threads 16
+  python test/performance/bench-local-folder-walker.py --root /mnt/nas/bench-tree --keep
+"""
+
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import export_local_folder_to_treelisty as exporter  # noqa: E402
+
+
+def legacy_scan_folder(folder_path: Path, depth=0, max_depth=10):
+    """The pre-scandir walker, metadata path only, kept verbatim for comparison"""
+    if depth > max_depth:
+        print(f"⚠️  Max depth {max_depth} reached at: {folder_path.name}")
+        return []
+
+    indent = '  ' * depth
+    print(f"{indent}📂 {folder_path.name}")
+
+    try:
+        children = []
+        items = sorted(folder_path.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
+
+        for item in items:
+            if item.name.startswith('.') or item.name.startswith('~'):
+                continue
+
+            is_folder = item.is_dir()
+            icon = exporter.get_file_icon(item)
+
+            try:
+                stats = item.stat()
+                file_size = stats.st_size if not is_folder else 0
+                modified_time = datetime.fromtimestamp(stats.st_mtime).isoformat()
+                created_time = datetime.fromtimestamp(stats.st_ctime).isoformat()
+            except Exception:
+                file_size = 0
+                modified_time = ''
+                created_time = ''
+
+            node = {
+                'id': str(item.resolve()),
+                'name': item.name,
+                'type': 'item',
+                'icon': icon,
+                'isFolder': is_folder,
+                'fileExtension': item.suffix if not is_folder else '',
+                'fileSize': file_size,
+                'dateModified': modified_time,
+                'dateCreated': created_time,
+                'filePath': str(item.resolve())
+            }
+
+            if is_folder:
+                subchildren = legacy_scan_folder(item, depth + 1, max_depth)
+                if subchildren:
+                    node['children'] = subchildren
+                node['expanded'] = False
+
+            children.append(node)
+
+        print(f"{indent}  ✓ {len(children)} items")
+        return children
+
+    except PermissionError:
+        print(f"{indent}  ❌ Permission denied")
+        return []
+    except Exception as e:
+        print(f"{indent}  ❌ Error: {e}")
+        return []
+
+
+def build_synthetic_tree(root: Path, total_files: int, fanout=10, files_per_dir=50):
+    """Create a balanced folder tree holding total_files small files"""
+    extensions = ['.pdf', '.docx', '.txt', '.md', '.csv', '.json', '.png', '.py', '']
+    created = 0
+    queue = [root]
+    while created < total_files:
+        folder = queue.pop(0)
+        folder.mkdir(parents=True, exist_ok=True)
+        for i in range(files_per_dir):
+            if created >= total_files:
+                break
+            ext = extensions[created % len(extensions)]
+            # Mixed case names exercise the case-insensitive sort
+            name = f"{'File' if i % 2 else 'file'}_{i:03d}{ext}"
+            (folder / name).write_bytes(b'x' * (created % 512))
+            created += 1
+        for d in range(fanout):
+            queue.append(folder / f"{'Docs' if d % 3 == 0 else 'folder'}_{d:02d}")
+    # Hidden entries must be skipped by both walkers
+    (root / '.hidden').write_text('skip')
+    (root / '~lock.docx').write_text('skip')
+    return created
+
+
+def count_items(children):
+    """Count total items recursively"""
+    if not children:
+        return 0
+    count = len(children)
+    for child in children:
+        if 'children' in child:
+            count += count_items(child['children'])
+    return count
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.2f}s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark local folder walkers')
+    parser.add_argument('--files', type=int, default=100_000, help='Synthetic file count (default: 100000)')
+    parser.add_argument('--threads', type=int, default=exporter.DEFAULT_SCAN_THREADS,
+                        help=f'scandir walker threads (default: {exporter.DEFAULT_SCAN_THREADS})')
+    parser.add_argument('--root', type=str, default=None,
+                        help='Where to build the tree (default: a temp dir); use a NAS path to test network latency')
+    parser.add_argument('--keep', action='store_true', help='Keep the synthetic tree afterwards')
+    args = parser.parse_args()
+
+    base = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix='treelisty-walker-bench-'))
+    root = base / 'bench-tree'
+
+    try:
+        print(f"Building synthetic tree with {args.files:,} files in {root} ...")
+        if not root.exists():
+            build_synthetic_tree(root, args.files)
+
+        print("\nWalking (metadata only):")
+        legacy, legacy_time = timed('iterdir (original)', lambda: legacy_scan_folder(root.resolve(), 0, 50))
+        serial, serial_time = timed('scandir, 1 thread', lambda: exporter.scan_folder(root, 0, 50, threads=1))
+        pooled, pooled_time = timed(f'scandir, {args.threads} threads',
+                                    lambda: exporter.scan_folder(root, 0, 50, threads=args.threads))
+        serial = [node.to_dict() for node in serial]
+        pooled = [node.to_dict() for node in pooled]
+
+        print(f"\nNodes: {count_items(legacy):,}")
+        print(f"Identical output (1 thread):  {'✅' if serial == legacy else '❌'}")
+        print(f"Identical output ({args.threads} threads): {'✅' if pooled == legacy else '❌'}")
+        print(f"Speedup: {legacy_time / serial_time:.1f}x serial, {legacy_time / pooled_time:.1f}x pooled")
+
+        if serial != legacy or pooled != legacy:
+            sys.exit(1)
+    finally:
+        if not args.keep and not args.root:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: memory per node, dict nodes vs. treelisty_nodes.LocalFileNode
+for the filesystem pattern.
+
+Builds N file/folder nodes (default 500k) from synthetic directory entries
+the way export_local_folder_to_treelisty.build_node does, once as the
+original dicts and once as slotted LocalFileNode objects, and reports the
+bytes allocated per node (tracemalloc) for each. Names, paths and stat
+values are created up front, since a scanner holds those either way.
+Also checks that node.to_dict() reproduces the dict exactly.
+
+Usage:
+  python test/performance/bench-node-memory.py
+  python test/performance/bench-node-memory.py --nodes 100000 --extracted 0.2
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import export_local_folder_to_treelisty as exporter  # noqa: E402
+from treelisty_nodes import LocalFileNode  # noqa: E402
+
+
+def synthetic_entries(count: int, fanout=10, files_per_dir=50):
+    """(name, path, is_folder, size, mtime, ctime) tuples for a balanced tree"""
+    extensions = ['.pdf', '.docx', '.txt', '.md', '.csv', '.json', '.png', '.py', '']
+    base_time = 1_700_000_000.0
+    entries = []
+    dirs = ['/home/user/Documents']
+    while len(entries) < count:
+        parent = dirs.pop(0)
+        for d in range(fanout):
+            path = f"{parent}/folder_{d:02d}"
+            dirs.append(path)
+            entries.append((f"folder_{d:02d}", path, True, 0, base_time + len(entries), base_time))
+        for i in range(files_per_dir):
+            name = f"Report_{len(entries):07d}{extensions[i % len(extensions)]}"
+            entries.append((name, f"{parent}/{name}", False, i * 1000, base_time + len(entries) * 1.5,
+                            base_time + len(entries)))
+    return entries[:count]
+
+
+def dict_node(name, path, is_folder, size, mtime, ctime):
+    """Node as the exporter built it before the slotted model"""
+    suffix = exporter.name_suffix(name)
+    node = {
+        'id': path,
+        'name': name,
+        'type': 'item',
+        'icon': exporter.get_icon_for_name(name, is_folder),
+        'isFolder': is_folder,
+        'fileExtension': suffix if not is_folder else '',
+        'fileSize': size,
+        'dateModified': datetime.fromtimestamp(mtime).isoformat(),
+        'dateCreated': datetime.fromtimestamp(ctime).isoformat(),
+        'filePath': path
+    }
+    if is_folder:
+        node['expanded'] = False
+    return node
+
+
+def slotted_node(name, path, is_folder, size, mtime, ctime):
+    suffix = exporter.name_suffix(name)
+    node = LocalFileNode(path, name, exporter.get_icon_for_name(name, is_folder), is_folder,
+                         suffix if not is_folder else '', size, mtime, ctime)
+    if is_folder:
+        node.expanded = False
+    return node
+
+
+def measure(label, build, entries, extracted_every):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    nodes = []
+    for i, entry in enumerate(entries):
+        node = build(*entry)
+        if extracted_every and i % extracted_every == 0 and not entry[2]:
+            add_text(node, 'Extracted text. ' * 20)
+        nodes.append(node)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_node = current / len(entries)
+    print(f"  {label:<22} {per_node:8.0f} bytes/node  {current / 2**20:9.1f}MB  {elapsed:6.2f}s")
+    return nodes, per_node
+
+
+def add_text(node, text):
+    if isinstance(node, dict):
+        node['description'] = text
+        node['_rag'] = {'source': node['name'], 'sourceType': 'local-file', 'sourceId': node['filePath'],
+                        'sourcePath': node['filePath'], 'imported': '2026-01-01T00:00:00',
+                        'charCount': len(text)}
+    else:
+        node.description = text
+        node.rag = {'source': node.name, 'sourceType': 'local-file', 'sourceId': node.file_path,
+                    'sourcePath': node.file_path, 'imported': '2026-01-01T00:00:00',
+                    'charCount': len(text)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark node memory for the filesystem pattern')
+    parser.add_argument('--nodes', type=int, default=500_000, help='Node count (default: 500000)')
+    parser.add_argument('--extracted', type=float, default=0.0,
+                        help='Fraction of nodes given extracted text (default: 0)')
+    args = parser.parse_args()
+
+    entries = synthetic_entries(args.nodes)
+    extracted_every = int(1 / args.extracted) if args.extracted else 0
+    print(f"Building {len(entries):,} filesystem nodes (Python {sys.version.split()[0]}):")
+
+    dicts, dict_bytes = measure('dict (original)', dict_node, entries, extracted_every)
+    slotted, slotted_bytes = measure('LocalFileNode', slotted_node, entries, extracted_every)
+
+    identical = all(node.to_dict() == reference for node, reference in zip(slotted, dicts))
+    print(f"\nIdentical to_dict() output: {'✅' if identical else '❌'}")
+    print(f"Saved: {dict_bytes - slotted_bytes:,.0f} bytes/node ({dict_bytes / slotted_bytes:.1f}x smaller)")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
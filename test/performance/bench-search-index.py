@@ -0,0 +1,112 @@
+"""
+Benchmark: treelisty_search_index over a million chunks.
+
+Builds an index of generated chunks (words drawn from a Zipf-like
+vocabulary, so a few words are in almost every chunk and most are rare),
+then reports build speed, index size, and query latency for queries of
+rare, mid-frequency and very common words and mixes of them, scored in
+pure Python and (if installed) with numpy. Finally
+changes one file in a hundred and reports how long updating the index
+takes next to the full build.
+
+Usage:
+  python test/performance/bench-search-index.py
+  python test/performance/bench-search-index.py --chunks 100000 --words 80 -k 20
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import treelisty_search_index as search  # noqa: E402
+
+VOCABULARY = 50000
+CHUNKS_PER_FILE = 5
+
+
+def make_chunks(count: int, words: int, seed: int):
+    """(file id, [(chunk node id, text)]) pairs; a pool of chunk texts keeps generation fast"""
+    rng = random.Random(seed)
+    vocabulary = [f'w{i}' for i in range(VOCABULARY)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(VOCABULARY)))
+    pool = [' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(words // 2, words * 3 // 2)))
+            for _ in range(20000)]
+    for file_number in range(0, count, CHUNKS_PER_FILE):
+        yield f'file-{file_number}', [(f'n_{doc:012x}', pool[rng.randrange(len(pool))] + f' doc{doc}')
+                                      for doc in range(file_number, min(file_number + CHUNKS_PER_FILE, count))]
+
+
+QUERIES = {
+    'rare (1 term)': ['w40000', 'w31337', 'w45678'],
+    'mid (2 terms)': ['w500 w2000', 'w900 w1500', 'w3000 w700'],
+    'common (1 term)': ['w0', 'w1', 'w2'],
+    'common (3 terms)': ['w0 w1 w2', 'w3 w4 w5', 'w1 w6 w9'],
+    'mixed (4 terms)': ['w0 w10 w400 w20000', 'w2 w50 w5000 w30000', 'w1 w30 w800 w12345'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query a search index of generated chunks')
+    parser.add_argument('--chunks', type=int, default=1_000_000, help='Chunks to index (default: 1000000)')
+    parser.add_argument('--words', type=int, default=60, help='Mean words per chunk (default: 60)')
+    parser.add_argument('-k', type=int, default=10, help='Results per query (default: 10)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        path = os.path.join(work, 'bench.search.db')
+        start = time.perf_counter()
+        index = search.SearchIndexWriter(path)
+        for file_id, chunks in make_chunks(args.chunks, args.words, 1):
+            index.add_file(file_id, chunks)
+        index.save()
+        index.close()
+        build_time = time.perf_counter() - start
+        print(f"Built index of {args.chunks:,} chunks (~{args.words} words each) in {build_time:.0f}s "
+              f"({args.chunks / build_time:,.0f} chunks/s, generation included), "
+              f"{os.path.getsize(path) / (1024 * 1024):,.0f}MB")
+
+        for use_numpy in ([False, True] if search.HAS_NUMPY else [False]):
+            start = time.perf_counter()
+            reader = search.SearchIndex(path, use_numpy=use_numpy)
+            print(f"\n{'numpy' if use_numpy else 'Pure Python'}: opened in {(time.perf_counter() - start) * 1000:.0f}ms; "
+                  f"top {args.k}, ms per query (median of 5 runs, each query):")
+            for label, queries in QUERIES.items():
+                times = []
+                for query in queries:
+                    runs = []
+                    for _ in range(5):
+                        start = time.perf_counter()
+                        reader.search(query, args.k)
+                        runs.append(time.perf_counter() - start)
+                    times.append(statistics.median(runs) * 1000)
+                print(f"  {label:<18} " + '  '.join(f"{t:>7.1f}" for t in times))
+            reader.close()
+        if not search.HAS_NUMPY:
+            print("  (numpy not installed: vectorized scoring not measured)")
+
+        # One file in a hundred changed: same file ids, new chunk texts
+        start = time.perf_counter()
+        index = search.SearchIndexWriter(path)
+        rng = random.Random(2)
+        for file_id, chunks in make_chunks(args.chunks, args.words, 1):
+            if rng.random() < 0.01:
+                chunks = [(node_id, text + ' edited') for node_id, text in chunks]
+            index.add_file(file_id, chunks)
+        index.save()
+        index.close()
+        update_time = time.perf_counter() - start
+        print(f"\nUpdate with 1% of files changed: {update_time:.0f}s ({update_time / build_time:.0%} of the build, "
+              f"generation included)")
+
+
+if __name__ == '__main__':
+    main()
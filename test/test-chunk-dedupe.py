@@ -0,0 +1,262 @@
+"""
+Offline test: treelisty_dedupe and the Drive content exporter's --dedupe.
+
+Checks that chunks with the same words are found as exact duplicates,
+that chunks sharing most of their word 4-grams are found as near
+duplicates of the first copy and chunks sharing few are not (against the
+true Jaccard similarity of generated chunks), that a chunk is compared
+with only a handful of earlier ones rather than all of them, and that the
+exporter marks or collapses the duplicate chunks of copied Drive files,
+references chunks that are in the export, reports the dedupe rate and
+output size in _rag.stats, and re-extracts collapsed nodes rather than
+reusing them.
+
+The exporter checks need the Drive exporter's Google client libraries
+installed; no network or credentials are used.
+
+Usage:
+  python test/test-chunk-dedupe.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import treelisty_dedupe as dedupe  # noqa: E402
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+WORDS = [f'{word}{i}' for word in ('report', 'budget', 'team', 'sales', 'plan', 'draft', 'review', 'risk')
+         for i in range(100)]
+
+
+def make_text(rng: random.Random, words: int = 200) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def edit(rng: random.Random, text: str, share: float) -> str:
+    """Text with a share of its words replaced"""
+    words = text.split()
+    for _ in range(int(len(words) * share)):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return ' '.join(words)
+
+
+def jaccard(first: str, second: str) -> float:
+    def shingles(text):
+        words = dedupe.TOKEN.findall(text.lower())
+        return set(zip(words, words[1:], words[2:], words[3:]))
+    a, b = shingles(first), shingles(second)
+    return len(a & b) / len(a | b)
+
+
+def test_duplicates():
+    print("\nexact and near duplicates")
+    rng = random.Random(1)
+    original = make_text(rng)
+    deduper = dedupe.ChunkDeduper()
+    check("first copy is canonical", deduper.check('a', original) is None)
+    check("same words, other case and spacing: exact duplicate",
+          deduper.check('b', '  ' + original.upper().replace(' ', '\n')) == ('a', 1.0) and deduper.stats['exact'] == 1)
+    near = deduper.check('c', edit(rng, original, 0.01))
+    check(f"a few words changed: near duplicate ({near})", near is not None and near.node_id == 'a')
+    check("mostly rewritten: not a duplicate", deduper.check('d', edit(rng, original, 0.3)) is None)
+    check("unrelated: not a duplicate", deduper.check('e', make_text(rng)) is None)
+    check("no words: not a duplicate, not canonical", deduper.check('f', ' ... ') is None and
+          deduper.check('g', '!!') is None and 'f' not in deduper.node_ids)
+    check("short chunks compare too", deduper.check('h', 'Approved.') is None and
+          deduper.check('i', 'approved') == ('h', 1.0))
+    words = dedupe.TOKEN.findall(original.lower())
+    check("signatures are the same every time", dedupe.signature(words) == dedupe.signature(list(words)))
+
+    # Against true similarity: pairs at 0.9 and above found, pairs under 0.6 never
+    rng = random.Random(2)
+    found, missed, wrong = 0, [], []
+    for i in range(400):
+        base = make_text(rng, rng.randint(20, 300))
+        copy = edit(rng, base, rng.choice([0.005, 0.01, 0.02, 0.05, 0.1, 0.3]))
+        deduper = dedupe.ChunkDeduper()
+        deduper.check('base', base)
+        duplicate = deduper.check('copy', copy)
+        similarity = jaccard(base, copy)
+        if similarity >= 0.9:
+            if duplicate is not None:
+                found += 1
+            else:
+                missed.append(similarity)
+        elif similarity < 0.6 and duplicate is not None:
+            wrong.append(similarity)
+    check(f"pairs at least 0.9 similar found ({found} found, {len(missed)} missed)",
+          found > 100 and len(missed) <= found // 100)
+    check(f"pairs under 0.6 similar never flagged ({len(wrong)})", not wrong)
+
+
+def test_sub_quadratic():
+    print("\ncomparisons")
+    rng = random.Random(3)
+    texts = [make_text(rng, 150) for _ in range(3000)]
+    comparisons = []
+    original_similarity = dedupe.similarity
+
+    def similarity(first, second):
+        comparisons.append(1)
+        return original_similarity(first, second)
+    dedupe.similarity = similarity
+    try:
+        deduper = dedupe.ChunkDeduper()
+        for i, text in enumerate(texts):
+            deduper.check(f'u{i}', text)
+        for i, text in enumerate(texts[:500]):
+            deduper.check(f'd{i}', edit(rng, text, 0.01))
+    finally:
+        dedupe.similarity = original_similarity
+    check(f"3500 chunks, {len(comparisons)} signature comparisons (all pairs: {3500 * 3499 // 2:,})",
+          len(comparisons) < 3500 * 2)
+    check(f"edited copies found ({deduper.stats['near']} of 500)", deduper.stats['near'] >= 495)
+
+
+def chunk_nodes(node):
+    """Chunk nodes of an exported knowledge-base tree, in order"""
+    nodes = []
+    for child in node.get('children', []):
+        if child.get('items'):
+            nodes += child['items']
+        elif 'chunk' in child.get('_rag', {}):
+            nodes.append(child)
+        nodes += chunk_nodes(child)
+    return nodes
+
+
+def without_marks(node):
+    """A tree without dedupe marks, generated ids and extraction times"""
+    if isinstance(node, list):
+        return [without_marks(child) for child in node]
+    if not isinstance(node, dict):
+        return node
+    return {key: without_marks(value) for key, value in node.items()
+            if key not in ('duplicateOf', 'similarity', 'id', 'extractedAt', 'extractSeconds', 'lastSync',
+                           'stats')}
+
+
+def test_drive_exporter():
+    print("\nDrive content exporter --dedupe")
+    try:
+        import export_gdrive_content_to_treelisty as content_exporter
+        from fake_drive import FakeDrive
+    except ImportError as e:
+        print(f"  (skipped: {e})")
+        return
+
+    rng = random.Random(4)
+    drive = FakeDrive(page_size=7)
+    paragraphs = [make_text(rng, 120) for _ in range(8)]
+    report = '\n\n'.join(paragraphs).encode()
+    folder = drive.add_folder('Reports', 'root')
+    drive.add_file('report final.txt', folder, report)
+    edited = paragraphs[:3] + [edit(rng, paragraphs[3], 0.5), paragraphs[4], edit(rng, paragraphs[5], 0.01)] + \
+        paragraphs[6:]
+    drive.add_file('report final v2.txt', folder, '\n\n'.join(edited).encode())
+    drive.add_file('Report (Doc)', drive.add_folder('Shared', 'root'), report,
+                   'application/vnd.google-apps.document')
+    for i in range(5):
+        drive.add_file(f'other-{i}.txt', folder, '\n\n'.join(make_text(rng, 120) for _ in range(4)).encode())
+    content_exporter.authenticate = lambda: drive
+
+    def export(name, **kwargs):
+        output = run_quietly(content_exporter.export_gdrive_content, 'root', 3, chunk_size=800, downloaders=0,
+                             **kwargs)
+        os.replace(output, name)
+        with open(name, 'r', encoding='utf-8') as f:
+            return name, json.load(f)
+
+    plain_file, plain = export('plain.json')
+    marked_file, marked = export('marked.json', dedupe='mark')
+    collapsed_file, collapsed = export('collapsed.json', dedupe='collapse', manifest_path='dedupe.manifest.db')
+
+    chunks = chunk_nodes(marked)
+    by_id = {chunk['id']: chunk for chunk in chunks}
+    duplicates = [chunk for chunk in chunks if 'duplicateOf' in chunk['_rag']['chunk']]
+    check(f"copies' chunks marked ({len(duplicates)} of {len(chunks)})", len(duplicates) >= 14)
+    check("every duplicate refers to an earlier, unmarked chunk in the export",
+          all(chunk['_rag']['chunk']['duplicateOf'] in by_id and
+              'duplicateOf' not in by_id[chunk['_rag']['chunk']['duplicateOf']]['_rag']['chunk'] and
+              chunks.index(by_id[chunk['_rag']['chunk']['duplicateOf']]) < chunks.index(chunk)
+              for chunk in duplicates))
+    check("the rewritten paragraph is not a duplicate",
+          not any(edited[3][:200] in chunk['description'] for chunk in duplicates))
+    near = [chunk for chunk in duplicates if chunk['_rag']['chunk']['similarity'] < 1]
+    check(f"the lightly edited one is a near duplicate ({len(near)} chunks)",
+          near and all(chunk['description'] in edited[5] for chunk in near))
+    check("marking changes nothing else", without_marks(marked) == without_marks(plain))
+
+    stats = collapsed['_rag']['stats']['dedupe']
+    collapsed_chunks = chunk_nodes(collapsed)
+    left_out = [chunk for chunk in collapsed_chunks if 'duplicateOf' in chunk['_rag']['chunk']]
+    check("collapsed chunks keep their reference but not their text",
+          len(left_out) == len(duplicates) and
+          all('description' not in chunk and 'text' not in chunk['_rag']['chunk'] for chunk in left_out))
+    check(f"stats report the dedupe rate ({stats})",
+          stats['duplicateChunks'] == len(duplicates) and stats['chunksChecked'] == len(chunks) and
+          stats['dedupeRate'] == round(len(duplicates) / len(chunks), 4) and stats['mode'] == 'collapse')
+    size = os.path.getsize(collapsed_file)
+    check(f"stats report the output size ({collapsed['_rag']['stats']['outputBytes']} of {size} bytes)",
+          0 < size - collapsed['_rag']['stats']['outputBytes'] < 1000)
+    check(f"collapsed export smaller by about the duplicate text ({size} vs {os.path.getsize(plain_file)} bytes)",
+          os.path.getsize(plain_file) - size > stats['duplicateChars'] * 0.8)
+    check("no stats without --dedupe", 'dedupe' not in plain['_rag']['stats'] and
+          'outputBytes' not in plain['_rag']['stats'])
+
+    # The manifest keeps nodes whole, so they are reused; an export with collapsed nodes can't be
+    drive.calls.clear()
+    _, again = export('again.json', dedupe='collapse', manifest_path='dedupe.manifest.db')
+    check("rerun with the manifest reuses every file, same tree",
+          drive.calls['media'] == 0 and without_marks(again) == without_marks(collapsed) and
+          [chunk.get('description') for chunk in chunk_nodes(again)] ==
+          [chunk.get('description') for chunk in collapsed_chunks])
+    drive.calls.clear()
+    _, from_collapsed = export('from-collapsed.json', incremental=collapsed_file)
+    check(f"files with collapsed chunks downloaded again from a collapsed baseline ({drive.calls['media']})",
+          drive.calls['media'] == 2 and without_marks(from_collapsed) == without_marks(plain))
+    _, from_marked = export('from-marked.json', incremental=marked_file)
+    check("marks from a baseline dropped without --dedupe",
+          not any('duplicateOf' in chunk['_rag']['chunk'] for chunk in chunk_nodes(from_marked)))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_duplicates()
+        test_sub_quadratic()
+        test_drive_exporter()
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Offline test: treelisty_chunking against the original chunk_text.
+
+Property checks on generated documents (paragraphs, sentences, odd
+whitespace, oversized sentences, chunk sizes from tiny to larger than the
+text): chunk_text gives exactly what the original greedy chunker
+(test/legacy_chunk_text.py) gives, and every span of chunk_spans slices
+that chunk out of its buffer. For content-defined chunking: chunks stay
+within max size, end at sentence or paragraph ends, cover the text, and mostly survive an edit elsewhere in the document. Runs in a few
+seconds with no dependencies.
+
+Usage:
+  python test/test-chunking.py
+  python test/test-chunking.py --cases 20000 --seed 7
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import treelisty_chunking as chunking  # noqa: E402
+from legacy_chunk_text import legacy_chunk_text  # noqa: E402
+
+WORDS = ['alpha', 'beta', 'Gamma', 'delta-x', 'e.g', 'pi', '3.14', 'ok', 'naïve', 'über', '—', 'x' * 30]
+ENDINGS = ['.', '!', '?', '', ',', '...', '.)']
+SPACES = [' ', ' ', ' ', '  ', '\t', '\n', ' \n ', '\xa0', '\u2003', '\x1c']
+BREAKS = ['\n\n', '\n\n', '\n\n\n', '\n\n\n\n\n', ' \n\n ', '\n \n', '\n\n \n\n', '\t\n\n\n\t']
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def random_document(rng: random.Random) -> str:
+    """Paragraphs of sentences, with the whitespace and sizes that make chunking interesting"""
+    paragraphs = []
+    for _ in range(rng.randint(0, 12)):
+        sentences = []
+        for _ in range(rng.randint(0, 10)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(1, 12))]
+            if rng.random() < 0.05:
+                words.append('y' * rng.randint(50, 400))  # one long unbroken run
+            sentence = ''.join(word + rng.choice(SPACES) for word in words).rstrip(' ')
+            sentences.append(sentence + rng.choice(ENDINGS))
+        paragraphs.append(''.join(s + rng.choice(SPACES) for s in sentences))
+    text = ''.join(p + rng.choice(BREAKS) for p in paragraphs)
+    if rng.random() < 0.3:
+        text = rng.choice(SPACES + BREAKS) + text
+    return text
+
+
+def test_matches_original(cases: int, seed: int):
+    print(f"\n{cases:,} generated documents vs. the original chunk_text")
+    rng = random.Random(seed)
+    mismatches = []
+    bad_spans = 0
+    chunks = 0
+    for case in range(cases):
+        text = random_document(rng)
+        chunk_size = rng.choice([1, 2, 5, 10, 30, 80, 200, 500, 1500, 10 ** 6])
+        expected = legacy_chunk_text(text, chunk_size)
+        actual = chunking.chunk_text(text, chunk_size)
+        chunks += len(actual)
+        if actual != expected:
+            mismatches.append((case, chunk_size, text))
+        buffer, spans = chunking.chunk_spans(text, chunk_size)
+        if [buffer[start:end] for start, end in spans] != [chunk['text'] for chunk in expected]:
+            bad_spans += 1
+    check(f"identical chunks ({chunks:,} chunks)", not mismatches)
+    for case, chunk_size, text in mismatches[:3]:
+        print(f"     case {case}, chunk_size={chunk_size}: {text[:120]!r}")
+    check("spans slice the chunks out of the buffer", bad_spans == 0)
+
+
+def test_edge_cases():
+    print("\nedge cases")
+    samples = [
+        ('', 10), ('   \n\n\t ', 10), ('short', 10), ('exactly10!', 10), ('exactly 11!', 10),
+        ('A. B. C.', 1), ('One.  Two!\nThree?\tFour', 6), ('a\n\n\n\nb', 1), ('x' * 95, 10),
+        ('Para one.\n\n  Para two is longer. It has sentences.  \n\nThree', 20),
+        ('word ' * 50, 7), ('end.\xa0Next\u2003one.\x1cLast', 9),
+        # Over chunk_size only before the two spaces between sentences are collapsed
+        ('Summary follows.\n\n' + '  '.join(['Yes.'] * 34), 200),
+    ]
+    for text, chunk_size in samples:
+        check(f"{text[:24]!r} at {chunk_size}",
+              chunking.chunk_text(text, chunk_size) == legacy_chunk_text(text, chunk_size))
+
+
+def test_content_defined(cases: int, seed: int):
+    print(f"\ncontent-defined chunking, {cases:,} generated documents")
+    rng = random.Random(seed)
+    too_long = uncovered = unsnapped = 0
+    for _ in range(cases):
+        text = random_document(rng)
+        avg_size = rng.choice([40, 100, 300, 1500])
+        buffer, spans = chunking.content_defined_spans(text, avg_size)
+        chunks = [buffer[start:end] for start, end in spans]
+        if ''.join(text.split()) != ''.join(''.join(chunks).split()):
+            uncovered += 1
+        too_long += sum(end - start > avg_size * 2 for start, end in spans)
+        # Only a cut at max size (after which the next chunk starts max size on) may end mid-sentence
+        for (start, end), (next_start, _) in zip(spans, spans[1:]):
+            if buffer[end - 1] not in '.!?' and buffer[end:end + 2] != '\n\n' and next_start - start < avg_size * 2:
+                unsnapped += 1
+    check("chunks cover the text", uncovered == 0)
+    check("chunks no longer than max size", too_long == 0)
+    check("chunks end at sentence or paragraph ends (unless cut at max size)", unsnapped == 0)
+
+    words = 'the report said sales grew and the team agreed to follow up next week'.split()
+    lines = [' '.join(rng.choice(words) for _ in range(rng.randint(5, 20))).capitalize() + '.' for _ in range(3000)]
+    original = chunking.chunk_text('\n'.join(lines), 1500, chunking.CONTENT_DEFINED)
+    edited = chunking.chunk_text('\n'.join(lines[:3] + ['A new line near the top.'] + lines[3:]), 1500,
+                                 chunking.CONTENT_DEFINED)
+    check("same chunks on every run", original == chunking.chunk_text('\n'.join(lines), 1500, 'content'))
+    known = {chunk['text'] for chunk in original}
+    kept = sum(chunk['text'] in known for chunk in edited) / len(edited)
+    check(f"line inserted near the top keeps the other chunks ({kept:.1%})", kept > 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check treelisty_chunking against the original chunker')
+    parser.add_argument('--cases', type=int, default=3000, help='Generated documents (default: 3000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    test_edge_cases()
+    test_matches_original(args.cases, args.seed)
+    test_content_defined(args.cases, args.seed)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
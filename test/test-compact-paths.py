@@ -0,0 +1,146 @@
+"""
+Offline test: --compact-paths exports and treelisty_paths.
+
+Exports a generated folder (nested folders, extracted documents, odd names,
+a symlink to a file elsewhere) both ways and checks that load_tree() and the
+treelisty_paths CLI turn the compact file back into the standard export,
+byte for byte once re-serialized, and that the compact file is smaller.
+Also round-trips nodes with Windows-style paths through compact_fields()
+and expand_tree().
+
+Usage:
+  python test/test-compact-paths.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+import treelisty_paths  # noqa: E402
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def without_volatile(tree):
+    """The export's bytes as json.dump writes them, minus sync and extraction times"""
+    tree = json.loads(json.dumps(tree))
+    tree['source'].pop('lastSync', None)
+
+    def strip(node):
+        if '_rag' in node:
+            node['_rag'].pop('imported', None)
+        for child in node.get('children', []):
+            strip(child)
+    strip(tree)
+    return json.dumps(tree, indent=2, ensure_ascii=False)
+
+
+def build_folder(root: Path, elsewhere: Path):
+    for name in ('Projects/2025/Q1 Plans', 'Projects/archive', 'Notes', 'empty'):
+        (root / name).mkdir(parents=True)
+    for i in range(20):
+        (root / 'Projects/2025/Q1 Plans' / f'plan {i}.md').write_text(f'# Plan {i}\n\n' + 'Goals and owners. ' * 10)
+    (root / 'Projects/archive' / 'café–notes.txt').write_text('Crème brûlée. ' * 20)
+    (root / 'Notes' / 'todo.txt').write_text('Buy milk. ' * 5)
+    (root / 'Notes' / 'photo.png').write_bytes(b'\x89PNG' + bytes(64))
+    elsewhere.mkdir()
+    (elsewhere / 'shared.txt').write_text('Lives outside the exported folder. ' * 10)
+    (root / 'Notes' / 'shared-link.txt').symlink_to(elsewhere / 'shared.txt')
+
+
+def export(root: Path, compact: bool):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return local_exporter.export_folder(root, extract=True, jobs=0, compact_paths=compact)
+
+
+def test_export_round_trip(work: Path):
+    print("\ncompact export vs. standard export")
+    root = work / 'My Files'
+    build_folder(root, work / 'elsewhere')
+    standard_file = export(root, compact=False)
+    compact_file = export(root, compact=True)
+    with open(standard_file, 'r', encoding='utf-8') as f:
+        standard = json.load(f)
+    with open(compact_file, 'r', encoding='utf-8') as f:
+        compact = json.load(f)
+
+    check("compact file is marked and leaves derivable paths out",
+          compact['source']['pathEncoding'] == treelisty_paths.PATH_ENCODING
+          and '/My Files/Notes' not in json.dumps(compact['children'][0]['children']))
+    check("only the symlink keeps an explicit filePath", json.dumps(compact).count('"filePath"') == 1)
+    check(f"smaller ({os.path.getsize(compact_file):,} vs {os.path.getsize(standard_file):,} bytes)",
+          os.path.getsize(compact_file) < os.path.getsize(standard_file) * 0.8)
+    check("load_tree() expands it to the standard export",
+          without_volatile(treelisty_paths.load_tree(compact_file)) == without_volatile(standard))
+    check("load_tree() leaves a standard export as it is",
+          treelisty_paths.load_tree(standard_file) == standard)
+
+    expanded_file = treelisty_paths.expanded_file_name(compact_file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        treelisty_paths.main([compact_file])
+    with open(expanded_file, 'r', encoding='utf-8') as f:
+        check("the CLI writes the standard export", without_volatile(json.load(f)) == without_volatile(standard))
+
+
+def test_windows_paths():
+    print("\nWindows-style paths")
+    folder = {'id': 'C:\\Users\\me\\Docs\\Sub', 'name': 'Sub', 'isFolder': True, 'dateCreated': None,
+              'filePath': 'C:\\Users\\me\\Docs\\Sub', 'children': []}
+    doc = {'id': 'C:\\Users\\me\\Docs\\Sub\\a.txt', 'name': 'a.txt', 'isFolder': False, 'dateCreated': None,
+           'filePath': 'C:\\Users\\me\\Docs\\Sub\\a.txt', 'description': 'text',
+           '_rag': {'source': 'a.txt', 'sourceType': 'local-file', 'sourceId': 'C:\\Users\\me\\Docs\\Sub\\a.txt',
+                    'sourcePath': 'C:\\Users\\me\\Docs\\Sub\\a.txt', 'charCount': 4}}
+    moved = {'id': 'D:\\Other\\b.txt', 'name': 'b-link.txt', 'isFolder': False, 'dateCreated': None,
+             'filePath': 'D:\\Other\\b.txt'}
+    on_drive_root = {'id': 'E:\\top.txt', 'name': 'top.txt', 'isFolder': False, 'dateCreated': None,
+                     'filePath': 'E:\\top.txt'}
+    folder['children'] = [doc, moved]
+    standard = {'source': {'type': 'local-folder'}, 'children': [
+        {'id': 'C:\\Users\\me\\Docs', 'children': [folder]}, {'id': 'E:\\', 'children': [on_drive_root]}]}
+
+    def compacted(node, parent):
+        fields = treelisty_paths.compact_fields({k: v for k, v in node.items() if k != 'children'}, parent, '\\')
+        if 'children' in node:
+            fields['children'] = [compacted(child, node['filePath']) for child in node['children']]
+        return fields
+    compact = {'source': {'type': 'local-folder', 'pathEncoding': treelisty_paths.PATH_ENCODING,
+                          'pathSeparator': '\\'},
+               'children': [{'id': phase['id'], 'children': [compacted(c, phase['id']) for c in phase['children']]}
+                            for phase in standard['children']]}
+    check("ids and paths dropped except where not derivable",
+          json.dumps(compact).count('"filePath"') == 1 and '"id": "C:\\\\Users\\\\me\\\\Docs\\\\Sub' not in
+          json.dumps(compact))
+    check("expand_tree() restores them, in the standard key order",
+          json.dumps(treelisty_paths.expand_tree(compact)) == json.dumps(standard))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_export_round_trip(Path(work).resolve())
+        os.chdir(ROOT)
+    test_windows_paths()
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
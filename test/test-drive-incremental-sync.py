@@ -0,0 +1,251 @@
+"""
+Offline test: --incremental Drive exports against a fake Drive.
+
+Runs each Drive exporter in full against test/fake_drive.FakeDrive, makes
+adds, renames, moves, content edits, trashes and deletes, then checks that
+an incremental export (through the Changes API for the filesystem exporter,
+by checksum for the content exporter) matches a fresh full export of the
+changed drive, ignoring sibling order and sync timestamps, and that the
+content exporter only downloaded files whose content changed, against a
+previous export or its --manifest. Also checks that --folder rescans just
+one folder into the previous export, and records that it did only then.
+
+Needs the exporters' Google client libraries installed; no network or
+credentials are used.
+
+Usage:
+  python test/test-drive-incremental-sync.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import export_gdrive_content_to_treelisty as content_exporter  # noqa: E402
+import export_google_drive_to_treelisty as drive_exporter  # noqa: E402
+from fake_drive import FakeDrive  # noqa: E402
+from treelisty_drive_sync import find_subtree  # noqa: E402
+
+TEXT = b'Quarterly planning notes. ' * 20
+GOOGLE_DOC = 'application/vnd.google-apps.document'
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def load(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def normalize(node, drop_ids=False):
+    """Comparable form: no sync times/tokens, children and items in a fixed order"""
+    node = dict(node)
+    if 'source' in node:
+        node['source'] = {k: v for k, v in node['source'].items() if k not in ('lastSync', 'changesPageToken')}
+    if drop_ids:
+        node.pop('id', None)
+        rag = node.get('_rag')
+        if rag and 'source' in rag:
+            node['_rag'] = dict(rag, source={k: v for k, v in rag['source'].items()
+                                             if k not in ('extractedAt', 'extractSeconds')})
+        if rag and 'stats' in rag:
+            node['_rag'] = dict(rag, stats={k: v for k, v in rag['stats'].items()
+                                           if k not in ('filesReused', 'bytesSaved', 'secondsSaved')})
+    for key in ('children', 'items'):
+        if key in node:
+            children = [normalize(child, drop_ids) for child in node[key]]
+            node[key] = sorted(children, key=lambda c: json.dumps(c, sort_keys=True, ensure_ascii=False))
+    return node
+
+
+def build_drive():
+    drive = FakeDrive(page_size=3)
+    ids = {}
+    ids['projects'] = drive.add_folder('Projects')
+    ids['alpha'] = drive.add_folder('Alpha', ids['projects'])
+    ids['beta'] = drive.add_folder('Beta', ids['projects'])
+    ids['deep'] = drive.add_folder('Deep', ids['alpha'])
+    ids['archive'] = drive.add_folder('Archive')
+    ids['old'] = drive.add_folder('Old Stuff', ids['archive'])
+    for name, parent in [('plan.txt', 'alpha'), ('spec.md', 'alpha'), ('stable.txt', 'alpha'),
+                         ('notes.txt', 'beta'), ('deep.txt', 'deep'), ('old.txt', 'old'),
+                         ('readme.txt', 'projects')]:
+        ids[name] = drive.add_file(name, ids[parent], TEXT + name.encode())
+    ids['report'] = drive.add_file('Report', ids['beta'], TEXT + b' exported', GOOGLE_DOC)
+    ids['top.txt'] = drive.add_file('top.txt', 'root', TEXT)
+    return drive, ids
+
+
+def mutate(drive, ids):
+    drive.rename(ids['plan.txt'], 'plan-v2.txt')                # rename in place
+    drive.update_content(ids['spec.md'], TEXT + b' revised')   # content edit
+    drive.move(ids['notes.txt'], ids['alpha'])                  # file move
+    drive.move(ids['deep'], ids['beta'])                        # folder move, same depth
+    drive.move(ids['old'], 'root')                              # folder move, shallower
+    drive.rename(ids['beta'], 'Beta (renamed)')                 # folder rename keeps contents
+    drive.trash(ids['readme.txt'])
+    drive.delete(ids['top.txt'])
+    drive.trash(ids['archive'])
+    new_folder = drive.add_folder('New Folder', ids['projects'])
+    drive.add_file('fresh.txt', new_folder, TEXT + b' fresh')
+    drive.add_folder('Too Deep', drive.add_folder('Nested', new_folder))
+    drive.add_file('new-top.txt', 'root', TEXT + b' top')
+
+
+def test_metadata_export():
+    print("\nexport_google_drive_to_treelisty --incremental")
+    drive, ids = build_drive()
+    drive_exporter.authenticate = lambda: drive
+
+    baseline = run_quietly(drive_exporter.export_google_drive, 2)
+    os.replace(baseline, 'baseline.json')
+    check("full export records a changes token", bool(load('baseline.json')['source'].get('changesPageToken')))
+
+    mutate(drive, ids)
+    drive.calls.clear()
+    updated = run_quietly(drive_exporter.export_google_drive, 2, incremental='baseline.json')
+    os.replace(updated, 'incremental.json')
+    incremental_calls = drive.calls['files.list']
+
+    drive.calls.clear()
+    fresh = run_quietly(drive_exporter.export_google_drive, 2)
+    os.replace(fresh, 'fresh.json')
+
+    check("incremental export matches a fresh full export",
+          normalize(load('incremental.json')) == normalize(load('fresh.json')))
+    check(f"fewer folder listings ({incremental_calls} vs {drive.calls['files.list']})",
+          incremental_calls < drive.calls['files.list'])
+
+    # A second incremental run with no changes leaves the tree as it is
+    again = run_quietly(drive_exporter.export_google_drive, 2, incremental='incremental.json')
+    check("no-change incremental run is a no-op",
+          normalize(load(again)) == normalize(load('incremental.json')))
+
+    fallback = run_quietly(drive_exporter.export_google_drive, 3, incremental='incremental.json')
+    check("different depth falls back to a full scan", load(fallback)['source']['syncDepth'] == 3)
+
+
+def test_folder_refresh():
+    print("\nexport_google_drive_to_treelisty --folder")
+    drive, ids = build_drive()
+    drive_exporter.authenticate = lambda: drive
+    baseline = load(run_quietly(drive_exporter.export_google_drive, 3))
+
+    drive.rename(ids['alpha'], 'Alpha (renamed)')
+    drive.add_file('added.txt', ids['deep'], TEXT)
+    drive.rename(ids['archive'], 'Not refreshed')
+    drive.calls.clear()
+    refreshed = load(run_quietly(drive_exporter.export_google_drive, 3, folder=ids['alpha']))
+    # Alpha (4 items, two pages) and Deep listed, not the rest of the drive
+    check(f"only the folder's subtree listed ({drive.calls['files.list']} listings)",
+          drive.calls['files.list'] == 3)
+
+    fresh = load(run_quietly(drive_exporter.export_google_drive, 3))
+    (node, path), = find_subtree(refreshed, ids['alpha'])
+    check("refreshed folder matches a fresh scan",
+          normalize(node) == normalize(find_subtree(fresh, ids['alpha'])[0][0]))
+    check("path leads to the folder",
+          [step['id'] for step in path] == ['root-gdrive', 'gdrive-main', ids['projects']])
+    check("rest of the tree left as it was",
+          find_subtree(refreshed, ids['archive'])[0][0] == find_subtree(baseline, ids['archive'])[0][0])
+    check("changes token kept", refreshed['source']['changesPageToken'] == baseline['source']['changesPageToken'])
+    check("folder refresh recorded", refreshed['source'].get('refreshedFolderId') == ids['alpha'])
+
+    # A folder the last export doesn't have: a normal (incremental) refresh, so the full tree is wanted
+    new_folder = drive.add_folder('Created Since', ids['projects'])
+    fallback = load(run_quietly(drive_exporter.export_google_drive, 3, incremental=drive_exporter.LATEST_EXPORT,
+                                folder=new_folder))
+    check("unknown folder falls back to the whole tree",
+          'refreshedFolderId' not in fallback['source'] and len(find_subtree(fallback, new_folder)) == 1
+          and normalize(fallback) == normalize(load(run_quietly(drive_exporter.export_google_drive, 3))))
+
+
+def test_content_export():
+    print("\nexport_gdrive_content_to_treelisty --incremental")
+    drive, ids = build_drive()
+    content_exporter.authenticate = lambda: drive
+
+    baseline = run_quietly(content_exporter.export_gdrive_content, 'root', 3)
+    os.replace(baseline, 'content-baseline.json')
+
+    mutate(drive, ids)
+    drive.calls.clear()
+    updated = run_quietly(content_exporter.export_gdrive_content, 'root', 3,
+                          incremental='content-baseline.json')
+    os.replace(updated, 'content-incremental.json')
+    # New content: spec (edited), fresh and new-top (added). plan-v2 (renamed) and
+    # notes (moved) keep their checksums; the Report Doc has no checksum but kept its modifiedTime.
+    check(f"only changed content downloaded ({drive.calls['media']})", drive.calls['media'] == 3)
+
+    fresh = run_quietly(content_exporter.export_gdrive_content, 'root', 3)
+    os.replace(fresh, 'content-fresh.json')
+    tree = load('content-incremental.json')
+    check("incremental content export matches a fresh full export",
+          normalize(tree, drop_ids=True) == normalize(load('content-fresh.json'), drop_ids=True))
+    stats = tree['_rag']['stats']
+    # stable.txt, deep.txt, old.txt, Report, plan-v2.txt and notes.txt
+    check("stats report reused files", stats.get('filesReused') == 6)
+    sizes = [len(TEXT + name.encode()) for name in ('stable.txt', 'deep.txt', 'old.txt', 'plan.txt', 'notes.txt')]
+    check(f"stats report bytes saved ({stats.get('bytesSaved')})",
+          stats.get('bytesSaved') == sum(sizes) + len(TEXT + b' exported'))
+
+    # The manifest: filled by one run, the whole baseline of the next
+    print("  --manifest")
+    drive.calls.clear()
+    run_quietly(content_exporter.export_gdrive_content, 'root', 3, manifest_path='content.manifest.db')
+    check("first manifest run downloads everything", drive.calls['media'] == 9)
+    drive.update_content(ids['stable.txt'], TEXT + b' stable no more')
+    drive.calls.clear()
+    again = run_quietly(content_exporter.export_gdrive_content, 'root', 3, manifest_path='content.manifest.db')
+    check(f"second run only downloads the edited file ({drive.calls['media']})", drive.calls['media'] == 1)
+    check("stats report reused files", load(again)['_rag']['stats'].get('filesReused') == 8)
+    fresh = run_quietly(content_exporter.export_gdrive_content, 'root', 3)
+    check("manifest run matches a fresh full export",
+          normalize(load(again), drop_ids=True) == normalize(load(fresh), drop_ids=True))
+    drive.calls.clear()
+    run_quietly(content_exporter.export_gdrive_content, 'root', 3, chunk_size=600,
+                manifest_path='content.manifest.db')
+    check("a new chunk size starts the manifest afresh", drive.calls['media'] == 9)
+    drive.calls.clear()
+    chunked = run_quietly(content_exporter.export_gdrive_content, 'root', 3, chunk_size=600,
+                          manifest_path='content.manifest.db', chunking='content')
+    check("so does content-defined chunking",
+          drive.calls['media'] == 9 and load(chunked)['source']['chunking'] == 'content')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_metadata_export()
+        test_folder_refresh()
+        test_content_export()
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Offline test: the extraction cache shared by the local and Drive exporters.
+
+Writes a PDF and a Word document into a folder, extracts them with the
+local exporter through --extract-cache, then parses the same bytes the way
+the Drive exporter does (and the other way round with fresh files), and
+checks the second exporter gets the first one's text from the cache: same
+text, counted as a hit, no parse.
+
+Needs PyMuPDF (to write the PDF), python-docx and the Drive exporter's
+Google client libraries installed; no network or credentials are used.
+
+Usage:
+  python test/test-extract-cache.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import docx  # noqa: E402
+import fitz  # noqa: E402
+
+import export_gdrive_content_to_treelisty as content_exporter  # noqa: E402
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+
+PDF = 'application/pdf'
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def write_pdf(path: Path, label: str):
+    doc = fitz.open()
+    for page in range(3):
+        doc.new_page().insert_text((72, 72), f'{label}: page {page + 1} of the quarterly report.')
+    doc.save(str(path))
+    doc.close()
+
+
+def write_docx(path: Path, label: str):
+    document = docx.Document()
+    document.add_paragraph(f'{label}: meeting notes, first paragraph.')
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = 'Owner'
+    table.rows[0].cells[1].text = label
+    document.save(str(path))
+
+
+def local_extract(path: Path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        text, error, _, hit = local_exporter.extract_content_uncounted(path)
+    return text, error, hit
+
+
+def no_parsing(*args, **kwargs):
+    raise AssertionError('parsed despite a cache hit')
+
+
+def test_local_then_drive(folder: Path):
+    print("\nlocal exporter first, Drive exporter second")
+    write_pdf(folder / 'report.pdf', 'local first')
+    write_docx(folder / 'notes.docx', 'local first')
+    for name, mime_type in (('report.pdf', PDF), ('notes.docx', DOCX)):
+        local_text, error, hit = local_extract(folder / name)
+        check(f"{name}: extracted locally, cache miss", error is None and hit is False and 'local first' in local_text)
+        extractor, backend, version = content_exporter.CACHED_EXTRACTORS[mime_type]
+        content_exporter.CACHED_EXTRACTORS[mime_type] = (no_parsing, backend, version)
+        try:
+            drive_text, drive_hit = content_exporter.extract_document((folder / name).read_bytes(), mime_type)
+        finally:
+            content_exporter.CACHED_EXTRACTORS[mime_type] = (extractor, backend, version)
+        check(f"{name}: Drive export hits the local entry", drive_hit is True and drive_text == local_text)
+
+
+def test_drive_then_local(folder: Path):
+    print("\nDrive exporter first, local exporter second")
+    write_pdf(folder / 'drive-report.pdf', 'drive first')
+    write_docx(folder / 'drive-notes.docx', 'drive first')
+    for name, mime_type, ext in (('drive-report.pdf', PDF, '.pdf'), ('drive-notes.docx', DOCX, '.docx')):
+        drive_text, drive_hit = content_exporter.extract_document((folder / name).read_bytes(), mime_type)
+        check(f"{name}: parsed for Drive, cache miss", drive_hit is False and 'drive first' in drive_text)
+        extractor, backend, version = local_exporter.CACHED_EXTRACTORS[ext]
+        local_exporter.CACHED_EXTRACTORS[ext] = (no_parsing, backend, version)
+        try:
+            local_text, error, hit = local_extract(folder / name)
+        finally:
+            local_exporter.CACHED_EXTRACTORS[ext] = (extractor, backend, version)
+        check(f"{name}: local export hits the Drive entry", hit is True and local_text == drive_text)
+
+
+def test_same_backend_keys():
+    print("\nbackend keys")
+    for ext, mime_type in (('.pdf', PDF), ('.docx', DOCX)):
+        check(f"{ext}: same backend and version in both exporters",
+              local_exporter.CACHED_EXTRACTORS[ext][1:] == content_exporter.CACHED_EXTRACTORS[mime_type][1:])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        cache = os.path.join(work, 'cache.db')
+        local_exporter.configure_extraction_cache(cache)
+        content_exporter.configure_extraction_cache(cache)
+        test_same_backend_keys()
+        test_local_then_drive(Path(work))
+        test_drive_then_local(Path(work))
+        local_exporter.extraction_cache.close()
+        content_exporter.extraction_cache.close()
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+Offline test: export_gdrive_content_to_treelisty's download/extract pipeline.
+
+Runs the content exporter against test/fake_drive.FakeDrive with concurrent
+downloads and worker-process parsing, and checks the knowledge-base tree is
+exactly what a serial run (one download at a time, parsed inline) writes,
+in the same order, including files that fail to download, and that the
+download memory limits (spilling to disk, the file size cap and the budget
+for downloads in flight or waiting to be parsed) hold without changing the
+output. Also checks that node ids are the same on every run and unique
+within an export.
+
+Needs the exporters' Google client libraries installed; no network or
+credentials are used.
+
+Usage:
+  python test/test-gdrive-content-pipeline.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import export_gdrive_content_to_treelisty as content_exporter  # noqa: E402
+from fake_drive import FakeDrive, FakeMediaHttp  # noqa: E402
+
+GOOGLE_DOC = 'application/vnd.google-apps.document'
+PDF = 'application/pdf'
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def load(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def without_volatile(node):
+    """Drop generated ids and extraction times, keeping order"""
+    if isinstance(node, list):
+        return [without_volatile(child) for child in node]
+    if not isinstance(node, dict):
+        return node
+    return {key: without_volatile(value) for key, value in node.items()
+            if key not in ('id', 'extractedAt', 'extractSeconds', 'lastSync')}
+
+
+def build_drive():
+    drive = FakeDrive(page_size=7)
+    for i in range(12):
+        folder = drive.add_folder(f'Folder {i:02d}', 'root')
+        sub = drive.add_folder(f'Sub {i:02d}', folder)
+        for j in range(5):
+            text = f'Paragraph {j} of folder {i}. '.encode() * (40 + 90 * j)
+            drive.add_file(f'notes-{i}-{j}.txt', sub if j % 2 else folder, text)
+        drive.add_file(f'Doc {i}', folder, b'Exported document text. ' * 30, GOOGLE_DOC)
+        drive.add_file(f'scan-{i}.pdf', sub, b'%PDF-1.4 not really a pdf', PDF)
+        drive.add_file(f'tiny-{i}.txt', folder, b'too short')
+    return drive
+
+
+class SlowMediaHttp(FakeMediaHttp):
+    """Media responses that take a while and sometimes fail, like the real thing"""
+
+    def request(self, uri, method='GET', **kwargs):
+        time.sleep(0.01)
+        if b'folder 3.' in self.content:
+            raise ConnectionError('connection reset')
+        return super().request(uri, method, **kwargs)
+
+
+def test_pipeline_matches_serial():
+    print("\nconcurrent downloads + worker-process parsing vs. serial")
+    drive = build_drive()
+    content_exporter.authenticate = lambda: drive
+    import fake_drive
+    fake_drive.FakeMediaHttp = SlowMediaHttp
+
+    start = time.perf_counter()
+    serial = run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=0, extract_jobs=0)
+    serial_time = time.perf_counter() - start
+    os.replace(serial, 'serial.json')
+    serial_media = drive.calls['media']
+
+    drive.calls.clear()
+    start = time.perf_counter()
+    piped = run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=8, extract_jobs=2)
+    piped_time = time.perf_counter() - start
+
+    tree = load(piped)
+    check("same tree, same order", without_volatile(tree) == without_volatile(load('serial.json')))
+    check("every file downloaded once", drive.calls['media'] == serial_media)
+    check("no changes token asked for", drive.calls['changes.getStartPageToken'] == 0)
+    check("failed downloads left out", not any('notes-3-' in json.dumps(child) for child in tree['children']))
+    check(f"overlapped downloads ({piped_time:.2f}s vs {serial_time:.2f}s serial)", piped_time < serial_time / 2)
+
+    # Without a pipeline, scan_and_extract still returns the nodes it built
+    nodes = run_quietly(content_exporter.scan_and_extract, drive, 'root', 'My Drive', 0, 3)
+    check("scan_and_extract without a writer returns the same nodes",
+          without_volatile(nodes) == without_volatile(tree['children']))
+    fake_drive.FakeMediaHttp = FakeMediaHttp
+
+
+def test_download_limits():
+    print("\nspill to disk, max file size, resident budget")
+    drive = build_drive()
+    drive.add_file('huge.txt', 'root', b'Large file. ' * 2000)
+    huge_doc = drive.add_file('Huge Doc', 'root', b'Large export. ' * 2000, GOOGLE_DOC)
+    del drive.items[huge_doc]['size']  # Google Docs are listed without a size
+    content_exporter.authenticate = lambda: drive
+    serial = run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=0,
+                         limits=content_exporter.DownloadLimits(0, 0, 0))
+    os.replace(serial, 'unlimited.json')
+    all_media = drive.calls['media']
+    reference = without_volatile(load('unlimited.json'))
+
+    os.mkdir('spill')
+    budget_peak = []
+    original_acquire = content_exporter.ByteBudget.acquire
+
+    def acquire(budget, amount, turn):
+        original_acquire(budget, amount, turn)
+        budget_peak.append(budget.used)
+    content_exporter.ByteBudget.acquire = acquire
+    try:
+        limits = content_exporter.DownloadLimits(spill_bytes=1024, max_file_bytes=0, max_resident_bytes=4096,
+                                                 spill_dir='spill')
+        spilled = run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=8, extract_jobs=2,
+                              limits=limits)
+    finally:
+        content_exporter.ByteBudget.acquire = original_acquire
+    check("spilled downloads give the same tree", without_volatile(load(spilled)) == reference)
+    check("spill files removed", os.listdir('spill') == [])
+    check(f"downloads in flight within budget (peak {max(budget_peak)} bytes)", max(budget_peak) <= 4096)
+
+    limits = content_exporter.DownloadLimits(spill_bytes=1024, max_file_bytes=20000, max_resident_bytes=0)
+    drive.calls.clear()
+    capped = load(run_quietly(content_exporter.export_gdrive_content, 'root', 3, limits=limits))
+    names = {child['name'] for child in capped['children']}
+    check("files over the size limit skipped", 'huge.txt' not in names and 'Huge Doc' not in names)
+    check("the rest unchanged", [c for c in reference['children'] if c['name'] not in ('huge.txt', 'Huge Doc')]
+          == without_volatile(capped['children']))
+    # huge.txt is listed with its size; the exported Doc has none and is cut off mid-download
+    check("oversized listed file not downloaded", drive.calls['media'] == all_media - 1)
+
+    buffer = content_exporter.DownloadBuffer(content_exporter.DownloadLimits(spill_bytes=10, spill_dir='spill'))
+    buffer.write(b'0123456789')
+    in_memory = buffer.source()
+    buffer.write(b'abc')
+    path = buffer.source()
+    with open(path, 'rb') as f:
+        check("buffer spills past the threshold", in_memory == b'0123456789' and f.read() == b'0123456789abc')
+    buffer.close()
+    check("buffer removes its temp file", not os.path.exists(path))
+
+
+def test_budget_until_parsed():
+    print("\nresident budget with documents parsed on the calling thread")
+    drive = build_drive()
+    for i in range(24):
+        drive.add_file(f'report-{i}.pdf', 'root', b'%PDF-1.4 ' + b'x' * 900, PDF)
+    content_exporter.authenticate = lambda: drive
+    budgets, closed = [], []
+    original_acquire = content_exporter.ByteBudget.acquire
+    original_close = content_exporter.DownloadBuffer.close
+
+    def acquire(budget, amount, turn):
+        original_acquire(budget, amount, turn)
+        budgets.append((budget, budget.used))
+
+    def close(buffer):
+        # A download still in memory must still be counted when it's let go
+        closed.append((0 if buffer.spilled else buffer.size, budgets[-1][0].used))
+        original_close(buffer)
+    content_exporter.ByteBudget.acquire = acquire
+    content_exporter.DownloadBuffer.close = close
+    try:
+        limits = content_exporter.DownloadLimits(spill_bytes=1024, max_file_bytes=0, max_resident_bytes=4096)
+        run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=8, extract_jobs=0,
+                    limits=limits)
+    finally:
+        content_exporter.ByteBudget.acquire = original_acquire
+        content_exporter.DownloadBuffer.close = original_close
+    peak = max(used for _, used in budgets)
+    check(f"budget.used never over the limit (peak {peak} bytes)", peak <= 4096)
+    check("downloads counted until parsed and closed",
+          len(closed) > 24 and all(used >= size for size, used in closed))
+
+
+def node_ids(node):
+    """Every node id in a tree, in order"""
+    ids = [node['id']] if 'id' in node else []
+    for key in ('children', 'items'):
+        for child in node.get(key, []):
+            ids += node_ids(child)
+    return ids
+
+
+def external_ids(node):
+    """Every Drive id a tree has a node for"""
+    ids = [node['external']['id']] if 'id' in node.get('external', {}) else []
+    for child in node.get('children', []):
+        ids += external_ids(child)
+    return ids
+
+
+def test_stable_ids():
+    print("\nnode ids derived from content")
+    drive = build_drive()
+    # The same paragraph four times: four identical chunks in one file
+    repeated = drive.add_file('repeated.txt', 'root', b'\n\n'.join([b'The same paragraph, again and again. ' * 35] * 4))
+    # A file in two folders is listed (and written) twice
+    shared = drive.add_file('shared.txt', 'root', b'Shared between folders. ' * 20)
+    drive.items[shared]['parents'].append(drive.add_folder('Also Here', 'root'))
+    content_exporter.authenticate = lambda: drive
+
+    first = load(run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=0))
+    second = load(run_quietly(content_exporter.export_gdrive_content, 'root', 3, downloaders=4, extract_jobs=2))
+    ids = node_ids(first)
+    check("same ids on every run", ids == node_ids(second))
+    check(f"ids unique ({len(ids)} nodes)", len(set(ids)) == len(ids))
+    repeated_node = next(c for c in first['children'] if c['external'].get('id') == repeated)
+    check("identical chunks get their own ids",
+          len({chunk['description'] for chunk in repeated_node['items']}) == 1
+          and len({chunk['id'] for chunk in repeated_node['items']}) == 4)
+    check("a file listed twice gets two ids", json.dumps(first).count(f'"id": "{shared}"') == 2)
+
+    # Reused nodes take the ids a fresh export gives them, whatever ids their baseline had
+    baseline = json.loads(json.dumps(first).replace('"n_', '"old_'))
+    with open('old-ids.json', 'w', encoding='utf-8') as f:
+        json.dump(baseline, f)
+    drive.calls.clear()
+    reused = load(run_quietly(content_exporter.export_gdrive_content, 'root', 3, incremental='old-ids.json'))
+    check("reused nodes get the same ids", node_ids(reused) == ids)
+    # Files without a node (too short, or not parsed: the fake PDFs only extract without PyMuPDF)
+    # have nothing to reuse and are downloaded again
+    exported = set(external_ids(first))
+    not_exported = [file_id for file_id in drive.content if file_id not in exported]
+    check(f"only files without a node downloaded again ({len(not_exported)})",
+          drive.calls['media'] == len(not_exported))
+
+    node_ids_for = content_exporter.NodeIds()
+    check("an id issued twice moves on to the next",
+          node_ids_for.file('abc') != node_ids_for.file('abc') and len(node_ids_for.issued) == 2)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_pipeline_matches_serial()
+        test_download_limits()
+        test_budget_until_parsed()
+        test_stable_ids()
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
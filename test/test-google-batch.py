@@ -0,0 +1,158 @@
+"""
+Offline test: treelisty_google_batch against a fake Drive.
+
+Checks that batched requests come back in input order with one round trip
+per 100 items, that rate-limited items are retried while other errors are
+reported per item, and that the Drive exporters produce the same trees
+with batched folder listings (--batch, and the content exporter's
+subfolder prefetch) as with one request per folder.
+
+Needs the exporters' Google client libraries installed; no network or
+credentials are used.
+
+Usage:
+  python test/test-google-batch.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import export_gdrive_content_to_treelisty as content_exporter  # noqa: E402
+import export_google_drive_to_treelisty as drive_exporter  # noqa: E402
+import treelisty_google_batch as batching  # noqa: E402
+from fake_drive import FakeDrive  # noqa: E402
+
+TEXT = b'Meeting notes and action items. ' * 10
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def load(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def without_volatile(node):
+    """Drop sync times and generated node ids"""
+    node = {k: v for k, v in node.items()
+            if k not in ('lastSync', 'changesPageToken', 'extractedAt', 'extractSeconds')}
+    if node.get('type') in ('root', 'phase', 'item') and str(node.get('id', '')).startswith('n_'):
+        del node['id']
+    return {k: without_volatile(v) if isinstance(v, dict) else
+            [without_volatile(c) if isinstance(c, dict) else c for c in v] if isinstance(v, list) else v
+            for k, v in node.items()}
+
+
+def build_drive(folders=150, files_per_folder=3):
+    drive = FakeDrive(page_size=50)
+    parents = ['root']
+    for i in range(folders):
+        folder = drive.add_folder(f'Folder {i:03d}', parents[i // 4])
+        parents.append(folder)
+        for j in range(files_per_folder):
+            drive.add_file(f'note-{i:03d}-{j}.txt', folder, TEXT + f'{i}/{j}'.encode())
+    return drive
+
+
+def test_iter_batched():
+    print("\niter_batched")
+    drive = build_drive(folders=5)
+    ids = [file_id for file_id in drive.items if file_id != drive.root_id] + ['missing-1', 'missing-2']
+    requests = ((file_id, drive.files().get(fileId=file_id, fields='id, name')) for file_id in ids)
+
+    results = list(batching.iter_batched(drive, requests, batch_size=7))
+    check("results in input order", [key for key, _, _ in results] == ids)
+    check("one round trip per batch", drive.calls['batch'] == -(-len(ids) // 7))
+    errors = {key: error for key, _, error in results if error is not None}
+    check("unknown ids fail on their own", set(errors) == {'missing-1', 'missing-2'})
+
+    drive.calls.clear()
+    drive.fail_next = [429, 503, 403]
+    responses, errors = batching.execute_batched(
+        drive, ((file_id, drive.files().get(fileId=file_id, fields='id')) for file_id in ids[:10]))
+    check("rate-limited and 5xx items retried", len(responses) == 10 and not errors)
+    check(f"retries re-batched ({drive.calls['batch']} round trips)", drive.calls['batch'] == 2)
+
+    drive.fail_next = [503] * (batching.NUM_RETRIES + 1)
+    responses, errors = batching.execute_batched(
+        drive, [('first', drive.files().get(fileId=ids[0], fields='id'))])
+    check("gives up after NUM_RETRIES", 'first' in errors and errors['first'].resp.status == 503)
+
+
+def test_drive_exporter():
+    print("\nexport_google_drive_to_treelisty --batch")
+    drive = build_drive()
+    drive_exporter.authenticate = lambda: drive
+
+    per_folder = run_quietly(drive_exporter.export_google_drive, 4, workers=1)
+    os.replace(per_folder, 'per-folder.json')
+    listing_calls = drive.calls['files.list']
+
+    drive.calls.clear()
+    batched = run_quietly(drive_exporter.export_google_drive, 4, batch=True)
+    check("same tree as per-folder listing",
+          without_volatile(load(batched)) == without_volatile(load('per-folder.json')))
+    check(f"{listing_calls} requests → {drive.calls['batch']} round trips",
+          drive.calls['batch'] < listing_calls / 10)
+
+
+def test_content_exporter():
+    print("\nexport_gdrive_content_to_treelisty (batched subfolder listings)")
+    drive = build_drive(folders=60)
+    content_exporter.authenticate = lambda: drive
+
+    batched = run_quietly(content_exporter.export_gdrive_content, 'root', 4)
+    os.replace(batched, 'batched.json')
+    round_trips = drive.calls['batch']
+
+    # Reference: the same export with every subfolder listed on its own
+    original = content_exporter.list_folders_batched
+    content_exporter.list_folders_batched = lambda *args, **kwargs: {}
+    try:
+        single = run_quietly(content_exporter.export_gdrive_content, 'root', 4)
+    finally:
+        content_exporter.list_folders_batched = original
+    check("same tree as per-folder listing",
+          without_volatile(load('batched.json')) == without_volatile(load(single)))
+    # Each folder's (up to 4) subfolders share one round trip
+    check(f"60 folders listed in {round_trips} batch round trips", round_trips <= 60 / 4 + 1)
+
+
+def main():
+    batching.backoff = lambda attempt: None
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_iter_batched()
+        test_drive_exporter()
+        test_content_exporter()
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
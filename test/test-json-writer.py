@@ -0,0 +1,177 @@
+"""
+Offline test: treelisty_json_writer.StreamingTreeWriter against json.dump.
+
+Writes generated trees node by node (leading and trailing fields, nested
+arrays, lazy objects and arrays that end up empty and must vanish, odd
+strings and numbers) and checks the output is byte-for-byte what
+json.dump(tree, f, indent=2, ensure_ascii=False) writes for the same tree.
+Also checks a real local folder export re-serializes to the same bytes.
+
+Usage:
+  python test/test-json-writer.py
+  python test/test-json-writer.py --cases 5000 --seed 7
+"""
+
+import argparse
+import contextlib
+import itertools
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+from treelisty_json_writer import StreamingTreeWriter  # noqa: E402
+
+VALUES = ['', 'plain', 'naïve – ünïcode 📁', 'quote " and \\ backslash', 'new\nline\ttab', ' ', 0, -1,
+          3.5, 1e-07, True, False, None, [], {}, [1, 'two', None], {'nested': {'deep': [{}]}}]
+
+KEYS = itertools.count()
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def random_fields(rng: random.Random, count: int):
+    """Fields with keys not used before (the writer, like the exporters, never repeats a key)"""
+    return {f'k{next(KEYS)}': rng.choice(VALUES) for _ in range(count)}
+
+
+def write_object(rng: random.Random, writer: StreamingTreeWriter, depth: int, key=None):
+    """Write a random object through writer; return it as a dict (None if it was lazy and left empty)"""
+    lazy = key is None and depth > 0 and rng.random() < 0.4
+    leading = random_fields(rng, rng.randint(0, 3))
+    writer.begin_object(leading, key=key, lazy=lazy)
+    expected = dict(leading)
+    # Fields alone don't keep a lazy object: only something written inside it does
+    has_content = not lazy
+
+    for _ in range(rng.randint(0, 3)):
+        choice = rng.random()
+        if choice < 0.3:
+            more = random_fields(rng, rng.randint(1, 2))
+            writer.write_fields(more)
+            expected.update(more)
+        elif choice < 0.7 and depth < 4:
+            array_key = f'list{len(expected)}'
+            items = write_array(rng, writer, depth + 1, array_key)
+            if items is not None:
+                expected[array_key] = items
+                has_content = True
+        elif depth < 4 and not lazy:
+            child_key = f'obj{len(expected)}'
+            expected[child_key] = write_object(rng, writer, depth + 1, child_key)
+
+    trailing = random_fields(rng, rng.randint(0, 2))
+    writer.end_object(trailing)
+    if lazy and not has_content:
+        return None
+    expected.update(trailing)
+    return expected
+
+
+def write_array(rng: random.Random, writer: StreamingTreeWriter, depth: int, key=None):
+    """Write a random array through writer; return it as a list (None if it was lazy and left empty)"""
+    lazy = rng.random() < 0.5
+    writer.begin_array(key=key, lazy=lazy)
+    items = []
+    for _ in range(rng.randint(0, 4)):
+        if rng.random() < 0.5 or depth >= 4:
+            value = rng.choice(VALUES)
+            writer.write_item(value)
+            items.append(value)
+        else:
+            child = write_object(rng, writer, depth + 1)
+            if child is not None:
+                items.append(child)
+    writer.end_array()
+    return None if lazy and not items else items
+
+
+def test_generated_trees(cases: int, seed: int):
+    print(f"\n{cases:,} generated trees vs. json.dump(indent=2)")
+    rng = random.Random(seed)
+    mismatches = []
+    for case in range(cases):
+        out = io.StringIO()
+        writer = StreamingTreeWriter(out)
+        tree = write_object(rng, writer, 0)
+        writer.close()
+        if out.getvalue() != json.dumps(tree, indent=2, ensure_ascii=False):
+            mismatches.append(case)
+    check("byte-identical output", not mismatches)
+    for case in mismatches[:3]:
+        print(f"     case {case}")
+
+
+def test_writer_errors():
+    print("\nmisuse")
+    writer = StreamingTreeWriter(io.StringIO())
+    writer.begin_object({'id': 'root'})
+    for label, call in (("array inside an object needs a key", lambda: writer.begin_array()),
+                        ("write_item needs an open array", lambda: writer.write_item(1))):
+        try:
+            call()
+            check(label, False)
+        except ValueError:
+            check(label, True)
+    try:
+        writer.close()
+        check("close() with containers open fails", False)
+    except ValueError:
+        check("close() with containers open fails", True)
+
+
+def test_local_export():
+    print("\na local folder export")
+    with tempfile.TemporaryDirectory() as work:
+        root = Path(work, 'Sample Folder')
+        for name in ('empty', 'docs/nested/deeper', 'docs/ünïcode'):
+            (root / name).mkdir(parents=True, exist_ok=True)
+        (root / 'docs' / 'readme.md').write_text('# Readme\n\nQuotes " and tabs\t. ' * 10)
+        (root / 'docs' / 'ünïcode' / 'café.txt').write_text('Crème brûlée. ' * 20)
+        (root / 'docs' / 'nested' / 'deeper' / 'data.json').write_text('{"a": 1}\n' * 30)
+        (root / 'top.txt').write_text('Top level. ' * 15)
+        cwd = os.getcwd()
+        os.chdir(work)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                output = local_exporter.export_folder(root, extract=True, jobs=0)
+            with open(output, 'r', encoding='utf-8') as f:
+                written = f.read()
+        finally:
+            os.chdir(cwd)
+    check("export is what json.dump writes for it", written == json.dumps(json.loads(written), indent=2,
+                                                                          ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    test_generated_trees(args.cases, args.seed)
+    test_writer_errors()
+    test_local_export()
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
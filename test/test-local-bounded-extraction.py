@@ -0,0 +1,172 @@
+"""
+Offline test: the local exporter reads documents only up to the content budget.
+
+Checks plain text files are decoded only up to max_size_kb (a 4GB sparse
+file costs no more than a small one), cut at a line boundary for JSON
+logs, with multi-byte UTF-8 and latin-1 handled as before (a bad byte
+past the budget doesn't switch the kept text to latin-1). Writes a
+many-page PDF and checks extraction parses only the pages that fit in
+max_size_kb (or the sampled ones with --pdf-sample), and that with
+--extract-cache the PDF is hashed in blocks and parsed from its path, never
+read into memory whole, giving the same text as without the cache.
+
+Needs PyMuPDF installed (to write the PDF); no network is used.
+
+Usage:
+  python test/test-local-bounded-extraction.py
+"""
+
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import fitz  # noqa: E402
+
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+import treelisty_documents as documents  # noqa: E402
+import treelisty_extract_cache  # noqa: E402
+
+PAGES = 200
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def extract(path: Path, max_size_kb=100, pdf_sample=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return local_exporter.extract_content_uncounted(path, max_size_kb, pdf_sample)
+
+
+@contextlib.contextmanager
+def count_pages_parsed():
+    """Count page_text() calls on whichever PDF backend is installed"""
+    reader = documents.PyMuPdfReader if documents.PDF_BACKEND == 'PyMuPDF' else documents.PyPdf2Reader
+    original = reader.page_text
+    parsed = []
+
+    def page_text(self, page_num):
+        parsed.append(page_num)
+        return original(self, page_num)
+    reader.page_text = page_text
+    try:
+        yield parsed
+    finally:
+        reader.page_text = original
+
+
+def write_pdf(path: Path):
+    doc = fitz.open()
+    for page in range(PAGES):
+        doc.new_page().insert_text((72, 72), f'Page {page + 1} of the manual. ' + 'Setup steps follow. ' * 4)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_plain_text(work: str):
+    print("\nplain text")
+    huge = Path(work, 'huge.txt')
+    with open(huge, 'wb') as f:
+        f.write(b'Log start. ' * 200)
+        f.truncate(4 * 1024 ** 3)  # Sparse: 4GB of zero bytes that take no disk space
+    start = time.perf_counter()
+    text, error, outcome, _ = extract(huge, max_size_kb=1)
+    elapsed = time.perf_counter() - start
+    check(f"4GB file read only to the budget ({elapsed * 1000:.0f}ms)",
+          outcome == 'succeeded' and elapsed < 2 and text == ('Log start. ' * 200)[:1024] + '\n\n[Truncated at 1KB]')
+
+    records = ''.join(f'{{"event": {i}, "message": "record number {i}"}}\n' for i in range(500))
+    Path(work, 'events.json').write_text(records)
+    text, _, _, _ = extract(Path(work, 'events.json'), max_size_kb=1)
+    body = text[:-len('\n\n[Truncated at 1KB]')]
+    check("JSON log cut after its last whole record",
+          records.startswith(body + '\n') and len(body) <= 1024 and body.endswith('}'))
+
+    accented = 'Crème brûlée, naïve café – 日本語テキスト. ' * 200
+    Path(work, 'accented.md').write_text(accented, encoding='utf-8')
+    text, _, _, _ = extract(Path(work, 'accented.md'), max_size_kb=1)
+    check("multi-byte UTF-8 cut by characters", text == accented[:1024] + '\n\n[Truncated at 1KB]')
+
+    Path(work, 'legacy.txt').write_bytes('Ancien fichier café crème. '.encode('latin-1') * 10)
+    text, _, _, _ = extract(Path(work, 'legacy.txt'))
+    check("latin-1 fallback", text == 'Ancien fichier café crème. ' * 10)
+
+    Path(work, 'late-bad-byte.txt').write_bytes(('é' * 50 + 'a' * 100).encode('utf-8') + b'\xff')
+    text, _, truncated = local_exporter.extract_text_from_plain(Path(work, 'late-bad-byte.txt'), max_chars=60)
+    check("bad byte past the budget keeps UTF-8", text == 'é' * 50 + 'a' * 10 and truncated)
+
+    Path(work, 'small.txt').write_text('Short note.\n' * 5)
+    text, _, outcome, _ = extract(Path(work, 'small.txt'))
+    check("small file read whole, untruncated", outcome == 'succeeded' and text == 'Short note.\n' * 5)
+
+
+def test_pdf_budget(pdf: Path):
+    print(f"\n{PAGES}-page PDF")
+    with count_pages_parsed() as parsed:
+        text, error, outcome, _ = extract(pdf, max_size_kb=1)
+    check(f"stops at the budget ({len(parsed)} of {PAGES} pages parsed)", 0 < len(parsed) < 20)
+    check("truncated at the budget", outcome == 'succeeded' and text.endswith('[Truncated at 1KB]'))
+
+    with count_pages_parsed() as parsed:
+        text, _, _, _ = extract(pdf, pdf_sample=local_exporter.PdfSample(2, 1))
+    check("--pdf-sample parses only the sampled pages", parsed == [0, 1, PAGES - 1])
+    check("and notes the gap", f'[Pages 3-{PAGES - 1} of {PAGES} not sampled]' in text)
+
+
+def test_cached_pdf_not_read_whole(pdf: Path, work: str):
+    print("\n--extract-cache")
+    uncached, _, _, _ = extract(pdf, max_size_kb=1)
+    local_exporter.configure_extraction_cache(os.path.join(work, 'cache.db'))
+
+    def read_bytes(self):
+        raise AssertionError(f'{self} read whole')
+    original_read_bytes = Path.read_bytes
+    original_block = treelisty_extract_cache.HASH_BLOCK_BYTES
+    Path.read_bytes = read_bytes
+    treelisty_extract_cache.HASH_BLOCK_BYTES = 4096
+    try:
+        with count_pages_parsed() as parsed:
+            text, error, _, hit = extract(pdf, max_size_kb=1)
+        again, _, _, hit_again = extract(pdf, max_size_kb=1)
+    finally:
+        Path.read_bytes = original_read_bytes
+        treelisty_extract_cache.HASH_BLOCK_BYTES = original_block
+    check(f"parsed from the path within the budget ({error or 'no error'})",
+          error is None and hit is False and 0 < len(parsed) < 20)
+    check("same text as without the cache", text == uncached)
+    check("second run is a cache hit", hit_again is True and again == uncached)
+    check("block hash is the file's SHA-256",
+          treelisty_extract_cache.ExtractionCache.file_digest(pdf) == hashlib.sha256(pdf.read_bytes()).hexdigest())
+    local_exporter.extraction_cache.close()
+    local_exporter.configure_extraction_cache(None)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        test_plain_text(work)
+        pdf = Path(work, 'manual.pdf')
+        write_pdf(pdf)
+        test_pdf_budget(pdf)
+        test_cached_pdf_not_read_whole(pdf, work)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Offline test: the local exporter's extraction process pool (ExtractionPipeline).
+
+Checks that extracting on worker processes gives exactly the nodes inline
+extraction gives, in the same order; that a file whose extraction hangs is
+abandoned after the per-file timeout while the rest are extracted; and that
+a worker crash recycles the pool, retrying the files it was running once.
+Worker misbehaviour is simulated by swapping the extraction function before
+the workers are forked, so this needs the fork start method (Linux).
+
+Usage:
+  python test/test-local-extraction-pipeline.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+
+original_extract = local_exporter.extract_content_uncounted
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def misbehaving_extract(file_path, *args):
+    """Runs in the workers: hang on hang-*, kill the worker on crash-* (flaky-* only the first time)"""
+    if file_path.name.startswith('hang-'):
+        time.sleep(60)
+    if file_path.name.startswith('crash-'):
+        os._exit(1)
+    if file_path.name.startswith('flaky-'):
+        marker = file_path.with_name('.crashed-' + file_path.name)
+        if not marker.exists():
+            marker.touch()
+            os._exit(1)
+    return original_extract(file_path, *args)
+
+
+def scan(folder: Path, jobs: int, timeout=local_exporter.DEFAULT_EXTRACT_TIMEOUT):
+    for key in local_exporter.extraction_stats:
+        local_exporter.extraction_stats[key] = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        nodes = local_exporter.scan_folder(folder, extract=True, jobs=jobs, extract_timeout=timeout)
+    return [without_volatile(node.to_dict()) for node in nodes]
+
+
+def without_volatile(node):
+    if '_rag' in node:
+        node['_rag'].pop('imported', None)
+    for child in node.get('children', []):
+        without_volatile(child)
+    return node
+
+
+def descriptions(nodes):
+    """path -> extracted text (None if there is none) for every file in the tree"""
+    found = {}
+    for node in nodes:
+        if node['isFolder']:
+            found.update(descriptions(node.get('children', [])))
+        else:
+            found[node['id']] = node.get('description')
+    return found
+
+
+def build_folder(root: Path):
+    for i in range(4):
+        folder = root / f'project-{i}'
+        (folder / 'notes').mkdir(parents=True)
+        for j in range(8):
+            (folder / f'readme-{j}.md').write_text(f'# Project {i}\n\n' + f'Section {j}. ' * (20 + j))
+            (folder / 'notes' / f'note-{j}.txt').write_text(f'Note {j} of project {i}. ' * 15)
+        (folder / 'data.csv').write_text('name,value\n' + ''.join(f'row{k},{k}\n' for k in range(50)))
+
+
+def test_matches_inline(root: Path):
+    print("\nworker processes vs. inline extraction")
+    inline = scan(root, jobs=0)
+    pooled = scan(root, jobs=3)
+    check("same nodes, same order", pooled == inline)
+    check("every document extracted", all(descriptions(pooled).values()))
+    return descriptions(inline)
+
+
+def scan_misbehaving(root: Path, timeout):
+    local_exporter.extract_content_uncounted = misbehaving_extract
+    try:
+        start = time.perf_counter()
+        nodes = scan(root, jobs=2, timeout=timeout)
+        return descriptions(nodes), time.perf_counter() - start
+    finally:
+        local_exporter.extract_content_uncounted = original_extract
+
+
+def test_timeout(root: Path, expected):
+    print("\na file whose extraction hangs")
+    hanging = root / 'project-0' / 'hang-forever.txt'
+    hanging.write_text('Never finishes. ' * 10)
+    found, elapsed = scan_misbehaving(root, timeout=2)
+    stats = local_exporter.extraction_stats
+    check(f"abandoned after the timeout ({elapsed:.1f}s in all)",
+          found.pop(str(hanging.resolve())) is None and stats['timed_out'] == 1 and 2 <= elapsed < 30)
+    check("every other file extracted as usual", found == expected)
+    check("counted as failed", stats['failed'] == 1 and stats['succeeded'] == len(expected))
+    hanging.unlink()
+
+
+def test_worker_crashes(root: Path, expected):
+    print("\nfiles that crash their worker")
+    crashing = root / 'project-1' / 'crash-always.txt'
+    crashing.write_text('Kills its worker. ' * 10)
+    flaky = root / 'project-2' / 'flaky-once.txt'
+    flaky.write_text('Kills its worker once. ' * 10)
+    found, _ = scan_misbehaving(root, timeout=30)
+    stats = local_exporter.extraction_stats
+    check("a file that always crashes is given up after one retry", found.pop(str(crashing.resolve())) is None)
+    check("a file that crashed once is extracted on retry", found.pop(str(flaky.resolve())) == 'Kills its worker once. ' * 10)
+    # Files running alongside a crash are retried too; only one crashing twice with them is given up
+    given_up = [path for path, text in found.items() if text is None]
+    check(f"other files extracted as usual ({len(given_up)} given up alongside the crash)",
+          len(given_up) <= 1 and all(found[path] == expected[path] for path in found if path not in given_up))
+    check("crashes counted as failed", stats['failed'] == 1 + len(given_up))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        root = Path(work, 'projects')
+        build_folder(root)
+        expected = test_matches_inline(root)
+        test_timeout(root, expected)
+        test_worker_crashes(root, expected)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Offline test: the local exporter's SQLite scan manifest (--incremental).
+
+Scans a generated folder with a ScanManifest, changes it (an edited
+document, a new file, a deleted file), and checks that each re-scan lists
+only the folders that changed, extracts only the documents that changed,
+and gives exactly the nodes a scan without the manifest gives. Also checks
+the stored text is dropped when the content budget or the manifest version
+changes.
+
+Usage:
+  python test/test-local-scan-manifest.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+class Counting:
+    """Count calls to one of the exporter's module functions while in use"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def __enter__(self):
+        self.original = getattr(local_exporter, self.name)
+
+        def counted(path, *args, **kwargs):
+            self.calls.append(str(path))
+            return self.original(path, *args, **kwargs)
+        setattr(local_exporter, self.name, counted)
+        return self
+
+    def __exit__(self, *exc):
+        setattr(local_exporter, self.name, self.original)
+
+
+def without_volatile(node):
+    if '_rag' in node:
+        node['_rag'].pop('imported', None)
+    for child in node.get('children', []):
+        without_volatile(child)
+    return node
+
+
+def scan(root: Path, db_path=None, max_content_kb=100):
+    """Nodes as dicts, plus (folders listed, files extracted) for a scan with or without a manifest"""
+    manifest = None
+    if db_path is not None:
+        manifest = local_exporter.ScanManifest(db_path, max_content_kb, local_exporter.EXTRACTABLE_EXTENSIONS)
+    with Counting('list_directory') as listed, Counting('extract_content') as extracted, \
+            contextlib.redirect_stdout(io.StringIO()):
+        nodes = local_exporter.scan_folder(root, extract=True, max_content_kb=max_content_kb, jobs=0,
+                                           manifest=manifest)
+    if manifest is not None:
+        manifest.save()
+        manifest.close()
+    return [without_volatile(node.to_dict()) for node in nodes], listed.calls, extracted.calls
+
+
+def matches_fresh_scan(root: Path, nodes, max_content_kb=100):
+    return nodes == scan(root, max_content_kb=max_content_kb)[0]
+
+
+def build_folder(root: Path):
+    for i in range(3):
+        for sub in ('drafts', 'final'):
+            folder = root / f'client-{i}' / sub
+            folder.mkdir(parents=True)
+            for j in range(4):
+                (folder / f'letter-{j}.txt').write_text(f'Letter {j} to client {i}. ' * (10 + j))
+            (folder / 'logo.png').write_bytes(b'\x89PNG' + bytes(100))
+
+
+def test_reuse_and_invalidation(root: Path, db_path: str):
+    all_dirs = 1 + 3 * 3
+    print("\nfirst scan")
+    _, listed, extracted = scan(root, db_path)
+    check(f"every folder listed ({len(listed)}) and document extracted ({len(extracted)})",
+          len(listed) == all_dirs and len(extracted) == 24)
+
+    print("\nunchanged")
+    nodes, listed, extracted = scan(root, db_path)
+    check("nothing listed or extracted", not listed and not extracted)
+    check("same nodes as a fresh scan", matches_fresh_scan(root, nodes))
+
+    print("\nan edited document")
+    edited = root / 'client-1' / 'final' / 'letter-2.txt'
+    edited.write_text('A rewritten letter. ' * 30)
+    nodes, listed, extracted = scan(root, db_path)
+    check("only it is extracted, no folder listed", extracted == [str(edited)] and not listed)
+    check("same nodes as a fresh scan", matches_fresh_scan(root, nodes))
+
+    print("\na new file and a deleted one")
+    added = root / 'client-0' / 'drafts' / 'letter-new.txt'
+    added.write_text('A new letter. ' * 20)
+    (root / 'client-2' / 'final' / 'letter-0.txt').unlink()
+    nodes, listed, extracted = scan(root, db_path)
+    check("only their folders are listed", sorted(listed) == sorted(
+        [str(root / 'client-0' / 'drafts'), str(root / 'client-2' / 'final')]))
+    check("only the new file is extracted", extracted == [str(added)])
+    check("same nodes as a fresh scan", matches_fresh_scan(root, nodes))
+    manifest = local_exporter.ScanManifest(db_path, 100)
+    stored = {path for (path,) in manifest.conn.execute("SELECT path FROM files")}
+    manifest.close()
+    check("the deleted file's text is dropped from the manifest",
+          str(root / 'client-2' / 'final' / 'letter-0.txt') not in stored and str(added) in stored)
+
+    print("\na different content budget")
+    nodes, listed, extracted = scan(root, db_path, max_content_kb=1)
+    check("every document extracted again, no folder listed", len(extracted) == 24 and not listed)
+    check("same nodes as a fresh scan", matches_fresh_scan(root, nodes, max_content_kb=1))
+
+    print("\nan older manifest version")
+    manifest = local_exporter.ScanManifest(db_path, 1)
+    with manifest.conn:
+        manifest.conn.execute("UPDATE meta SET value = '0' WHERE key = 'version'")
+    manifest.close()
+    nodes, listed, extracted = scan(root, db_path, max_content_kb=1)
+    check("everything listed and extracted again", len(listed) == all_dirs and len(extracted) == 24)
+    check("same nodes as a fresh scan", matches_fresh_scan(root, nodes, max_content_kb=1))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        root = Path(work, 'clients').resolve()
+        build_folder(root)
+        test_reuse_and_invalidation(root, os.path.join(work, 'manifest.db'))
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
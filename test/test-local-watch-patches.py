@@ -0,0 +1,186 @@
+"""
+Offline test: the local exporter's --watch JSON Patch output.
+
+Exports a generated folder, changes it (new files, an edited document, a
+deleted file, a new folder, a file replaced by a folder), rescans the
+folders watchdog would report as the watch loop does, and checks that
+replaying the patches on the base export gives a fresh export of the
+changed folder. Also checks the patches stay small: one new file next to
+a large subtree is a single add plus the changed folder fields, never a
+replaced subtree.
+
+Runs rescan_directory directly, so watchdog itself is not needed.
+
+Usage:
+  python test/test-local-watch-patches.py
+"""
+
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import export_local_folder_to_treelisty as local_exporter  # noqa: E402
+
+OPTIONS = {'max_depth': 10, 'extract': True, 'max_content_kb': 100, 'pdf_sample': None, 'sheets': None}
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def export(folder: Path):
+    output = run_quietly(local_exporter.export_folder, folder, OPTIONS['max_depth'], extract=True, jobs=0)
+    tree = local_exporter.load_tree(output)
+    os.remove(output)
+    return tree
+
+
+def apply_patch(tree, ops):
+    """A minimal RFC 6902 add/remove/replace, enough for the exporter's patches"""
+    tree = copy.deepcopy(tree)
+    for op in ops:
+        *parents, last = [part.replace('~1', '/').replace('~0', '~') for part in op['path'].split('/')[1:]]
+        target = tree
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        if isinstance(target, list):
+            index = int(last)
+            if op['op'] == 'add':
+                target.insert(index, copy.deepcopy(op['value']))
+            elif op['op'] == 'remove':
+                del target[index]
+            else:
+                target[index] = copy.deepcopy(op['value'])
+        elif op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = copy.deepcopy(op['value'])
+    return tree
+
+
+def without_volatile(tree):
+    tree = copy.deepcopy(tree)
+    tree['source'].pop('lastSync', None)
+
+    def strip(node):
+        if '_rag' in node:
+            node['_rag'].pop('imported', None)
+        for child in node.get('children', []):
+            strip(child)
+    strip(tree)
+    return tree
+
+
+def rescan(tree, root: Path, changed_paths):
+    """What the watch loop does for one batch: the changed paths' folders (and theirs, for mtimes)"""
+    dirty = set()
+    for path in changed_paths:
+        parent = os.path.dirname(str(path))
+        dirty.add(parent)
+        if parent != str(root):
+            dirty.add(os.path.dirname(parent))
+    ops = []
+    for dir_path in sorted(dirty, key=lambda d: len(local_exporter.relative_parts(str(root), d))):
+        ops.extend(run_quietly(local_exporter.rescan_directory, tree, root, dir_path, OPTIONS))
+    return ops
+
+
+def touch_later(path: Path):
+    """Make sure an edit shows up as a new mtime even on coarse filesystem clocks"""
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+
+def build_folder(root: Path):
+    for name in ('reports', 'reports/2025', 'reports/2025/q1', 'archive', 'empty'):
+        (root / name).mkdir(parents=True)
+    for i in range(150):
+        (root / 'reports/2025/q1' / f'note-{i:03d}.txt').write_text(f'Quarterly note {i}. ' * 30)
+    for i in range(5):
+        (root / 'reports' / f'summary-{i}.md').write_text(f'# Summary {i}\n\n' + 'Details follow. ' * 20)
+        (root / 'archive' / f'old-{i}.txt').write_text('Old text. ' * 10)
+    (root / 'archive' / 'was-a-file').write_text('Will become a folder. ' * 5)
+
+
+def test_replay_matches_fresh_export(root: Path):
+    print("\nreplaying patches gives a fresh export")
+    base = export(root)
+    tree = copy.deepcopy(base)
+    patches = []
+
+    edited = root / 'reports' / 'summary-2.md'
+    edited.write_text('# Summary 2\n\nRewritten with different content. ' * 5)
+    touch_later(edited)
+    (root / 'archive' / 'old-1.txt').unlink()
+    new_file = root / 'reports/2025/q1/note-new.txt'
+    new_file.write_text('A note added while watching. ' * 10)
+    patches.append(rescan(tree, root, [edited, root / 'archive' / 'old-1.txt', new_file]))
+
+    (root / 'archive' / 'was-a-file').unlink()
+    (root / 'archive' / 'was-a-file').mkdir()
+    (root / 'archive' / 'was-a-file' / 'inside.txt').write_text('Now a folder. ' * 10)
+    (root / 'fresh' / 'deep').mkdir(parents=True)
+    (root / 'fresh' / 'deep' / 'doc.txt').write_text('Brand new folder content. ' * 10)
+    (root / 'empty' / 'first.txt').write_text('The first file here. ' * 10)
+    patches.append(rescan(tree, root, [root / 'archive' / 'was-a-file', root / 'fresh', root / 'empty' / 'first.txt']))
+
+    replayed = base
+    for ops in patches:
+        replayed = apply_patch(replayed, ops)
+    check("patches take the base export to the watcher's tree", replayed == tree)
+    check("and to a fresh export of the changed folder", without_volatile(replayed) == without_volatile(export(root)))
+
+
+def test_patch_shape(root: Path):
+    print("\none new file next to a large subtree")
+    tree = export(root)
+    export_size = len(json.dumps(tree, indent=2, ensure_ascii=False))
+    new_file = root / 'reports' / 'added.txt'
+    new_file.write_text('Just one more file. ' * 10)
+    ops = rescan(tree, root, [new_file])
+    patch_size = len(json.dumps(ops, indent=2, ensure_ascii=False))
+
+    adds = [op for op in ops if op['op'] == 'add']
+    check("one add, for the new file", len(adds) == 1 and adds[0]['value']['name'] == 'added.txt')
+    check("everything else replaces single fields",
+          all(op['op'] == 'replace' and not op['path'].split('/')[-1].isdigit() for op in ops if op not in adds))
+    check("no subtree in any op", not any('children' in op.get('value', {}) for op in ops))
+    check(f"patch is small ({patch_size:,} bytes, export {export_size:,})", patch_size < 4096 < export_size / 10)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        for test in (test_replay_matches_fresh_export, test_patch_shape):
+            root = Path(work, test.__name__).resolve()
+            build_folder(root)
+            test(root)
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
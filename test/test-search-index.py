@@ -0,0 +1,303 @@
+"""
+Offline test: treelisty_search_index and the exporters' --search-index.
+
+Checks that top-k results are exactly what scoring every chunk with BM25
+gives, for rare, common and mixed queries and several k; that updating an
+index with some files changed, added and removed re-indexes only those,
+never returns their old chunks, and (once compacted) ranks exactly like an
+index built from scratch; that a run closed without saving leaves the
+index as it was; and that both exporters index every chunk they write and
+leave unchanged files alone on the next run.
+
+The exporter checks need the Drive exporter's Google client libraries
+installed; no network or credentials are used.
+
+Usage:
+  python test/test-search-index.py
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import treelisty_search_index as search  # noqa: E402
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def make_files(rng: random.Random, count: int, prefix: str = 'f'):
+    """{file id: [(chunk node id, text)]}, words drawn from a skewed vocabulary like real text"""
+    words = [f'w{i}' for i in range(1500)]
+    weights = [1 / (i + 1) for i in range(len(words))]
+    return {f'{prefix}{i}': [(f'{prefix}{i}-c{j}-{rng.random():.6f}',
+                              ' '.join(rng.choices(words, weights, k=rng.randint(0, 150))))
+                             for j in range(rng.randint(1, 6))]
+            for i in range(count)}
+
+
+def brute_force(files, query, k):
+    """BM25 over every chunk, best first, as (rounded score, node id)"""
+    chunks = [(node_id, search.tokenize(text)) for file_chunks in files.values() for node_id, text in file_chunks
+              if search.tokenize(text)]
+    avg_length = sum(len(terms) for _, terms in chunks) / len(chunks)
+    query_terms = list(dict.fromkeys(search.tokenize(query)))
+    df = {term: sum(term in terms for _, terms in chunks) for term in query_terms}
+    scored = []
+    for node_id, terms in chunks:
+        score = 0.0
+        for term in query_terms:
+            tf = terms.count(term)
+            if tf:
+                idf = math.log(1 + (len(chunks) - df[term] + 0.5) / (df[term] + 0.5))
+                score += idf * tf * (search.K1 + 1) / (
+                    tf + search.K1 * (1 - search.B + search.B * len(terms) / avg_length))
+        if score > 0:
+            scored.append((round(score, 6), node_id))
+    scored.sort(key=lambda hit: -hit[0])
+    return scored[:k]
+
+
+def build(path, files):
+    index = search.SearchIndexWriter(path)
+    for file_id, chunks in files.items():
+        index.add_file(file_id, chunks)
+    index.save()
+    return index
+
+
+QUERIES = ['w0', 'w0 w1 w2', 'w3 w700', 'w1499', 'w12 w40 w900 w1400', 'W5, w5 and w5!', 'absent', '']
+
+
+def results(index, query, k):
+    return [(round(hit.score, 6), hit.node_id) for hit in index.search(query, k)]
+
+
+def same_ranking(actual, expected):
+    # Equal scores may come in any order
+    return [score for score, _ in actual] == [score for score, _ in expected] and \
+        {node for score, node in actual if score > expected[-1][0]} == \
+        {node for score, node in expected if score > expected[-1][0]} if expected else not actual
+
+
+def test_exact_top_k():
+    print("\ntop-k against scoring every chunk")
+    files = make_files(random.Random(1), 2000)
+    build('exact.db', files).close()
+    original_share = search.NUMPY_DF_SHARE
+    for use_numpy in ([False, True] if search.HAS_NUMPY else [False]):
+        # Score every query with numpy, not just those of common words
+        search.NUMPY_DF_SHARE = 0 if use_numpy else original_share
+        index = search.SearchIndex('exact.db', use_numpy=use_numpy)
+        for k in (1, 10, 100):
+            mismatched = [query for query in QUERIES
+                          if not same_ranking(results(index, query, k), brute_force(files, query, k))]
+            check(f"{'numpy' if use_numpy else 'pure Python'}, k={k}: same results for {len(QUERIES)} queries",
+                  not mismatched)
+        index.close()
+    search.NUMPY_DF_SHARE = original_share
+    if not search.HAS_NUMPY:
+        print("  (numpy not installed: vectorized scoring not checked)")
+
+
+def test_incremental_update():
+    print("\nincremental update")
+    rng = random.Random(2)
+    files = make_files(rng, 1500)
+    build('incremental.db', files).close()
+
+    updated = dict(files)
+    changed = rng.sample(sorted(files), 100)
+    for file_id in changed[:60]:
+        updated[file_id] = make_files(rng, 1, f'{file_id}-v2-')[f'{file_id}-v2-0']
+    for file_id in changed[60:]:
+        del updated[file_id]
+    updated.update(make_files(rng, 50, 'new'))
+
+    index = search.SearchIndexWriter('incremental.db')
+    for file_id, chunks in updated.items():
+        index.add_file(file_id, chunks)
+    index.save()
+    check(f"only changed and new files re-indexed ({index.stats})",
+          index.stats == {'files_added': 110, 'files_unchanged': 1400, 'files_deleted': 40,
+                          'chunks_added': sum(bool(text) for f in changed[:60] + [f'new{i}' for i in range(50)]
+                                              for _, text in updated[f])})
+
+    reader = search.SearchIndex('incremental.db')
+    current = {node_id for chunks in updated.values() for node_id, text in chunks if text}
+    stale = [hit for query in QUERIES for hit in reader.search(query, 500) if hit.node_id not in current]
+    check("old chunks of changed and removed files never returned", not stale)
+    reader.close()
+
+    index.compact()
+    index.conn.commit()
+    index.close()
+    build('fresh.db', updated).close()
+    compacted, fresh = search.SearchIndex('incremental.db'), search.SearchIndex('fresh.db')
+    check("compacted index ranks exactly like one built from scratch",
+          all(results(compacted, query, 50) == results(fresh, query, 50) for query in QUERIES))
+    check("compaction left one segment of live chunks",
+          len(compacted.lengths) == len(current) and
+          compacted.conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0] == 1)
+    compacted.close()
+    fresh.close()
+
+    index = search.SearchIndexWriter('fresh.db')
+    index.add_file('only', [('only-c0', 'w0 w1')])
+    index.close()
+    reader = search.SearchIndex('fresh.db')
+    check("closing without save() leaves the index as it was",
+          len(reader.lengths) == len(current) and not any(hit.file_id == 'only' for hit in reader.search('w0', 5000)))
+    reader.close()
+
+    original_segment_postings = search.SEGMENT_POSTINGS
+    search.SEGMENT_POSTINGS = 5000
+    try:
+        build('segmented.db', updated).close()
+    finally:
+        search.SEGMENT_POSTINGS = original_segment_postings
+    segmented = search.SearchIndex('segmented.db')
+    fresh = search.SearchIndex('fresh.db')
+    check(f"an index written in {segmented.conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]} "
+          f"segments ranks the same",
+          all(results(segmented, query, 50) == results(fresh, query, 50) for query in QUERIES))
+    segmented.close()
+    fresh.close()
+
+
+def tree_chunk_ids(node):
+    """Node ids of the chunks in an exported knowledge-base tree"""
+    ids = []
+    for child in node.get('children', []):
+        if child.get('items'):
+            ids += [item['id'] for item in child['items']]
+        elif 'description' in child:
+            ids.append(child['id'])
+        ids += tree_chunk_ids(child)
+    return ids
+
+
+def test_local_exporter():
+    print("\nlocal folder exporter --search-index")
+    import export_local_folder_to_treelisty as local_exporter
+
+    folder = Path('local')
+    (folder / 'sub').mkdir(parents=True)
+    for i in range(20):
+        (folder / ('sub' if i % 2 else '.') / f'note-{i}.txt').write_text(
+            f'Meeting notes {i}. The team discussed topic{i} and the budget. ' * 5, encoding='utf-8')
+    (folder / 'image.png').write_bytes(b'not text')
+    run_quietly(local_exporter.export_folder, folder, extract=True, jobs=0, search_index_path='local.db')
+    index = search.SearchIndex('local.db')
+    hits = index.search('topic7 budget', 3)
+    check("every extracted file indexed", len(index.lengths) == 20)
+    check("query finds the file", hits and hits[0].node_id == str((folder / 'sub' / 'note-7.txt').resolve()))
+    index.close()
+
+    (folder / 'note-4.txt').write_text('Rewritten entirely: nothing about the old subject.', encoding='utf-8')
+    (folder / 'sub' / 'note-5.txt').unlink()
+    writer_stats = []
+    original_save = search.SearchIndexWriter.save
+
+    def save(index, export_file=''):
+        original_save(index, export_file)
+        writer_stats.append(dict(index.stats))
+    search.SearchIndexWriter.save = save
+    try:
+        run_quietly(local_exporter.export_folder, folder, extract=True, jobs=0, search_index_path='local.db')
+    finally:
+        search.SearchIndexWriter.save = original_save
+    check(f"next run re-indexes only what changed ({writer_stats[0]})",
+          writer_stats[0] == {'files_added': 1, 'files_unchanged': 18, 'files_deleted': 1, 'chunks_added': 1})
+    index = search.SearchIndex('local.db')
+    check("the edit is searchable", index.search('rewritten', 1)[0].node_id.endswith('note-4.txt'))
+    check("the deleted file is gone", not any(hit.node_id.endswith('note-5.txt') for hit in index.search('topic5', 20)))
+    index.close()
+
+
+def test_drive_exporter():
+    print("\nDrive content exporter --search-index")
+    try:
+        import export_gdrive_content_to_treelisty as content_exporter
+        from fake_drive import FakeDrive
+    except ImportError as e:
+        print(f"  (skipped: {e})")
+        return
+
+    drive = FakeDrive(page_size=7)
+    for i in range(6):
+        folder = drive.add_folder(f'Folder {i}', 'root')
+        for j in range(4):
+            drive.add_file(f'notes-{i}-{j}.txt', folder,
+                           '\n\n'.join(f'Section {s} of report{i}x{j} covers item{s}.' * 8 for s in range(6)).encode())
+    content_exporter.authenticate = lambda: drive
+    output = run_quietly(content_exporter.export_gdrive_content, 'root', 3, chunk_size=300, downloaders=0,
+                         manifest_path='drive.manifest.db', search_index_path='drive.db')
+    with open(output, 'r', encoding='utf-8') as f:
+        tree = json.load(f)
+    index = search.SearchIndex('drive.db')
+    indexed = {row[0] for row in index.conn.execute("SELECT node_id FROM docs")}
+    chunk_ids = tree_chunk_ids(tree)
+    check(f"every chunk node indexed by its id ({len(chunk_ids)} chunks)", indexed == set(chunk_ids))
+    check("index records the export it belongs to", index.export_file == output)
+    hit = index.search('report3x2 item4', 1)[0]
+    chunk = next(item for child in tree['children'] for sub in child.get('children', [])
+                 for item in sub.get('items', []) if item['id'] == hit.node_id)
+    check("top hit is the chunk with both terms", 'report3x2' in chunk['description'] and
+          'item4' in chunk['description'])
+    index.close()
+
+    stats = []
+    original_save = search.SearchIndexWriter.save
+
+    def save(index, export_file=''):
+        original_save(index, export_file)
+        stats.append(dict(index.stats))
+    search.SearchIndexWriter.save = save
+    try:
+        run_quietly(content_exporter.export_gdrive_content, 'root', 3, chunk_size=300, downloaders=0,
+                    manifest_path='drive.manifest.db', search_index_path='drive.db')
+    finally:
+        search.SearchIndexWriter.save = original_save
+    check(f"unchanged drive: nothing re-indexed ({stats[0]})",
+          stats[0]['files_added'] == 0 and stats[0]['files_unchanged'] == 24)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_exact_top_k()
+        test_incremental_update()
+        test_local_exporter()
+        test_drive_exporter()
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Offline test: treelisty_spreadsheet and the exporters' spreadsheet extraction.
+
+Checks that sheets come out as their first rows or a column summary within
+the row and character budgets, that only about as many rows are read as the
+budgets need however many there are, that headers are found below titles
+and not invented for headerless data, that CSV delimiters are detected,
+and that the local exporter (CSV files) and the Drive content exporter
+(Google Sheets, and Excel workbooks if openpyxl is installed) write bounded
+descriptions and re-extract spreadsheets when the sheet options change.
+
+The Drive exporter checks need its Google client libraries installed; no
+network or credentials are used.
+
+Usage:
+  python test/test-spreadsheet-extraction.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'test'))
+
+import treelisty_spreadsheet as sheets  # noqa: E402
+from treelisty_spreadsheet import SUMMARY, SheetOptions  # noqa: E402
+
+failures = []
+
+
+def check(label, ok):
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+REGIONS = ['West', 'East', 'North', 'South']
+
+
+def sales_rows(count, title=True):
+    """A sales sheet: optional title and blank row, header, then `count` rows"""
+    if title:
+        yield ['Quarterly sales']
+        yield []
+    yield ['Date', 'Region', 'Amount', 'Note']
+    for i in range(count):
+        yield [datetime(2024, 1, 1) + timedelta(days=i % 365), REGIONS[i % 4], (i * 37) % 1000 + 0.5,
+               'checked' if i % 7 == 0 else None]
+
+
+class CountingRows:
+    """Rows that count how many were pulled"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.pulled = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self.rows)
+        self.pulled += 1
+        return row
+
+
+def test_rows_mode():
+    print("\nrows mode")
+    rows = CountingRows(sales_rows(1_000_000))
+    text = sheets.sheet_text(rows, SheetOptions(max_rows=20), 'Sales', total_rows=1_000_003)
+    lines = text.split('\n')
+    check("title, header and the first 20 rows", lines[:4] == ['## Sheet: Sales', '', 'Quarterly sales',
+                                                              'Date | Region | Amount | Note']
+          and lines[4] == '2024-01-01 | West | 0.5 | checked' and len(lines) == 4 + 20 + 1)
+    check(f"note of how many there were ({lines[-1]})", lines[-1] == '[First 20 rows of ~1,000,000]')
+    check(f"only the rows needed read ({rows.pulled:,} of 1,000,003)", rows.pulled < 100)
+
+    text = sheets.sheet_text(sales_rows(1_000_000), SheetOptions(max_rows=10_000, max_chars=3000))
+    check(f"character budget ({len(text)} chars)", len(text) <= 3000 + 40 and text.endswith('rows]'))
+
+    rows = CountingRows([None] * 5 for _ in range(1_000_000))
+    text = sheets.sheet_text(rows, SheetOptions(scan_rows=5000))
+    check(f"blank rows count against the rows read ({rows.pulled:,})", rows.pulled <= 5001 and text == '[First 0 rows]')
+
+    small = sheets.sheet_text([['a', 'b'], [1, 2], [3, None, None]], SheetOptions())
+    check("a small sheet whole, trailing empty cells dropped, no note", small == 'a | b\n1 | 2\n3')
+    check("cells kept on one line and cut", sheets.cell_text('line one\nline two') == 'line one line two' and
+          len(sheets.cell_text('x' * 1000)) == sheets.MAX_CELL_CHARS)
+
+
+def test_summary_mode():
+    print("\nsummary mode")
+    rows = CountingRows(sales_rows(200_000))
+    text = sheets.sheet_text(rows, SheetOptions(mode=SUMMARY, scan_rows=20_000), 'Sales', total_rows=200_003)
+    check(f"rows read stop at scan_rows ({rows.pulled:,})", rows.pulled <= 20_001)
+    check("counts, with how many there were", '19,997 rows × 4 columns (the first 19,997 rows of ~200,000)' in text)
+    check("date column: type, distinct, range", '- Date (date): 365 distinct, 2024-01-01 to 2024-12-30' in text)
+    check("text column: distinct and most common values",
+          '- Region (text): 4 distinct, most common: West (5,000), East (4,999), North (4,999), South (4,999)'
+          in text)
+    check("number column: range", '- Amount (number): 1,000 distinct, 0.5 to 999.5' in text)
+    check("sparse column: empty count", '- Note (text): 1 distinct, most common: checked (2,857), 17,140 empty'
+          in text)
+    samples = text.split('Sample rows:\n')[1].split('\n')
+    check("sample rows under the header", samples[0] == 'Date | Region | Amount | Note' and len(samples) == 6)
+
+    wide = [[f'col{i}' for i in range(500)]] + [[str(i * j) for i in range(500)] for j in range(100)]
+    text = sheets.sheet_text(wide, SheetOptions(mode=SUMMARY, max_chars=2000))
+    check(f"wide sheet: columns and characters within budget ({len(text)} chars)",
+          len(text) <= 2000 + 30 and '- col49 ' in text or text.endswith('[Summary truncated]'))
+    check("distinct values capped", '1,000+ distinct' in sheets.sheet_text(
+        (['id', 'n'] if i == 0 else [f'x{i}', i] for i in range(5000)), SheetOptions(mode=SUMMARY)))
+
+
+def test_header_detection():
+    print("\nheader detection")
+    find = sheets.find_header
+    check("below a title", find([['Report'], [], ['Name', 'Age'], ['Ann', '31']]) == 2)
+    check("numeric first row: no header", find([['1', '2'], ['3', '4']]) is None)
+    check("values repeating below: no header", find([['Alice', 'Engineer'], ['Bob', 'Engineer']]) is None)
+    check("repeated names: no header", find([['x', 'x'], ['1', '2']]) is None)
+    check("text header over text data", find([['Name', 'City'], ['Ann', 'Oslo'], ['Bo', 'Rome']]) == 0)
+    text = sheets.sheet_text([['Ann', 'Oslo'], ['Ann', 'Rome']], SheetOptions(mode=SUMMARY))
+    check("no header: columns by letter", '- Column A (text)' in text and '- Column B (text)' in text)
+
+
+def test_csv():
+    print("\nCSV")
+    data = 'name;amount;city\n' + ''.join(f'n{i};{i % 90};"City {i % 13}; center"\n' for i in range(100_000))
+    text = sheets.csv_text(io.StringIO(data, newline=''), SheetOptions(mode=SUMMARY))
+    check("semicolon delimiter detected, quoted delimiters kept",
+          '- city (text): 13 distinct' in text and 'City 0; center' in text)
+    text = sheets.csv_text(io.StringIO('a,b\n"multi\nline",2\n', newline=''), SheetOptions())
+    check("quoted newlines stay in their cell", text == 'a | b\nmulti line | 2')
+    check("empty file", sheets.csv_text(io.StringIO(''), SheetOptions()) == '')
+
+
+def test_local_exporter():
+    print("\nlocal folder exporter: CSV files")
+    import export_local_folder_to_treelisty as local_exporter
+
+    folder = Path('local')
+    folder.mkdir()
+    with open(folder / 'big.csv', 'w', encoding='utf-8', newline='') as f:
+        f.write('id,region,amount\n')
+        for i in range(300_000):
+            f.write(f'{i},{REGIONS[i % 4]},{i % 997}\n')
+    (folder / 'small.csv').write_text('a,b\n1,2\n', encoding='utf-8')
+
+    def export(**kwargs):
+        output = run_quietly(local_exporter.export_folder, folder, extract=True, jobs=0, **kwargs)
+        with open(output, 'r', encoding='utf-8') as f:
+            tree = json.load(f)
+        os.remove(output)
+        return {child['name']: child.get('description') for child in tree['children'][0]['children']}
+
+    start = time.perf_counter()
+    described = export(manifest_path='local.manifest.db')
+    seconds = time.perf_counter() - start
+    check(f"large CSV: first rows only ({len(described['big.csv']):,} chars, {seconds:.2f}s)",
+          described['big.csv'].startswith('id | region | amount\n0 | West | 0') and
+          described['big.csv'].endswith('[First 200 rows]') and len(described['big.csv']) < 5000)
+    check("small CSV whole", described['small.csv'] == 'a | b\n1 | 2')
+
+    described = export(manifest_path='local.manifest.db', sheets=SheetOptions(mode=SUMMARY))
+    check("other sheet options: CSV files extracted again",
+          '- region (text): 4 distinct' in described['big.csv'] and 'Sample rows:' in described['big.csv'])
+    described = export(max_content_kb=1)
+    check("max content size still applies", len(described['big.csv']) <= 1024 + 40)
+
+
+def test_drive_exporter():
+    print("\nDrive content exporter: Google Sheets and Excel")
+    try:
+        import export_gdrive_content_to_treelisty as content_exporter
+        from fake_drive import FakeDrive
+    except ImportError as e:
+        print(f"  (skipped: {e})")
+        return
+
+    drive = FakeDrive(page_size=7)
+    rows = ['Date,Region,Amount'] + [f'2024-01-{i % 28 + 1:02d},{REGIONS[i % 4]},{i % 500}' for i in range(100_000)]
+    drive.add_file('Sales', 'root', ('\n'.join(rows) + '\n').encode(), content_exporter.GOOGLE_SHEET)
+    if content_exporter.HAS_OPENPYXL:
+        import openpyxl
+        workbook = openpyxl.Workbook()
+        workbook.active.title = 'Orders'
+        for row in sales_rows(5000):
+            workbook.active.append(row)
+        for i in range(30):
+            workbook.create_sheet(f'Extra {i}').append(['x', 'y'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        drive.add_file('orders.xlsx', 'root', buffer.getvalue(), content_exporter.EXCEL)
+    content_exporter.authenticate = lambda: drive
+
+    def export(**kwargs):
+        output = run_quietly(content_exporter.export_gdrive_content, 'root', 2, downloaders=0, extract_jobs=0,
+                             manifest_path='drive.manifest.db', **kwargs)
+        with open(output, 'r', encoding='utf-8') as f:
+            tree = json.load(f)
+        os.remove(output)
+        return {child['name']: '\n'.join(item['description'] for item in child['items']) if 'items' in child
+                else child['description'] for child in tree['children']}
+
+    described = export(sheets=SheetOptions(max_rows=50))
+    check(f"Google Sheet: first rows ({len(described['Sales']):,} chars)",
+          described['Sales'].startswith('Date | Region | Amount\n2024-01-01 | West | 0') and
+          '[First 50 rows]' in described['Sales'] and len(described['Sales']) < 2000)
+    if content_exporter.HAS_OPENPYXL:
+        check("Excel: sheets within budget, the rest noted",
+              '## Sheet: Orders' in described['orders.xlsx'] and '[First 50 rows of ~5,000]' in described['orders.xlsx']
+              and '[11 more sheets not extracted]' in described['orders.xlsx'])
+    else:
+        print("  (openpyxl not installed: Excel not checked)")
+
+    drive.calls.clear()
+    export(sheets=SheetOptions(max_rows=50))
+    check("same options: spreadsheets reused", drive.calls['media'] == 0)
+    described = export(sheets=SheetOptions(mode=SUMMARY))
+    check("other options: spreadsheets read again",
+          drive.calls['media'] == 1 + content_exporter.HAS_OPENPYXL and
+          '- Region (text): 4 distinct' in described['Sales'] and '(the first 9,999 rows)' in described['Sales'])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        test_rows_mode()
+        test_summary_mode()
+        test_header_detection()
+        test_csv()
+        test_local_exporter()
+        test_drive_exporter()
+        os.chdir(ROOT)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("✅ All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,634 @@
+"""
+TreeListy API Cassettes
+Record/replay transport for the Google exporters (Drive, Drive content,
+Gmail, Calendar), so they can be profiled and regression-tested offline.
+
+Each exporter's authenticate() goes through this module. Normally it does
+nothing. With environment variables set it either records every HTTP
+response the Google client receives to a cassette file, or serves the
+exporter entirely from a cassette: no credentials, no network, with an
+optional simulated round-trip latency.
+
+    TREELISTY_CASSETTE=drive.cassette        Cassette file
+    TREELISTY_CASSETTE_MODE=record|replay    (default: replay)
+    TREELISTY_CASSETTE_LATENCY_MS=40         Sleep per round trip when replaying
+
+A cassette is one interaction per line: its match key, a tab, then the
+interaction as JSON (method, uri, status, headers, body). Requests match on
+method, path and query parameters, ignoring ones that only shape the
+response (fields, pageSize, maxResults); a request that doesn't match
+exactly gets the next unused response for the same method and path, so
+date-filtered queries (Gmail's after:, Calendar's timeMin) still replay on
+another day. Batch requests are recorded and replayed as their individual
+calls, so a cassette works with and without batching. Replay reads
+interactions from disk on demand, so million-item cassettes don't have to
+fit in memory.
+
+Synthetic cassettes of any size can be generated for benchmarking:
+
+    python treelisty_cassette.py synth drive 100k -o drive-100k.cassette
+    python treelisty_cassette.py synth gmail 10k -o gmail-10k.cassette
+    python treelisty_cassette.py synth calendar 1m -o calendar-1m.cassette
+
+    TREELISTY_CASSETTE=drive-100k.cassette python export_google_drive_to_treelisty.py 20
+"""
+
+import argparse
+import atexit
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from email.parser import Parser
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+ENV_CASSETTE = 'TREELISTY_CASSETTE'
+ENV_MODE = 'TREELISTY_CASSETTE_MODE'
+ENV_LATENCY = 'TREELISTY_CASSETTE_LATENCY_MS'
+
+# Query parameters that only shape a response, not which data it holds
+IGNORED_PARAMS = {'fields', 'pageSize', 'maxResults', 'prettyPrint'}
+
+# Response headers worth keeping (the rest are dates, cookies, tracing ids)
+KEPT_HEADERS = ('content-type', 'content-range')
+
+BATCH_BOUNDARY = 'treelisty_cassette_batch'
+
+# Fix Windows console encoding for emojis
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def match_key(method: str, uri: str) -> str:
+    """Key a request is matched on: method, path and the data-selecting query parameters"""
+    parts = urlsplit(uri)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    return f"{method} {unquote(parts.path)}?{urlencode(params)}"
+
+
+def route_key(method: str, uri: str) -> str:
+    """Looser key for requests without an exact match: method and path"""
+    return f"{method} {unquote(urlsplit(uri).path)}"
+
+
+def is_batch(uri: str) -> bool:
+    return urlsplit(uri).path.startswith('/batch')
+
+
+# =============================================================================
+# Cassette files
+# =============================================================================
+
+class CassetteWriter:
+    """Appends interactions to a cassette file; safe to share between threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.f = open(path, 'w', encoding='utf-8')
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def add(self, method: str, uri: str, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        """Record one response; body is bytes, text, or a JSON value (written as JSON)"""
+        interaction = {'method': method, 'uri': uri, 'status': status,
+                       'headers': headers or {'content-type': 'application/json; charset=UTF-8'}}
+        if isinstance(body, (bytes, bytearray)):
+            try:
+                interaction['body'] = body.decode('utf-8')
+            except UnicodeDecodeError:
+                interaction['body_b64'] = base64.b64encode(body).decode('ascii')
+        elif isinstance(body, str):
+            interaction['body'] = body
+        elif isinstance(body, _StreamedList):
+            interaction['body'] = body.to_json()
+        else:
+            interaction['body'] = json.dumps(body, ensure_ascii=False, separators=(',', ':'))
+        line = match_key(method, uri) + '\t' + json.dumps(interaction, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.f.write(line)
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            if not self.f.closed:
+                self.f.close()
+
+
+class Cassette:
+    """
+    Recorded interactions indexed by match key and by route, read from disk
+    when served. Each recorded response is served once, in recorded order,
+    except that the last one for a key keeps being served (a repeated
+    request gets the same answer).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.exact = {}     # match key -> deque of line offsets
+        self.routes = {}    # route key -> deque of line offsets
+        self.used = set()
+        self.misses = 0
+        with open(path, 'rb') as f:
+            offset = 0
+            for line in f:
+                key = line[:line.index(b'\t')].decode('utf-8')
+                self.exact.setdefault(key, deque()).append(offset)
+                method, _, rest = key.partition(' ')
+                self.routes.setdefault(f"{method} {rest.partition('?')[0]}", deque()).append(offset)
+                offset += len(line)
+        self.f = open(path, 'rb')
+
+    def __len__(self):
+        return sum(len(offsets) for offsets in self.exact.values())
+
+    def lookup(self, method: str, uri: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            offset = self._take(self.exact.get(match_key(method, uri)))
+            if offset is None:
+                offset = self._take(self.routes.get(route_key(method, uri)), unused_only=True)
+            if offset is None:
+                self.misses += 1
+                if self.misses <= 5:
+                    print(f"⚠️  Cassette miss: {method} {uri}", file=sys.stderr)
+                return None
+            self.used.add(offset)
+            self.f.seek(offset)
+            line = self.f.readline()
+        return json.loads(line[line.index(b'\t') + 1:])
+
+    def _take(self, offsets, unused_only=False):
+        if not offsets:
+            return None
+        if unused_only:
+            while offsets and offsets[0] in self.used:
+                offsets.popleft()
+            return offsets.popleft() if offsets else None
+        return offsets.popleft() if len(offsets) > 1 else offsets[0]
+
+
+_cassettes = {}
+_writers = {}
+_registry_lock = threading.Lock()
+
+
+def open_cassette(path: str) -> Cassette:
+    """Cassette for path, shared by every service replaying it in this process"""
+    with _registry_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+def open_writer(path: str) -> CassetteWriter:
+    with _registry_lock:
+        if path not in _writers:
+            _writers[path] = CassetteWriter(path)
+            atexit.register(_writers[path].close)
+        return _writers[path]
+
+
+# =============================================================================
+# HTTP transports (httplib2.Http-compatible, as googleapiclient expects)
+# =============================================================================
+
+def make_response(status: int, headers: Dict[str, str], body: bytes):
+    import httplib2
+    response = httplib2.Response(dict(headers, status=str(status), **{'content-length': str(len(body))}))
+    response.reason = 'OK' if status < 300 else 'Error'
+    return response
+
+
+def interaction_body(interaction: Dict[str, Any]) -> bytes:
+    if 'body_b64' in interaction:
+        return base64.b64decode(interaction['body_b64'])
+    return interaction.get('body', '').encode('utf-8')
+
+
+def split_batch_request(body, headers: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """(content id, method, uri) for each call in a batch request body"""
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    content_type = {k.lower(): v for k, v in headers.items()}['content-type']
+    message = Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n{body}")
+    calls = []
+    for part in message.get_payload():
+        request_line, _, rest = part.get_payload().replace('\r\n', '\n').partition('\n')
+        method, path, _ = request_line.split(' ', 2)
+        host = Parser().parsestr(rest)['Host']
+        calls.append((part['Content-ID'].strip('<>'), method, f"https://{host}{path}"))
+    return calls
+
+
+def split_batch_response(content: bytes, content_type: str) -> Dict[str, Tuple[int, Dict[str, str], bytes]]:
+    """Content id -> (status, headers, body) for each call in a batch response"""
+    message = Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n{content.decode('utf-8')}")
+    responses = {}
+    for part in message.get_payload():
+        payload = part.get_payload()
+        status_line, _, rest = payload.partition('\n')
+        head, _, body = rest.replace('\r\n', '\n').partition('\n\n')
+        part_headers = Parser().parsestr(head + '\n\n')
+        content_id = part['Content-ID'].strip('<>')
+        if content_id.startswith('response-'):
+            content_id = content_id[len('response-'):]
+        responses[content_id] = (int(status_line.split(' ')[1]),
+                                 {k.lower(): v for k, v in part_headers.items() if k.lower() in KEPT_HEADERS},
+                                 body.encode('utf-8'))
+    return responses
+
+
+def join_batch_response(parts: List[Tuple[str, int, Dict[str, str], bytes]]) -> bytes:
+    chunks = []
+    for content_id, status, headers, body in parts:
+        content_type = headers.get('content-type', 'application/json; charset=UTF-8')
+        chunks.append(f"--{BATCH_BOUNDARY}\r\nContent-Type: application/http\r\n"
+                      f"Content-ID: <response-{content_id}>\r\n\r\n"
+                      f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                      f"Content-Type: {content_type}\r\n\r\n{body.decode('utf-8')}\r\n")
+    chunks.append(f"--{BATCH_BOUNDARY}--")
+    return ''.join(chunks).encode('utf-8')
+
+
+class RecordingHttp:
+    """Passes requests to a real (authorized) Http and records each response"""
+
+    def __init__(self, http, writer: CassetteWriter):
+        self.http = http
+        self.writer = writer
+
+    def request(self, uri, method='GET', body=None, headers=None, *args, **kwargs):
+        response, content = self.http.request(uri, method, body=body, headers=headers, *args, **kwargs)
+        if is_batch(uri) and response.status < 300:
+            calls = split_batch_request(body, headers or {})
+            answers = split_batch_response(content, response['content-type'])
+            for content_id, call_method, call_uri in calls:
+                if content_id in answers:
+                    status, part_headers, part_body = answers[content_id]
+                    self.writer.add(call_method, call_uri, status, part_body, part_headers)
+        else:
+            kept = {k: v for k, v in response.items() if k in KEPT_HEADERS}
+            self.writer.add(method, uri, response.status, content, kept)
+        return response, content
+
+
+class ReplayHttp:
+    """Answers requests from a cassette, sleeping `latency` seconds per round trip"""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0):
+        self.cassette = cassette
+        self.latency = latency
+
+    def request(self, uri, method='GET', body=None, headers=None, *args, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        if is_batch(uri):
+            parts = [(content_id,) + self._answer(call_method, call_uri)
+                     for content_id, call_method, call_uri in split_batch_request(body, headers or {})]
+            return (make_response(200, {'content-type': f'multipart/mixed; boundary={BATCH_BOUNDARY}'}, b''),
+                    join_batch_response(parts))
+        status, response_headers, content = self._answer(method, uri)
+        return make_response(status, response_headers, content), content
+
+    def _answer(self, method, uri) -> Tuple[int, Dict[str, str], bytes]:
+        interaction = self.cassette.lookup(method, uri)
+        if interaction is None:
+            error = {'error': {'code': 404, 'message': f'Not in cassette: {method} {uri}'}}
+            return 404, {'content-type': 'application/json'}, json.dumps(error).encode('utf-8')
+        return interaction['status'], interaction.get('headers', {}), interaction_body(interaction)
+
+
+# =============================================================================
+# Exporter hooks
+# =============================================================================
+
+def cassette_mode() -> Optional[str]:
+    """'record', 'replay', or None when no cassette is configured"""
+    if not os.environ.get(ENV_CASSETTE):
+        return None
+    mode = os.environ.get(ENV_MODE, 'replay').lower()
+    if mode not in ('record', 'replay'):
+        raise ValueError(f"{ENV_MODE} must be 'record' or 'replay', not {mode!r}")
+    return mode
+
+
+def replay_service(api: str, version: str):
+    """
+    A googleapiclient service answered from the configured cassette, or
+    None unless replaying. Exporters call this first in authenticate().
+    """
+    if cassette_mode() != 'replay':
+        return None
+    from googleapiclient.discovery import build
+    latency = float(os.environ.get(ENV_LATENCY, 0) or 0) / 1000
+    http = ReplayHttp(open_cassette(os.environ[ENV_CASSETTE]), latency)
+    return build(api, version, http=http, static_discovery=True)
+
+
+def build_service(api: str, version: str, credentials):
+    """build(api, version, credentials=...), recording responses when configured to"""
+    from googleapiclient.discovery import build
+    if cassette_mode() != 'record':
+        return build(api, version, credentials=credentials)
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    http = RecordingHttp(AuthorizedHttp(credentials, http=httplib2.Http()),
+                         open_writer(os.environ[ENV_CASSETTE]))
+    return build(api, version, http=http, static_discovery=True)
+
+
+# =============================================================================
+# Synthetic cassettes
+# =============================================================================
+
+DRIVE_API = 'https://www.googleapis.com/drive/v3'
+GMAIL_API = 'https://gmail.googleapis.com/gmail/v1/users/me'
+CALENDAR_API = 'https://www.googleapis.com/calendar/v3'
+
+SYNTH_ROOT_ID = 'synthetic-root'
+SYNTH_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+SYNTH_FILE_TYPES = [
+    ('.mov', 'video/quicktime'), ('.png', 'image/png'), ('.jpg', 'image/jpeg'),
+    ('.zip', 'application/zip'), ('.mp4', 'video/mp4'), ('.xlsx', 'application/octet-stream'),
+]
+
+
+def parse_count(text: str) -> int:
+    """'10k', '100k', '1m' or a plain number"""
+    text = text.strip().lower().replace('_', '').replace(',', '')
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+class SyntheticDrive:
+    """
+    A deterministic drive of `items` folders and files, computed on demand.
+
+    Items are numbered in breadth-first order in blocks of
+    `subfolders + files` children: block 0 is My Drive's contents and block
+    b is the contents of the b-th folder, so any item's parent and any
+    folder's listing follow from arithmetic, without holding the drive in
+    memory. Every `text_every`-th file is plain text with downloadable
+    content; the rest aren't extractable.
+    """
+
+    def __init__(self, items: int, subfolders: int = 6, files: int = 24, text_every: int = 20,
+                 text_bytes: int = 1200):
+        self.items = items
+        self.subfolders = subfolders
+        self.block = subfolders + files
+        self.text_every = text_every
+        self.text_bytes = text_bytes
+
+    def is_folder(self, i: int) -> bool:
+        return i % self.block < self.subfolders
+
+    def folder_ordinal(self, i: int) -> int:
+        return (i // self.block) * self.subfolders + i % self.block
+
+    def item_id(self, i: int) -> str:
+        return f"syn{i:08d}"
+
+    def parent_id(self, i: int) -> str:
+        block = i // self.block
+        if block == 0:
+            return SYNTH_ROOT_ID
+        # Block b holds the children of folder ordinal b - 1
+        ordinal = block - 1
+        return self.item_id((ordinal // self.subfolders) * self.block + ordinal % self.subfolders)
+
+    def children(self, folder_index: Optional[int]) -> range:
+        """Item indexes in a folder (None = My Drive)"""
+        block = 0 if folder_index is None else self.folder_ordinal(folder_index) + 1
+        start = block * self.block
+        return range(min(start, self.items), min(start + self.block, self.items))
+
+    def is_text(self, i: int) -> bool:
+        return not self.is_folder(i) and i % self.text_every == 0
+
+    def metadata(self, i: int, with_parents: bool = False) -> Dict[str, Any]:
+        modified = (SYNTH_EPOCH + timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        if self.is_folder(i):
+            name, mime_type = f"Folder {i:07d}", FOLDER_MIME_TYPE
+        elif self.is_text(i):
+            name, mime_type = f"Notes {i:07d}.txt", 'text/plain'
+        else:
+            ext, mime_type = SYNTH_FILE_TYPES[i % len(SYNTH_FILE_TYPES)]
+            name = f"Document {i:07d}{ext}"
+        item = {
+            'id': self.item_id(i),
+            'name': name,
+            'mimeType': mime_type,
+            'createdTime': SYNTH_EPOCH.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'modifiedTime': modified,
+            'webViewLink': f"https://drive.google.com/file/d/{self.item_id(i)}/view",
+            'owners': [{'displayName': 'Synthetic User'}],
+        }
+        if not self.is_folder(i):
+            item['size'] = str(self.text_bytes if self.is_text(i) else 1024 * (i % 5000 + 1))
+        if with_parents:
+            item['parents'] = [self.parent_id(i)]
+        return item
+
+    def text(self, i: int) -> bytes:
+        line = f"Synthetic note {i}: quarterly planning, budget review and action items. "
+        return (line * (self.text_bytes // len(line) + 1))[:self.text_bytes].encode('utf-8')
+
+
+def synthesize_drive(path: str, items: int, page_size: int = 1000) -> int:
+    """
+    Write a Drive cassette for a SyntheticDrive of `items` items, covering
+    what both Drive exporters request: per-folder listings (any mode),
+    bulk --flat listing, the filesystem exporter's changes token, and text
+    downloads.
+
+    Returns:
+        int: interactions written
+    """
+    drive = SyntheticDrive(items)
+    writer = CassetteWriter(path)
+    writer.add('GET', f"{DRIVE_API}/files/root?fields=id&alt=json", 200, {'id': SYNTH_ROOT_ID})
+    writer.add('GET', f"{DRIVE_API}/changes/startPageToken?alt=json", 200, {'startPageToken': '1'})
+    writer.add('GET', f"{DRIVE_API}/changes?pageToken=1&spaces=drive&includeRemoved=true&alt=json", 200,
+               {'changes': [], 'newStartPageToken': '1'})
+
+    # Per-folder listings ('root' is the alias the exporters query My Drive with)
+    folders = [None] + [i for i in range(items) if drive.is_folder(i)]
+    for folder in folders:
+        folder_id = 'root' if folder is None else drive.item_id(folder)
+        listing = [drive.metadata(i) for i in drive.children(folder)]
+        for page_start in range(0, max(len(listing), 1), page_size):
+            query = {'q': f"'{folder_id}' in parents and trashed=false", 'alt': 'json'}
+            if page_start:
+                query['pageToken'] = str(page_start)
+            response = {'files': listing[page_start:page_start + page_size]}
+            if page_start + page_size < len(listing):
+                response['nextPageToken'] = str(page_start + page_size)
+            writer.add('GET', f"{DRIVE_API}/files?{urlencode(query)}", 200, response)
+    del folders
+
+    # Bulk listing (--flat)
+    for page_start in range(0, max(items, 1), page_size):
+        query = {'q': 'trashed=false', 'alt': 'json'}
+        if page_start:
+            query['pageToken'] = f"flat-{page_start}"
+        response = {'files': [drive.metadata(i, with_parents=True)
+                              for i in range(page_start, min(page_start + page_size, items))]}
+        if page_start + page_size < items:
+            response['nextPageToken'] = f"flat-{page_start + page_size}"
+        writer.add('GET', f"{DRIVE_API}/files?{urlencode(query)}", 200, response)
+
+    # Content of the text files (export_gdrive_content_to_treelisty.py)
+    for i in range(0, items, drive.text_every):
+        if drive.is_text(i):
+            writer.add('GET', f"{DRIVE_API}/files/{drive.item_id(i)}?alt=media", 200, drive.text(i),
+                       {'content-type': 'text/plain'})
+    writer.close()
+    return writer.count
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+def synthetic_thread(i: int) -> Dict[str, Any]:
+    """A Gmail thread (format=full) with 1-3 messages, some with attachments"""
+    labels = [['INBOX'], ['SENT'], ['INBOX', 'IMPORTANT'], ['CATEGORY_UPDATES'], ['INBOX', 'STARRED']][i % 5]
+    messages = []
+    for m in range(i % 3 + 1):
+        sent = SYNTH_EPOCH + timedelta(minutes=i * 7 + m)
+        body = f"Hi team,\n\nFollow-up {m + 1} on synthetic thread {i}: see notes and next steps.\n\nThanks"
+        parts = [
+            {'mimeType': 'text/plain', 'body': {'size': len(body), 'data': _b64(body)}},
+            {'mimeType': 'text/html', 'body': {'data': _b64(f"<p>{body}</p>")}},
+        ]
+        if (i + m) % 7 == 0:
+            parts.append({'mimeType': 'application/pdf', 'filename': f'report-{i}.pdf',
+                          'body': {'size': 20480, 'attachmentId': f'att{i}-{m}'}})
+        messages.append({
+            'id': f"msg{i:08d}{m}",
+            'threadId': f"thr{i:08d}",
+            'labelIds': labels,
+            'snippet': body[:80],
+            'payload': {
+                'mimeType': 'multipart/mixed',
+                'headers': [
+                    {'name': 'Subject', 'value': f"Synthetic thread {i}"},
+                    {'name': 'From', 'value': f"Sender {i % 97} <sender{i % 97}@example.com>"},
+                    {'name': 'To', 'value': 'me@example.com'},
+                    {'name': 'Date', 'value': sent.strftime('%a, %d %b %Y %H:%M:%S +0000')},
+                ],
+                'parts': parts,
+            },
+        })
+    return {'id': f"thr{i:08d}", 'messages': messages}
+
+
+def synthesize_gmail(path: str, items: int) -> int:
+    """
+    Write a Gmail cassette of `items` threads: one threads.list answer
+    (export_gmail asks for max_threads at once) and threads.get per thread.
+    """
+    writer = CassetteWriter(path)
+    threads = [{'id': f"thr{i:08d}", 'snippet': ''} for i in range(items)]
+    writer.add('GET', f"{GMAIL_API}/threads?q=after%3A2025%2F01%2F01&alt=json", 200,
+               {'threads': threads, 'resultSizeEstimate': items})
+    del threads
+    for i in range(items):
+        writer.add('GET', f"{GMAIL_API}/threads/thr{i:08d}?format=full&alt=json", 200, synthetic_thread(i))
+    writer.close()
+    return writer.count
+
+
+def synthesize_calendar(path: str, items: int) -> int:
+    """
+    Write a Calendar cassette of `items` events spread over the default
+    export window around now (one events.list answer, as the exporter
+    reads a single page).
+    """
+    writer = CassetteWriter(path)
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    writer.add('GET', f"{CALENDAR_API}/calendars/primary?alt=json", 200,
+               {'id': 'primary', 'summary': 'synthetic@example.com'})
+
+    def events() -> Iterator[Dict[str, Any]]:
+        for i in range(items):
+            start = now + timedelta(hours=(i * 37) % (37 * 24) - 7 * 24)
+            event = {
+                'id': f"evt{i:010d}",
+                'status': 'confirmed',
+                'summary': ['Standup', '1:1', 'Planning', 'Review', 'Lunch'][i % 5] + f" #{i}",
+                'htmlLink': f"https://calendar.google.com/event?eid=evt{i:010d}",
+                'creator': {'email': 'synthetic@example.com', 'self': True},
+                'organizer': {'email': 'synthetic@example.com'},
+            }
+            if i % 11 == 0:
+                event['start'] = {'date': start.strftime('%Y-%m-%d')}
+                event['end'] = {'date': (start + timedelta(days=1)).strftime('%Y-%m-%d')}
+            else:
+                event['start'] = {'dateTime': start.strftime('%Y-%m-%dT%H:%M:%SZ')}
+                event['end'] = {'dateTime': (start + timedelta(minutes=30)).strftime('%Y-%m-%dT%H:%M:%SZ')}
+            if i % 3 == 0:
+                event['attendees'] = [{'email': f"person{i % 50}@example.com", 'responseStatus': 'accepted'},
+                                      {'email': 'synthetic@example.com', 'self': True,
+                                       'responseStatus': 'needsAction'}]
+                event['location'] = 'Room 4'
+                event['hangoutLink'] = f"https://meet.google.com/syn-{i % 1000:03d}"
+            yield event
+
+    # Written as a stream so a million events don't have to be held as one list
+    writer.add('GET', f"{CALENDAR_API}/calendars/primary/events?orderBy=startTime&singleEvents=true&alt=json",
+               200, _StreamedList('items', events(), {'kind': 'calendar#events', 'summary': 'synthetic'}))
+    writer.close()
+    return writer.count
+
+
+class _StreamedList:
+    """JSON object whose one list field is produced by a generator (for CassetteWriter.add)"""
+
+    def __init__(self, key: str, items: Iterator[Any], fields: Dict[str, Any]):
+        self.key = key
+        self.items = items
+        self.fields = fields
+
+    def to_json(self) -> str:
+        head = json.dumps(self.fields, ensure_ascii=False, separators=(',', ':'))[:-1]
+        items = ','.join(json.dumps(item, ensure_ascii=False, separators=(',', ':')) for item in self.items)
+        return f'{head},"{self.key}":[{items}]}}'
+
+
+SYNTHESIZERS = {
+    'drive': synthesize_drive,
+    'gmail': synthesize_gmail,
+    'calendar': synthesize_calendar,
+}
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Generate synthetic API cassettes for offline exporter benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+    synth = sub.add_parser('synth', help='Write a synthetic cassette')
+    synth.add_argument('api', choices=sorted(SYNTHESIZERS))
+    synth.add_argument('items', help='Item count: files+folders, threads or events (e.g. 10k, 100k, 1m)')
+    synth.add_argument('-o', '--output', default=None, help='Cassette file (default: <api>-<items>.cassette)')
+    args = parser.parse_args(argv)
+
+    items = parse_count(args.items)
+    output = args.output or f"{args.api}-{args.items.lower()}.cassette"
+    start = time.perf_counter()
+    count = SYNTHESIZERS[args.api](output, items)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(output) / (1024 * 1024)
+    print(f"✅ {output}: {items:,} {args.api} items, {count:,} interactions, {size_mb:,.1f}MB ({elapsed:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
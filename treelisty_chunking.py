@@ -0,0 +1,247 @@
+"""
+TreeListy Text Chunking
+Splits extracted document text into RAG chunks for
+export_gdrive_content_to_treelisty.py.
+
+Chunks are cut greedily, packing whole paragraphs up to the chunk size;
+a paragraph too large for one chunk is packed by sentences instead, and a
+sentence too large for one chunk is cut every chunk_size characters.
+
+chunk_spans() does this on one normalized copy of the text and returns
+(start, end) offsets into it rather than chunk strings: paragraphs are
+stripped and joined by exactly one blank line, and the sentence breaks of
+oversized paragraphs become single spaces, so every chunk - paragraphs
+joined with '\\n\\n', sentences with ' ' - is a plain slice of the buffer.
+Packing works on paragraph and sentence lengths alone, and chunks are only
+materialized when sliced out (chunk_text() does that).
+
+Greedy cuts depend on everything before them: one paragraph inserted near
+the top moves every later boundary. content_defined_spans() is the
+alternative (chunking='content'): it only cuts at sentence and paragraph
+ends, and whether it cuts at one is decided by a hash of the text just
+before it, so the same passage gets the same cuts wherever it sits, and
+an edit only changes the chunks around it. Chunks average about avg_size,
+are not cut before min_size unless what follows won't fit, and are forced
+to end by max_size (at the last paragraph or sentence end that fits, if
+there is one).
+
+Usage:
+    buffer, spans = chunk_spans(text, 1500)
+    for start, end in spans:
+        index(buffer[start:end])
+
+    chunks = chunk_text(text, 1500, chunking=CONTENT_DEFINED)
+"""
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+GREEDY = 'greedy'
+CONTENT_DEFINED = 'content'
+CHUNKING_MODES = (GREEDY, CONTENT_DEFINED)
+
+# Runs of 3+ newlines count as one blank line
+EXCESS_NEWLINES = re.compile(r'\n{3,}')
+# The end of a sentence and the whitespace after it
+SENTENCE_BREAK = re.compile(r'([.!?])\s+')
+# Where content-defined chunks may end, in a normalized buffer
+CUT_POINT = re.compile(r'[.!?]\s+|\n\n')
+
+# Content-defined chunking: characters before a cut point that decide whether to cut there
+CDC_WINDOW = 32
+# How much likelier a paragraph end is to be cut at than a sentence end
+PARAGRAPH_WEIGHT = 2
+
+
+def normalize_text(text: str, chunk_size: int) -> Tuple[str, List[Tuple[int, Optional[List[int]]]]]:
+    """
+    The buffer chunk_spans() cuts: stripped paragraphs joined by one blank
+    line, with single spaces between the sentences of paragraphs over
+    chunk_size.
+
+    Returns:
+        tuple: (buffer, paragraphs) - each paragraph's length, and for the
+        oversized ones the lengths of their sentences (else None)
+    """
+    parts = []
+    paragraphs = []
+    for para in text.split('\n\n'):
+        para = para.strip()
+        if not para:
+            continue
+        sentences = None
+        if len(para) > chunk_size:
+            # split() gives [text, end, text, end, ..., text]: a sentence is a text and its end
+            pieces = SENTENCE_BREAK.split(para)
+            pieces = [words + stop for words, stop in zip(pieces[::2], pieces[1::2])] + [pieces[-1]]
+            sentences = [len(piece) for piece in pieces]
+            para = ' '.join(pieces)
+        parts.append(para)
+        paragraphs.append((len(para), sentences))
+    return '\n\n'.join(parts), paragraphs
+
+
+def chunk_spans(text: str, chunk_size: int) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Cut text into chunks of at most chunk_size characters.
+
+    Returns:
+        tuple: (buffer, spans) - chunk i is buffer[start:end] for the i-th
+        (start, end) in spans
+    """
+    text = text.strip()
+    if '\n\n\n' in text:
+        text = EXCESS_NEWLINES.sub('\n\n', text)
+    if not text:
+        return text, []
+    if len(text) <= chunk_size:
+        # Small enough to keep whole, as it is
+        return text, [(0, len(text))]
+
+    buffer, paragraphs = normalize_text(text, chunk_size)
+    spans = []
+    # The chunk being packed, as buffer[start:end] (start is None while empty)
+    start = end = None
+    para_start = 0
+
+    for para_len, sentences in paragraphs:
+        para_end = para_start + para_len
+        current_len = end - start if start is not None else 0
+        # A paragraph split into sentences was over chunk_size before its sentence
+        # breaks were collapsed, so it never fits alongside another
+        if sentences is None and current_len + para_len + 2 <= chunk_size:
+            # Fits after a blank line
+            if start is None:
+                start = para_start
+            end = para_end
+        else:
+            if start is not None:
+                spans.append((start, end))
+                start = end = None
+            if sentences is None:
+                start, end = para_start, para_end
+            else:
+                # Too large for a chunk of its own: pack its sentences instead
+                sentence_start = para_start
+                for sentence_len in sentences:
+                    sentence_end = sentence_start + sentence_len
+                    current_len = end - start if start is not None else 0
+                    if current_len + sentence_len + 1 <= chunk_size:
+                        if start is None:
+                            start = sentence_start
+                        end = sentence_end
+                    else:
+                        if start is not None:
+                            spans.append((start, end))
+                            start = end = None
+                        if sentence_len > chunk_size:
+                            # A sentence too large even alone: cut it every chunk_size characters
+                            for piece_start in range(sentence_start, sentence_end, chunk_size):
+                                piece = strip_span(buffer, piece_start, min(piece_start + chunk_size, sentence_end))
+                                if piece is not None:
+                                    spans.append(piece)
+                        else:
+                            start, end = sentence_start, sentence_end
+                    sentence_start = sentence_end + 1
+        para_start = para_end + 2
+
+    if start is not None:
+        spans.append((start, end))
+    return buffer, spans
+
+
+def content_defined_spans(text: str, avg_size: int, min_size: Optional[int] = None,
+                          max_size: Optional[int] = None) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Cut text into content-defined chunks (by default avg_size/4 to
+    2*avg_size characters).
+
+    Each sentence or paragraph end at least min_size into a chunk is a cut
+    with probability (its distance from the previous one) / (avg_size -
+    min_size), decided by the CRC-32 of the CDC_WINDOW characters before it
+    - the value a rolling hash over that window has there - so chunks grow
+    about avg_size long whatever the sentence length, and the same text
+    gives the same cuts.
+
+    Returns:
+        tuple: (buffer, spans) as for chunk_spans; the buffer is the text
+        with paragraphs stripped and joined by one blank line
+    """
+    min_size = avg_size // 4 if min_size is None else min_size
+    max_size = avg_size * 2 if max_size is None else max_size
+    spread = max(1, avg_size - min_size)
+    buffer = '\n\n'.join(para for para in (part.strip() for part in text.split('\n\n')) if para)
+    spans = []
+    start = 0
+    previous_end = 0
+    # The last sentence and paragraph ends passed without cutting, as (end, next start)
+    last_sentence = last_paragraph = None
+
+    def force_cuts(limit):
+        # Cut until no more than max_size remains before `limit`
+        nonlocal start, last_sentence, last_paragraph
+        while limit - start > max_size:
+            if last_paragraph is not None and last_paragraph[0] - start >= min_size:
+                cut = last_paragraph
+            else:
+                cut = last_sentence or last_paragraph
+            if cut is not None:
+                spans.append((start, cut[0]))
+                start = cut[1]
+            else:
+                # No sentence end to snap to: cut mid-sentence
+                piece = strip_span(buffer, start, start + max_size)
+                if piece is not None:
+                    spans.append(piece)
+                start += max_size
+                while start < limit and buffer[start].isspace():
+                    start += 1
+            last_sentence = last_paragraph = None
+
+    for match in CUT_POINT.finditer(buffer):
+        end = match.start() + (buffer[match.start()] != '\n')
+        paragraph = buffer[match.start():match.end()].endswith('\n\n')
+        force_cuts(end)
+        gap = end - previous_end
+        previous_end = end
+        if end - start >= min_size:
+            weight = PARAGRAPH_WEIGHT if paragraph else 1
+            if zlib.crc32(buffer[max(0, end - CDC_WINDOW):end].encode('utf-8')) < gap * weight * 2 ** 32 // spread:
+                spans.append((start, end))
+                start = match.end()
+                last_sentence = last_paragraph = None
+                continue
+        if paragraph:
+            last_paragraph = (end, match.end())
+        else:
+            last_sentence = (end, match.end())
+
+    force_cuts(len(buffer))
+    if start < len(buffer):
+        spans.append((start, len(buffer)))
+    return buffer, spans
+
+
+def strip_span(buffer: str, start: int, end: int):
+    """buffer[start:end] without surrounding whitespace, as a span; None if nothing is left"""
+    while start < end and buffer[start].isspace():
+        start += 1
+    while end > start and buffer[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def chunk_text(text: str, chunk_size: int, chunking: str = GREEDY) -> List[Dict[str, Any]]:
+    """
+    Chunk text for RAG: [{'text', 'charCount', 'isLeaf'}] per chunk, cut
+    greedily at up to chunk_size or, with chunking=CONTENT_DEFINED, content
+    defined around chunk_size on average.
+    """
+    if not text:
+        return []
+    if chunking == CONTENT_DEFINED:
+        buffer, spans = content_defined_spans(text, chunk_size)
+    else:
+        buffer, spans = chunk_spans(text, chunk_size)
+    return [{'text': buffer[start:end], 'charCount': end - start, 'isLeaf': True} for start, end in spans]
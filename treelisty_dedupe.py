@@ -0,0 +1,147 @@
+"""
+TreeListy Near-Duplicate Chunks
+Finds chunks that repeat an earlier chunk, word for word or nearly, for
+export_gdrive_content_to_treelisty.py --dedupe.
+
+Shared drives hold many copies of the same text: "final" and "final v2",
+a Google Doc and the PDF exported from it. Each chunk gets a MinHash
+signature of its shingles (runs of SHINGLE_WORDS lowercased words), and
+two chunks are near-duplicates when their signatures agree in at least
+`threshold` of their SIGNATURE_SIZE positions - an estimate of the
+Jaccard similarity of their shingle sets.
+
+Signatures use one-permutation hashing: each shingle is hashed once, the
+hash picks one of the signature's positions and that position keeps the
+smallest hash it was given. Positions no shingle went to copy the next
+filled one (rotated, so they don't match by accident), so short chunks
+still compare sensibly.
+
+Chunks are compared in sub-quadratic time by LSH banding: the signature
+is cut into BANDS bands of ROWS positions, and a chunk is only compared
+with the earlier chunks that have an identical band. At the default
+threshold of 0.8, a near-duplicate shares a band with its original 99%
+of the time. Chunks with identical words skip all that (a digest
+lookup). The first copy of a chunk is canonical, and only canonical
+chunks are kept for comparison, about 1KB of memory each.
+
+Usage:
+    deduper = ChunkDeduper(threshold=0.8)
+    for node_id, text in chunks:
+        duplicate = deduper.check(node_id, text)
+        if duplicate is not None:
+            print(f"{node_id} repeats {duplicate.node_id} ({duplicate.similarity:.0%})")
+"""
+
+import hashlib
+import re
+import zlib
+from array import array
+from typing import Dict, List, NamedTuple, Optional
+
+DEFAULT_THRESHOLD = 0.8
+
+# Words: runs of letters and digits, lowercased, so case and spacing don't matter
+TOKEN = re.compile(r'\w+')
+SHINGLE_WORDS = 4
+
+# Signature of BANDS bands of ROWS positions
+BANDS = 12
+ROWS = 5
+SIGNATURE_SIZE = BANDS * ROWS
+
+# Odd multiplier scrambling shingle hashes
+MULTIPLIER = 0x9E3779B1
+# Shingle hashes are below EMPTY; copied positions are offset by multiples of it
+EMPTY = 1 << 32
+
+
+class Duplicate(NamedTuple):
+    node_id: str            # the canonical chunk repeated
+    similarity: float       # estimated Jaccard similarity; 1.0 for identical words
+
+
+def signature(words: List[str]) -> Optional[array]:
+    """MinHash signature of a chunk's words (None without any)"""
+    if not words:
+        return None
+    word_bytes = [word.encode('utf-8') + b' ' for word in words]
+    if len(word_bytes) < SHINGLE_WORDS:
+        # Too short for a single shingle: the whole chunk is one
+        word_bytes += [b''] * (SHINGLE_WORDS - len(word_bytes))
+    crc32 = zlib.crc32
+    values = [EMPTY] * SIGNATURE_SIZE
+    for a, b, c, d in zip(word_bytes, word_bytes[1:], word_bytes[2:], word_bytes[3:]):
+        # CRC-32 of the shingle, scrambled (CRC alone is linear, and similar shingles would hash alike)
+        shingle = crc32(d, crc32(c, crc32(b, crc32(a)))) * MULTIPLIER & 0xFFFFFFFF
+        position = shingle % SIGNATURE_SIZE
+        if shingle < values[position]:
+            values[position] = shingle
+
+    # Densify: an empty position takes the next filled one's value, offset by how far it had to look
+    for position in range(SIGNATURE_SIZE):
+        if values[position] >= EMPTY:
+            for distance in range(1, SIGNATURE_SIZE):
+                other = values[(position + distance) % SIGNATURE_SIZE]
+                if other < EMPTY:
+                    values[position] = other + distance * EMPTY
+                    break
+    return array('Q', values)
+
+
+def similarity(first: array, second: array) -> float:
+    """Share of signature positions two chunks agree on"""
+    return sum(x == y for x, y in zip(first, second)) / SIGNATURE_SIZE
+
+
+class ChunkDeduper:
+    """
+    Remembers canonical chunks and tells whether a new chunk repeats one
+    (see module docstring). Chunks are checked in output order, so the
+    first copy stays canonical.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.node_ids: List[str] = []               # canonical chunks, by number
+        self.signatures = array('Q')                # their signatures, SIGNATURE_SIZE values each
+        self.digests: Dict[bytes, int] = {}         # digest of a canonical chunk's words -> number
+        self.bands: Dict[int, int] = {}             # band hash -> first canonical chunk with that band
+        self.stats = {'chunks': 0, 'exact': 0, 'near': 0, 'chars': 0, 'duplicate_chars': 0}
+
+    def check(self, node_id: str, text: str) -> Optional[Duplicate]:
+        """The canonical chunk this one repeats, or None (and it becomes canonical)"""
+        self.stats['chunks'] += 1
+        self.stats['chars'] += len(text)
+        words = TOKEN.findall(text.lower())
+        if not words:
+            return None
+        digest = hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=12).digest()
+        number = self.digests.get(digest)
+        if number is not None:
+            return self._duplicate('exact', text, number, 1.0)
+
+        chunk_signature = signature(words)
+        band_keys = [hash((band,) + tuple(chunk_signature[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+        best, best_similarity = None, 0.0
+        for number in dict.fromkeys(self.bands.get(key) for key in band_keys):
+            if number is None:
+                continue
+            start = number * SIGNATURE_SIZE
+            estimate = similarity(chunk_signature, self.signatures[start:start + SIGNATURE_SIZE])
+            if estimate > best_similarity:
+                best, best_similarity = number, estimate
+        if best is not None and best_similarity >= self.threshold:
+            return self._duplicate('near', text, best, round(best_similarity, 3))
+
+        number = len(self.node_ids)
+        self.node_ids.append(node_id)
+        self.signatures.extend(chunk_signature)
+        self.digests[digest] = number
+        for key in band_keys:
+            self.bands.setdefault(key, number)
+        return None
+
+    def _duplicate(self, kind: str, text: str, number: int, estimate: float) -> Duplicate:
+        self.stats[kind] += 1
+        self.stats['duplicate_chars'] += len(text)
+        return Duplicate(self.node_ids[number], estimate)
@@ -0,0 +1,205 @@
+"""
+TreeListy Document Text
+PDF and Word text extraction shared by export_local_folder_to_treelisty.py
+and export_gdrive_content_to_treelisty.py.
+
+Both exporters parse documents with these functions and key the shared
+extraction cache (treelisty_extract_cache) by PDF_BACKEND / DOCX_BACKEND and
+their versions, so a document reached through a synced folder and through
+the Drive API gives the same text and is only parsed once.
+
+PDFs are parsed with PyMuPDF when it is installed, otherwise PyPDF2. Pages
+are parsed one at a time and extraction stops as soon as the text passes
+max_chars, so a 2,000-page manual costs only the pages that fit in the
+budget. With a PdfSample, only the outline and the first/last pages are read.
+
+Every extractor takes the document's bytes or its path and returns
+(text, error), error None on success.
+
+Usage:
+    text, error = pdf_text('manual.pdf', max_chars=100 * 1024)
+    text, error = docx_text(raw_bytes)
+"""
+
+import io
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+try:
+    import fitz  # PyMuPDF
+    PDF_BACKEND = 'PyMuPDF'
+    PDF_VERSION = getattr(fitz, 'VersionBind', '?')
+except ImportError:
+    try:
+        import PyPDF2
+        PDF_BACKEND = 'PyPDF2'
+        PDF_VERSION = getattr(PyPDF2, '__version__', '?')
+    except ImportError:
+        PDF_BACKEND = None
+        PDF_VERSION = None
+
+try:
+    import docx
+    DOCX_BACKEND = 'python-docx+tables'
+    DOCX_VERSION = getattr(docx, '__version__', '?')
+except ImportError:
+    DOCX_BACKEND = None
+    DOCX_VERSION = None
+
+Source = Union[bytes, str, Path]
+
+
+class PdfSample(NamedTuple):
+    """--pdf-sample: extract the outline plus only the first and last pages of each PDF"""
+    first: int
+    last: int
+
+
+def pdf_text(source: Source, max_chars=None, sample: Optional[PdfSample] = None):
+    """Extract a PDF's text (see module docstring); returns (text, error)"""
+    if PDF_BACKEND is None:
+        return None, "PyMuPDF or PyPDF2 not installed"
+
+    try:
+        reader = PyMuPdfReader(source) if PDF_BACKEND == 'PyMuPDF' else PyPdf2Reader(source)
+        try:
+            return join_within_budget(iter_pdf_text(reader, sample), max_chars), None
+        finally:
+            reader.close()
+    except Exception as e:
+        return None, str(e)
+
+
+def docx_text(source: Source):
+    """Extract a Word document's paragraphs, then its tables' rows; returns (text, error)"""
+    if DOCX_BACKEND is None:
+        return None, "python-docx not installed"
+
+    try:
+        doc = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else str(source))
+        text_parts = []
+
+        for para in doc.paragraphs:
+            if para.text.strip():
+                text_parts.append(para.text)
+
+        # Also extract from tables
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = ' | '.join(cell.text.strip() for cell in row.cells if cell.text.strip())
+                if row_text:
+                    text_parts.append(row_text)
+
+        return '\n\n'.join(text_parts), None
+    except Exception as e:
+        return None, str(e)
+
+
+class PyMuPdfReader:
+    """A PDF opened with PyMuPDF; pages are loaded when their text is asked for"""
+
+    def __init__(self, source: Source):
+        if isinstance(source, bytes):
+            self.doc = fitz.open(stream=source, filetype='pdf')
+        else:
+            self.doc = fitz.open(str(source), filetype='pdf')
+        self.page_count = self.doc.page_count
+
+    def page_text(self, page_num: int) -> str:
+        return self.doc.load_page(page_num).get_text()
+
+    def outline(self):
+        """Bookmarks as (level, title, page index or None)"""
+        return [(level - 1, title, page - 1 if page > 0 else None)
+                for level, title, page, *_ in self.doc.get_toc(simple=True)]
+
+    def close(self):
+        self.doc.close()
+
+
+class PyPdf2Reader:
+    """A PDF opened with PyPDF2; pages are parsed when their text is asked for"""
+
+    def __init__(self, source: Source):
+        self.reader = PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else str(source))
+        self.page_count = len(self.reader.pages)
+
+    def page_text(self, page_num: int) -> str:
+        return self.reader.pages[page_num].extract_text()
+
+    def outline(self):
+        """Bookmarks as (level, title, page index or None)"""
+        entries = []
+
+        def walk(items, level):
+            for item in items:
+                if isinstance(item, list):
+                    walk(item, level + 1)  # Children of the preceding bookmark
+                    continue
+                try:
+                    page = self.reader.get_destination_page_number(item)
+                except Exception:
+                    page = None
+                entries.append((level, item.title, page))
+
+        walk(self.reader.outline, 0)
+        return entries
+
+    def close(self):
+        pass
+
+
+def iter_pdf_text(reader, sample: Optional[PdfSample] = None):
+    """Yield a PDF's text blocks in output order; each page is parsed only when reached"""
+    page_count = reader.page_count
+    if sample is None:
+        yield from iter_pdf_pages(reader, range(page_count))
+        return
+
+    outline = pdf_outline_text(reader)
+    if outline:
+        yield outline
+    head = min(sample.first, page_count)
+    tail = max(head, page_count - sample.last)
+    yield from iter_pdf_pages(reader, range(head))
+    if tail > head:
+        yield f"[Pages {head + 1}-{tail} of {page_count} not sampled]"
+    yield from iter_pdf_pages(reader, range(tail, page_count))
+
+
+def iter_pdf_pages(reader, page_numbers):
+    for page_num in page_numbers:
+        try:
+            page_text = reader.page_text(page_num)
+            if page_text:
+                yield f"[Page {page_num + 1}]\n{page_text}"
+        except Exception as e:
+            yield f"[Page {page_num + 1}] (extraction error: {e})"
+
+
+def pdf_outline_text(reader):
+    """The PDF's bookmarks as an indented table of contents ('' if it has none)"""
+    try:
+        entries = reader.outline()
+    except Exception:
+        return ''
+    lines = [f"{'  ' * level}{title}{f' (p. {page + 1})' if page is not None else ''}"
+             for level, title, page in entries]
+    return "[Table of Contents]\n" + '\n'.join(lines) if lines else ''
+
+
+def join_within_budget(blocks, max_chars=None, separator='\n\n'):
+    """
+    Join text blocks, pulling no more from the iterator once max_chars is passed.
+
+    The result runs past max_chars when there was more text, so the caller's
+    truncation (and its marker) still applies.
+    """
+    parts = []
+    length = -len(separator)
+    for block in blocks:
+        parts.append(block)
+        length += len(separator) + len(block)
+        if max_chars is not None and length > max_chars:
+            break
+    return separator.join(parts)
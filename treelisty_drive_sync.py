@@ -0,0 +1,125 @@
+"""
+TreeListy Drive Incremental Sync
+Google Drive Changes API helpers for export_google_drive_to_treelisty.py.
+
+Each export records a Drive changes page token (taken *before* its scan, so
+nothing that changes during the scan is missed) in its source metadata as
+'changesPageToken'. An --incremental run loads the newest previous export,
+asks changes.list for everything since that token, and only touches the
+files that changed: it applies adds, moves, renames and deletes to the
+previous tree by file id. (export_gdrive_content_to_treelisty.py uses only
+find_previous_export and load_previous_export: it takes a previous export
+as its baseline, but compares each listed file's checksum instead of
+asking for changes, so it records no token.)
+
+Usage:
+    token = get_start_page_token(service)
+    changes, next_token = list_changes(service, previous_token)
+    for change in changes:
+        if change_is_removal(change): ...
+"""
+
+import glob
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Retries for 429 / 5xx / rate-limit 403 responses (googleapiclient backs off exponentially)
+NUM_RETRIES = 5
+
+DEFAULT_FILE_FIELDS = "id, name, mimeType, size, createdTime, modifiedTime, webViewLink, owners"
+
+
+def get_start_page_token(service) -> str:
+    """Token for 'now': changes.list from here returns only later changes"""
+    response = service.changes().getStartPageToken().execute(num_retries=NUM_RETRIES)
+    return response['startPageToken']
+
+
+def list_changes(service, page_token: str,
+                 file_fields: str = DEFAULT_FILE_FIELDS) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Every My Drive change since page_token, following nextPageToken.
+
+    Returns:
+        tuple: (changes in feed order, token to store for the next run)
+    """
+    changes = []
+    fields = (f"nextPageToken, newStartPageToken, "
+              f"changes(fileId, removed, file({file_fields}, parents, trashed))")
+    while True:
+        response = service.changes().list(
+            pageToken=page_token,
+            pageSize=1000,
+            spaces='drive',
+            includeRemoved=True,
+            fields=fields
+        ).execute(num_retries=NUM_RETRIES)
+        changes.extend(response.get('changes', []))
+        if 'newStartPageToken' in response:
+            return changes, response['newStartPageToken']
+        page_token = response['nextPageToken']
+
+
+def change_is_removal(change: Dict[str, Any]) -> bool:
+    """True for deleted, trashed, or no-longer-accessible files"""
+    return change.get('removed', False) or change.get('file', {}).get('trashed', False)
+
+
+def find_previous_export(pattern: str) -> Optional[str]:
+    """Newest export file matching a glob pattern (e.g. 'google-drive-*.json'), if any"""
+    files = [f for f in glob.glob(pattern) if not f.endswith('.partial')]
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def load_previous_export(file_path: Optional[str], require_token: bool = True,
+                         **expected) -> Optional[Dict[str, Any]]:
+    """
+    Load a previous export as the baseline for an incremental run.
+
+    Returns None (with a message) when there is no file, it has no changes
+    token (unless require_token is False), or any `expected` source field
+    (e.g. syncDepth=5) differs, in which case the caller should do a full
+    export.
+    """
+    if not file_path or not os.path.exists(file_path):
+        print("ℹ️  No previous export found - running a full export")
+        return None
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        tree = json.load(f)
+
+    source = tree.get('source', {})
+    if require_token and not source.get('changesPageToken'):
+        print(f"ℹ️  {file_path} has no changes token - running a full export")
+        return None
+    for key, value in expected.items():
+        if source.get(key) != value:
+            print(f"ℹ️  {file_path} was exported with {key}={source.get(key)!r} "
+                  f"(now {value!r}) - running a full export")
+            return None
+
+    print(f"♻️  Incremental from: {file_path}")
+    return tree
+
+
+def find_subtree(tree: Dict[str, Any], node_id: str) -> List[Tuple[Dict[str, Any], List[Dict[str, str]]]]:
+    """
+    Every placement of a node in an exported tree, by id (a Drive item with
+    several parents appears once per parent).
+
+    Returns:
+        list: (node, path) pairs, where path is the [{'id', 'name'}, ...]
+        ancestors from the tree root down to the node's parent
+    """
+    placements = []
+    stack = [(tree, [])]
+    while stack:
+        node, path = stack.pop()
+        if node.get('id') == node_id:
+            placements.append((node, path))
+        children = node.get('children')
+        if children:
+            child_path = path + [{'id': node.get('id'), 'name': node.get('name')}]
+            stack.extend((child, child_path) for child in reversed(children))
+    return placements
@@ -0,0 +1,181 @@
+"""
+TreeListy Extraction Cache
+Content-addressed on-disk cache of extracted document text, shared by
+export_local_folder_to_treelisty.py and export_gdrive_content_to_treelisty.py.
+
+Entries are keyed by the SHA-256 of the raw file bytes plus the extractor
+backend and its version, so the same PDF reached through a synced folder and
+through the Drive API is only parsed once per backend, and upgrading a parser
+(or changing how we format its output) naturally invalidates old text.
+
+The cache is a single SQLite file. It is safe to share between processes
+(the local exporter's extraction workers each open their own connection).
+Total text size is capped; least-recently-used entries are evicted first.
+
+Usage:
+    cache = ExtractionCache('treelisty-extract-cache.db', max_mb=1024)
+    key = cache.key(raw_bytes, PDF_BACKEND, PDF_VERSION)  # treelisty_documents
+    text = cache.get(key)
+    if text is None:
+        text = parse(raw_bytes)
+        cache.put(key, text)
+    for line in cache.summary_lines():
+        print(line)
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import List, Optional
+
+DEFAULT_CACHE_FILE = 'treelisty-extract-cache.db'
+DEFAULT_CACHE_MB = 1024
+
+# Bumped when the cache layout or the exporters' text formatting changes
+CACHE_VERSION = '2'
+
+# Eviction trims down to this fraction of the cap, so it doesn't run on every put
+EVICT_TO = 0.9
+
+# Files are hashed this much at a time, so a huge file never sits in memory
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+class ExtractionCache:
+    """Content-addressed, size-capped LRU cache of extracted text (see module docstring)"""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_FILE, max_mb: int = DEFAULT_CACHE_MB,
+                 evict_on_put: bool = True):
+        """
+        Args:
+            db_path: SQLite file holding the cache
+            max_mb: Cap on cached text size
+            evict_on_put: Evict as soon as a put() crosses the cap; worker
+                processes turn this off and leave eviction to the parent
+        """
+        self.db_path = db_path
+        self.max_mb = max_mb
+        self.max_bytes = max_mb * 1024 * 1024
+        self.evict_on_put = evict_on_put
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'chars_served': 0}
+        self._conn = None
+        self._pid = None
+        self._approx_bytes = None
+
+    @property
+    def conn(self):
+        # Opened lazily, and reopened after a fork: SQLite connections can't cross processes
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._conn = sqlite3.connect(self.db_path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, text TEXT, bytes INTEGER, last_used REAL)
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def key(raw: bytes, backend: str, version: str) -> str:
+        """Cache key for raw file bytes parsed by a given extractor backend/version"""
+        return ExtractionCache.digest_key(hashlib.sha256(raw).hexdigest(), backend, version)
+
+    @staticmethod
+    def file_digest(file_path) -> str:
+        """SHA-256 hex digest of a file, read in HASH_BLOCK_BYTES blocks (for digest_key())"""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def digest_key(digest: str, backend: str, version: str) -> str:
+        """key() from the SHA-256 hex digest of the bytes, for callers that hash while streaming"""
+        return f"{digest}:{backend}:{version}:{CACHE_VERSION}"
+
+    def get(self, *keys: str) -> Optional[str]:
+        """
+        Return cached text for the first of keys present (and mark it recently
+        used), or None on a miss. Several keys still count as one lookup.
+        """
+        for key in keys:
+            row = self.conn.execute("SELECT text FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                break
+        else:
+            self.stats['misses'] += 1
+            return None
+        with self.conn:
+            self.conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.stats['hits'] += 1
+        self.stats['chars_served'] += len(row[0])
+        return row[0]
+
+    def put(self, key: str, text: str):
+        """Store extracted text, evicting least-recently-used entries past the cap"""
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                              (key, text, size, time.time()))
+
+        if not self.evict_on_put:
+            return
+        if self._approx_bytes is None:
+            self._approx_bytes = self.total_bytes()
+        else:
+            self._approx_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def record(self, hit: Optional[bool], chars: int = 0):
+        """Count a lookup that happened in another process (None = not cacheable)"""
+        if hit is None:
+            return
+        self.stats['hits' if hit else 'misses'] += 1
+        if hit:
+            self.stats['chars_served'] += chars
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache is back under EVICT_TO of its cap"""
+        total = self.total_bytes()
+        target = int(self.max_bytes * EVICT_TO)
+        if total <= self.max_bytes:
+            self._approx_bytes = total
+            return
+
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, bytes FROM entries ORDER BY last_used"):
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self.stats['evictions'] += len(doomed)
+        self._approx_bytes = total
+
+    def summary_lines(self) -> List[str]:
+        """Lines for an exporter's summary block"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = f" ({self.stats['hits'] * 100 // lookups}%)" if lookups else ""
+        size_mb = self.total_bytes() / (1024 * 1024)
+        return [
+            f"   Hits: {self.stats['hits']}{rate}",
+            f"   Misses: {self.stats['misses']}",
+            f"   Evicted: {self.stats['evictions']}",
+            f"   Size: {size_mb:,.1f}MB of {self.max_bytes // (1024 * 1024):,}MB",
+        ]
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+            self._conn = None
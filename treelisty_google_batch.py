@@ -0,0 +1,173 @@
+"""
+TreeListy Google API Batching
+Sends many small Google API requests (Gmail threads.get, Drive files.list /
+files.get, ...) in googleapiclient batch round trips, shared by the Gmail
+and Google Drive exporters.
+
+A batch carries up to 100 requests in one HTTP round trip; each item still
+succeeds or fails on its own. Items that fail with a retryable error (429,
+5xx, or a 403 rate-limit reason) are retried in a later batch with
+exponential backoff; anything else is handed back as that item's error, so
+one bad thread or folder doesn't fail the whole run. A failed round trip
+(network error) retries the whole batch.
+
+Media downloads (files().get_media / export_media) can't be batched by the
+Google APIs; those stay one request per file.
+
+Usage:
+    requests = ((thread_id, service.users().threads().get(userId='me', id=thread_id))
+                for thread_id in thread_ids)
+    for thread_id, thread, error in iter_batched(service, requests):
+        ...
+
+    listings = list_folders_batched(drive_service, folder_ids, "id, name, mimeType")
+"""
+
+import random
+import time
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+# Most calls a Google API batch accepts (Gmail recommends 50 to stay under its rate limits)
+MAX_BATCH_SIZE = 100
+NUM_RETRIES = 5
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+MAX_BACKOFF_SECONDS = 32
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an item's error is worth retrying (rate limiting or a server error)"""
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    if status in RETRY_STATUSES:
+        return True
+    if status == 403:
+        content = error.content
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
+        return any(reason in str(content) for reason in RATE_LIMIT_REASONS)
+    return False
+
+
+def backoff(attempt: int):
+    """Sleep before retry number `attempt` (0-based): 1, 2, 4, ... seconds plus jitter"""
+    time.sleep(min(2 ** attempt + random.random(), MAX_BACKOFF_SECONDS))
+
+
+def iter_batched(service, requests: Iterable[Tuple[Hashable, Any]], batch_size: int = MAX_BATCH_SIZE,
+                 num_retries: int = NUM_RETRIES) -> Iterator[Tuple[Hashable, Any, Optional[Exception]]]:
+    """
+    Execute (key, request) pairs in batches of up to batch_size.
+
+    Requests are built but not executed by the caller (e.g.
+    service.files().get(fileId=...)); they're consumed lazily, one batch at
+    a time, so a generator of millions of requests is fine.
+
+    Yields:
+        tuple: (key, response, None) or (key, None, error), in input order
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    requests = iter(requests)
+    while True:
+        chunk = list(islice(requests, batch_size))
+        if not chunk:
+            return
+        outcomes = _execute_with_retries(service, chunk, num_retries)
+        for i, (key, _) in enumerate(chunk):
+            response, error = outcomes[i]
+            yield key, response, error
+
+
+def execute_batched(service, requests: Iterable[Tuple[Hashable, Any]], batch_size: int = MAX_BATCH_SIZE,
+                    num_retries: int = NUM_RETRIES) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Exception]]:
+    """
+    Execute all (key, request) pairs in batches.
+
+    Returns:
+        tuple: (responses by key, errors by key), both in input order
+    """
+    responses, errors = {}, {}
+    for key, response, error in iter_batched(service, requests, batch_size, num_retries):
+        if error is None:
+            responses[key] = response
+        else:
+            errors[key] = error
+    return responses, errors
+
+
+def _execute_with_retries(service, chunk: List[Tuple[Hashable, Any]],
+                          num_retries: int) -> Dict[int, Tuple[Any, Optional[Exception]]]:
+    """Run one chunk, re-batching retryable failures; returns position -> (response, error)"""
+    outcomes = {}
+    pending = list(range(len(chunk)))
+    for attempt in range(num_retries + 1):
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        batch = service.new_batch_http_request()
+        for i in pending:
+            batch.add(chunk[i][1], callback=callback, request_id=str(i))
+        try:
+            batch.execute()
+        except Exception as e:
+            # The round trip itself failed (network error, malformed batch response)
+            results = {i: (None, e) for i in pending if i not in results}
+
+        retry = []
+        for i in pending:
+            response, error = results.get(i, (None, RuntimeError('No response in batch')))
+            # Transport errors and rate limits are retried; other API errors are final
+            if error is not None and attempt < num_retries and (
+                    is_retryable(error) or not isinstance(error, HttpError)):
+                retry.append(i)
+            else:
+                outcomes[i] = (response, error)
+        pending = retry
+        if not pending:
+            break
+        backoff(attempt)
+    return outcomes
+
+
+# =============================================================================
+# Drive
+# =============================================================================
+
+def list_folders_batched(service, folder_ids: Iterable[str], file_fields: str, page_size: int = 1000,
+                         batch_size: int = MAX_BATCH_SIZE,
+                         num_retries: int = NUM_RETRIES) -> Dict[str, Any]:
+    """
+    List the non-trashed items of many Drive folders, batching files.list
+    calls (first pages together, then any further pages together).
+
+    Returns:
+        dict: folder id -> list of items in listing order, or the error that
+        stopped its listing
+    """
+    listings = {folder_id: [] for folder_id in folder_ids}
+    page_tokens = {folder_id: None for folder_id in listings}
+    while page_tokens:
+        requests = ((folder_id, service.files().list(
+            q=f"'{folder_id}' in parents and trashed=false",
+            pageSize=page_size,
+            fields=f"nextPageToken, files({file_fields})",
+            pageToken=page_token
+        )) for folder_id, page_token in page_tokens.items())
+
+        next_tokens = {}
+        for folder_id, response, error in iter_batched(service, requests, batch_size, num_retries):
+            if error is not None:
+                listings[folder_id] = error
+                continue
+            listings[folder_id].extend(response.get('files', []))
+            if response.get('nextPageToken'):
+                next_tokens[folder_id] = response['nextPageToken']
+        page_tokens = next_tokens
+    return listings
@@ -0,0 +1,177 @@
+"""
+TreeListy Streaming JSON Writer
+Writes a TreeListy tree to disk node by node instead of building the whole
+tree in memory and calling json.dump() at the end.
+
+The output is byte-for-byte what json.dump(tree, f, indent=2, ensure_ascii=False)
+would produce for the same keys in the same order, so exports stay importable
+by the app unchanged. Memory is bounded by the depth of the open objects, not
+by the size of the tree.
+
+Objects and arrays can be opened "lazily": nothing is written for them until
+something is written inside, and if they are closed while still empty they
+vanish from the output. That matches the exporters' habit of only adding
+'children' (or a whole folder node) when a folder turned out to have content.
+
+Usage:
+    with open(path, 'w', encoding='utf-8') as f:
+        writer = StreamingTreeWriter(f)
+        writer.begin_object({'id': 'root', 'name': 'My Tree'})
+        writer.begin_array('children')
+        writer.begin_object({'id': 'folder'}, lazy=True)
+        writer.begin_array('children', lazy=True)
+        writer.write_item({'id': 'leaf'})
+        writer.end_array()
+        writer.end_object({'expanded': False})
+        writer.end_array()
+        writer.end_object({'pattern': {'key': 'filesystem'}})
+        writer.close()
+"""
+
+import json
+from typing import Any, Dict, Optional, TextIO
+
+
+class _Frame:
+    """One open object or array"""
+    __slots__ = ('kind', 'level', 'key', 'fields', 'lazy', 'written', 'count')
+
+    def __init__(self, kind: str, level: int, key: Optional[str], fields: Optional[Dict[str, Any]], lazy: bool):
+        self.kind = kind            # 'object' or 'array'
+        self.level = level          # indentation level of the closing bracket
+        self.key = key              # key in the parent object (None inside an array or at the root)
+        self.fields = fields        # leading object fields, held until the frame is written
+        self.lazy = lazy
+        self.written = False
+        self.count = 0              # members written so far
+
+
+class StreamingTreeWriter:
+    """Incremental JSON writer for TreeListy trees (see module docstring)"""
+
+    def __init__(self, f: TextIO, indent: int = 2):
+        self.f = f
+        self.indent = indent
+        self.stack = []
+        self.items_written = 0      # values written with write_item()
+
+    # -- objects -----------------------------------------------------------
+
+    def begin_object(self, fields: Optional[Dict[str, Any]] = None, key: Optional[str] = None,
+                     lazy: bool = False):
+        """
+        Open an object (the root, an array item, or `key` of the current object).
+
+        A non-lazy object is written immediately, along with any lazy
+        ancestors that were still pending.
+        """
+        self._check_key(key)
+        frame = _Frame('object', len(self.stack), key, dict(fields or {}), lazy)
+        self.stack.append(frame)
+        if not lazy:
+            self._materialize()
+
+    def write_fields(self, fields: Dict[str, Any]):
+        """Add fields to the currently open object"""
+        frame = self._top('object')
+        if not frame.written:
+            frame.fields.update(fields)
+            return
+        for key, value in fields.items():
+            self._write_member(frame, key, value)
+
+    def end_object(self, fields: Optional[Dict[str, Any]] = None):
+        """Write trailing fields and close the current object"""
+        frame = self._top('object')
+        # Trailing fields alone don't make a lazy object worth keeping
+        if fields and frame.written:
+            self.write_fields(fields)
+        self._close(frame, '}')
+
+    # -- arrays ------------------------------------------------------------
+
+    def begin_array(self, key: Optional[str] = None, lazy: bool = False):
+        """Open an array (as `key` of the current object, or as an item of the current array)"""
+        self._check_key(key)
+        self.stack.append(_Frame('array', len(self.stack), key, None, lazy))
+        if not lazy:
+            self._materialize()
+
+    def write_item(self, value: Any):
+        """Write a complete value into the current array"""
+        frame = self._top('array')
+        self._materialize()
+        self._write_member(frame, None, value)
+        self.items_written += 1
+
+    def end_array(self):
+        """Close the current array"""
+        self._close(self._top('array'), ']')
+
+    # -- finishing ---------------------------------------------------------
+
+    def close(self):
+        """Check every object and array was closed"""
+        if self.stack:
+            raise ValueError(f"{len(self.stack)} JSON containers left open")
+
+    # -- internals ---------------------------------------------------------
+
+    def _check_key(self, key):
+        if not self.stack:
+            return
+        parent = self.stack[-1]
+        if parent.kind == 'object' and key is None:
+            raise ValueError("Objects and arrays inside an object need a key")
+        if parent.kind == 'array' and key is not None:
+            raise ValueError("Array items can't have a key")
+
+    def _top(self, kind: str) -> _Frame:
+        if not self.stack or self.stack[-1].kind != kind:
+            raise ValueError(f"No open {kind} to write to")
+        return self.stack[-1]
+
+    def _pad(self, level: int) -> str:
+        return '\n' + ' ' * (self.indent * level)
+
+    def _write_member(self, frame: _Frame, key: Optional[str], value: Any):
+        """Write one key/value (objects) or value (arrays) into a written frame"""
+        pad = self._pad(frame.level + 1)
+        prefix = ',' if frame.count else ''
+        if key is not None:
+            prefix += pad + json.dumps(key, ensure_ascii=False) + ': '
+        else:
+            prefix += pad
+        encoded = json.dumps(value, indent=self.indent, ensure_ascii=False)
+        # json.dumps only emits raw newlines between tokens, so this re-indents safely
+        self.f.write(prefix + encoded.replace('\n', pad))
+        frame.count += 1
+
+    def _materialize(self):
+        """Write the opening of every frame that hasn't been written yet"""
+        for i, frame in enumerate(self.stack):
+            if frame.written:
+                continue
+            parent = self.stack[i - 1] if i else None
+            if parent is not None:
+                prefix = ',' if parent.count else ''
+                prefix += self._pad(parent.level + 1)
+                if frame.key is not None:
+                    prefix += json.dumps(frame.key, ensure_ascii=False) + ': '
+                parent.count += 1
+                self.f.write(prefix)
+            self.f.write('{' if frame.kind == 'object' else '[')
+            frame.written = True
+            if frame.kind == 'object' and frame.fields:
+                fields, frame.fields = frame.fields, None
+                for key, value in fields.items():
+                    self._write_member(frame, key, value)
+
+    def _close(self, frame: _Frame, bracket: str):
+        self.stack.pop()
+        if not frame.written:
+            return  # Lazy and never had content: leave it out entirely
+        if frame.count:
+            self.f.write(self._pad(frame.level) + bracket)
+        else:
+            self.f.write(bracket)
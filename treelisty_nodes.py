@@ -0,0 +1,147 @@
+"""
+TreeListy Node Model
+Compact in-memory nodes for the filesystem-pattern exporters.
+
+Scanners used to build every item as a dict with a dozen string keys
+('fileExtension', 'dateModified', 'filePath', ...), which at hundreds of
+thousands of items costs far more in per-dict overhead than the data itself.
+FileNode keeps the same information in __slots__ attributes, stores
+timestamps as numbers until they are written, and shares values that are
+duplicated in the JSON (a local file's id is its path). The TreeListy dict is
+only built at write time, one node or subtree at a time.
+
+Output is unchanged: to_dict() produces exactly the keys, order and values
+the exporters wrote before.
+
+Usage:
+    node = LocalFileNode('/data/a.pdf', 'a.pdf', '📕', False, '.pdf', 1234,
+                         st.st_mtime, st.st_ctime)
+    node.description = text
+    json.dumps(node.to_dict())
+
+    writer = StreamingTreeWriter(f)
+    ...
+    write_nodes(writer, children)   # into an open 'children' array
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+Timestamp = Union[float, str, None]
+
+
+def iso_date(value: Timestamp) -> str:
+    """Format a stored timestamp: POSIX seconds, an already-formatted string, or None ('')"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    return datetime.fromtimestamp(value).isoformat()
+
+
+class FileNode:
+    """
+    One file or folder item in the filesystem pattern.
+
+    Subclasses add the source-specific fields written after 'dateCreated' by
+    listing (JSON key, attribute) pairs in EXTRA_FIELDS.
+    """
+    __slots__ = ('id', 'name', 'icon', 'is_folder', 'file_extension', 'file_size',
+                 'date_modified', 'date_created', 'description', 'rag', 'children', 'expanded')
+
+    EXTRA_FIELDS = ()
+
+    def __init__(self, id: str, name: str, icon: str, is_folder: bool, file_extension: str = '',
+                 file_size: int = 0, date_modified: Timestamp = None, date_created: Timestamp = None):
+        self.id = id
+        self.name = name
+        self.icon = icon
+        self.is_folder = is_folder
+        self.file_extension = file_extension
+        self.file_size = file_size
+        self.date_modified = date_modified
+        self.date_created = date_created
+        self.description = None     # Extracted text (RAG), written with its '_rag' metadata
+        self.rag = None
+        self.children = None        # List of child nodes; omitted from the JSON when empty
+        self.expanded = None        # Folders only
+
+    def fields(self) -> Dict[str, Any]:
+        """The node's own keys in TreeListy order, without 'children' and 'expanded'"""
+        fields = {
+            'id': self.id,
+            'name': self.name,
+            'type': 'item',
+            'icon': self.icon,
+            'isFolder': self.is_folder,
+            'fileExtension': self.file_extension,
+            'fileSize': self.file_size,
+            'dateModified': iso_date(self.date_modified),
+            'dateCreated': iso_date(self.date_created),
+        }
+        for key, attr in self.EXTRA_FIELDS:
+            fields[key] = getattr(self, attr)
+        if self.description is not None:
+            fields['description'] = self.description
+            fields['_rag'] = self.rag
+        return fields
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The full TreeListy dict for this node and its subtree"""
+        node = self.fields()
+        if self.children:
+            node['children'] = [child.to_dict() for child in self.children]
+        if self.expanded is not None:
+            node['expanded'] = self.expanded
+        return node
+
+
+class LocalFileNode(FileNode):
+    """Item found on the local filesystem; its id is its resolved path"""
+    __slots__ = ()
+
+    EXTRA_FIELDS = (('filePath', 'file_path'),)
+
+    @property
+    def file_path(self) -> str:
+        return self.id
+
+
+class DriveFileNode(FileNode):
+    """Item listed from Google Drive"""
+    __slots__ = ('file_url', 'file_owner', 'mime_type')
+
+    EXTRA_FIELDS = (('fileUrl', 'file_url'), ('fileOwner', 'file_owner'), ('mimeType', 'mime_type'))
+
+    def __init__(self, id: str, name: str, icon: str, is_folder: bool, file_extension: str = '',
+                 file_size: int = 0, date_modified: Timestamp = None, date_created: Timestamp = None,
+                 file_url: str = '', file_owner: str = '', mime_type: str = ''):
+        super().__init__(id, name, icon, is_folder, file_extension, file_size, date_modified, date_created)
+        self.file_url = file_url
+        self.file_owner = file_owner
+        self.mime_type = mime_type
+
+
+def write_nodes(writer, nodes: Optional[List[FileNode]]):
+    """
+    Write nodes into the writer's open array, materializing one dict at a time.
+
+    Folders are opened as objects and their children written recursively, so
+    a large subtree never exists as dicts all at once.
+    """
+    for node in nodes or ():
+        if not node.children:
+            writer.write_item(node.to_dict())
+            continue
+        writer.begin_object(node.fields())
+        writer.begin_array('children')
+        write_nodes(writer, node.children)
+        writer.end_array()
+        writer.end_object({'expanded': node.expanded} if node.expanded is not None else None)
+
+
+def count_nodes(nodes: Optional[List[FileNode]]) -> int:
+    """Count nodes recursively"""
+    if not nodes:
+        return 0
+    return len(nodes) + sum(count_nodes(node.children) for node in nodes)
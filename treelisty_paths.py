@@ -0,0 +1,133 @@
+"""
+TreeListy Compact Path Encoding
+Opt-in compact form of filesystem-pattern exports (--compact-paths), and the
+loader that expands it back.
+
+A local export repeats each item's absolute path four times: as 'id', as
+'filePath' and, for extracted documents, as '_rag.sourceId' and
+'_rag.sourcePath'. In a deep tree almost all of those bytes are the parent
+folders' paths over and over. In the compact form a node's path is implied by
+its parent's path plus its name, so all four are left out; only a node whose
+path isn't derivable that way (a symlink resolved elsewhere) keeps an explicit
+'filePath'. The root's 'source' is marked with 'pathEncoding' so loaders know
+to expand it.
+
+Compact files are smaller to store and faster to parse, but TreeListy imports
+the expanded form: run them through load_tree() or this module's CLI first.
+
+Usage:
+    tree = load_tree('local-folder-Docs-20250101_120000.compact.json')
+
+    python treelisty_paths.py local-folder-Docs-20250101_120000.compact.json
+        Writes local-folder-Docs-20250101_120000.json (expanded)
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, Optional
+
+PATH_ENCODING = 'parent-relative'
+
+# Fix Windows console encoding for emojis
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def child_path(parent_path: str, name: str, sep: str = os.sep) -> str:
+    """Path of `name` inside `parent_path`, joined the way os.path.join does"""
+    if parent_path.endswith(sep):
+        return parent_path + name
+    return parent_path + sep + name
+
+
+def compact_fields(fields: Dict[str, Any], parent_path: str, sep: str = os.sep) -> Dict[str, Any]:
+    """Drop the paths that can be derived from parent_path (fields are modified and returned)"""
+    path = fields.pop('filePath')
+    del fields['id']
+    if path != child_path(parent_path, fields['name'], sep):
+        fields['filePath'] = path
+
+    rag = fields.get('_rag')
+    if rag is not None and rag.get('sourceId') == path and rag.get('sourcePath') == path:
+        fields['_rag'] = {key: value for key, value in rag.items() if key not in ('sourceId', 'sourcePath')}
+    return fields
+
+
+def expand_node(node: Dict[str, Any], parent_path: str, sep: str = os.sep) -> Dict[str, Any]:
+    """Rebuild a compact node (and its subtree) with the standard keys and key order"""
+    path = node.get('filePath') or child_path(parent_path, node['name'], sep)
+
+    expanded = {'id': path}
+    for key, value in node.items():
+        if key == 'filePath':
+            continue
+        if key == 'children':
+            value = [expand_node(child, path, sep) for child in value]
+        elif key == '_rag' and 'sourceId' not in value:
+            value = expand_rag(value, path)
+        expanded[key] = value
+        if key == 'dateCreated':
+            expanded['filePath'] = path
+    return expanded
+
+
+def expand_rag(rag: Dict[str, Any], path: str) -> Dict[str, Any]:
+    expanded = {}
+    for key, value in rag.items():
+        expanded[key] = value
+        if key == 'sourceType':
+            expanded['sourceId'] = path
+            expanded['sourcePath'] = path
+    return expanded
+
+
+def expand_tree(tree: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact export in place (no-op for a standard one) and return it"""
+    source = tree.get('source') or {}
+    if source.get('pathEncoding') != PATH_ENCODING:
+        return tree
+
+    sep = source.pop('pathSeparator', os.sep)
+    del source['pathEncoding']
+    # Top-level folders ('phase' nodes) keep their absolute path as id
+    for phase in tree.get('children', []):
+        if 'children' in phase:
+            phase['children'] = [expand_node(child, phase['id'], sep) for child in phase['children']]
+    return tree
+
+
+def load_tree(file_path: str) -> Dict[str, Any]:
+    """Load a TreeListy export, expanding compact paths if it uses them"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return expand_tree(json.load(f))
+
+
+def expanded_file_name(file_path: str) -> str:
+    if file_path.endswith('.compact.json'):
+        return file_path[:-len('.compact.json')] + '.json'
+    return file_path[:-len('.json')] + '.expanded.json' if file_path.endswith('.json') else file_path + '.json'
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        description='Expand a compact-path TreeListy export into the standard importable format'
+    )
+    parser.add_argument('input', help='Compact export (.compact.json)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Output file (default: input name without .compact)')
+    args = parser.parse_args(argv)
+
+    output_file = args.output or expanded_file_name(args.input)
+    tree = load_tree(args.input)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(tree, f, indent=2, ensure_ascii=False)
+
+    before = os.path.getsize(args.input)
+    after = os.path.getsize(output_file)
+    print(f"✅ Expanded {args.input} ({before:,} bytes) → {output_file} ({after:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
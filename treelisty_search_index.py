@@ -0,0 +1,524 @@
+"""
+TreeListy Search Index
+A BM25 inverted index of a knowledge-base export's chunks, written next to
+the tree JSON by export_gdrive_content_to_treelisty.py and
+export_local_folder_to_treelisty.py (--search-index), so chunks can be
+searched without loading the tree and scanning every description.
+
+The index is a single SQLite file:
+- docs: one row per indexed chunk - its node id, the file node it came
+  from and a doc number, the chunk's position in the postings
+- segments: the token count (document length) of every doc, one packed
+  array per segment of consecutive doc numbers
+- postings: for each term, term frequency and size class (the doc length
+  to within a factor of 2 ** (1 / SIZE_CLASSES)), the doc numbers of the
+  chunks of that size containing the term that many times, one packed
+  array per segment - the term frequency of a posting is the row it is in
+
+Exporters update it rather than rebuild it. Every file node is added with
+its chunks; a file whose chunks (node ids and text) are unchanged since
+the last run is kept as it is, one that changed has its old docs deleted
+and the new ones appended in a new segment, and files a run didn't add are
+deleted when it is saved. Deleted docs get length 0 and are skipped by
+queries, and like deleted documents in Lucene they still count toward
+document frequencies until the index is compacted (renumbered into one
+segment without them), which save() does once they are over
+COMPACT_DELETED of the docs or there are more than MAX_SEGMENTS segments.
+
+Queries score exact BM25 in pure Python, and avoid touching most postings:
+each row of postings (term frequency and size class) has an upper bound on
+what it adds to a score - from its term frequency and shortest doc, so it
+is close to exact - and rows are visited best bound first. Once the k-th
+best score so far is out of reach for any chunk not yet seen, only the
+chunks that can still make the top k are scored further, and they are
+dropped as the remaining rows' bounds fall. Most queries over a million
+chunks take milliseconds that way. Only queries with several words that
+are each in a large share of the chunks (NUMPY_DF_SHARE) - whose chunks
+all score about the same, so little can be skipped - still visit a good
+share of their postings; with numpy installed, those are scored in numpy
+instead (every posting, vectorized), several times faster. Both compute
+the same BM25 scores.
+
+Usage:
+    index = SearchIndexWriter('gdrive-content.search.db')
+    index.add_file(file_node_id, [(chunk_node_id, chunk_text), ...])
+    index.save('gdrive-content-20250101_120000.json')
+    index.close()
+
+    index = SearchIndex('gdrive-content.search.db')
+    for hit in index.search('quarterly revenue', k=10):
+        print(hit.node_id, hit.score)
+
+    python treelisty_search_index.py gdrive-content.search.db "quarterly revenue" -k 10
+"""
+
+import argparse
+import hashlib
+import heapq
+import math
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Optional import for vectorized scoring
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Bumped when the index layout or tokenization changes
+INDEX_VERSION = '1'
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Words: runs of letters and digits, lowercased; longer runs are left out
+TOKEN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 40
+
+# Size classes per doubling of doc length, grouping postings by length
+SIZE_CLASSES = 4
+
+# Postings buffered in memory before they are written as a segment
+SEGMENT_POSTINGS = 4_000_000
+# Compact once deleted docs are over this share of all docs, or segments over MAX_SEGMENTS
+COMPACT_DELETED = 0.25
+MAX_SEGMENTS = 64
+
+# Queries with two or more terms in more than this share of the chunks are scored with numpy
+NUMPY_DF_SHARE = 0.45
+
+# A doc number array, packed; 'I' is 4 bytes on every platform we run on
+DOC_ARRAY = 'I'
+
+
+def tokenize(text: str) -> List[str]:
+    """The terms of a text, in order (the same for chunks and queries)"""
+    return [term for term in TOKEN.findall(text.lower()) if len(term) <= MAX_TERM_LENGTH]
+
+
+def size_class(length: int) -> int:
+    return int(math.log2(length) * SIZE_CLASSES)
+
+
+def _fingerprint(chunks: List[Tuple[str, str]]) -> str:
+    digest = hashlib.sha1()
+    for node_id, text in chunks:
+        digest.update(node_id.encode('utf-8') + b'\x1f' + text.encode('utf-8') + b'\x1e')
+    return digest.hexdigest()
+
+
+def _create_tables(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS files (file_id TEXT PRIMARY KEY, fingerprint TEXT);
+        CREATE TABLE IF NOT EXISTS docs (doc INTEGER PRIMARY KEY, node_id TEXT, file_id TEXT);
+        CREATE INDEX IF NOT EXISTS docs_file ON docs (file_id);
+        CREATE TABLE IF NOT EXISTS segments (segment INTEGER PRIMARY KEY, first_doc INTEGER, lengths BLOB);
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT, segment INTEGER, tf INTEGER, size_class INTEGER, min_length INTEGER, docs BLOB,
+            PRIMARY KEY (term, segment, tf, size_class)) WITHOUT ROWID;
+    """)
+
+
+class SearchIndexWriter:
+    """
+    Adds an export's chunks to a search index, in place (see module docstring).
+
+    add_file() each file node as it is written; save() after the export is
+    written commits the run, and closing without saving leaves the index as
+    it was.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        _create_tables(self.conn)
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get('version') != INDEX_VERSION:
+            self.conn.executescript("""
+                DELETE FROM meta; DELETE FROM files; DELETE FROM docs;
+                DELETE FROM segments; DELETE FROM postings;
+            """)
+            meta = {}
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (INDEX_VERSION,))
+        self.live_docs = int(meta.get('live_docs', 0))
+        self.total_length = int(meta.get('total_length', 0))
+        # Segments as [segment, first_doc, lengths]; lengths are loaded when a doc in them is deleted
+        self.segments = [[segment, first_doc, None] for segment, first_doc
+                         in self.conn.execute("SELECT segment, first_doc FROM segments ORDER BY segment")]
+        self.changed_segments = set()
+        self.next_doc = self._doc_count()
+        self.seen = set()
+        self.stats = {'files_added': 0, 'files_unchanged': 0, 'files_deleted': 0, 'chunks_added': 0}
+        self._reset_pending()
+
+    def add_file(self, file_id: str, chunks: List[Tuple[str, str]]):
+        """
+        Index a file node's chunks, as (node id, text) pairs; chunks without
+        a single term are left out. A file added twice in one run (a Drive
+        file in two folders) keeps both.
+        """
+        fingerprint = _fingerprint(chunks)
+        if file_id not in self.seen:
+            self.seen.add(file_id)
+            row = self.conn.execute("SELECT fingerprint FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            if row is not None and row[0] == fingerprint:
+                self.stats['files_unchanged'] += 1
+                return
+            if row is not None:
+                self._delete_docs(file_id)
+        else:
+            previous = self.conn.execute("SELECT fingerprint FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            fingerprint = hashlib.sha1(((previous[0] if previous else '') + fingerprint).encode()).hexdigest()
+        self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?)", (file_id, fingerprint))
+        self.stats['files_added'] += 1
+
+        for node_id, text in chunks:
+            terms = Counter(tokenize(text))
+            if not terms:
+                continue
+            doc = self.next_doc
+            self.next_doc += 1
+            length = sum(terms.values())
+            size = size_class(length)
+            self.pending_docs.append((doc, node_id, file_id))
+            self.pending_lengths.append(length)
+            self.live_docs += 1
+            self.total_length += length
+            postings = self.pending_postings
+            for term, tf in terms.items():
+                docs = postings.get((term, tf, size))
+                if docs is None:
+                    docs = postings[term, tf, size] = array(DOC_ARRAY)
+                docs.append(doc)
+            self.pending_count += len(terms)
+            self.stats['chunks_added'] += 1
+        if self.pending_count >= SEGMENT_POSTINGS:
+            self._write_segment()
+
+    def save(self, export_file: str = ''):
+        """
+        Write what is pending, delete files this run didn't add, compact if
+        due, and commit; export_file is recorded as the tree it indexes.
+        """
+        self._write_segment()
+        unseen = [file_id for (file_id,) in self.conn.execute("SELECT file_id FROM files")
+                  if file_id not in self.seen]
+        for file_id in unseen:
+            self._delete_docs(file_id)
+            self.conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+        self.stats['files_deleted'] = len(unseen)
+        self._write_lengths()
+
+        doc_count = self._doc_count()
+        if doc_count and (doc_count - self.live_docs > doc_count * COMPACT_DELETED
+                          or len(self.segments) > MAX_SEGMENTS):
+            self.compact()
+        self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                              [('live_docs', str(self.live_docs)), ('total_length', str(self.total_length)),
+                               ('export', export_file)])
+        self.conn.commit()
+        self.seen = set()
+
+    def compact(self):
+        """Renumber the live docs into a single segment, dropping deleted ones"""
+        lengths = self._all_lengths()
+        renumbered = array(DOC_ARRAY, [0]) * len(lengths)
+        new_lengths = array(DOC_ARRAY)
+        for doc, length in enumerate(lengths):
+            if length:
+                renumbered[doc] = len(new_lengths)
+                new_lengths.append(length)
+        rows = self.conn.execute("SELECT doc, node_id, file_id FROM docs ORDER BY doc").fetchall()
+        self.conn.execute("DELETE FROM docs")
+        self.conn.executemany("INSERT INTO docs VALUES (?, ?, ?)",
+                              ((renumbered[doc], node_id, file_id) for doc, node_id, file_id in rows
+                               if lengths[doc]))
+        del rows
+
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS merged (term TEXT, tf INTEGER, size_class INTEGER, "
+                          "min_length INTEGER, docs BLOB)")
+        self.conn.execute("DELETE FROM merged")
+        merged = []
+        key = None
+        docs = array(DOC_ARRAY)
+        for row in self.conn.execute("SELECT term, tf, size_class, docs FROM postings "
+                                     "ORDER BY term, tf, size_class, segment"):
+            if row[:3] != key:
+                if docs:
+                    merged.append(key + (min(map(new_lengths.__getitem__, docs)), docs.tobytes()))
+                key = row[:3]
+                docs = array(DOC_ARRAY)
+            old = array(DOC_ARRAY)
+            old.frombytes(row[3])
+            docs.extend(renumbered[doc] for doc in old if lengths[doc])
+            if len(merged) >= 10000:
+                self.conn.executemany("INSERT INTO merged VALUES (?, ?, ?, ?, ?)", merged)
+                merged = []
+        if docs:
+            merged.append(key + (min(map(new_lengths.__getitem__, docs)), docs.tobytes()))
+        self.conn.executemany("INSERT INTO merged VALUES (?, ?, ?, ?, ?)", merged)
+        self.conn.execute("DELETE FROM postings")
+        self.conn.execute("INSERT INTO postings SELECT term, 0, tf, size_class, min_length, docs FROM merged")
+        self.conn.execute("DROP TABLE merged")
+        self.conn.execute("DELETE FROM segments")
+        self.conn.execute("INSERT INTO segments VALUES (0, 0, ?)", (new_lengths.tobytes(),))
+        self.segments = [[0, 0, new_lengths]]
+        self.changed_segments = set()
+        self.live_docs = len(new_lengths)
+        self.next_doc = len(new_lengths)
+
+    def close(self):
+        self.conn.close()
+
+    def _reset_pending(self):
+        self.pending_docs = []
+        self.pending_lengths = array(DOC_ARRAY)
+        self.pending_postings: Dict[Tuple[str, int, int], array] = {}
+        self.pending_count = 0
+
+    def _doc_count(self) -> int:
+        """Doc numbers used so far, deleted ones included"""
+        row = self.conn.execute("SELECT first_doc, length(lengths) FROM segments ORDER BY segment DESC "
+                                "LIMIT 1").fetchone()
+        return row[0] + row[1] // array(DOC_ARRAY).itemsize if row is not None else 0
+
+    def _write_segment(self):
+        if not self.pending_docs:
+            return
+        segment = self.segments[-1][0] + 1 if self.segments else 0
+        first_doc = self.pending_docs[0][0]
+        lengths = self.pending_lengths
+        self.conn.executemany("INSERT INTO docs VALUES (?, ?, ?)", self.pending_docs)
+        self.conn.execute("INSERT INTO segments VALUES (?, ?, ?)", (segment, first_doc, lengths.tobytes()))
+        self.conn.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?, ?, ?)",
+            ((term, segment, tf, size, min(lengths[doc - first_doc] for doc in docs), docs.tobytes())
+             for (term, tf, size), docs in sorted(self.pending_postings.items())))
+        self.segments.append([segment, first_doc, lengths])
+        self._reset_pending()
+
+    def _delete_docs(self, file_id: str):
+        docs = [doc for (doc,) in self.conn.execute("SELECT doc FROM docs WHERE file_id = ?", (file_id,))]
+        self.conn.execute("DELETE FROM docs WHERE file_id = ?", (file_id,))
+        for doc in docs:
+            entry = self._segment_of(doc)
+            if entry[2] is None:
+                entry[2] = array(DOC_ARRAY)
+                entry[2].frombytes(self.conn.execute("SELECT lengths FROM segments WHERE segment = ?",
+                                                     (entry[0],)).fetchone()[0])
+            self.total_length -= entry[2][doc - entry[1]]
+            entry[2][doc - entry[1]] = 0
+            self.live_docs -= 1
+            self.changed_segments.add(entry[0])
+
+    def _segment_of(self, doc: int):
+        starts = [entry[1] for entry in self.segments]
+        return self.segments[bisect_left(starts, doc + 1) - 1]
+
+    def _write_lengths(self):
+        for entry in self.segments:
+            if entry[0] in self.changed_segments:
+                self.conn.execute("UPDATE segments SET lengths = ? WHERE segment = ?",
+                                  (entry[2].tobytes(), entry[0]))
+        self.changed_segments = set()
+
+    def _all_lengths(self) -> array:
+        lengths = array(DOC_ARRAY)
+        for segment, blob in self.conn.execute("SELECT segment, lengths FROM segments ORDER BY segment"):
+            lengths.frombytes(blob)
+        return lengths
+
+
+class Hit(NamedTuple):
+    node_id: str
+    score: float
+    file_id: str
+
+
+class SearchIndex:
+    """Top-k BM25 search over a search index (see module docstring)"""
+
+    def __init__(self, db_path: str, use_numpy: bool = HAS_NUMPY):
+        self.db_path = db_path
+        self.use_numpy = use_numpy
+        self.conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, check_same_thread=False)
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"{db_path} is not a version {INDEX_VERSION} search index")
+        self.export_file = meta.get('export', '')
+        self.live_docs = int(meta.get('live_docs', 0))
+        self.avg_length = max(int(meta.get('total_length', 0)) / self.live_docs if self.live_docs else 1.0, 1.0)
+        self.lengths = array(DOC_ARRAY)
+        for (blob,) in self.conn.execute("SELECT lengths FROM segments ORDER BY segment"):
+            self.lengths.frombytes(blob)
+        if use_numpy:
+            # The length term of every chunk's BM25 denominator; deleted chunks' are infinite, so they score 0
+            lengths = numpy.frombuffer(self.lengths, dtype=numpy.uint32).astype(numpy.float64)
+            lengths[lengths == 0] = numpy.inf
+            self.numpy_norms = lengths * (K1 * B / self.avg_length)
+
+    def search(self, query: str, k: int = 10) -> List[Hit]:
+        """The k chunks scoring highest for query, best first"""
+        if k <= 0 or not self.live_docs:
+            return []
+        terms = self._term_groups(query)
+        if not terms:
+            return []
+        common = len(self.lengths) * NUMPY_DF_SHARE
+        if self.use_numpy and sum(sum(len(group[3]) for group in groups) > common for groups in terms) >= 2:
+            return self._hits(self._search_numpy(terms, k))
+        lengths = self.lengths
+        norm = K1 * B / self.avg_length
+        # Next group to visit per term, and the best any chunk can still gain from the rest
+        positions = [0] * len(terms)
+
+        def remaining():
+            return [groups[position][0] if position < len(groups) else 0.0
+                    for groups, position in zip(terms, positions)]
+
+        def next_group():
+            heads = remaining()
+            term = heads.index(max(heads))
+            positions[term] += 1
+            return terms[term][positions[term] - 1]
+
+        # Score everything visited until no chunk not seen yet can make the top k
+        scores = {}
+        kth = 0.0
+        unseen = sum(remaining())
+        visited = 0
+        while unseen > kth:
+            _, weight, base, docs = next_group()
+            get = scores.get
+            for doc in docs:
+                length = lengths[doc]
+                if length:
+                    scores[doc] = get(doc, 0.0) + weight / (base + norm * length)
+            unseen = sum(remaining())
+            visited += len(docs)
+            # Finding the k-th score takes a pass over the scores, so only do it as often as that pays
+            if len(scores) >= k and (visited * 4 >= len(scores) or unseen <= kth):
+                kth = heapq.nlargest(k, scores.values())[-1]
+                visited = 0
+
+        # Then only add to the chunks that still can, dropping them as the bounds fall
+        candidates = {doc: score for doc, score in scores.items() if score + unseen >= kth}
+        del scores
+        pruned_at = unseen
+        while unseen > 0.0 and len(candidates) > k:
+            _, weight, base, docs = next_group()
+            self._add_group(candidates, weight, base, docs, norm)
+            unseen = sum(remaining())
+            if unseen < pruned_at * 0.9:
+                kth = max(kth, heapq.nlargest(k, candidates.values())[-1])
+                candidates = {doc: score for doc, score in candidates.items() if score + unseen >= kth}
+                pruned_at = unseen
+        for groups, position in zip(terms, positions):
+            for _, weight, base, docs in groups[position:]:
+                self._add_group(candidates, weight, base, docs, norm)
+
+        return self._hits(heapq.nlargest(k, candidates.items(), key=lambda item: (item[1], -item[0])))
+
+    def _search_numpy(self, terms, k: int) -> List[Tuple[int, float]]:
+        """Top k (doc, score) pairs, scoring every posting of the query's terms with numpy"""
+        norms = self.numpy_norms
+        scores = numpy.zeros(len(norms))
+        for groups in terms:
+            # A chunk is in one group per term, so no doc repeats within an update
+            for _, weight, base, docs in groups:
+                docs = numpy.frombuffer(docs, dtype=numpy.uint32)
+                scores[docs] += weight / (base + norms[docs])
+        top = numpy.argpartition(-scores, k - 1)[:k] if k < len(scores) else numpy.arange(len(scores))
+        best = sorted(((int(doc), float(scores[doc])) for doc in top if scores[doc] > 0),
+                      key=lambda item: (-item[1], item[0]))
+        return best
+
+    def _hits(self, best: List[Tuple[int, float]]) -> List[Hit]:
+        hits = []
+        for doc, score in best:
+            node_id, file_id = self.conn.execute("SELECT node_id, file_id FROM docs WHERE doc = ?",
+                                                 (doc,)).fetchone()
+            hits.append(Hit(node_id, score, file_id))
+        return hits
+
+    def _term_groups(self, query: str):
+        """Per query term in the index, its postings as [bound, weight, base, docs] groups, best bound first"""
+        norm = K1 * B / self.avg_length
+        terms = []
+        for term in dict.fromkeys(tokenize(query)):
+            groups = {}
+            for tf, size, min_length, blob in self.conn.execute(
+                    "SELECT tf, size_class, min_length, docs FROM postings WHERE term = ? ORDER BY segment", (term,)):
+                group = groups.get((tf, size))
+                if group is None:
+                    group = groups[tf, size] = [min_length, array(DOC_ARRAY)]
+                group[0] = min(group[0], min_length)
+                # Segments hold increasing doc numbers, so the docs stay sorted
+                group[1].frombytes(blob)
+            if not groups:
+                continue
+            df = sum(len(docs) for _, docs in groups.values())
+            idf = math.log(1 + (len(self.lengths) - df + 0.5) / (df + 0.5))
+            term_groups = []
+            for (tf, _), (min_length, docs) in groups.items():
+                # A posting adds weight / (base + norm * length) to its chunk's score
+                weight = idf * tf * (K1 + 1)
+                base = tf + K1 * (1 - B)
+                term_groups.append((weight / (base + norm * min_length), weight, base, docs))
+            term_groups.sort(key=lambda group: group[0], reverse=True)
+            terms.append(term_groups)
+        return terms
+
+    def _add_group(self, candidates: Dict[int, float], weight: float, base: float, docs: array, norm: float):
+        """Add a group's contributions to the candidates it contains"""
+        lengths = self.lengths
+        if len(candidates) * 10 < len(docs):
+            for doc in candidates:
+                i = bisect_left(docs, doc)
+                if i < len(docs) and docs[i] == doc:
+                    candidates[doc] += weight / (base + norm * lengths[doc])
+        else:
+            for doc in [doc for doc in docs if doc in candidates]:
+                candidates[doc] += weight / (base + norm * lengths[doc])
+
+    def close(self):
+        self.conn.close()
+
+
+def file_chunks(node: Dict) -> List[Tuple[str, str]]:
+    """A file node's chunks as (node id, text): its chunk items, or its own description"""
+    if node.get('items'):
+        return [(item['id'], item.get('description', '')) for item in node['items']]
+    if node.get('description') is not None and '_rag' in node:
+        return [(node['id'], node['description'])]
+    return []
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description='Search a TreeListy search index (BM25)')
+    parser.add_argument('index', help='Search index file (*.search.db)')
+    parser.add_argument('query', help='Search query')
+    parser.add_argument('-k', type=int, default=10, help='Results to return (default: 10)')
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.index)
+    start = time.perf_counter()
+    hits = index.search(args.query, args.k)
+    elapsed = time.perf_counter() - start
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank:>3}. {hit.score:8.3f}  {hit.node_id}  ({hit.file_id})")
+    print(f"{len(hits)} results from {index.live_docs:,} chunks in {elapsed * 1000:.1f}ms", file=sys.stderr)
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,8 @@ from datetime import datetime
 from flask import Flask, jsonify, send_file, request
 from flask_cors import CORS
 
+from treelisty_drive_sync import find_subtree
+
 # Fix Windows console encoding for emojis
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -36,6 +38,12 @@ def refresh_google_drive():
     """
     Triggers Google Drive export and returns the latest JSON
     Accepts optional source metadata for targeted refresh
+
+    With a source folderId other than 'root', only that folder is rescanned
+    and spliced into the last full export; the response then carries just
+    the refreshed folder node as 'data', with 'path' (its ancestors'
+    ids and names, from the tree root) so TreeListy can replace it in place.
+    If the export couldn't refresh just the folder, the full tree is sent.
     """
     try:
         print("🔄 Refresh request received from TreeListy...")
@@ -56,10 +64,15 @@ def refresh_google_drive():
         else:
             print(f"📋 No source metadata - scanning entire Drive (depth: {sync_depth})")
 
-        # Run the export script with specified depth
+        # Run the export script with specified depth; --incremental updates the
+        # newest previous export from the Drive Changes API when it can, and
+        # --folder rescans only the requested folder
+        command = ['python', 'export_google_drive_to_treelisty.py', str(sync_depth), '--incremental']
+        if folder_id != 'root':
+            command += ['--folder', folder_id]
         print("📥 Running Google Drive export script...")
         result = subprocess.run(
-            ['python', 'export_google_drive_to_treelisty.py', str(sync_depth)],
+            command,
             capture_output=True,
             text=True,
             encoding='utf-8',  # Force UTF-8 encoding for emoji support
@@ -97,6 +110,24 @@ def refresh_google_drive():
         file_size = file_stats.st_size
         modified_time = datetime.fromtimestamp(file_stats.st_mtime).isoformat()
 
+        # Folder refresh: send only the refreshed subtree. When the folder wasn't
+        # in the last export the script falls back to a normal refresh, which
+        # records no refreshedFolderId, and the full tree is sent
+        if folder_id != 'root' and tree_data.get('source', {}).get('refreshedFolderId') == folder_id:
+            placements = find_subtree(tree_data, folder_id)
+            if placements:
+                subtree, path = placements[0]
+                print(f"✅ Sending folder {subtree.get('name')} to TreeListy")
+                return jsonify({
+                    'success': True,
+                    'filename': latest_file,
+                    'fileSize': file_size,
+                    'modified': modified_time,
+                    'folderId': folder_id,
+                    'path': path,
+                    'data': subtree
+                })
+
         print(f"✅ Sending {file_size} bytes to TreeListy")
 
         return jsonify({
@@ -0,0 +1,297 @@
+"""
+TreeListy Spreadsheet Text
+Turns spreadsheet rows - an Excel workbook's sheets, a CSV file - into
+text for RAG within fixed budgets, for the content exporters.
+
+Stringifying every cell of a 200,000-row workbook gives a description of
+tens of megabytes, cut into thousands of chunks no one will search for.
+Here rows are read one at a time and reading stops at the budgets in
+SheetOptions: at most `scan_rows` rows and `max_chars` characters of text
+per sheet, and `max_sheets` sheets, so extraction time and output size
+stay bounded whatever the size of the workbook.
+
+Two modes:
+- rows: the sheet's first rows as ' | '-separated lines (up to max_rows
+  below the header), with a note of how many there were in all.
+- summary: a line per column - its header, value types, distinct count
+  and range or most common values over the rows read - then the header
+  and a few sample rows.
+
+The header is detected among a sheet's first rows: the first row of at
+least two distinct text cells none of which comes up again in its column
+below. Rows above it (titles, notes) are kept as they are.
+
+Usage:
+    text = sheet_text(rows, SheetOptions(mode=SUMMARY), name='Sales')
+    with open('data.csv', newline='', encoding='utf-8') as f:
+        text = csv_text(f, SheetOptions(max_rows=50))
+"""
+
+import csv
+import itertools
+import re
+from collections import Counter
+from datetime import date, datetime, time
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+ROWS = 'rows'
+SUMMARY = 'summary'
+SHEET_MODES = (ROWS, SUMMARY)
+
+# Part of SheetOptions.key(): bump when the same options give different text
+FORMAT_VERSION = '1'
+
+MAX_CELL_CHARS = 200        # A cell's text is cut after this
+HEADER_SEARCH_ROWS = 10     # Rows the header may be among
+HEADER_CHECK_ROWS = 20      # Rows below a candidate header checked against it
+MAX_DISTINCT = 1000         # Distinct values counted per column, then "1,000+"
+TOP_VALUES = 5              # Most common values listed for a text column
+CSV_SNIFF_CHARS = 32 * 1024  # Start of a CSV file its delimiter is guessed from
+
+NUMBER = re.compile(r'[-+]?[$€£]?(?:\d{1,3}(?:,\d{3})+|\d+)?(?:\.\d+)?(?:[eE][-+]?\d+)?%?')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?')
+OTHER_DATE = re.compile(r'\d{1,2}[/.]\d{1,2}[/.]\d{2,4}')
+
+
+class SheetOptions(NamedTuple):
+    """How sheets are turned into text (see module docstring); budgets are per sheet"""
+    mode: str = ROWS
+    max_rows: int = 200         # Rows written below the header (rows mode)
+    max_chars: int = 20000      # Characters of text
+    scan_rows: int = 10000      # Rows read, in either mode
+    max_sheets: int = 20        # Sheets per workbook
+    max_columns: int = 50       # Columns, from the left
+    sample_rows: int = 5        # Sample rows (summary mode)
+
+    def key(self) -> str:
+        """The options as a string, for cache keys and manifests"""
+        return f'sheets{FORMAT_VERSION}:' + ','.join(str(value) for value in self)
+
+
+def value_type(value: Any) -> Optional[str]:
+    """'number', 'date', 'time', 'boolean' or 'text' for a cell (None if empty); CSV text is recognized too"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, (datetime, date)):
+        return 'date'
+    if isinstance(value, time):
+        return 'time'
+    text = str(value).strip()
+    if not text:
+        return None
+    if any(c.isdigit() for c in text):
+        if NUMBER.fullmatch(text):
+            return 'number'
+        if ISO_DATE.fullmatch(text) or OTHER_DATE.fullmatch(text):
+            return 'date'
+    if text.lower() in ('true', 'false'):
+        return 'boolean'
+    return 'text'
+
+
+def cell_text(value: Any) -> str:
+    """A cell as it is written: on one line, at most MAX_CELL_CHARS characters"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime) and value.time() == time():
+        value = value.date()
+    text = ' '.join(str(value).split())
+    return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS - 1] + '…'
+
+
+def row_cells(row: Sequence[Any], max_columns: int) -> List[str]:
+    """A row's cell texts up to max_columns, without trailing empty cells"""
+    cells = [cell_text(value) for value in row[:max_columns]]
+    while cells and not cells[-1]:
+        cells.pop()
+    return cells
+
+
+def column_letter(index: int) -> str:
+    """Spreadsheet column name for a 0-based index: A, B, ..., Z, AA, ..."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def find_header(rows: List[List[str]]) -> Optional[int]:
+    """Index of the header among a sheet's first rows (cell texts), or None"""
+    for i, row in enumerate(rows[:HEADER_SEARCH_ROWS]):
+        filled = [cell for cell in row if cell]
+        if len(filled) < 2:
+            continue  # Blank, or a title
+        below = [other for other in rows[i + 1:i + 1 + HEADER_CHECK_ROWS] if any(other)]
+        if (len(set(filled)) < len(filled) or any(value_type(cell) != 'text' for cell in filled) or not below
+                or any(cell and j < len(other) and other[j] == cell
+                       for other in below for j, cell in enumerate(row))):
+            return None
+        return i
+    return None
+
+
+class _Column:
+    """What summary mode reports for one column"""
+
+    def __init__(self):
+        self.types = Counter()
+        self.values = Counter()     # Cell texts, the first MAX_DISTINCT distinct ones
+        self.more_values = False
+        self.low = self.high = None  # (sort key, text) of the smallest/largest number or ISO date
+
+    def add(self, value: Any, text: str):
+        kind = value_type(value)
+        if kind is None:
+            return
+        self.types[kind] += 1
+        if text in self.values or len(self.values) < MAX_DISTINCT:
+            self.values[text] += 1
+        else:
+            self.more_values = True
+
+        key = None
+        if kind == 'number':
+            try:
+                key = float(value) if not isinstance(value, str) else \
+                    float(value.strip().lstrip('+$€£').replace(',', '').rstrip('%') or 'nan')
+            except ValueError:
+                key = None
+        elif kind == 'date':
+            key = value.isoformat() if isinstance(value, (datetime, date)) else \
+                (text if ISO_DATE.fullmatch(text) else None)
+        if key is not None and key == key:
+            if self.low is None or key < self.low[0]:
+                self.low = (key, text)
+            if self.high is None or key > self.high[0]:
+                self.high = (key, text)
+
+    def describe(self, name: str, rows: int) -> str:
+        """The column's line, out of `rows` non-empty rows"""
+        kinds = '/'.join(kind for kind, _ in self.types.most_common())
+        details = [f"{len(self.values):,}{'+' if self.more_values else ''} distinct"]
+        if self.low is not None and self.low[0] != self.high[0]:
+            details.append(f"{self.low[1]} to {self.high[1]}")
+        elif self.types.most_common(1)[0][0] in ('text', 'boolean'):
+            common = self.values.most_common(TOP_VALUES)
+            if common[0][1] > 1:
+                details.append('most common: ' + ', '.join(f"{text} ({count:,})" for text, count in common))
+            else:
+                details.append('e.g. ' + ', '.join(text for text, _ in common[:3]))
+        empty = rows - sum(self.types.values())
+        if empty:
+            details.append(f"{empty:,} empty")
+        return f"- {name} ({kinds}): " + ', '.join(details)
+
+
+def sheet_text(rows: Iterable[Sequence[Any]], options: SheetOptions = SheetOptions(), name: Optional[str] = None,
+               total_rows: Optional[int] = None) -> str:
+    """
+    A sheet's rows (sequences of cell values) as text within the options'
+    budgets (see module docstring), headed '## Sheet: name' if named. Rows
+    are pulled lazily, at most options.scan_rows of them; total_rows, if
+    known (a workbook's recorded dimensions), is reported when they weren't
+    all read.
+    """
+    source = iter(rows)
+    budgeted = itertools.islice(source, options.scan_rows)
+    head = [(row, row_cells(row, options.max_columns)) for row in itertools.islice(
+        budgeted, HEADER_SEARCH_ROWS + HEADER_CHECK_ROWS)]
+    header_at = find_header([cells for _, cells in head])
+    data_from = header_at + 1 if header_at is not None else 0
+    title = [f"## Sheet: {name}", ''] if name is not None else []
+
+    read = 0
+    shown = 0
+    if options.mode == SUMMARY:
+        preamble = [' | '.join(cells) for _, cells in head[:data_from] if any(cells)]
+        header = preamble.pop() if header_at is not None else None
+        columns: List[_Column] = []
+        samples = []
+        for row, cells in itertools.chain(head[data_from:], ((row, None) for row in budgeted)):
+            read += 1
+            if cells is None:
+                cells = row_cells(row, options.max_columns)
+            if not cells:
+                continue
+            shown += 1
+            while len(columns) < len(cells):
+                columns.append(_Column())
+            for column, value, text in zip(columns, row, cells):
+                column.add(value, text)
+            if len(samples) < options.sample_rows:
+                samples.append(' | '.join(cells))
+        more = read + data_from >= options.scan_rows and next(source, None) is not None
+
+        names = head[header_at][1] if header_at is not None else []
+        if not shown:
+            return '\n'.join(title + preamble + ([header] if header is not None else [])).strip()
+        described = [column.describe(names[i] if i < len(names) and names[i] else f"Column {column_letter(i)}",
+                                     shown)
+                     for i, column in enumerate(columns) if column.types]
+        counted = f"{shown:,} rows × {len(described)} columns"
+        if more:
+            counted += f" (the first {shown:,} rows" + (f" of ~{total_rows - data_from:,}" if total_rows else '') + ")"
+        lines = title + preamble + [counted, 'Columns:'] + described
+        if samples:
+            lines += ['Sample rows:'] + ([header] if header is not None else []) + samples
+        text = '\n'.join(lines)
+        if len(text) > options.max_chars:
+            text = text[:text.rfind('\n', 0, options.max_chars)] + '\n[Summary truncated]'
+        return text
+
+    lines = list(title)
+    length = 0
+    cut = False
+    for row, cells in itertools.chain(head, ((row, None) for row in budgeted)):
+        read += 1
+        if cells is None:
+            cells = row_cells(row, options.max_columns)
+        if not cells:
+            continue
+        line = ' | '.join(cells)
+        if (read > data_from and shown >= options.max_rows) or length + len(line) + 1 > options.max_chars:
+            cut = True
+            break
+        lines.append(line)
+        length += len(line) + 1
+        if read > data_from:
+            shown += 1
+    if cut or (read >= options.scan_rows and next(source, None) is not None):
+        lines.append(f"[First {shown:,} rows" + (f" of ~{total_rows - data_from:,}" if total_rows else '') + "]")
+    return '\n'.join(lines).rstrip()
+
+
+def workbook_text(sheets: Iterable[Tuple[str, Iterable[Sequence[Any]], Optional[int]]],
+                  options: SheetOptions = SheetOptions(), sheet_count: Optional[int] = None) -> str:
+    """
+    A workbook's text: (name, rows, total rows or None) for each sheet, at
+    most options.max_sheets of them (sheets is pulled lazily), with a note
+    of how many more there were out of sheet_count.
+    """
+    parts = [sheet_text(rows, options, name, total_rows)
+             for name, rows, total_rows in itertools.islice(sheets, options.max_sheets)]
+    if sheet_count is not None and sheet_count > options.max_sheets:
+        parts.append(f"[{sheet_count - options.max_sheets:,} more sheets not extracted]")
+    return '\n\n'.join(parts)
+
+
+def csv_text(f: TextIO, options: SheetOptions = SheetOptions(), name: Optional[str] = None) -> str:
+    """
+    A CSV file's text (see sheet_text), f opened with newline='' and
+    seekable. The delimiter is guessed from the start of the file.
+    """
+    sample = f.read(CSV_SNIFF_CHARS)
+    if len(sample) == CSV_SNIFF_CHARS and '\n' in sample:
+        sample = sample[:sample.rfind('\n')]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+    f.seek(0)
+    return sheet_text(csv.reader(f, dialect), options, name)